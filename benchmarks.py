@@ -0,0 +1,1048 @@
+"""
+GalaxyWrite benchmarks.
+Generates deterministic synthetic datasets and times DataManager methods and page data paths
+against them, reporting latency percentiles, query counts and peak memory. A load test drives
+the same operations from many concurrent sessions, e.g.:
+    python manage.py generate-data --scale 10k
+    python manage.py benchmark --scale 10k --save-baseline
+    python manage.py benchmark --scale 10k
+    python manage.py load-test --scale 10k --sessions 1 4 16 32
+    python manage.py import-time
+"""
+
+import base64
+import io
+import json
+import platform
+import random
+import sqlite3
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import tracemalloc
+import uuid
+from collections import Counter
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import bcrypt
+from PIL import Image
+from sqlalchemy import event, func, literal_column, select
+
+from blog_platform import (
+    APP_URL,
+    RENDER_VERSION,
+    TRENDING_PAGE_SIZE,
+    AnalyticsEvent,
+    Blog,
+    CaseStudy,
+    Comment,
+    DataManager,
+    Follow,
+    JobWorker,
+    Like,
+    Media,
+    Tag,
+    User,
+    blog_tags,
+    bootstrap_schema,
+    capture_queries,
+    case_study_tags,
+    get_db_engine,
+    get_db_session,
+    handle_notify_followers,
+    iter_batches,
+    new_id,
+    rebuild_derived_indexes,
+    render_comment,
+    render_content,
+)
+
+# Synthetic datasets: every row is derived from the seed, so a scale always produces the same data.
+BENCHMARK_DIR = Path("benchmark_data")
+BENCHMARK_SEED = 42
+BENCHMARK_EPOCH = datetime(2025, 1, 1)
+BENCHMARK_SPAN_DAYS = 365
+BENCHMARK_PASSWORD = "benchmark-password"
+BENCHMARK_BATCH_SIZE = 5000
+BENCHMARK_VOCABULARY_SIZE = 5000
+BENCHMARK_NAMESPACE = uuid.UUID("6f1c9a52-3a1e-4f0b-9d1e-5b7a2c4e8f10")
+
+# Row counts per 1,000 users; larger scales multiply every count.
+BENCHMARK_BASE_SCALE = {
+    'users': 1000, 'tags': 100, 'blogs': 2000, 'case_studies': 200, 'likes': 10000,
+    'comments': 3000, 'events': 20000, 'follows': 5000, 'media': 200
+}
+BENCHMARK_SCALES = {
+    label: {kind: count * factor for kind, count in BENCHMARK_BASE_SCALE.items()}
+    for label, factor in (('1k', 1), ('10k', 10), ('100k', 100), ('1m', 1000))
+}
+BENCHMARK_EVENT_TYPES = {'view': 60, 'like': 12, 'comment': 5, 'share': 3, 'view_profile': 10, 'explore_tag': 8, 'follow': 2}
+
+# Benchmark runs: a method regresses when its p95 latency or peak memory grows by more than the
+# tolerance (and by more than the noise floor), or when it issues more queries than the baseline.
+BENCHMARK_ITERATIONS = 30
+BENCHMARK_WARMUP = 3
+BENCHMARK_SAMPLE_SIZE = 200
+BENCHMARK_REGRESSION_TOLERANCE = 0.2
+BENCHMARK_LATENCY_NOISE_MS = 2.0
+BENCHMARK_MEMORY_NOISE_KB = 256
+
+# Load test: each simulated session runs benchmarks picked by weight from the mix, the way
+# Streamlit runs each browser session as a thread sharing one engine.
+LOAD_TEST_MIX = {
+    'page:explore': 40, 'get_content_by_id': 15, 'save_like': 15, 'save_comment': 8,
+    'save_blog': 2, 'log_analytics_event': 20
+}
+LOAD_TEST_SESSIONS = [1, 2, 4, 8, 16, 32]
+LOAD_TEST_DURATION = 10.0
+
+# Import-time budget for the app module, measured in fresh interpreters against an
+# already-bootstrapped database. Deferred modules must only be imported by the pages using them.
+IMPORT_TIME_BUDGET_MS = 1000
+IMPORT_TIME_RUNS = 5
+IMPORT_DEFERRED_MODULES = ('pandas', 'PIL', 'reportlab', 'numpy', 'scipy')
+
+
+def database_path(scale: str) -> Path:
+    """
+    Default database file for a synthetic dataset.
+    Args:
+        scale: Scale label from BENCHMARK_SCALES.
+    Returns:
+        Path: SQLite database path.
+    """
+    return BENCHMARK_DIR / f"galaxywrite-{scale}.db"
+
+
+def baseline_path(scale: str) -> Path:
+    """
+    Default stored baseline for a scale.
+    Args:
+        scale: Scale label from BENCHMARK_SCALES.
+    Returns:
+        Path: Baseline JSON path.
+    """
+    return BENCHMARK_DIR / f"baseline-{scale}.json"
+
+
+def open_data_manager(path: Path) -> DataManager:
+    """
+    Open (creating if needed) a benchmark database with the application schema.
+    Args:
+        path: SQLite database path.
+    Returns:
+        DataManager: Data manager bound to the database.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    engine = get_db_engine(f"sqlite:///{path}")
+    bootstrap_schema(engine, auto_apply="1")
+    return DataManager(get_db_session(engine))
+
+
+def synthetic_id(kind: str, index: int) -> str:
+    """
+    Stable ID of the index-th synthetic row of a kind, so rows can reference each other
+    without keeping generated IDs in memory.
+    Args:
+        kind: Row kind, e.g. 'blog'.
+        index: 0-based row number.
+    Returns:
+        str: UUID string.
+    """
+    return str(uuid.uuid5(BENCHMARK_NAMESPACE, f"{kind}:{index}"))
+
+
+def synthetic_username(index: int) -> str:
+    """
+    Username of the index-th synthetic user.
+    Args:
+        index: 0-based user number.
+    Returns:
+        str: Username.
+    """
+    return f"user{index:07d}"
+
+
+class SyntheticDataGenerator:
+    """
+    Fills an empty database with a deterministic, realistically skewed dataset.
+    Authors, followed users, liked content and words follow Zipf-like popularity, and all rows are
+    inserted with executemany in batches of BENCHMARK_BATCH_SIZE.
+    """
+
+    def __init__(self, dm: DataManager, scale: str = '10k', seed: int = BENCHMARK_SEED,
+                 batch_size: int = BENCHMARK_BATCH_SIZE):
+        if scale not in BENCHMARK_SCALES:
+            raise ValueError(f"Unknown scale {scale}; choose from {', '.join(BENCHMARK_SCALES)}")
+        self.dm = dm
+        self.scale = scale
+        self.counts = BENCHMARK_SCALES[scale]
+        self.seed = seed
+        self.batch_size = batch_size
+        self.rng = random.Random(seed)
+        self.vocabulary = self._vocabulary()
+        self.word_weights = self._zipf_weights(len(self.vocabulary))
+        self.user_weights = self._zipf_weights(self.counts['users'])
+        self.content_count = self.counts['blogs'] + self.counts['case_studies']
+        self.content_weights = self._zipf_weights(self.content_count)
+        self.tag_weights = self._zipf_weights(self.counts['tags'])
+
+    def run(self, progress_callback=None) -> Dict[str, int]:
+        """
+        Generate every table of the dataset.
+        Args:
+            progress_callback: Called with (table, rows inserted so far, rows to insert).
+        Returns:
+            Dict[str, int]: Rows inserted per kind.
+        Raises:
+            ValueError: If the database already contains users.
+        """
+        with self.dm.session_factory() as session:
+            if session.scalar(select(func.count()).select_from(User)):
+                raise ValueError("Database already contains data; generate into an empty database")
+        self._generate_users(progress_callback)
+        self._generate_tags()
+        self._generate_content('blog', progress_callback)
+        self._generate_content('case_study', progress_callback)
+        self._generate_media(progress_callback)
+        self._generate_likes(progress_callback)
+        self._generate_comments(progress_callback)
+        self._generate_events(progress_callback)
+        rebuild_derived_indexes(self.dm.session_factory)
+        return dict(self.counts)
+
+    def _generate_users(self, progress_callback) -> None:
+        users = self.counts['users']
+        following = [[] for _ in range(users)]
+        seen = set()
+        for _ in range(self.counts['follows']):
+            follower = self.rng.randrange(users)
+            followed = self._pick(self.user_weights)
+            if follower != followed and (follower, followed) not in seen:
+                seen.add((follower, followed))
+                following[follower].append(synthetic_username(followed))
+        # bcrypt with a fixed salt and the minimum cost keeps generation fast and deterministic.
+        password = bcrypt.hashpw(BENCHMARK_PASSWORD.encode(), b"$2b$04$GalaxyWriteBenchmarkSu").decode()
+        rows = ({
+            'id': index + 1,
+            'username': synthetic_username(index),
+            'password': password,
+            'email': f"{synthetic_username(index)}@example.com",
+            'profile': {'bio': self._sentence(12), 'following': following[index]},
+            'created_at': self._timestamp(),
+            'is_active': self.rng.random() >= 0.02,
+            'is_admin': index == 0,
+            'last_login': self._timestamp()
+        } for index in range(users))
+        self._insert('users', User.__table__, rows, users, progress_callback)
+        follows = ({'follower_id': follower + 1, 'followed_id': followed + 1, 'created_at': BENCHMARK_EPOCH}
+                   for follower, followed in sorted(seen))
+        self._insert('follows', Follow.__table__, follows, len(seen), progress_callback)
+
+    def _generate_tags(self) -> None:
+        rows = [{'id': synthetic_id('tag', index), 'name': f"{self.vocabulary[index]}-{index}",
+                 'created_at': BENCHMARK_EPOCH} for index in range(self.counts['tags'])]
+        self._insert('tags', Tag.__table__, rows, len(rows), None)
+
+    def _generate_content(self, content_type: str, progress_callback) -> None:
+        model, association, key = (Blog, blog_tags, 'blog_id') if content_type == 'blog' else \
+            (CaseStudy, case_study_tags, 'case_study_id')
+        total = self.counts['blogs' if content_type == 'blog' else 'case_studies']
+        offset = 0 if content_type == 'blog' else self.counts['blogs']
+        done = 0
+        for indexes in iter_batches(range(total), self.batch_size):
+            rows, links = [], []
+            for index in indexes:
+                content_id = synthetic_id(content_type, index)
+                author = self._pick(self.user_weights)
+                tag_indexes = sorted({self._pick(self.tag_weights) for _ in range(self.rng.randint(1, 4))})
+                created_at = self._timestamp()
+                row = {
+                    'id': content_id,
+                    'user_id': author + 1,
+                    'username': synthetic_username(author),
+                    'title': self._sentence(self.rng.randint(4, 10)).rstrip('.').title(),
+                    'tags': [f"{self.vocabulary[tag]}-{tag}" for tag in tag_indexes],
+                    'media': self._media_for(offset + index),
+                    'font': 'Inter',
+                    'content_type': content_type,
+                    'created_at': created_at,
+                    'updated_at': created_at,
+                    'views': int(self.rng.paretovariate(1.2) * 10),
+                    'public_link': f"{APP_URL}/content/{content_type}/{synthetic_username(author)}/{content_id}",
+                    'is_published': self.rng.random() < 0.9,
+                    'is_draft': False
+                }
+                if content_type == 'blog':
+                    row['content'] = self._paragraphs(self.rng.randint(50, 400))
+                else:
+                    row['problem'] = self._paragraphs(self.rng.randint(30, 120))
+                    row['solution'] = self._paragraphs(self.rng.randint(30, 120))
+                    row['results'] = self._paragraphs(self.rng.randint(20, 80))
+                row.update(render_content(content_type, row))
+                rows.append(row)
+                links.extend({key: content_id, 'tag_id': synthetic_id('tag', tag)} for tag in tag_indexes)
+            with self.dm.session_factory() as session:
+                session.execute(model.__table__.insert(), rows)
+                session.execute(association.insert(), links)
+                session.commit()
+            done += len(rows)
+            if progress_callback:
+                progress_callback(model.__tablename__, done, total)
+
+    def _generate_media(self, progress_callback) -> None:
+        image = io.BytesIO()
+        Image.new('RGB', (64, 64), (90, 120, 200)).save(image, format='PNG')
+        data = image.getvalue()
+        encoded = base64.b64encode(data).decode()
+        media, content_count = self.counts['media'], self.content_count
+
+        def row(index: int) -> Dict[str, Any]:
+            content_index = index * content_count // media
+            content_type, content_id = self._content(content_index)
+            owner = self._owner(content_index)
+            return {
+                'id': synthetic_id('media', index), 'user_id': owner + 1, 'username': synthetic_username(owner),
+                'content_type': content_type, 'content_id': content_id, 'type': 'image', 'content': encoded,
+                'filename': f"image-{index}.png", 'uploaded_at': self._timestamp(), 'size': len(data),
+                'checksum': synthetic_id('checksum', index)
+            }
+
+        self._insert('media', Media.__table__, (row(index) for index in range(media)), media, progress_callback)
+
+    def _generate_likes(self, progress_callback) -> None:
+        users, seen = self.counts['users'], set()
+
+        def rows():
+            for index in range(self.counts['likes']):
+                user, content_index = self.rng.randrange(users), self._pick(self.content_weights)
+                if (user, content_index) in seen:
+                    continue
+                seen.add((user, content_index))
+                content_type, content_id = self._content(content_index)
+                yield {'id': synthetic_id('like', index), 'user_id': user + 1, 'content_type': content_type,
+                       'content_id': content_id, 'created_at': self._timestamp()}
+
+        self._insert('likes', Like.__table__, rows(), self.counts['likes'], progress_callback)
+
+    def _generate_comments(self, progress_callback) -> None:
+        def row(index: int) -> Dict[str, Any]:
+            user = self.rng.randrange(self.counts['users'])
+            content_type, content_id = self._content(self._pick(self.content_weights))
+            comment, created_at = self._sentence(self.rng.randint(5, 40)), self._timestamp()
+            return {'id': synthetic_id('comment', index), 'user_id': user + 1, 'username': synthetic_username(user),
+                    'content_type': content_type, 'content_id': content_id, 'comment': comment,
+                    'comment_html': render_comment(synthetic_username(user), comment, created_at),
+                    'render_version': RENDER_VERSION, 'created_at': created_at}
+
+        comments = self.counts['comments']
+        self._insert('comments', Comment.__table__, (row(index) for index in range(comments)), comments, progress_callback)
+
+    def _generate_events(self, progress_callback) -> None:
+        event_types = list(BENCHMARK_EVENT_TYPES)
+        event_weights = list(BENCHMARK_EVENT_TYPES.values())
+
+        def row(index: int) -> Dict[str, Any]:
+            user = self.rng.randrange(self.counts['users'])
+            content_type, content_id = self._content(self._pick(self.content_weights))
+            return {'id': synthetic_id('event', index), 'user_id': None if self.rng.random() < 0.1 else user + 1,
+                    'event_type': self.rng.choices(event_types, event_weights)[0], 'content_type': content_type,
+                    'content_id': content_id, 'timestamp': self._timestamp(), 'event_metadata': {}}
+
+        events = self.counts['events']
+        self._insert('analytics_events', AnalyticsEvent.__table__, (row(index) for index in range(events)), events,
+                     progress_callback)
+
+    def _insert(self, name: str, table, rows, total: int, progress_callback) -> None:
+        done = 0
+        for batch in iter_batches(rows, self.batch_size):
+            with self.dm.session_factory() as session:
+                session.execute(table.insert(), batch)
+                session.commit()
+            done += len(batch)
+            if progress_callback:
+                progress_callback(name, done, total)
+
+    def _content(self, content_index: int) -> tuple:
+        if content_index < self.counts['blogs']:
+            return 'blog', synthetic_id('blog', content_index)
+        return 'case_study', synthetic_id('case_study', content_index - self.counts['blogs'])
+
+    def _owner(self, content_index: int) -> int:
+        # Media owners only need to be stable, not to match the content author.
+        return content_index % self.counts['users']
+
+    def _media_for(self, content_index: int) -> List[str]:
+        media, content_count = self.counts['media'], self.content_count
+        first = -(-content_index * media // content_count)
+        last = -(-(content_index + 1) * media // content_count)
+        return [synthetic_id('media', index) for index in range(first, min(last, media))]
+
+    def _vocabulary(self) -> List[str]:
+        syllables = ['ka', 'lo', 'mi', 'ne', 'ru', 'ta', 'vo', 'shi', 'qua', 'zen', 'dor', 'fel', 'gra', 'pix', 'sol']
+        words = set()
+        while len(words) < BENCHMARK_VOCABULARY_SIZE:
+            words.add(''.join(self.rng.choice(syllables) for _ in range(self.rng.randint(1, 4))))
+        return sorted(words, key=lambda word: (len(word), word))
+
+    def _zipf_weights(self, count: int, exponent: float = 1.1) -> List[float]:
+        total, weights = 0.0, []
+        for rank in range(count):
+            total += 1.0 / (rank + 1) ** exponent
+            weights.append(total)
+        return weights
+
+    def _pick(self, cum_weights: List[float]) -> int:
+        return self.rng.choices(range(len(cum_weights)), cum_weights=cum_weights)[0]
+
+    def _sentence(self, words: int) -> str:
+        chosen = self.rng.choices(self.vocabulary, cum_weights=self.word_weights, k=words)
+        return ' '.join(chosen).capitalize() + '.'
+
+    def _paragraphs(self, words: int) -> str:
+        sentences = []
+        while words > 0:
+            length = min(words, self.rng.randint(6, 20))
+            sentences.append(self._sentence(length))
+            words -= length
+        return '\n\n'.join(' '.join(sentences[i:i + 5]) for i in range(0, len(sentences), 5))
+
+    def _timestamp(self) -> datetime:
+        return BENCHMARK_EPOCH + timedelta(seconds=self.rng.randrange(BENCHMARK_SPAN_DAYS * 86400))
+
+
+class BenchmarkContext:
+    """
+    Deterministic samples of existing rows that benchmarks draw their arguments from.
+    """
+
+    def __init__(self, dm: DataManager, seed: int = BENCHMARK_SEED, sample_size: int = BENCHMARK_SAMPLE_SIZE):
+        self.dm = dm
+        self.rng = random.Random(seed)
+        with dm.session_factory() as session:
+            self.usernames = self._sample(session, User.__table__, User.username, sample_size)
+            self.blog_ids = self._sample(session, Blog.__table__, Blog.id, sample_size)
+            self.case_study_ids = self._sample(session, CaseStudy.__table__, CaseStudy.id, sample_size)
+            self.tags = self._sample(session, Tag.__table__, Tag.name, sample_size)
+            # The most prolific author stands in for a popular account.
+            self.popular_author = session.execute(
+                select(Blog.username).group_by(Blog.username).order_by(func.count().desc()).limit(1)
+            ).scalar() or (self.usernames[0] if self.usernames else None)
+            words = session.execute(select(Blog.title).order_by(Blog.created_at).limit(50)).scalars().all()
+        if not (self.usernames and self.blog_ids):
+            raise ValueError("Benchmark database is empty; run generate-data first")
+        words = sorted({word.lower() for title in words for word in title.split()}, key=len)
+        self.common_term = words[0] if words else 'a'
+        self.rare_term = words[-1] if words else 'zzz'
+        self.latest = BENCHMARK_EPOCH + timedelta(days=BENCHMARK_SPAN_DAYS)
+
+    def fork(self, seed: int) -> 'BenchmarkContext':
+        """
+        Copy the samples with an independent random generator, one per simulated session.
+        Args:
+            seed: Seed for the copy's generator.
+        Returns:
+            BenchmarkContext: Context sharing this one's samples.
+        """
+        forked = object.__new__(BenchmarkContext)
+        forked.__dict__.update(self.__dict__)
+        forked.rng = random.Random(seed)
+        return forked
+
+    def user(self) -> str:
+        return self.rng.choice(self.usernames)
+
+    def blog(self) -> str:
+        return self.rng.choice(self.blog_ids)
+
+    def content(self) -> tuple:
+        if self.case_study_ids and self.rng.random() < 0.2:
+            return 'case_study', self.rng.choice(self.case_study_ids)
+        return 'blog', self.blog()
+
+    def tag(self) -> str:
+        return self.rng.choice(self.tags)
+
+    def _sample(self, session, table, column, size: int) -> List[Any]:
+        # Sampling by rowid keeps the choice stable for a given database and seed.
+        rowid = literal_column(f"{table.name}.rowid")
+        max_rowid = session.execute(select(func.max(rowid)).select_from(table)).scalar() or 0
+        rowids = sorted(self.rng.sample(range(1, max_rowid + 1), min(size, max_rowid)))
+        return session.execute(select(column).where(rowid.in_(rowids))).scalars().all()
+
+
+# Benchmarks, keyed by name; each receives a BenchmarkContext and runs one operation.
+BENCHMARKS: Dict[str, Dict[str, Any]] = {}
+
+
+def benchmark(name: str, group: str = 'data_manager', iterations: Optional[int] = None):
+    """
+    Register a benchmark.
+    Args:
+        name: Unique benchmark name.
+        group: 'data_manager' for single DataManager methods, 'page' for a page's data path.
+        iterations: Iterations to run instead of the suite default, for slow operations.
+    Returns:
+        Callable: Decorator.
+    """
+    def register(func):
+        BENCHMARKS[name] = {'func': func, 'group': group, 'iterations': iterations}
+        return func
+    return register
+
+
+@benchmark('get_content_by_id')
+def bench_get_content_by_id(ctx: BenchmarkContext) -> None:
+    ctx.dm.get_content_by_id(*ctx.content())
+
+
+@benchmark('get_user_content')
+def bench_get_user_content(ctx: BenchmarkContext) -> None:
+    ctx.dm.get_user_content(ctx.user())
+
+
+@benchmark('search_content:rare_term')
+def bench_search_rare(ctx: BenchmarkContext) -> None:
+    ctx.dm.search_content(ctx.rare_term)
+
+
+@benchmark('search_content:common_term', iterations=5)
+def bench_search_common(ctx: BenchmarkContext) -> None:
+    ctx.dm.search_content(ctx.common_term, content_type='blog')
+
+
+@benchmark('search_content:tag')
+def bench_search_tag(ctx: BenchmarkContext) -> None:
+    ctx.dm.search_content(ctx.rare_term, tags=[ctx.tag()])
+
+
+@benchmark('get_timeline')
+def bench_get_timeline(ctx: BenchmarkContext) -> None:
+    ctx.dm.get_timeline(ctx.user())
+
+
+@benchmark('get_related_content')
+def bench_get_related_content(ctx: BenchmarkContext) -> None:
+    ctx.dm.get_related_content([('blog', ctx.blog()) for _ in range(10)])
+
+
+@benchmark('search_content:trending')
+def bench_search_trending(ctx: BenchmarkContext) -> None:
+    ctx.dm.search_content('', trending=True, limit=TRENDING_PAGE_SIZE)
+
+
+@benchmark('get_analytics')
+def bench_get_analytics(ctx: BenchmarkContext) -> None:
+    ctx.dm.get_analytics(ctx.popular_author, start_date=ctx.latest - timedelta(days=30), end_date=ctx.latest)
+
+
+@benchmark('query_users')
+def bench_query_users(ctx: BenchmarkContext) -> None:
+    ctx.dm.query_users(status='active', page=ctx.rng.randint(1, 5))
+
+
+@benchmark('query_users:search')
+def bench_query_users_search(ctx: BenchmarkContext) -> None:
+    ctx.dm.query_users(search=ctx.user()[-4:])
+
+
+@benchmark('query_content')
+def bench_query_content(ctx: BenchmarkContext) -> None:
+    ctx.dm.query_content('blog', status='published', page=ctx.rng.randint(1, 5))
+
+
+@benchmark('get_notifications')
+def bench_get_notifications(ctx: BenchmarkContext) -> None:
+    ctx.dm.get_notifications(ctx.user())
+
+
+@benchmark('get_media_usage')
+def bench_get_media_usage(ctx: BenchmarkContext) -> None:
+    ctx.dm.get_media_usage(ctx.user())
+
+
+@benchmark('get_job_stats')
+def bench_get_job_stats(ctx: BenchmarkContext) -> None:
+    ctx.dm.get_job_stats()
+
+
+@benchmark('save_blog')
+def bench_save_blog(ctx: BenchmarkContext) -> None:
+    ctx.dm.save_blog(ctx.user(), "Benchmark post", "Benchmark body " * 50, f"{ctx.tag()}, {ctx.tag()}")
+
+
+@benchmark('update_blog')
+def bench_update_blog(ctx: BenchmarkContext) -> None:
+    ctx.dm.update_blog(ctx.blog(), "Updated benchmark post", f"Updated body {ctx.rng.random()} " * 50,
+                       ctx.tag(), [], 'Inter', True, False)
+
+
+@benchmark('save_comment')
+def bench_save_comment(ctx: BenchmarkContext) -> None:
+    ctx.dm.save_comment(ctx.user(), *ctx.content(), "Benchmark comment")
+
+
+@benchmark('save_like')
+def bench_save_like(ctx: BenchmarkContext) -> None:
+    username, (content_type, content_id) = ctx.user(), ctx.content()
+    ctx.dm.save_like(username, content_type, content_id)
+    ctx.dm.remove_like(username, content_type, content_id)
+
+
+@benchmark('log_analytics_event')
+def bench_log_analytics_event(ctx: BenchmarkContext) -> None:
+    ctx.dm.log_analytics_event(ctx.user(), 'view', *ctx.content())
+
+
+@benchmark('record_analytics_event')
+def bench_record_analytics_event(ctx: BenchmarkContext) -> None:
+    ctx.dm.record_analytics_event(ctx.user(), 'view', *ctx.content())
+
+
+@benchmark('record_views')
+def bench_record_views(ctx: BenchmarkContext) -> None:
+    ctx.dm.record_views([ctx.content() for _ in range(20)])
+
+
+@benchmark('notify_followers', iterations=5)
+def bench_notify_followers(ctx: BenchmarkContext) -> None:
+    # Runs the job the app enqueues on publish; a fresh content ID keeps the dedupe check from
+    # skipping followers notified by an earlier iteration.
+    handle_notify_followers(ctx.dm, {'username': ctx.popular_author, 'content_type': 'blog',
+                                     'content_id': new_id(), 'message': "Benchmark notification"})
+
+
+@benchmark('save_draft')
+def bench_save_draft(ctx: BenchmarkContext) -> None:
+    ctx.dm.save_draft(ctx.user(), 'blog', None, {'title': "Draft", 'content': f"Draft body {ctx.rng.random()}"})
+
+
+@benchmark('get_content_history')
+def bench_get_content_history(ctx: BenchmarkContext) -> None:
+    ctx.dm.get_content_history('blog', ctx.blog())
+
+
+@benchmark('count_pending_purge')
+def bench_count_pending_purge(ctx: BenchmarkContext) -> None:
+    ctx.dm.count_pending_purge()
+
+
+@benchmark('page:explore', group='page')
+def bench_page_explore(ctx: BenchmarkContext) -> None:
+    # Mirrors view_content_page: tag options, search, view counting, related posts, then per card
+    # the like count, the viewer's like and the latest comments.
+    dm, username = ctx.dm, ctx.user()
+    with dm.session_factory() as session:
+        session.query(Tag).all()
+    contents = dm.search_content(ctx.rare_term)
+    dm.record_views([(content.content_type, content.id) for content in contents])
+    dm.get_related_content([(content.content_type, content.id) for content in contents])
+    with dm.session_factory() as session:
+        user = session.query(User).filter_by(username=username).first()
+        for content in contents:
+            session.query(Like).filter_by(content_type=content.content_type, content_id=content.id).count()
+            session.query(Like).filter_by(user_id=user.id, content_type=content.content_type,
+                                          content_id=content.id).first()
+            session.query(Comment).filter_by(content_type=content.content_type, content_id=content.id) \
+                .order_by(Comment.created_at.desc()).limit(5).all()
+            if content.media:
+                session.query(Media.id, Media.type, Media.filename).filter(Media.id.in_(content.media)).all()
+
+
+@benchmark('page:analytics', group='page')
+def bench_page_analytics(ctx: BenchmarkContext) -> None:
+    # Mirrors analytics_page for the most prolific author.
+    username = ctx.popular_author
+    ctx.dm.get_analytics(username, start_date=ctx.latest - timedelta(days=30), end_date=ctx.latest)
+    with ctx.dm.session_factory() as session:
+        session.query(Blog.id, Blog.title, Blog.views, Blog.created_at).filter_by(
+            username=username, deleted_at=None).all()
+        session.query(CaseStudy.id, CaseStudy.title, CaseStudy.views, CaseStudy.created_at).filter_by(
+            username=username, deleted_at=None).all()
+        user = session.query(User).filter_by(username=username).first()
+        session.query(AnalyticsEvent).filter_by(user_id=user.id).limit(20).all()
+
+
+@benchmark('page:public_profile', group='page')
+def bench_page_public_profile(ctx: BenchmarkContext) -> None:
+    # Mirrors public_profile_page and its follow button.
+    username = ctx.user()
+    with ctx.dm.session_factory() as session:
+        session.query(User).filter_by(username=username).first()
+        session.query(Blog).filter_by(username=username, is_published=True, deleted_at=None).all()
+        session.query(CaseStudy).filter_by(username=username, is_published=True, deleted_at=None).all()
+    ctx.dm.is_following(ctx.user(), username)
+    ctx.dm.log_analytics_event(None, 'view_profile', event_metadata={'profile_user': username})
+
+
+@benchmark('page:tag_explorer', group='page', iterations=10)
+def bench_page_tag_explorer(ctx: BenchmarkContext) -> None:
+    # Mirrors tag_explorer_page, which loads every tag and then the tagged content.
+    with ctx.dm.session_factory() as session:
+        session.query(Tag).all()
+        tag = session.query(Tag).filter_by(name=ctx.tag()).first()
+        [content.title for content in tag.blogs + tag.case_studies if content.is_published]
+
+
+@benchmark('page:notifications', group='page')
+def bench_page_notifications(ctx: BenchmarkContext) -> None:
+    # Mirrors notifications_page.
+    username = ctx.user()
+    ctx.dm.get_notifications(username)
+    ctx.dm.log_analytics_event(username, 'view_notifications')
+
+
+@benchmark('page:admin', group='page')
+def bench_page_admin(ctx: BenchmarkContext) -> None:
+    # Mirrors the admin dashboard's first pages and counters.
+    ctx.dm.query_users()
+    ctx.dm.query_content('blog')
+    ctx.dm.query_content('case_study')
+    ctx.dm.count_pending_purge()
+    ctx.dm.get_job_stats()
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """
+    Nearest-rank percentile.
+    Args:
+        samples: Measurements.
+        pct: Percentile between 0 and 100.
+    Returns:
+        float: The percentile, or 0 for no samples.
+    """
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered) + 0.5)) - 1))]
+
+
+def run_benchmark(ctx: BenchmarkContext, name: str, iterations: int = BENCHMARK_ITERATIONS,
+                  warmup: int = BENCHMARK_WARMUP) -> Dict[str, Any]:
+    """
+    Time one benchmark.
+    Latency and query counts come from untraced iterations; peak memory from one extra
+    iteration under tracemalloc, whose overhead would otherwise skew the timings.
+    Args:
+        ctx: Benchmark context.
+        name: Registered benchmark name.
+        iterations: Timed iterations (a benchmark's own iteration count takes precedence).
+        warmup: Untimed iterations run first.
+    Returns:
+        Dict[str, Any]: Latency percentiles in ms, queries per iteration and peak memory in KB.
+    """
+    spec = BENCHMARKS[name]
+    iterations = spec['iterations'] or iterations
+    for _ in range(min(warmup, iterations)):
+        spec['func'](ctx)
+    timings, queries = [], []
+    for _ in range(iterations):
+        with capture_queries(name) as profile:
+            spec['func'](ctx)
+        timings.append(profile.render_time * 1000)
+        queries.append(profile.query_count)
+    tracemalloc.start()
+    try:
+        spec['func'](ctx)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {
+        'group': spec['group'],
+        'iterations': iterations,
+        'p50_ms': round(percentile(timings, 50), 3),
+        'p95_ms': round(percentile(timings, 95), 3),
+        'p99_ms': round(percentile(timings, 99), 3),
+        'mean_ms': round(sum(timings) / len(timings), 3),
+        'queries': round(sum(queries) / len(queries), 2),
+        'peak_kb': round(peak / 1024, 1)
+    }
+
+
+def run_benchmarks(dm: DataManager, names: Optional[List[str]] = None, iterations: int = BENCHMARK_ITERATIONS,
+                   seed: int = BENCHMARK_SEED, progress_callback=None) -> Dict[str, Any]:
+    """
+    Run the benchmark suite against a database.
+    Args:
+        dm: Data manager bound to the benchmark database.
+        names: Benchmarks to run (all when None).
+        iterations: Timed iterations per benchmark.
+        seed: Seed for argument sampling.
+        progress_callback: Called with (name, result) after each benchmark.
+    Returns:
+        Dict[str, Any]: Run metadata and per-benchmark results.
+    Raises:
+        ValueError: If a benchmark name is unknown or the database is empty.
+    """
+    unknown = set(names or []) - set(BENCHMARKS)
+    if unknown:
+        raise ValueError(f"Unknown benchmarks: {', '.join(sorted(unknown))}")
+    ctx = BenchmarkContext(dm, seed=seed)
+    results = {}
+    for name in names or list(BENCHMARKS):
+        results[name] = run_benchmark(ctx, name, iterations=iterations)
+        if progress_callback:
+            progress_callback(name, results[name])
+    return {
+        'created_at': datetime.utcnow().isoformat(),
+        'python': platform.python_version(),
+        'sqlite': sqlite3.sqlite_version,
+        'seed': seed,
+        'benchmarks': results
+    }
+
+
+def compare_to_baseline(results: Dict[str, Any], baseline: Dict[str, Any],
+                        tolerance: float = BENCHMARK_REGRESSION_TOLERANCE) -> List[Dict[str, Any]]:
+    """
+    Find benchmarks that regressed against a stored baseline.
+    Args:
+        results: Output of run_benchmarks.
+        baseline: A previous run_benchmarks output.
+        tolerance: Allowed relative growth of p95 latency and peak memory.
+    Returns:
+        List[Dict[str, Any]]: One entry per regressed metric with the name, metric, baseline and current values.
+    """
+    regressions = []
+    for name, current in results['benchmarks'].items():
+        previous = baseline.get('benchmarks', {}).get(name)
+        if not previous:
+            continue
+        checks = (
+            ('p95_ms', BENCHMARK_LATENCY_NOISE_MS, tolerance),
+            ('peak_kb', BENCHMARK_MEMORY_NOISE_KB, tolerance),
+            ('queries', 0, 0)
+        )
+        for metric, noise, allowed in checks:
+            if current[metric] > previous[metric] * (1 + allowed) and current[metric] - previous[metric] > noise:
+                regressions.append({'name': name, 'metric': metric, 'baseline': previous[metric],
+                                    'current': current[metric]})
+    return regressions
+
+
+def load_results(path: Path) -> Dict[str, Any]:
+    """
+    Load stored benchmark results.
+    Args:
+        path: JSON file written by save_results.
+    Returns:
+        Dict[str, Any]: Stored results.
+    """
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_results(results: Dict[str, Any], path: Path) -> None:
+    """
+    Store benchmark results as JSON.
+    Args:
+        results: Output of run_benchmarks.
+        path: Destination file.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(results, f, indent=2)
+
+
+class LoadTest:
+    """
+    Runs a weighted mix of benchmarks from N concurrent sessions for a fixed duration per
+    concurrency level, measuring throughput, tail latency, lock waits and errors.
+    Lock wait is the time spent in INSERT/UPDATE/DELETE statements: with WAL, readers never
+    block, so a session waits on SQLite's single write lock (up to the busy timeout) there.
+    Database errors are counted from the engine even when a DataManager method swallows them.
+    """
+
+    def __init__(self, dm: DataManager, mix: Optional[Dict[str, int]] = None, duration: float = LOAD_TEST_DURATION,
+                 think_time: float = 0.0, seed: int = BENCHMARK_SEED, with_worker: bool = True):
+        self.mix = mix or LOAD_TEST_MIX
+        unknown = set(self.mix) - set(BENCHMARKS)
+        if unknown:
+            raise ValueError(f"Unknown benchmarks in mix: {', '.join(sorted(unknown))}")
+        self.dm = dm
+        self.duration = duration
+        self.think_time = think_time
+        self.seed = seed
+        self.with_worker = with_worker
+        self.ctx = BenchmarkContext(dm, seed=seed)
+        self._errors = threading.local()
+        self._db_errors = Counter()
+        self._lock = threading.Lock()
+        event.listen(dm.session_factory.kw['bind'], 'handle_error', self._record_db_error)
+
+    def run(self, sessions: List[int] = LOAD_TEST_SESSIONS, progress_callback=None) -> List[Dict[str, Any]]:
+        """
+        Run each concurrency level in turn.
+        Args:
+            sessions: Concurrent session counts to test.
+            progress_callback: Called with each level's result.
+        Returns:
+            List[Dict[str, Any]]: One result per level.
+        """
+        worker = JobWorker(self.dm, worker_id="load-test-worker") if self.with_worker else None
+        if worker:
+            worker.start()
+        try:
+            results = []
+            for count in sessions:
+                results.append(self.run_level(count))
+                if progress_callback:
+                    progress_callback(results[-1])
+            return results
+        finally:
+            if worker:
+                worker.stop()
+
+    def run_level(self, sessions: int) -> Dict[str, Any]:
+        """
+        Run the mix from a number of concurrent sessions for the configured duration.
+        Args:
+            sessions: Number of concurrent sessions.
+        Returns:
+            Dict[str, Any]: Throughput, latency percentiles, lock wait, error rate and per-operation results.
+        """
+        samples: List[Dict[str, Any]] = []
+        with self._lock:
+            self._db_errors.clear()
+        deadline = time.monotonic() + self.duration
+        threads = [threading.Thread(target=self._session, args=(self.ctx.fork(self.seed * 1000 + n), deadline, samples),
+                                    name=f"load-session-{n}") for n in range(sessions)]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+        latencies = [sample['ms'] for sample in samples]
+        lock_waits = [sample['lock_wait_ms'] for sample in samples]
+        failed = sum(1 for sample in samples if sample['error'])
+        operations = {}
+        for name in self.mix:
+            named = [sample for sample in samples if sample['name'] == name]
+            if named:
+                operations[name] = {
+                    'count': len(named),
+                    'p50_ms': round(percentile([sample['ms'] for sample in named], 50), 2),
+                    'p99_ms': round(percentile([sample['ms'] for sample in named], 99), 2),
+                    'errors': sum(1 for sample in named if sample['error'])
+                }
+        with self._lock:
+            db_errors = dict(self._db_errors)
+        return {
+            'sessions': sessions,
+            'duration_s': round(elapsed, 2),
+            'operations': len(samples),
+            'throughput_ops': round(len(samples) / elapsed, 1) if elapsed else 0.0,
+            'p50_ms': round(percentile(latencies, 50), 2),
+            'p95_ms': round(percentile(latencies, 95), 2),
+            'p99_ms': round(percentile(latencies, 99), 2),
+            'lock_wait_ms': round(sum(lock_waits), 1),
+            'lock_wait_p99_ms': round(percentile(lock_waits, 99), 2),
+            'error_rate': round(failed / len(samples), 4) if samples else 0.0,
+            'db_errors': db_errors,
+            'by_operation': operations
+        }
+
+    def _session(self, ctx: BenchmarkContext, deadline: float, samples: List[Dict[str, Any]]) -> None:
+        names, weights = list(self.mix), list(self.mix.values())
+        while time.monotonic() < deadline:
+            name = ctx.rng.choices(names, weights)[0]
+            self._errors.count = 0
+            error = None
+            with capture_queries(name) as profile:
+                try:
+                    BENCHMARKS[name]['func'](ctx)
+                except Exception as e:
+                    error = type(e).__name__
+            lock_wait = sum(stats['total_time'] for sql, stats in profile.statements.items()
+                            if sql.upper().startswith(('INSERT', 'UPDATE', 'DELETE')))
+            samples.append({'name': name, 'ms': profile.render_time * 1000, 'lock_wait_ms': lock_wait * 1000,
+                            'error': error or ('DatabaseError' if self._errors.count else None)})
+            if self.think_time:
+                time.sleep(ctx.rng.expovariate(1 / self.think_time))
+
+    def _record_db_error(self, exception_context) -> None:
+        self._errors.count = getattr(self._errors, 'count', 0) + 1
+        message = str(exception_context.original_exception)
+        key = 'database is locked' if 'database is locked' in message else type(exception_context.original_exception).__name__
+        with self._lock:
+            self._db_errors[key] += 1
+
+
+def measure_import_time(module: str = 'blog_platform', runs: int = IMPORT_TIME_RUNS,
+                        budget_ms: float = IMPORT_TIME_BUDGET_MS) -> Dict[str, Any]:
+    """
+    Time importing a module in fresh interpreters and check it against the budget.
+    The first import also bootstraps the schema if needed, so it is run once untimed.
+    Args:
+        module: Module to import.
+        runs: Timed imports.
+        budget_ms: Maximum allowed median import time.
+    Returns:
+        Dict[str, Any]: Median and best times, the slowest direct imports, deferred modules that were
+        loaded anyway, and whether the import is within budget.
+    """
+    script = (
+        "import json, sys, time\n"
+        "started = time.perf_counter()\n"
+        f"import {module}\n"
+        "elapsed = time.perf_counter() - started\n"
+        f"print(json.dumps({{'ms': elapsed * 1000, 'loaded': [m for m in {list(IMPORT_DEFERRED_MODULES)!r} if m in sys.modules]}}))\n"
+    )
+    subprocess.run([sys.executable, '-c', script], capture_output=True, check=True)
+    timings, loaded, imports = [], [], {}
+    for run in range(runs):
+        command = [sys.executable] + (['-X', 'importtime'] if run == 0 else []) + ['-c', script]
+        completed = subprocess.run(command, capture_output=True, text=True, check=True)
+        result = json.loads(completed.stdout.strip().splitlines()[-1])
+        if run == 0:
+            # -X importtime adds overhead, so its run only supplies the per-module breakdown.
+            imports = parse_import_times(completed.stderr, module)
+            loaded = result['loaded']
+            continue
+        timings.append(result['ms'])
+    median = statistics.median(timings) if timings else 0.0
+    return {
+        'module': module,
+        'median_ms': round(median, 1),
+        'best_ms': round(min(timings), 1) if timings else 0.0,
+        'budget_ms': budget_ms,
+        'slowest_imports': sorted(imports.items(), key=lambda item: item[1], reverse=True)[:10],
+        'deferred_loaded': loaded,
+        'within_budget': median <= budget_ms and not loaded
+    }
+
+
+def parse_import_times(report: str, module: str) -> Dict[str, float]:
+    """
+    Extract the cumulative time of each module imported directly by a module from
+    `python -X importtime` output.
+    Args:
+        report: stderr of the interpreter.
+        module: Importing module.
+    Returns:
+        Dict[str, float]: Milliseconds per directly imported top-level module.
+    """
+    entries = []
+    for line in report.splitlines():
+        if not line.startswith('import time:') or '|' not in line:
+            continue
+        _, cumulative, name = line.split('|')
+        if cumulative.strip().isdigit():
+            entries.append((len(name) - len(name.lstrip()), name.strip(), int(cumulative) / 1000))
+    # importtime lists a module after its imports, so the direct imports of `module` are the
+    # entries one level deeper that precede it.
+    times = {}
+    for index, (depth, name, ms) in enumerate(entries):
+        if name == module:
+            for child_depth, child, child_ms in reversed(entries[:index]):
+                if child_depth <= depth:
+                    break
+                if child_depth == depth + 2:
+                    times[child] = round(child_ms, 1)
+            break
+    return times
@@ -8,15 +8,39 @@ comments, likes, search, analytics, and admin tools.
 import streamlit as st
 import streamlit_authenticator as stauth  # pip install streamlit-authenticator
 import bleach
+from bleach.callbacks import nofollow
+from bleach.linkifier import LinkifyFilter
+from bleach.sanitizer import Cleaner
 import uuid
 import base64
 import urllib.parse
-import pandas as pd
 import re
 import json
 import time
 import logging
-from datetime import datetime, timedelta
+import logging.handlers
+import os
+import mimetypes
+import threading
+import hashlib
+import random
+import socket
+import sys
+import tempfile
+import zlib
+import difflib
+import importlib
+import multiprocessing
+import zipfile
+from collections import Counter, OrderedDict, deque
+from contextlib import contextmanager
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from email.utils import formatdate, parsedate_to_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from datetime import datetime, timedelta, timezone
+from functools import partial
+from html import unescape
 from typing import List, Optional, Dict, Any, Tuple
 from sqlalchemy import (
     ForeignKeyConstraint,
@@ -32,14 +56,23 @@ from sqlalchemy import (
     ForeignKey,
     Index,
     Float,
+    LargeBinary,
+    MetaData,
     and_,
     or_,
     text,
+    literal_column,
+    bindparam,
+    inspect as sa_inspect,
+    select,
+    update,
+    event,
 )
-from sqlalchemy.orm import foreign, relationship, sessionmaker, declarative_base, remote
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import aliased, foreign, relationship, sessionmaker, declarative_base, remote
 from sqlalchemy.exc import SQLAlchemyError, IntegrityError
 from sqlalchemy.sql import func
-from PIL import Image
+from sqlalchemy.types import TypeDecorator
 import io
 from pathlib import Path
 
@@ -50,16 +83,201 @@ logger = logging.getLogger(__name__)
 Base = declarative_base()
 APP_URL = "https://gallaxywrite.streamlit.app"
 
+# Media server settings. The server only runs when GALAXYWRITE_MEDIA_URL names a public URL
+# that reaches it from viewers' browsers (e.g. a reverse proxy to the local port); otherwise
+# media is sent through Streamlit. It serves only media of published, live content and
+# current profile pictures.
+MEDIA_BASE_URL = os.environ.get("GALAXYWRITE_MEDIA_URL", "").rstrip("/")
+MEDIA_SERVER_ENABLED = bool(MEDIA_BASE_URL) and os.environ.get("GALAXYWRITE_MEDIA_SERVER", "1") != "0"
+MEDIA_SERVER_HOST = os.environ.get("GALAXYWRITE_MEDIA_HOST", "127.0.0.1")
+MEDIA_SERVER_PORT = int(os.environ.get("GALAXYWRITE_MEDIA_PORT", "8502"))
+MEDIA_CACHE_MAX_AGE = 60 * 60 * 24 * 365
+MEDIA_STREAM_CHUNK_SIZE = 256 * 1024
+
+# Media ingest limits. Chunk size is a multiple of 3 so base64 chunks concatenate without padding.
+MEDIA_INGEST_CHUNK_SIZE = 3 * 256 * 1024
+MEDIA_SPOOL_MAX_MEMORY = 8 * 1024 * 1024
+MEDIA_MAX_FILE_SIZE = int(os.environ.get("GALAXYWRITE_MEDIA_MAX_FILE_SIZE", 200 * 1024 * 1024))
+MEDIA_USER_QUOTA = int(os.environ.get("GALAXYWRITE_MEDIA_USER_QUOTA", 1024 * 1024 * 1024))
+MEDIA_INGEST_WORKERS = int(os.environ.get("GALAXYWRITE_MEDIA_INGEST_WORKERS", 4))
+
+# Decoded image cache used by the media server and inline rendering.
+IMAGE_CACHE_MAX_BYTES = int(os.environ.get("GALAXYWRITE_IMAGE_CACHE_MB", 64)) * 1024 * 1024
+IMAGE_MAX_DISPLAY_WIDTH = 2048
+
+# Orphaned media garbage collection.
+MEDIA_GC_GRACE_PERIOD = timedelta(hours=int(os.environ.get("GALAXYWRITE_MEDIA_GC_GRACE_HOURS", 24)))
+MEDIA_GC_INTERVAL = int(os.environ.get("GALAXYWRITE_MEDIA_GC_INTERVAL", 60 * 60))
+MEDIA_GC_BATCH_SIZE = 500
+
+# Deleted content is hidden immediately and purged in the background after a grace period,
+# CONTENT_PURGE_BATCH_SIZE items per transaction.
+CONTENT_PURGE_GRACE_PERIOD = timedelta(hours=int(os.environ.get("GALAXYWRITE_PURGE_GRACE_HOURS", 24)))
+CONTENT_PURGE_INTERVAL = 600
+CONTENT_PURGE_BATCH_SIZE = 100
+CONTENT_PURGE_PAUSE = 0.05
+
+# Draft history: a snapshot every DRAFT_SNAPSHOT_INTERVAL revisions, otherwise a delta.
+# Retention keeps the last DRAFT_KEEP_LAST revisions plus one checkpoint per day.
+DRAFT_SNAPSHOT_INTERVAL = 10
+DRAFT_KEEP_LAST = 20
+DRAFT_CHECKPOINT_DAYS = 30
+
+# Published content history: a keyframe every REVISION_KEYFRAME_INTERVAL revisions bounds
+# reconstruction to at most that many deltas.
+REVISION_KEYFRAME_INTERVAL = 16
+
+# Large text and JSON columns are zlib-compressed when their UTF-8 encoding is at least
+# COMPRESSION_THRESHOLD bytes; shorter values are stored as plain text.
+COMPRESSION_THRESHOLD = int(os.environ.get("GALAXYWRITE_COMPRESSION_THRESHOLD", 1024))
+COMPRESSION_LEVEL = 6
+
+# Rendering: content, comments and notifications are sanitised and rendered to HTML once, when
+# saved, with a single cleaner configuration. Bump RENDER_VERSION whenever the rules or the
+# renderers change; the rerender job then refreshes every artifact stamped with an older version.
+RENDER_VERSION = 1
+RENDER_ALLOWED_TAGS = {'a', 'abbr', 'b', 'blockquote', 'br', 'code', 'em', 'h4', 'i', 'li', 'ol', 'p', 'pre', 'strong', 'ul'}
+RENDER_ALLOWED_ATTRIBUTES = {'a': ['href', 'title', 'rel'], 'abbr': ['title']}
+RENDER_ALLOWED_PROTOCOLS = {'http', 'https', 'mailto'}
+EXCERPT_LENGTH = 300
+CASE_STUDY_EXCERPT_LENGTH = 200
+RERENDER_BATCH_SIZE = 200
+
+# Trending: every view, like and comment adds its weight to the item's score, scaled by
+# 2^((event time - epoch) / half-life). Scores of older activity are then relatively smaller, so
+# ordering by the stored score ranks items by exponentially decayed activity without rewriting
+# rows as time passes. The renormalizer periodically moves the epoch to now, scaling every score
+# down to keep them in float range, and drops items whose decayed score fell below the minimum.
+TRENDING_HALF_LIFE = timedelta(hours=int(os.environ.get("GALAXYWRITE_TRENDING_HALF_LIFE_HOURS", 24)))
+TRENDING_WEIGHTS = {'view': 1.0, 'like': 5.0, 'comment': 10.0}
+TRENDING_RENORMALIZE_INTERVAL = 60 * 60
+TRENDING_MIN_SCORE = 0.01
+TRENDING_PAGE_SIZE = 20
+
+# Home timeline: publishing copies an entry into each follower's timeline (fan-out on write),
+# except for authors with at least TIMELINE_FANOUT_THRESHOLD followers, whose posts are merged
+# into their followers' timelines when read (fan-out on read). A timeline keeps its newest
+# TIMELINE_MAX_ENTRIES entries; following an author copies in their latest TIMELINE_BACKFILL_ENTRIES.
+TIMELINE_FANOUT_THRESHOLD = int(os.environ.get("GALAXYWRITE_TIMELINE_FANOUT_THRESHOLD", 1000))
+TIMELINE_MAX_ENTRIES = 500
+TIMELINE_BACKFILL_ENTRIES = 50
+TIMELINE_FANOUT_BATCH_SIZE = 500
+TIMELINE_PAGE_SIZE = 20
+
+# Related content: published posts are compared by cosine similarity of TF-IDF vectors of their
+# title and body, extended with tag features, and the RELATED_TOP_K most similar posts of each
+# are stored. Edits are folded in by a refresh job shortly after saving; the index is rebuilt
+# from scratch once RELATED_REBUILD_FRACTION of the posts have changed since the last build.
+RELATED_TOP_K = 5
+RELATED_MIN_SIMILARITY = 0.05
+RELATED_TAG_WEIGHT = 0.5
+RELATED_MIN_DF = 2
+RELATED_MAX_FEATURES = 50000
+RELATED_BATCH_SIZE = 256
+RELATED_REBUILD_FRACTION = 0.2
+RELATED_REFRESH_DELAY = 30
+
+# PDF export: rendered on a worker process pool and cached by (content, updated_at, template).
+PDF_CACHE_DIR = Path(os.environ.get("GALAXYWRITE_PDF_CACHE_DIR", "pdf_cache"))
+PDF_CACHE_MAX_BYTES = int(os.environ.get("GALAXYWRITE_PDF_CACHE_MB", 512)) * 1024 * 1024
+PDF_EXPORT_WORKERS = int(os.environ.get("GALAXYWRITE_PDF_WORKERS", 2))
+PDF_IMAGE_DPI = 200
+PDF_TEMPLATES = {
+    'standard': {'pagesize': 'A4', 'margin': 72, 'font_size': 11, 'image_scale': 1.0},
+    'compact': {'pagesize': 'LETTER', 'margin': 48, 'font_size': 9, 'image_scale': 0.6},
+}
+PDF_FONTS = {'Times New Roman': 'Times-Roman'}
+
+# Account export: rows are streamed in keyset-ordered parts; each part is a resume checkpoint
+# and rewrites the archive's central directory once, saving a copy of it in the checkpoint.
+EXPORT_DIR = Path(os.environ.get("GALAXYWRITE_EXPORT_DIR", "exports"))
+EXPORT_BATCH_SIZE = 500
+EXPORT_PART_ROWS = 10000
+EXPORT_MEDIA_PER_PART = 50
+
+# Admin dashboard pagination and sort keys (label -> column attribute).
+ADMIN_PAGE_SIZE = 50
+ADMIN_USER_SORTS = {'created_at': 'created_at', 'username': 'username', 'last_login': 'last_login'}
+ADMIN_CONTENT_SORTS = {'created_at': 'created_at', 'updated_at': 'updated_at', 'title': 'title', 'views': 'views', 'author': 'username'}
+
+# Bulk import: records are prepared in chunks on worker processes and inserted in batches.
+IMPORT_BATCH_SIZE = 1000
+IMPORT_CHUNK_SIZE = 200
+IMPORT_WORKERS = max(1, min(4, os.cpu_count() or 1))
+IMPORT_MAX_REPORTED_ERRORS = 100
+
+# Job queue: deferred side effects are stored in the jobs table and run by worker processes
+# (`python manage.py worker`) or, unless disabled, by a worker thread inside the app.
+JOB_PRIORITY_HIGH = 10
+JOB_PRIORITY_NORMAL = 0
+JOB_PRIORITY_LOW = -10
+JOB_MAX_ATTEMPTS = 5
+JOB_RETRY_BASE_DELAY = 5
+JOB_RETRY_MAX_DELAY = 3600
+JOB_VISIBILITY_TIMEOUT = 300
+JOB_POLL_INTERVAL = 1.0
+JOB_RETENTION = timedelta(days=7)
+JOB_INLINE_WORKER = os.environ.get("GALAXYWRITE_INLINE_JOB_WORKER", "1") != "0"
+
+# Query instrumentation: per-rerun statistics for each page, kept in memory for the admin
+# debug panel and appended to a rotating JSONL metrics file.
+QUERY_PROFILING_ENABLED = os.environ.get("GALAXYWRITE_QUERY_PROFILING", "1") != "0"
+QUERY_METRICS_FILE = Path(os.environ.get("GALAXYWRITE_QUERY_METRICS_FILE", "metrics/query_metrics.jsonl"))
+QUERY_METRICS_MAX_BYTES = 10 * 1024 * 1024
+QUERY_METRICS_BACKUPS = 5
+QUERY_METRICS_HISTORY = 200
+QUERY_PROFILE_TOP_N = 5
+QUERY_N_PLUS_ONE_THRESHOLD = 10
+
+# Slow query log: statements slower than the threshold are recorded with their query plan.
+SLOW_QUERY_THRESHOLD_MS = float(os.environ.get("GALAXYWRITE_SLOW_QUERY_MS", 100))
+SLOW_QUERY_LOG_FILE = Path(os.environ.get("GALAXYWRITE_SLOW_QUERY_LOG", "metrics/slow_queries.jsonl"))
+SLOW_QUERY_HISTORY = 500
+SLOW_QUERY_MAX_SHAPES = 1000
+
+# Schema migrations are applied with `python manage.py migrate`; the app only reports pending
+# ones. GALAXYWRITE_AUTO_MIGRATE=1 makes the app apply them at startup instead, and =0 also stops
+# it from creating a new, empty database. Backfills update MIGRATION_BATCH_SIZE rows per
+# transaction; the rates only feed dry-run estimates.
+MIGRATIONS_AUTO_APPLY = os.environ.get("GALAXYWRITE_AUTO_MIGRATE", "new")
+MIGRATION_BATCH_SIZE = 5000
+MIGRATION_BATCH_PAUSE = 0.01
+MIGRATION_INDEX_ROWS_PER_SECOND = 500000
+MIGRATION_BACKFILL_ROWS_PER_SECOND = 50000
+
+# Seconds a connection waits for SQLite's write lock before failing.
+SQLITE_BUSY_TIMEOUT = 30
+
+# Serialises media blob writes within a process; SQLite allows a single writer at a time.
+_media_write_lock = threading.Lock()
+
 # Database Setup
 
 
-def get_db_engine():
+def get_db_engine(url: str = "sqlite:///galaxywrite.db"):
     """
     Initialize SQLAlchemy engine for SQLite database.
+    Args:
+        url: Database URL; benchmarks point this at a separate synthetic database.
     Returns:
         Engine: SQLAlchemy engine instance.
     """
-    return create_engine("sqlite:///galaxywrite.db", echo=False)
+    engine = create_engine(url, echo=False, connect_args={'timeout': SQLITE_BUSY_TIMEOUT})
+    instrument_engine(engine)
+
+    @event.listens_for(engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        # WAL lets readers proceed while the app and job workers write.
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.close()
+        dbapi_connection.create_function("uuid_blob", 1, sqlite_uuid_blob, deterministic=True)
+        # Used by the full-text search triggers and the compression migration.
+        dbapi_connection.create_function("compress_text", 1, compress_text, deterministic=True)
+        dbapi_connection.create_function("decompress_text", 1, decompress_text, deterministic=True)
+        dbapi_connection.create_function("trending_boost", 1, trending_boost, deterministic=True)
+
+    return engine
 
 
 def get_db_session(engine):
@@ -72,1155 +290,6257 @@ def get_db_session(engine):
     """
     return sessionmaker(bind=engine)
 
-# Models
+# Query Instrumentation
 
+# Holds the QueryProfile of the page being rendered on the current script thread.
+_query_context = threading.local()
+_SQL_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_SQL_PLACEHOLDER_LISTS = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
 
-class User(Base):
+
+def normalize_sql(statement: str) -> str:
     """
-    User model for storing user information.
+    Reduce a SQL statement to its shape: literals become ?, IN lists collapse and
+    whitespace is normalised, so repeated executions of one query compare equal.
+    Args:
+        statement: SQL text.
+    Returns:
+        str: Normalised statement.
     """
-    __tablename__ = 'users'
-    id = Column(Integer, primary_key=True)
-    username = Column(String(50), unique=True, nullable=False)
-    password = Column(String(255), nullable=False)
-    email = Column(String(100), unique=True, nullable=False)
-    profile = Column(JSON, default={})
-    created_at = Column(DateTime, default=datetime.utcnow)
-    is_active = Column(Boolean, default=True)
-    is_admin = Column(Boolean, default=False)
-    last_login = Column(DateTime)
-    blogs = relationship("Blog", back_populates="user", overlaps="user")
-    case_studies = relationship("CaseStudy", back_populates="user", overlaps="user")
-    comments = relationship("Comment", back_populates="user", overlaps="user")
-    media = relationship("Media", back_populates="user", overlaps="user")
-    likes = relationship("Like", back_populates="user")
-    notifications = relationship("Notification", back_populates="user")
-    analytics_events = relationship("AnalyticsEvent", back_populates="user")
-    drafts = relationship("Draft", back_populates="user")
-    __table_args__ = (Index('idx_user_username', 'username'),)
+    shape = _SQL_LITERALS.sub('?', statement)
+    shape = _SQL_PLACEHOLDER_LISTS.sub('(?, ...)', shape)
+    return ' '.join(shape.split())
 
 
-class Tag(Base):
+class QueryProfile:
     """
-    Tag model for categorizing content.
+    Query count, database time and per-statement-shape statistics for one page render.
     """
-    __tablename__ = 'tags'
-    id = Column(String(36), primary_key=True)
-    name = Column(String(50), unique=True, nullable=False)
-    created_at = Column(DateTime, default=datetime.utcnow)
-    blogs = relationship("Blog", secondary="blog_tags", back_populates="tag_objects")
-    case_studies = relationship("CaseStudy", secondary="case_study_tags", back_populates="tag_objects")
-    __table_args__ = (Index('idx_tag_name', 'name'),)
 
+    def __init__(self, page: str):
+        self.page = page
+        self.started_at = datetime.utcnow()
+        self.query_count = 0
+        self.db_time = 0.0
+        self.render_time = 0.0
+        self.statements: Dict[str, Dict[str, Any]] = {}
 
-class Blog(Base):
+    def record(self, statement: str, duration: float) -> None:
+        """
+        Add one executed statement.
+        Args:
+            statement: SQL text.
+            duration: Execution time in seconds.
+        """
+        self.query_count += 1
+        self.db_time += duration
+        stats = self.statements.setdefault(normalize_sql(statement), {'count': 0, 'total_time': 0.0, 'max_time': 0.0})
+        stats['count'] += 1
+        stats['total_time'] += duration
+        stats['max_time'] = max(stats['max_time'], duration)
+
+    def slowest(self, limit: int = QUERY_PROFILE_TOP_N) -> List[Dict[str, Any]]:
+        """
+        Statement shapes with the most total database time.
+        Args:
+            limit: Maximum shapes to return.
+        Returns:
+            List[Dict[str, Any]]: SQL, execution count, total and max milliseconds.
+        """
+        ranked = sorted(self.statements.items(), key=lambda item: item[1]['total_time'], reverse=True)[:limit]
+        return [{'sql': sql, 'count': stats['count'], 'total_ms': round(stats['total_time'] * 1000, 2),
+                 'max_ms': round(stats['max_time'] * 1000, 2)} for sql, stats in ranked]
+
+    def repeated_statements(self, threshold: int = QUERY_N_PLUS_ONE_THRESHOLD) -> List[Dict[str, Any]]:
+        """
+        SELECT shapes executed at least threshold times, the signature of an N+1 pattern.
+        Args:
+            threshold: Minimum executions to flag.
+        Returns:
+            List[Dict[str, Any]]: SQL and execution count.
+        """
+        return [{'sql': sql, 'count': stats['count']} for sql, stats in self.statements.items()
+                if stats['count'] >= threshold and sql.upper().startswith('SELECT')]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Summarise the profile for display and the metrics file.
+        Returns:
+            Dict[str, Any]: Page, timings, counts, slowest statements and N+1 suspects.
+        """
+        return {
+            'page': self.page,
+            'started_at': self.started_at.isoformat(),
+            'render_ms': round(self.render_time * 1000, 2),
+            'query_count': self.query_count,
+            'db_ms': round(self.db_time * 1000, 2),
+            'slowest': self.slowest(),
+            'n_plus_one': self.repeated_statements()
+        }
+
+
+def instrument_engine(engine) -> None:
     """
-    Blog model for blog posts.
+    Attach query timing hooks to an engine.
+    Statements executed while a page is being profiled are added to its QueryProfile.
+    Args:
+        engine: SQLAlchemy engine instance.
     """
-    __tablename__ = 'blogs'
-    id = Column(String(36), primary_key=True)
-    user_id = Column(Integer, ForeignKey('users.id'), nullable=False)
-    username = Column(String(50), nullable=False)
-    title = Column(String(255), nullable=False)
-    content = Column(Text, nullable=False)
-    tags = Column(JSON, default=[])
-    media = Column(JSON, default=[])
-    font = Column(String(50), default='Inter')
-    content_type = Column(String(20), default='blog')
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow)
-    views = Column(Integer, default=0)
-    public_link = Column(String(255))
-    is_published = Column(Boolean, default=True)
-    is_draft = Column(Boolean, default=False)
-    user = relationship("User", back_populates="blogs", overlaps="blogs")
-    comments = relationship(
-        "Comment",
-        back_populates="blog",
-        primaryjoin=and_(
-            text("Blog.id == foreign(Comment.content_id)"),
-            text("Comment.content_type == 'blog'")
-        )
-    )
-    media_rel = relationship(
-        "Media",
-        back_populates="blog",
-        primaryjoin=and_(
-            text("Media.content_id == foreign(Blog.id)"),
-            text("Media.content_type == 'blog'")
-        )
-    )
-    likes = relationship(
-        "Like",
-        back_populates="blog",
-        primaryjoin=and_(
-            text("Like.content_id == foreign(Blog.id)"),
-            text("Like.content_type == 'blog'")
-        )
-    )
-    tag_objects = relationship("Tag", secondary="blog_tags", back_populates="blogs")
-    drafts = relationship("Draft", back_populates="blog")
-    __table_args__ = (Index('idx_blog_username', 'username', 'content_type'),)
+    @event.listens_for(engine, "before_cursor_execute")
+    def start_query_timer(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('query_started', []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def record_query(conn, cursor, statement, parameters, context, executemany):
+        duration = time.perf_counter() - conn.info['query_started'].pop()
+        profile = getattr(_query_context, 'profile', None)
+        if profile is not None:
+            profile.record(statement, duration)
+        if duration * 1000 >= SLOW_QUERY_THRESHOLD_MS:
+            record_slow_query(conn, statement, parameters, executemany, duration)
+
+    @event.listens_for(engine, "handle_error")
+    def discard_query_timer(exception_context):
+        if exception_context.connection is not None and exception_context.connection.info.get('query_started'):
+            exception_context.connection.info['query_started'].pop()
+
+
+def describe_parameters(parameters: Any, executemany: bool) -> Any:
+    """
+    Describe bound parameters by type and size without recording their values.
+    Args:
+        parameters: DBAPI parameters of the statement.
+        executemany: Whether parameters is a sequence of parameter sets.
+    Returns:
+        Any: List of parameter shapes, or for executemany a dict with the row count and first row's shape.
+    """
+    def shape(value: Any) -> str:
+        if value is None:
+            return 'NULL'
+        if isinstance(value, (str, bytes)):
+            return f"{type(value).__name__}[{len(value)}]"
+        return type(value).__name__
 
+    rows = list(parameters or []) if executemany else [parameters or ()]
+    first = rows[0] if rows else ()
+    values = first.values() if isinstance(first, dict) else first
+    shapes = [shape(value) for value in values]
+    return {'rows': len(rows), 'shape': shapes} if executemany else shapes
 
-class CaseStudy(Base):
+
+def find_call_site() -> Optional[str]:
     """
-    CaseStudy model for case studies.
+    Find the application code that issued the current statement.
+    Returns:
+        Optional[str]: The innermost DataManager method (or other function in this module) and line.
     """
-    __tablename__ = 'case_studies'
-    id = Column(String(36), primary_key=True)
-    user_id = Column(Integer, ForeignKey('users.id'), nullable=False)
-    username = Column(String(50), nullable=False)
-    title = Column(String(255), nullable=False)
-    problem = Column(Text, nullable=False)
-    solution = Column(Text, nullable=False)
-    results = Column(Text, nullable=False)
-    tags = Column(JSON, default=[])
-    media = Column(JSON, default=[])
-    font = Column(String(50), default='Inter')
-    content_type = Column(String(20), default='case_study')
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow)
-    views = Column(Integer, default=0)
-    public_link = Column(String(255))
-    is_published = Column(Boolean, default=True)
-    is_draft = Column(Boolean, default=False)
-    user = relationship("User", back_populates="case_studies", overlaps="case_studies")
-    comments = relationship(
-        "Comment",
-        back_populates="case_study",
-        primaryjoin=and_(
-            text("CaseStudy.id == foreign(Comment.content_id)"),
-            text("Comment.content_type == 'case_study'")
-        )
-    )
-    media_rel = relationship(
-        "Media",
-        back_populates="case_study",
-        primaryjoin=and_(
-            text("Media.content_id == foreign(CaseStudy.id)"),
-            text("Media.content_type == 'case_study'")
-        )
-    )
-    likes = relationship(
-        "Like",
-        back_populates="case_study",
-        primaryjoin=and_(
-            text("Like.content_id == foreign(CaseStudy.id)"),
-            text("Like.content_type == 'case_study'")
-        )
-    )
-    tag_objects = relationship("Tag", secondary="case_study_tags", back_populates="case_studies")
-    drafts = relationship("Draft", back_populates="case_study")
-    __table_args__ = (Index('idx_case_username', 'username', 'content_type'),)
+    this_file = os.path.abspath(__file__)
+    fallback = None
+    frame = sys._getframe(1)
+    while frame is not None:
+        code = frame.f_code
+        if code.co_name not in ('find_call_site', 'record_slow_query', 'record_query') and \
+                os.path.abspath(code.co_filename) == this_file:
+            owner = frame.f_locals.get('self')
+            if type(owner).__name__ == 'DataManager':
+                return f"DataManager.{code.co_name}:{frame.f_lineno}"
+            fallback = fallback or f"{code.co_name}:{frame.f_lineno}"
+        frame = frame.f_back
+    return fallback
+
+
+def explain_query_plan(conn, statement: str, parameters: Any) -> Optional[List[str]]:
+    """
+    Capture SQLite's query plan for a statement.
+    Runs on a separate DBAPI cursor so the original statement's results are untouched.
+    Args:
+        conn: SQLAlchemy connection that ran the statement.
+        statement: SQL text.
+        parameters: One set of bound parameters.
+    Returns:
+        Optional[List[str]]: Plan steps, or None if the plan could not be produced.
+    """
+    try:
+        cursor = conn.connection.driver_connection.cursor()
+        try:
+            rows = cursor.execute(f"EXPLAIN QUERY PLAN {statement}", parameters or ()).fetchall()
+        finally:
+            cursor.close()
+        return [row[3] for row in rows]
+    except Exception as e:
+        logger.debug(f"Could not explain slow query: {str(e)}")
+        return None
 
 
-class Media(Base):
+def full_scan_tables(plan: Optional[List[str]]) -> List[str]:
     """
-    Media model for uploaded files.
+    List tables a query plan reads with a full table scan.
+    Args:
+        plan: Query plan steps.
+    Returns:
+        List[str]: Scanned table names.
     """
-    __tablename__ = 'media'
-    id = Column(String(36), primary_key=True)
-    user_id = Column(Integer, ForeignKey('users.id'), nullable=False)
-    username = Column(String(50), nullable=False)
-    content_type = Column(String(20))
-    content_id = Column(String(36))
-    type = Column(String(20), nullable=False)
-    content = Column(Text, nullable=False)
-    filename = Column(String(255), nullable=False)
-    uploaded_at = Column(DateTime, default=datetime.utcnow)
-    user = relationship("User", back_populates="media", overlaps="media")
-    blog = relationship(
-        "Blog",
-        back_populates="media_rel",
-        primaryjoin=and_(
-            text("Media.content_id == foreign(Blog.id)"),
-            text("Media.content_type == 'blog'")
-        )
-    )
-    case_study = relationship(
-        "CaseStudy",
-        back_populates="media_rel",
-        primaryjoin=and_(
-            text("Media.content_id == foreign(CaseStudy.id)"),
-            text("Media.content_type == 'case_study'")
-        )
-    )
-    __table_args__ = (Index('idx_media_username', 'username'),)
+    tables = []
+    for step in plan or []:
+        match = re.match(r'SCAN (?:TABLE )?(\w+)(.*)', step)
+        if match and 'USING' not in match.group(2):
+            tables.append(match.group(1))
+    return tables
 
 
-class Comment(Base):
+class SlowQueryLog:
     """
-    Comment model for content comments.
+    Recent slow statements plus per-shape aggregates for the top-offenders report.
     """
-    __tablename__ = 'comments'
-    id = Column(String(36), primary_key=True)
-    user_id = Column(Integer, ForeignKey('users.id'), nullable=False)
-    content_type = Column(String(20), nullable=False)
-    content_id = Column(String(36), nullable=False)  # No ForeignKey due to polymorphism
-    username = Column(String(50), nullable=False)
-    comment = Column(Text, nullable=False)
-    created_at = Column(DateTime, default=datetime.utcnow)
-    user = relationship("User", back_populates="comments")
-    blog = relationship(
-        "Blog",
-        back_populates="comments",
-        primaryjoin=and_(
-            text("Comment.content_id == foreign(Blog.id)"),
-            text("Comment.content_type == 'blog'")
-        )
-    )
-    case_study = relationship(
-        "CaseStudy",
-        back_populates="comments",
-        primaryjoin=and_(
-            text("Comment.content_id == foreign(CaseStudy.id)"),
-            text("Comment.content_type == 'case_study'")
-        )
-    )
-    __table_args__ = (Index('idx_comment_content', 'content_type', 'content_id'),)
 
+    def __init__(self, history: int = SLOW_QUERY_HISTORY):
+        self.recent = deque(maxlen=history)
+        self.offenders: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
 
-class Like(Base):
+    def add(self, entry: Dict[str, Any]) -> None:
+        """
+        Record one slow statement.
+        Args:
+            entry: Slow query record as written to the log file.
+        """
+        with self._lock:
+            self.recent.append(entry)
+            offender = self.offenders.get(entry['sql'])
+            if offender is None:
+                if len(self.offenders) >= SLOW_QUERY_MAX_SHAPES:
+                    return
+                offender = self.offenders[entry['sql']] = {
+                    'sql': entry['sql'], 'count': 0, 'total_ms': 0.0, 'max_ms': 0.0,
+                    'call_sites': set(), 'full_scans': set(), 'plan': None, 'parameters': None
+                }
+            offender['count'] += 1
+            offender['total_ms'] += entry['duration_ms']
+            offender['max_ms'] = max(offender['max_ms'], entry['duration_ms'])
+            if entry.get('call_site'):
+                offender['call_sites'].add(entry['call_site'])
+            offender['full_scans'].update(entry.get('full_scans') or [])
+            offender['plan'] = entry.get('plan') or offender['plan']
+            offender['parameters'] = entry.get('parameters')
+
+    def top_offenders(self, limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        Statement shapes ranked by total time spent above the threshold.
+        Args:
+            limit: Maximum shapes to return.
+        Returns:
+            List[Dict[str, Any]]: Aggregates with count, total/max/avg ms, call sites, scanned tables and plan.
+        """
+        with self._lock:
+            ranked = sorted(self.offenders.values(), key=lambda o: o['total_ms'], reverse=True)[:limit]
+            return [dict(o, total_ms=round(o['total_ms'], 2), max_ms=round(o['max_ms'], 2),
+                         avg_ms=round(o['total_ms'] / o['count'], 2),
+                         call_sites=sorted(o['call_sites']), full_scans=sorted(o['full_scans']))
+                    for o in ranked]
+
+    @classmethod
+    def from_file(cls, path: Path = SLOW_QUERY_LOG_FILE) -> 'SlowQueryLog':
+        """
+        Rebuild the aggregates from a slow query log file and its rotated backups.
+        Args:
+            path: Log file path.
+        Returns:
+            SlowQueryLog: Log containing every readable entry.
+        """
+        log = cls()
+        for candidate in sorted(Path(path).parent.glob(Path(path).name + '*'), reverse=True):
+            with open(candidate) as f:
+                for line in f:
+                    try:
+                        log.add(json.loads(line))
+                    except (json.JSONDecodeError, KeyError):
+                        continue
+        return log
+
+
+def record_slow_query(conn, statement: str, parameters: Any, executemany: bool, duration: float) -> None:
     """
-    Like model for content likes.
+    Log a statement that exceeded SLOW_QUERY_THRESHOLD_MS with its plan and call site.
+    Args:
+        conn: SQLAlchemy connection that ran the statement.
+        statement: SQL text.
+        parameters: DBAPI parameters.
+        executemany: Whether parameters is a sequence of parameter sets.
+        duration: Execution time in seconds.
     """
-    __tablename__ = 'likes'
-    id = Column(String(36), primary_key=True)
-    user_id = Column(Integer, ForeignKey('users.id'), nullable=False)
-    content_type = Column(String(20), nullable=False)
-    content_id = Column(String(36), nullable=False)
-    created_at = Column(DateTime, default=datetime.utcnow)
-    user = relationship("User", back_populates="likes")
-    blog = relationship(
-        "Blog",
-        back_populates="likes",
-        primaryjoin="and_(Like.content_id == foreign(Blog.id), Like.content_type == 'blog')"
-    )
-    case_study = relationship(
-        "CaseStudy",
-        back_populates="likes",
-        primaryjoin="and_(Like.content_id == foreign(CaseStudy.id), Like.content_type == 'case_study')"
-    )
-    __table_args__ = (
-        Index('idx_like_content', 'content_type', 'content_id'),
-        ForeignKeyConstraint(['user_id'], ['users.id'], name='fk_like_user_id'),
-    )
+    plan = explain_query_plan(conn, statement, (parameters[0] if parameters else ()) if executemany else parameters)
+    entry = {
+        'timestamp': datetime.utcnow().isoformat(),
+        'duration_ms': round(duration * 1000, 2),
+        'sql': normalize_sql(statement),
+        'parameters': describe_parameters(parameters, executemany),
+        'call_site': find_call_site(),
+        'plan': plan,
+        'full_scans': full_scan_tables(plan)
+    }
+    get_slow_query_log().add(entry)
+    get_slow_query_logger().info(json.dumps(entry))
+    if entry['full_scans']:
+        logger.warning(f"Slow full scan of {', '.join(entry['full_scans'])} ({entry['duration_ms']} ms) "
+                       f"from {entry['call_site']}: {entry['sql'][:200]}")
 
 
-class Notification(Base):
+@st.cache_resource
+def get_slow_query_log() -> SlowQueryLog:
     """
-    Notification model for user alerts.
+    Return the process-wide slow query log.
+    Returns:
+        SlowQueryLog: Shared log.
     """
-    __tablename__ = 'notifications'
-    id = Column(String(36), primary_key=True)
-    user_id = Column(Integer, ForeignKey('users.id'), nullable=False)
-    message = Column(Text, nullable=False)
-    is_read = Column(Boolean, default=False)
-    created_at = Column(DateTime, default=datetime.utcnow)
-    content_type = Column(String(20))
-    content_id = Column(String(36))
-    user = relationship("User", back_populates="notifications")
-    __table_args__ = (Index('idx_notification_user', 'user_id'),)
+    return SlowQueryLog()
 
 
-class AnalyticsEvent(Base):
+@st.cache_resource
+def get_slow_query_logger() -> logging.Logger:
     """
-    AnalyticsEvent model for tracking user interactions.
+    Return the logger that appends slow queries to the rotating JSONL slow query log.
+    Returns:
+        logging.Logger: Slow query logger.
     """
-    __tablename__ = 'analytics_events'
-    id = Column(String(36), primary_key=True)
-    user_id = Column(Integer, ForeignKey('users.id'), nullable=True)
-    event_type = Column(String(50), nullable=False)
-    content_type = Column(String(20))
-    content_id = Column(String(36))
-    timestamp = Column(DateTime, default=datetime.utcnow)
-    event_metadata = Column(JSON, default={})
-    user = relationship("User", back_populates="analytics_events")
-    __table_args__ = (Index('idx_analytics_event', 'event_type', 'timestamp'),)
+    return create_jsonl_logger(f"{__name__}.slow_queries", SLOW_QUERY_LOG_FILE)
 
 
-class Draft(Base):
+def create_jsonl_logger(name: str, path: Path) -> logging.Logger:
     """
-    Draft model for content versions.
+    Create a logger that writes one JSON document per line to a rotating file.
+    Args:
+        name: Logger name.
+        path: Log file path.
+    Returns:
+        logging.Logger: Configured logger.
     """
-    __tablename__ = 'drafts'
-    id = Column(String(36), primary_key=True)
-    user_id = Column(Integer, ForeignKey('users.id'), nullable=False)
-    content_type = Column(String(20), nullable=False)
-    content_id = Column(String(36))
-    data = Column(JSON, nullable=False)
-    created_at = Column(DateTime, default=datetime.utcnow)
-    user = relationship("User", back_populates="drafts")
-    blog = relationship("Blog", back_populates="drafts")
-    case_study = relationship("CaseStudy", back_populates="drafts")
-    __table_args__ = (Index('idx_draft_user', 'user_id', 'content_type'),)
-
+    path.parent.mkdir(parents=True, exist_ok=True)
+    jsonl_logger = logging.getLogger(name)
+    jsonl_logger.propagate = False
+    jsonl_logger.setLevel(logging.INFO)
+    handler = logging.handlers.RotatingFileHandler(path, maxBytes=QUERY_METRICS_MAX_BYTES,
+                                                   backupCount=QUERY_METRICS_BACKUPS)
+    handler.setFormatter(logging.Formatter('%(message)s'))
+    jsonl_logger.handlers = [handler]
+    return jsonl_logger
+
+
+@st.cache_resource
+def get_query_metrics() -> deque:
+    """
+    Return the process-wide buffer of recent page profiles.
+    Returns:
+        deque: Most recent profile summaries, newest last.
+    """
+    return deque(maxlen=QUERY_METRICS_HISTORY)
 
-# Association Tables
-blog_tags = Table(
-    'blog_tags', Base.metadata,
-    Column('blog_id', String(36), ForeignKey('blogs.id'), primary_key=True),
-    Column('tag_id', String(36), ForeignKey('tags.id'), primary_key=True)
-)
 
-case_study_tags = Table(
-    'case_study_tags', Base.metadata,
-    Column('case_study_id', String(36), ForeignKey('case_studies.id'), primary_key=True),
-    Column('tag_id', String(36), ForeignKey('tags.id'), primary_key=True)
+@st.cache_resource
+def get_metrics_logger() -> logging.Logger:
+    """
+    Return the logger that appends page profiles to the rotating JSONL metrics file.
+    Returns:
+        logging.Logger: Metrics logger.
+    """
+    return create_jsonl_logger(f"{__name__}.metrics", QUERY_METRICS_FILE)
+
+
+@contextmanager
+def capture_queries(name: str):
+    """
+    Collect the statements executed on the current thread into a QueryProfile.
+    Args:
+        name: Label for the profile.
+    Yields:
+        QueryProfile: Profile being collected.
+    """
+    profile = QueryProfile(name)
+    previous = getattr(_query_context, 'profile', None)
+    _query_context.profile = profile
+    started = time.perf_counter()
+    try:
+        yield profile
+    finally:
+        profile.render_time = time.perf_counter() - started
+        _query_context.profile = previous
+
+
+@contextmanager
+def profile_queries(page: str):
+    """
+    Profile the queries and render time of a page function.
+    Args:
+        page: Page name used to tag the profile.
+    Yields:
+        Optional[QueryProfile]: Profile being collected, or None when profiling is disabled.
+    """
+    if not QUERY_PROFILING_ENABLED:
+        yield None
+        return
+    try:
+        with capture_queries(page) as profile:
+            yield profile
+    finally:
+        summary = profile.to_dict()
+        get_query_metrics().append(summary)
+        get_metrics_logger().info(json.dumps(summary))
+        for repeated in summary['n_plus_one']:
+            logger.warning(f"Possible N+1 on {page}: {repeated['count']}x {repeated['sql'][:200]}")
+
+# Derived indexes are rebuilt from the base tables; bulk writers skip incremental
+# maintenance and rebuild them once at the end.
+DERIVED_INDEX_BUILDERS: List[Tuple[str, Any]] = []
+
+
+def derived_index_builder(name: str):
+    """
+    Register a function that rebuilds a derived index from the base tables.
+    Args:
+        name: Index name used in logs and reports.
+    Returns:
+        Callable: Decorator that registers the builder, which receives a session.
+    """
+    def register(builder):
+        DERIVED_INDEX_BUILDERS.append((name, builder))
+        return builder
+    return register
+
+
+def rebuild_derived_indexes(session_factory) -> Dict[str, float]:
+    """
+    Run every registered derived index builder, each in its own transaction.
+    Args:
+        session_factory: SQLAlchemy session factory.
+    Returns:
+        Dict[str, float]: Seconds spent per builder.
+    """
+    timings = {}
+    for name, builder in DERIVED_INDEX_BUILDERS:
+        started = time.perf_counter()
+        with session_factory() as session:
+            builder(session)
+            session.commit()
+        timings[name] = round(time.perf_counter() - started, 3)
+        logger.info(f"Rebuilt derived index {name} in {timings[name]}s")
+    return timings
+
+
+@derived_index_builder('planner_statistics')
+def rebuild_planner_statistics(session) -> None:
+    """
+    Refresh SQLite query planner statistics after large data changes.
+    Args:
+        session: Active database session.
+    """
+    session.execute(text("ANALYZE"))
+
+
+# Full-text search: one FTS5 table per content table, holding its own plaintext copy of the
+# searched columns. Triggers are plain SQL, so any SQLite client can write the content tables:
+# they drop stale index rows and queue changed rows, and the app decompresses and indexes
+# queued rows before searching. The schema therefore never calls an app-registered function.
+CONTENT_SEARCH_COLUMNS = {
+    'blogs': ['title', 'content'],
+    'case_studies': ['title', 'problem', 'solution', 'results'],
+}
+CONTENT_SEARCH_BATCH_SIZE = 500
+
+
+def content_search_ddl(table: str) -> List[str]:
+    """
+    Statements creating the full-text index of a content table, its queue and triggers.
+    Args:
+        table: Key of CONTENT_SEARCH_COLUMNS.
+    Returns:
+        List[str]: Idempotent DDL statements.
+    """
+    names = ', '.join(CONTENT_SEARCH_COLUMNS[table])
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {table}_search USING fts5({names}, tokenize='unicode61 remove_diacritics 2')",
+        f"CREATE TABLE IF NOT EXISTS {table}_search_queue (row_id INTEGER PRIMARY KEY)",
+        f"CREATE TRIGGER IF NOT EXISTS {table}_search_insert AFTER INSERT ON {table} BEGIN "
+        f"INSERT OR IGNORE INTO {table}_search_queue (row_id) VALUES (new.rowid); END",
+        f"CREATE TRIGGER IF NOT EXISTS {table}_search_delete AFTER DELETE ON {table} BEGIN "
+        f"DELETE FROM {table}_search WHERE rowid = old.rowid; "
+        f"DELETE FROM {table}_search_queue WHERE row_id = old.rowid; END",
+        f"CREATE TRIGGER IF NOT EXISTS {table}_search_update AFTER UPDATE OF {names} ON {table} BEGIN "
+        f"DELETE FROM {table}_search WHERE rowid = old.rowid; "
+        f"INSERT OR IGNORE INTO {table}_search_queue (row_id) VALUES (new.rowid); END",
+    ]
+
+
+def sync_content_search(session) -> int:
+    """
+    Index the rows queued by the content table triggers.
+    The queue is emptied by the first statement, which takes the write lock, so no write can
+    slip between reading a row and indexing it.
+    Args:
+        session: Active database session, or a connection during migration.
+    Returns:
+        int: Number of rows indexed.
+    """
+    indexed = 0
+    for table, columns in CONTENT_SEARCH_COLUMNS.items():
+        names = ', '.join(columns)
+        row_ids = [row_id for (row_id,) in session.execute(text(f"DELETE FROM {table}_search_queue RETURNING row_id"))]
+        for start in range(0, len(row_ids), CONTENT_SEARCH_BATCH_SIZE):
+            batch = row_ids[start:start + CONTENT_SEARCH_BATCH_SIZE]
+            ids = {'ids': batch}
+            session.execute(text(f"DELETE FROM {table}_search WHERE rowid IN :ids").bindparams(bindparam('ids', expanding=True)), ids)
+            rows = session.execute(text(f"SELECT rowid, {names} FROM {table} WHERE rowid IN :ids")
+                                   .bindparams(bindparam('ids', expanding=True)), ids).all()
+            if rows:
+                session.execute(text(f"INSERT INTO {table}_search (rowid, {names}) VALUES (:rowid, "
+                                     f"{', '.join(f':{column}' for column in columns)})"),
+                                [{'rowid': row[0], **{column: decompress_text(value) for column, value in zip(columns, row[1:])}}
+                                 for row in rows])
+                indexed += len(rows)
+    return indexed
+
+
+@derived_index_builder('content_search')
+def rebuild_content_search(session) -> None:
+    """
+    Rebuild the full-text indexes from the content tables.
+    Args:
+        session: Active database session, or a connection during migration.
+    """
+    for table in CONTENT_SEARCH_COLUMNS:
+        session.execute(text(f"DELETE FROM {table}_search"))
+        session.execute(text(f"INSERT OR IGNORE INTO {table}_search_queue (row_id) SELECT rowid FROM {table}"))
+    sync_content_search(session)
+
+
+def search_match_expression(query: str) -> Optional[str]:
+    """
+    Turn a search box query into an FTS5 expression matching every word as a prefix.
+    Args:
+        query: User input.
+    Returns:
+        Optional[str]: MATCH expression, or None if the query has no words.
+    """
+    words = re.findall(r'\w+', query or '')
+    return ' '.join(f'"{word}"*' for word in words) or None
+
+
+def trending_boost(seconds: Optional[float]) -> Optional[float]:
+    """
+    Scale of activity that happened the given number of seconds after the trending epoch.
+    Args:
+        seconds: Event time minus epoch, in seconds; negative for events before the epoch.
+    Returns:
+        Optional[float]: 2 ** (seconds / half-life), or None for a NULL argument.
+    """
+    if seconds is None:
+        return None
+    return 2.0 ** (seconds / TRENDING_HALF_LIFE.total_seconds())
+
+
+@derived_index_builder('trending_scores')
+def rebuild_trending_scores(session) -> None:
+    """
+    Recompute trending scores from likes and comments, resetting the epoch to now.
+    Views carry no timestamp, so an item's views count as activity at its last update.
+    Args:
+        session: Active database session, or a connection during migration.
+    """
+    now = time.time()
+    # Seconds between a stored UTC datetime and now.
+    age = "(julianday({column}) - 2440587.5) * 86400.0 - :now"
+    session.execute(TrendingScore.__table__.delete())
+    session.execute(sqlite_insert(TrendingEpoch).values(id=1, epoch=now).on_conflict_do_update(
+        index_elements=['id'], set_={'epoch': now}))
+    session.execute(text(
+        "INSERT INTO trending_scores (content_type, content_id, score, updated_at) "
+        "SELECT content_type, content_id, sum(score), :updated_at FROM ("
+        f"SELECT content_type, content_id, :like * trending_boost({age.format(column='created_at')}) AS score FROM likes "
+        f"UNION ALL SELECT content_type, content_id, :comment * trending_boost({age.format(column='created_at')}) FROM comments "
+        f"UNION ALL SELECT 'blog', id, :view * views * trending_boost({age.format(column='updated_at')}) "
+        "FROM blogs WHERE views > 0 AND is_published = 1 AND deleted_at IS NULL "
+        f"UNION ALL SELECT 'case_study', id, :view * views * trending_boost({age.format(column='updated_at')}) "
+        "FROM case_studies WHERE views > 0 AND is_published = 1 AND deleted_at IS NULL"
+        ") GROUP BY content_type, content_id HAVING sum(score) >= :min_score"
+    ), {'now': now, 'updated_at': datetime.utcnow(), 'min_score': TRENDING_MIN_SCORE, **TRENDING_WEIGHTS})
+
+
+# Published, live content of both types, as (content_type, id, user_id, created_at) rows.
+PUBLISHED_CONTENT_SQL = (
+    "SELECT 'blog' AS content_type, id, user_id, created_at FROM blogs "
+    "WHERE is_published = 1 AND deleted_at IS NULL "
+    "UNION ALL SELECT 'case_study', id, user_id, created_at FROM case_studies "
+    "WHERE is_published = 1 AND deleted_at IS NULL"
 )
 
-# Table Creation
-engine = get_db_engine()
-User.__table__.create(engine, checkfirst=True)
-Tag.__table__.create(engine, checkfirst=True)
-Blog.__table__.create(engine, checkfirst=True)
-CaseStudy.__table__.create(engine, checkfirst=True)
-Media.__table__.create(engine, checkfirst=True)
-Comment.__table__.create(engine, checkfirst=True)
-Like.__table__.create(engine, checkfirst=True)
-Notification.__table__.create(engine, checkfirst=True)
-AnalyticsEvent.__table__.create(engine, checkfirst=True)
-Draft.__table__.create(engine, checkfirst=True)
-blog_tags.create(engine, checkfirst=True)
-case_study_tags.create(engine, checkfirst=True)
-Session = get_db_session(engine)
 
-# Data Manager
+@derived_index_builder('home_timelines')
+def rebuild_home_timelines(session) -> None:
+    """
+    Recount followers and refill every home timeline from the follow graph.
+    Posts of authors at or above the fan-out threshold are left out; they are merged in on read.
+    Args:
+        session: Active database session, or a connection during migration.
+    """
+    session.execute(text(
+        "UPDATE users SET follower_count = (SELECT count(*) FROM follows WHERE follows.followed_id = users.id)"))
+    session.execute(TimelineEntry.__table__.delete())
+    session.execute(text(
+        "INSERT INTO timeline_entries (user_id, content_type, content_id, author_id, created_at) "
+        "SELECT user_id, content_type, content_id, author_id, created_at FROM ("
+        "SELECT follows.follower_id AS user_id, content.content_type, content.id AS content_id, "
+        "content.user_id AS author_id, content.created_at, row_number() OVER ("
+        "PARTITION BY follows.follower_id ORDER BY content.created_at DESC) AS position "
+        "FROM follows JOIN users AS authors ON authors.id = follows.followed_id "
+        f"JOIN ({PUBLISHED_CONTENT_SQL}) AS content ON content.user_id = follows.followed_id "
+        "WHERE authors.follower_count < :threshold"
+        ") WHERE position <= :max_entries"
+    ), {'threshold': TIMELINE_FANOUT_THRESHOLD, 'max_entries': TIMELINE_MAX_ENTRIES})
+
+
+# Related Content
+
+RELATED_TOKEN_PATTERN = re.compile(r"[^\W\d_]{2,}")
+
+
+class RelatedContentIndex:
+    """
+    TF-IDF matrix of published posts used to precompute related content.
+    Each row is the L2-normalised TF-IDF vector of a post's title and body followed by its tag
+    features, so one sparse matrix product gives the cosine similarities of a batch of posts to
+    all others. The vocabulary, IDF weights and tag columns are fixed when the index is built;
+    sync() re-vectorizes changed posts against them and recomputes only the neighbors that can
+    have changed.
+    The vocabulary, IDF weights, tag columns and post versions are stored in the database with
+    the neighbor lists, so any process can sync: one whose copy is missing or stale reloads it,
+    re-vectorizing the indexed posts without recomputing their neighbors. Every write replaces
+    the stored generation token only if it is still the one the copy was loaded at, so a sync
+    racing another process fails and is retried instead of overwriting its results.
+    """
+
+    def __init__(self):
+        self.keys: List[Optional[Tuple[str, str]]] = []
+        self.rows: Dict[Tuple[str, str], int] = {}
+        self.versions: Dict[Tuple[str, str], Optional[datetime]] = {}
+        self.neighbors: Dict[int, List[Tuple[int, float]]] = {}
+        self.vocabulary: Dict[str, int] = {}
+        self.tag_columns: Dict[str, int] = {}
+        self.idf = None
+        self.matrix = None
+        self.changed_since_build = 0
+        self.generation: Optional[str] = None
+        self._lock = threading.Lock()
+
+    def build(self, session) -> Dict[str, Any]:
+        """
+        Vectorize every published post, compute all neighbor lists and replace the stored index.
+        Args:
+            session: Active database session, or a connection during migration.
+        Returns:
+            Dict[str, Any]: Report with the number of posts and vocabulary size.
+        """
+        import numpy as np
+
+        generation = session.execute(select(RelatedIndexState.generation).where(RelatedIndexState.id == 1)).scalar()
+        documents = list(self._load_documents(session))
+        frequencies = Counter(term for _, _, terms, _ in documents for term in terms)
+        terms = sorted((term for term, df in frequencies.items() if df >= RELATED_MIN_DF),
+                       key=lambda term: (-frequencies[term], term))[:RELATED_MAX_FEATURES]
+        self.vocabulary = {term: column for column, term in enumerate(terms)}
+        self.idf = np.log((1 + len(documents)) / (1 + np.array([frequencies[term] for term in terms], dtype=float))) + 1
+        tags = sorted({tag for _, _, _, post_tags in documents for tag in post_tags})
+        self.tag_columns = {tag: len(terms) + column for column, tag in enumerate(tags)}
+        self.keys = [key for key, _, _, _ in documents]
+        self.rows = {key: row for row, key in enumerate(self.keys)}
+        self.versions = {key: version for key, version, _, _ in documents}
+        self.matrix = self._vectorize([(terms, post_tags) for _, _, terms, post_tags in documents])
+        self.changed_since_build = 0
+        self.neighbors = self._top_neighbors(list(range(len(self.keys))))
+        self._claim(session, generation, changed_since_build=0, built_at=datetime.utcnow(),
+                    model=compress_json({'terms': terms, 'idf': self.idf.tolist(), 'tags': tags}))
+        session.execute(RelatedIndexVersion.__table__.delete())
+        self._store_versions(session, self.keys)
+        session.execute(RelatedContent.__table__.delete())
+        self._store(session, self.neighbors)
+        logger.info(f"Built related content for {len(self.keys)} posts over {len(self.vocabulary)} terms")
+        return {'posts': len(self.keys), 'terms': len(self.vocabulary), 'rebuilt': True}
+
+    def sync(self, session) -> Dict[str, Any]:
+        """
+        Fold posts published, edited, unpublished or deleted since the last sync into the index
+        and refresh the stored neighbor lists they affect.
+        Builds the index instead when none is stored or too much has changed since it was built.
+        Args:
+            session: Active database session.
+        Returns:
+            Dict[str, Any]: Report with the number of changed, removed and recomputed posts.
+        """
+        with self._lock:
+            try:
+                return self._sync(session)
+            except BaseException:
+                # The copy may no longer match what is committed; reload it on the next sync.
+                self.generation = None
+                raise
+
+    def _sync(self, session) -> Dict[str, Any]:
+        import numpy as np
+        from scipy import sparse
+
+        state = session.execute(select(RelatedIndexState).where(RelatedIndexState.id == 1)).scalar()
+        if state is None:
+            return self.build(session)
+        if self.generation != state.generation:
+            self._load(session, state)
+        live = {}
+        for key, model in (('blog', Blog), ('case_study', CaseStudy)):
+            live.update(((key, content_id), updated_at) for content_id, updated_at in session.execute(
+                select(model.id, model.updated_at).where(model.is_published == True, model.deleted_at.is_(None))))
+        changed = [key for key, version in live.items() if key not in self.versions or self.versions[key] != version]
+        removed = [key for key in self.rows if key not in live]
+        if self.changed_since_build + len(changed) + len(removed) > RELATED_REBUILD_FRACTION * max(len(live), 1):
+            return self.build(session)
+        if not changed and not removed:
+            return {'changed': 0, 'removed': 0, 'recomputed': 0}
+
+        documents = list(self._load_documents(session, changed))
+        removed_rows = [self.rows.pop(key) for key in removed]
+        for row, key in zip(removed_rows, removed):
+            self.keys[row] = None
+            self.versions.pop(key, None)
+            self.neighbors.pop(row, None)
+        for key, version, _, _ in documents:
+            if key not in self.rows:
+                self.rows[key] = len(self.keys)
+                self.keys.append(key)
+            self.versions[key] = version
+        updated = [self.rows[key] for key, _, _, _ in documents]
+
+        # Zero the rows being replaced or removed, then add the new vectors in their place.
+        count, width = len(self.keys), self.matrix.shape[1]
+        self.matrix.resize((count, width))
+        keep = np.ones(count)
+        keep[removed_rows + updated] = 0
+        placement = sparse.csr_matrix((np.ones(len(updated)), (updated, range(len(updated)))),
+                                      shape=(count, len(updated)))
+        vectors = self._vectorize([(terms, post_tags) for _, _, terms, post_tags in documents])
+        self.matrix = (sparse.diags(keep) @ self.matrix + placement @ vectors).tocsr()
+        self.matrix.eliminate_zeros()
+
+        # Posts whose list held a changed or removed post, or whose weakest neighbor is now
+        # beaten by a changed post, are recomputed along with the changed posts.
+        gone = set(removed_rows + updated)
+        affected = set(updated)
+        for row, neighbors in self.neighbors.items():
+            if any(neighbor in gone for neighbor, _ in neighbors):
+                affected.add(row)
+        if updated:
+            similarities = (self.matrix @ self.matrix[updated].T).toarray().max(axis=1)
+            for row in range(count):
+                if self.keys[row] is None or row in affected:
+                    continue
+                current = self.neighbors.get(row, [])
+                weakest = current[-1][1] if len(current) == RELATED_TOP_K else RELATED_MIN_SIMILARITY
+                if similarities[row] >= weakest:
+                    affected.add(row)
+        results = self._top_neighbors(sorted(affected))
+        self.neighbors.update(results)
+        self.changed_since_build += len(changed) + len(removed)
+        self._claim(session, state.generation, changed_since_build=self.changed_since_build)
+        self._delete(session, removed + changed, RelatedIndexVersion)
+        self._store_versions(session, [key for key, _, _, _ in documents])
+        self._delete(session, removed)
+        self._store(session, results)
+        return {'changed': len(changed), 'removed': len(removed), 'recomputed': len(results)}
+
+    def _load(self, session, state: 'RelatedIndexState') -> None:
+        # Restores the stored index: posts are re-vectorized against the stored vocabulary, and
+        # posts deleted or unpublished since keep an empty row so the sync can remove them.
+        import numpy as np
+
+        model = decompress_json(state.model)
+        self.vocabulary = {term: column for column, term in enumerate(model['terms'])}
+        self.idf = np.array(model['idf'], dtype=float)
+        self.tag_columns = {tag: len(model['terms']) + column for column, tag in enumerate(model['tags'])}
+        self.versions = {(content_type, content_id): updated_at for content_type, content_id, updated_at in session.execute(
+            select(RelatedIndexVersion.content_type, RelatedIndexVersion.content_id, RelatedIndexVersion.updated_at))}
+        self.keys = list(self.versions)
+        self.rows = {key: row for row, key in enumerate(self.keys)}
+        documents = {key: (terms, tags) for key, _, terms, tags in self._load_documents(session, self.keys)}
+        self.matrix = self._vectorize([documents.get(key, (Counter(), [])) for key in self.keys])
+        self.neighbors = {}
+        for row in session.execute(select(RelatedContent).order_by(
+                RelatedContent.content_type, RelatedContent.content_id, RelatedContent.rank)).scalars():
+            key, related = (row.content_type, row.content_id), (row.related_type, row.related_id)
+            if key in self.rows and related in self.rows:
+                self.neighbors.setdefault(self.rows[key], []).append((self.rows[related], row.score))
+        self.changed_since_build = state.changed_since_build
+        self.generation = state.generation
+        logger.info(f"Loaded related content index of {len(self.keys)} posts")
+
+    def _claim(self, session, generation: Optional[str], **values) -> None:
+        # Replaces the stored generation token, failing if another process has written since
+        # `generation` was read.
+        token = uuid.uuid4().hex
+        table = RelatedIndexState.__table__
+        if generation is None:
+            session.execute(table.insert().values(id=1, generation=token, **values))
+        elif not session.execute(table.update().where(table.c.id == 1, table.c.generation == generation).values(
+                generation=token, **values)).rowcount:
+            raise RuntimeError("Related content index was updated by another process")
+        self.generation = token
+
+    def _load_documents(self, session, keys: Optional[List[Tuple[str, str]]] = None):
+        # Yields (key, updated_at, term counts, tags) of published posts, optionally only the given ones.
+        for key, model in (('blog', Blog), ('case_study', CaseStudy)):
+            fields = [getattr(model, field) for field in RENDER_FIELDS[key]]
+            query = select(model.id, model.updated_at, model.title, model.tags, *fields).where(
+                model.is_published == True, model.deleted_at.is_(None))
+            if keys is None:
+                batches = [None]
+            else:
+                ids = [content_id for item_type, content_id in keys if item_type == key]
+                batches = [ids[start:start + 500] for start in range(0, len(ids), 500)]
+            for ids in batches:
+                for row in session.execute(query if ids is None else query.where(model.id.in_(ids))):
+                    document = ' '.join(part or '' for part in (row.title, *row[4:])).lower()
+                    yield (key, row.id), row.updated_at, Counter(RELATED_TOKEN_PATTERN.findall(document)), row.tags or []
+
+    def _vectorize(self, documents: List[Tuple[Counter, List[str]]]):
+        # One CSR row per document: the TF-IDF block and the tag block are normalised separately,
+        # weighted, and the whole row normalised again.
+        import numpy as np
+        from scipy import sparse
+
+        data, indices, indptr = [], [], [0]
+        for terms, tags in documents:
+            columns = [self.vocabulary[term] for term in terms if term in self.vocabulary]
+            weights = np.array([1 + np.log(terms[term]) for term in terms if term in self.vocabulary]) * self.idf[columns]
+            if len(weights):
+                weights /= np.linalg.norm(weights)
+            tag_columns = sorted({self.tag_columns[tag] for tag in tags if tag in self.tag_columns})
+            tag_weights = np.full(len(tag_columns), RELATED_TAG_WEIGHT / np.sqrt(len(tag_columns))) if tag_columns else np.array([])
+            row = np.concatenate([weights, tag_weights])
+            norm = np.linalg.norm(row)
+            data.extend(row / norm if norm else row)
+            indices.extend(columns + tag_columns)
+            indptr.append(len(indices))
+        return sparse.csr_matrix((data, indices, indptr), shape=(len(documents), len(self.vocabulary) + len(self.tag_columns)))
+
+    def _top_neighbors(self, rows: List[int]) -> Dict[int, List[Tuple[int, float]]]:
+        # Similarities of RELATED_BATCH_SIZE posts at a time against all posts, as one dense block.
+        import numpy as np
+
+        results = {}
+        transposed = self.matrix.T.tocsc()
+        rows = [row for row in rows if self.keys[row] is not None]
+        for batch in (rows[start:start + RELATED_BATCH_SIZE] for start in range(0, len(rows), RELATED_BATCH_SIZE)):
+            similarities = (self.matrix[batch] @ transposed).toarray()
+            similarities[np.arange(len(batch)), batch] = 0
+            if similarities.shape[1] > RELATED_TOP_K:
+                candidates = np.argpartition(-similarities, RELATED_TOP_K, axis=1)[:, :RELATED_TOP_K]
+            else:
+                candidates = np.tile(np.arange(similarities.shape[1]), (len(batch), 1))
+            for position, row in enumerate(batch):
+                scores = similarities[position, candidates[position]]
+                results[row] = [(int(candidates[position][index]), float(scores[index])) for index in np.argsort(-scores)
+                                if scores[index] >= RELATED_MIN_SIMILARITY]
+        return results
+
+    def _delete(self, session, keys: List[Tuple[str, str]], model=None) -> None:
+        model = model or RelatedContent
+        for content_type in ('blog', 'case_study'):
+            ids = [content_id for key_type, content_id in keys if key_type == content_type]
+            for start in range(0, len(ids), 500):
+                session.execute(model.__table__.delete().where(
+                    model.content_type == content_type, model.content_id.in_(ids[start:start + 500])))
+
+    def _store_versions(self, session, keys: List[Tuple[str, str]]) -> None:
+        rows = [{'content_type': key[0], 'content_id': key[1], 'updated_at': self.versions[key]} for key in keys]
+        for start in range(0, len(rows), 1000):
+            session.execute(RelatedIndexVersion.__table__.insert(), rows[start:start + 1000])
+
+    def _store(self, session, results: Dict[int, List[Tuple[int, float]]]) -> None:
+        self._delete(session, [self.keys[row] for row in results])
+        rows = [{'content_type': self.keys[row][0], 'content_id': self.keys[row][1], 'rank': rank,
+                 'related_type': self.keys[neighbor][0], 'related_id': self.keys[neighbor][1], 'score': score}
+                for row, neighbors in results.items() for rank, (neighbor, score) in enumerate(neighbors)]
+        for start in range(0, len(rows), 1000):
+            session.execute(RelatedContent.__table__.insert(), rows[start:start + 1000])
+
+
+@st.cache_resource
+def get_related_index() -> RelatedContentIndex:
+    """
+    Return the process's copy of the related content index; it is loaded from the database, or
+    built if none is stored, on its first sync.
+    Returns:
+        RelatedContentIndex: Shared index.
+    """
+    return RelatedContentIndex()
+
+
+@derived_index_builder('related_content')
+def rebuild_related_content(session) -> None:
+    """
+    Recompute the related posts of every published post.
+    Args:
+        session: Active database session, or a connection during migration.
+    """
+    RelatedContentIndex().build(session)
+
+# Versioning Helpers
+
+
+def content_hash(data: Any) -> str:
+    """
+    Hash a JSON-serialisable value in canonical form.
+    Args:
+        data: Value to hash.
+    Returns:
+        str: SHA-256 hex digest.
+    """
+    return hashlib.sha256(
+        json.dumps(data, sort_keys=True, separators=(',', ':'), default=str).encode('utf-8')
+    ).hexdigest()
+
+
+def compress_json(data: Any) -> bytes:
+    """
+    Serialise a value to JSON and zlib-compress it.
+    Args:
+        data: JSON-serialisable value.
+    Returns:
+        bytes: Compressed payload.
+    """
+    return zlib.compress(json.dumps(data, separators=(',', ':'), default=str).encode('utf-8'), 9)
+
+
+def decompress_json(payload: bytes) -> Any:
+    """
+    Decompress a payload produced by compress_json.
+    Args:
+        payload: Compressed payload.
+    Returns:
+        Any: Decoded value.
+    """
+    return json.loads(zlib.decompress(payload).decode('utf-8'))
+
+
+def diff_text(old: str, new: str) -> List[Any]:
+    """
+    Encode new text as line operations against old text.
+    Args:
+        old: Previous text.
+        new: Current text.
+    Returns:
+        List[Any]: [start, end] ranges of old lines to copy, and strings to insert.
+    """
+    old_lines = old.splitlines(keepends=True)
+    new_lines = new.splitlines(keepends=True)
+    ops = []
+    matcher = difflib.SequenceMatcher(None, old_lines, new_lines, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == 'equal':
+            ops.append([i1, i2])
+        elif tag in ('replace', 'insert'):
+            ops.append(''.join(new_lines[j1:j2]))
+    return ops
+
+
+def patch_text(old: str, ops: List[Any]) -> str:
+    """
+    Rebuild text from old text and operations produced by diff_text.
+    Args:
+        old: Previous text.
+        ops: Line operations.
+    Returns:
+        str: Current text.
+    """
+    old_lines = old.splitlines(keepends=True)
+    return ''.join(op if isinstance(op, str) else ''.join(old_lines[op[0]:op[1]]) for op in ops)
+
+
+def make_delta(old: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Encode a dictionary as field-level changes against a previous version.
+    Text fields are stored as line diffs; other changed fields are stored whole.
+    Args:
+        old: Previous version.
+        new: Current version.
+    Returns:
+        Dict[str, Any]: Delta with 'set', 'diff' and 'del' entries.
+    """
+    delta = {'set': {}, 'diff': {}, 'del': [key for key in old if key not in new]}
+    for key, value in new.items():
+        if key in old and old[key] == value:
+            continue
+        if isinstance(value, str) and isinstance(old.get(key), str) and '\n' in old[key]:
+            delta['diff'][key] = diff_text(old[key], value)
+        else:
+            delta['set'][key] = value
+    return delta
+
+
+def apply_delta(old: Dict[str, Any], delta: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Apply a delta produced by make_delta.
+    Args:
+        old: Previous version.
+        delta: Field-level changes.
+    Returns:
+        Dict[str, Any]: Current version.
+    """
+    new = {key: value for key, value in old.items() if key not in delta.get('del', [])}
+    for key, ops in delta.get('diff', {}).items():
+        new[key] = patch_text(old.get(key, ''), ops)
+    new.update(delta.get('set', {}))
+    return new
+
+
+def content_revision_data(content_type: str, content: Any) -> Dict[str, Any]:
+    """
+    Extract the versioned fields of a blog or case study.
+    Args:
+        content_type: Content type (blog/case_study).
+        content: Blog or CaseStudy object.
+    Returns:
+        Dict[str, Any]: Field values recorded in the revision log.
+    """
+    fields = ['title', 'content'] if content_type == 'blog' else ['title', 'problem', 'solution', 'results']
+    data = {field: getattr(content, field) for field in fields}
+    data.update({
+        'tags': list(content.tags or []),
+        'media': list(content.media or []),
+        'font': content.font,
+        'is_published': content.is_published
+    })
+    return data
+
+
+def replay_revisions(revisions: List[Tuple[bool, bytes]]) -> List[Dict[str, Any]]:
+    """
+    Rebuild full versions from a chain that starts with a snapshot.
+    Args:
+        revisions: (is_snapshot, payload) pairs in revision order.
+    Returns:
+        List[Dict[str, Any]]: Full version for each revision.
+    """
+    states, state = [], None
+    for is_snapshot, payload in revisions:
+        decoded = decompress_json(payload)
+        state = decoded if is_snapshot else apply_delta(state, decoded)
+        states.append(state)
+    return states
+
+# Rendering
+
+# Fields rendered for each content type, with the headings case study sections are shown under.
+RENDER_FIELDS = {'blog': ['content'], 'case_study': ['problem', 'solution', 'results']}
+CASE_STUDY_SECTIONS = [('Problem', 'problem'), ('Solution', 'solution'), ('Results', 'results')]
+
+_render_state = threading.local()
+
+
+def get_cleaner() -> Cleaner:
+    """
+    Return the render pipeline's HTML cleaner.
+    Every artifact is cleaned with this one configuration; Cleaner instances are not
+    thread-safe, so each thread builds its own copy.
+    Returns:
+        Cleaner: Cleaner for the current thread.
+    """
+    cleaner = getattr(_render_state, 'cleaner', None)
+    if cleaner is None:
+        cleaner = _render_state.cleaner = Cleaner(
+            tags=RENDER_ALLOWED_TAGS,
+            attributes=RENDER_ALLOWED_ATTRIBUTES,
+            protocols=RENDER_ALLOWED_PROTOCOLS,
+            strip=True,
+            filters=[partial(LinkifyFilter, callbacks=[nofollow], skip_tags={'pre', 'code'})]
+        )
+    return cleaner
+
+
+def render_html(text_value: str) -> str:
+    """
+    Render stored text as sanitised HTML: blank lines separate paragraphs, newlines break lines.
+    Args:
+        text_value: Text as stored (already cleaned on input).
+    Returns:
+        str: Sanitised HTML.
+    """
+    blocks = [block.strip() for block in re.split(r'\n\s*\n', text_value or '') if block.strip()]
+    return get_cleaner().clean(''.join(f"<p>{'<br>'.join(block.splitlines())}</p>" for block in blocks))
+
+
+def render_inline(text_value: str) -> str:
+    """
+    Render a short text, such as a comment, as sanitised HTML without paragraphs.
+    Args:
+        text_value: Text as stored.
+    Returns:
+        str: Sanitised HTML.
+    """
+    return get_cleaner().clean('<br>'.join((text_value or '').splitlines()))
+
+
+def render_excerpt(html_value: str, length: int) -> str:
+    """
+    Plaintext excerpt of rendered HTML, cut at a word boundary.
+    Args:
+        html_value: Sanitised HTML from render_html.
+        length: Maximum length before the ellipsis.
+    Returns:
+        str: Excerpt.
+    """
+    # The input is the cleaner's output, so stripping tags with a pattern is safe here.
+    plain = ' '.join(unescape(re.sub(r'<[^>]*>', ' ', html_value or '')).split())
+    if len(plain) <= length:
+        return plain
+    return plain[:length].rsplit(' ', 1)[0] + '...'
+
+
+def render_content(content_type: str, fields: Dict[str, str]) -> Dict[str, Any]:
+    """
+    Render the stored artifacts of a blog or case study.
+    Args:
+        content_type: Content type (blog/case_study).
+        fields: Values of RENDER_FIELDS[content_type].
+    Returns:
+        Dict[str, Any]: content_html, excerpt and render_version column values.
+    """
+    if content_type == 'blog':
+        content_html = render_html(fields['content'])
+        excerpt = render_excerpt(content_html, EXCERPT_LENGTH)
+    else:
+        sections = [(heading, render_html(fields[field])) for heading, field in CASE_STUDY_SECTIONS]
+        content_html = ''.join(f"<h4>{heading}</h4>{body}" for heading, body in sections)
+        excerpt = '\n'.join(f"{heading}: {render_excerpt(body, CASE_STUDY_EXCERPT_LENGTH)}" for heading, body in sections)
+    return {'content_html': content_html, 'excerpt': excerpt, 'render_version': RENDER_VERSION}
+
+
+def render_comment(username: str, comment: str, created_at: datetime) -> str:
+    """
+    Render a comment line: author, text and time.
+    Args:
+        username: Commenter's username.
+        comment: Comment text as stored.
+        created_at: Comment time.
+    Returns:
+        str: Sanitised HTML.
+    """
+    return f"{get_cleaner().clean(username)}: {render_inline(comment)} ({created_at.strftime('%Y-%m-%d %H:%M')})"
+
+
+def render_notification(message: str, created_at: datetime) -> str:
+    """
+    Render a notification line: message and time.
+    Args:
+        message: Notification message as stored.
+        created_at: Notification time.
+    Returns:
+        str: Sanitised HTML.
+    """
+    return f"{render_inline(message)} ({created_at.strftime('%Y-%m-%d %H:%M')})"
+
+
+def content_artifacts(content: Any) -> Dict[str, Any]:
+    """
+    Stored artifacts of a blog or case study, rendered on the fly for rows never rendered.
+    Args:
+        content: Blog or CaseStudy object.
+    Returns:
+        Dict[str, Any]: content_html and excerpt.
+    """
+    if content.render_version:
+        return {'content_html': content.content_html, 'excerpt': content.excerpt}
+    return render_content(content.content_type, {field: getattr(content, field) for field in RENDER_FIELDS[content.content_type]})
+
+# Identifiers
+
+
+def _uuid7(milliseconds: int, entropy: bytes) -> str:
+    # 48-bit Unix time in ms, version 7, 12 + 62 bits from entropy, RFC 4122 variant.
+    rand = int.from_bytes(entropy[:10], 'big')
+    value = ((milliseconds & (1 << 48) - 1) << 80) | (0x7 << 76) | ((rand >> 62 & 0xFFF) << 64) \
+        | (0b10 << 62) | (rand & (1 << 62) - 1)
+    return str(uuid.UUID(int=value))
+
+
+def new_id() -> str:
+    """
+    Generate a primary key for a new row.
+    UUIDv7 keys start with the creation time, so new rows are appended at the right edge of
+    every B-tree instead of landing on a random page.
+    Returns:
+        str: Canonical UUID string.
+    """
+    return _uuid7(time.time_ns() // 1_000_000, os.urandom(10))
+
+
+def time_ordered_id(timestamp: datetime, key: str) -> str:
+    """
+    Derive a stable UUIDv7 key for a row created at a known time, e.g. imported content.
+    Args:
+        timestamp: Creation time (naive UTC).
+        key: Stable identity of the row; the same key and time always give the same ID.
+    Returns:
+        str: Canonical UUID string.
+    """
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+    milliseconds = int((timestamp - datetime(1970, 1, 1)).total_seconds() * 1000)
+    return _uuid7(milliseconds, hashlib.sha256(key.encode('utf-8')).digest())
+
+
+def parse_uuid(value: Any) -> Optional[uuid.UUID]:
+    """
+    Parse a UUID, returning None for anything else.
+    Args:
+        value: Candidate value.
+    Returns:
+        Optional[uuid.UUID]: Parsed UUID or None.
+    """
+    try:
+        return value if isinstance(value, uuid.UUID) else uuid.UUID(str(value))
+    except ValueError:
+        return None
+
+
+def sqlite_uuid_blob(value: Any) -> Any:
+    """
+    SQL function uuid_blob(): the 16-byte form of a UUID string, NULL for other text.
+    Blobs pass through unchanged, so migrations can apply it to partially converted columns.
+    """
+    if value is None or isinstance(value, bytes):
+        return value
+    parsed = parse_uuid(value)
+    return parsed.bytes if parsed else None
+
+
+class CompactUUID(TypeDecorator):
+    """
+    UUID column stored as 16 bytes instead of 36 characters of text.
+    Python code keeps using canonical strings. Values that are not UUIDs are stored as UTF-8,
+    so a lookup with a malformed ID simply matches nothing.
+    """
+
+    impl = LargeBinary
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None or isinstance(value, bytes):
+            return value
+        parsed = parse_uuid(value)
+        return parsed.bytes if parsed else str(value).encode('utf-8')
+
+    def process_result_value(self, value, dialect):
+        if isinstance(value, bytes):
+            return str(uuid.UUID(bytes=value)) if len(value) == 16 else value.decode('utf-8', 'replace')
+        return value
+
+# Compressed Columns
+
+# First byte of a compressed value, naming its codec. Plain values are stored as text, so
+# they never start with it.
+COMPRESSION_CODEC_ZLIB = b'\x01'
+
+
+def compress_text(value: Any) -> Any:
+    """
+    Compress text of at least COMPRESSION_THRESHOLD bytes.
+    Shorter text, and text that does not shrink, is returned unchanged; already compressed
+    values pass through, so applying it twice is harmless.
+    Args:
+        value: Text to store.
+    Returns:
+        Any: Codec byte followed by the compressed UTF-8, or the value unchanged.
+    """
+    if not isinstance(value, str):
+        return value
+    data = value.encode('utf-8')
+    if len(data) < COMPRESSION_THRESHOLD:
+        return value
+    compressed = zlib.compress(data, COMPRESSION_LEVEL)
+    return COMPRESSION_CODEC_ZLIB + compressed if len(compressed) + 1 < len(data) else value
+
+
+def decompress_text(value: Any) -> Any:
+    """
+    Reverse compress_text; plain text passes through, so a column may hold both forms.
+    Args:
+        value: Stored value.
+    Returns:
+        Any: Text, or None.
+    """
+    if isinstance(value, bytes):
+        if value[:1] == COMPRESSION_CODEC_ZLIB:
+            return zlib.decompress(value[1:]).decode('utf-8')
+        return value.decode('utf-8')
+    return value
+
+
+class CompressedText(TypeDecorator):
+    """
+    Text column compressed with compress_text when large.
+    SQL string functions and LIKE only see the compressed bytes of large values; search
+    goes through the full-text index, which is fed the plaintext.
+    """
+
+    impl = Text
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        return compress_text(value)
+
+    def process_result_value(self, value, dialect):
+        return decompress_text(value)
+
+
+class CompressedJSON(TypeDecorator):
+    """
+    JSON column whose serialised form is compressed with compress_text when large.
+    """
+
+    impl = Text
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        return None if value is None else compress_text(json.dumps(value))
+
+    def process_result_value(self, value, dialect):
+        value = decompress_text(value)
+        return None if value is None else json.loads(value)
+
+# Models
+
+
+class User(Base):
+    """
+    User model for storing user information.
+    """
+    __tablename__ = 'users'
+    id = Column(Integer, primary_key=True)
+    username = Column(String(50), unique=True, nullable=False)
+    password = Column(String(255), nullable=False)
+    email = Column(String(100), unique=True, nullable=False)
+    profile = Column(JSON, default={})
+    created_at = Column(DateTime, default=datetime.utcnow)
+    is_active = Column(Boolean, default=True)
+    is_admin = Column(Boolean, default=False)
+    last_login = Column(DateTime)
+    follower_count = Column(Integer, default=0)
+    blogs = relationship("Blog", back_populates="user", overlaps="user")
+    case_studies = relationship("CaseStudy", back_populates="user", overlaps="user")
+    comments = relationship("Comment", back_populates="user", overlaps="user")
+    media = relationship("Media", back_populates="user", overlaps="user")
+    likes = relationship("Like", back_populates="user")
+    notifications = relationship("Notification", back_populates="user")
+    analytics_events = relationship("AnalyticsEvent", back_populates="user")
+    drafts = relationship("Draft", back_populates="user")
+    __table_args__ = (
+        Index('idx_user_username', 'username'),
+        Index('idx_user_active_created', 'is_active', 'created_at'),
+        Index('idx_user_created', 'created_at'),
+    )
+
+
+class Tag(Base):
+    """
+    Tag model for categorizing content.
+    """
+    __tablename__ = 'tags'
+    id = Column(CompactUUID, primary_key=True)
+    name = Column(String(50), unique=True, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    blogs = relationship("Blog", secondary="blog_tags", back_populates="tag_objects")
+    case_studies = relationship("CaseStudy", secondary="case_study_tags", back_populates="tag_objects")
+    __table_args__ = (Index('idx_tag_name', 'name'),)
+
+
+class Blog(Base):
+    """
+    Blog model for blog posts.
+    """
+    __tablename__ = 'blogs'
+    id = Column(CompactUUID, primary_key=True)
+    user_id = Column(Integer, ForeignKey('users.id'), nullable=False)
+    username = Column(String(50), nullable=False)
+    title = Column(String(255), nullable=False)
+    content = Column(CompressedText, nullable=False)
+    tags = Column(JSON, default=[])
+    media = Column(JSON, default=[])
+    font = Column(String(50), default='Inter')
+    content_type = Column(String(20), default='blog')
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+    views = Column(Integer, default=0)
+    public_link = Column(String(255))
+    is_published = Column(Boolean, default=True)
+    is_draft = Column(Boolean, default=False)
+    deleted_at = Column(DateTime)
+    content_html = Column(CompressedText)
+    excerpt = Column(Text)
+    render_version = Column(Integer)
+    user = relationship("User", back_populates="blogs", overlaps="blogs")
+    comments = relationship(
+        "Comment",
+        back_populates="blog",
+        primaryjoin="and_(Blog.id == foreign(Comment.content_id), Comment.content_type == 'blog')",
+        viewonly=True
+    )
+    media_rel = relationship(
+        "Media",
+        back_populates="blog",
+        primaryjoin="and_(Blog.id == foreign(Media.content_id), Media.content_type == 'blog')",
+        viewonly=True
+    )
+    likes = relationship(
+        "Like",
+        back_populates="blog",
+        primaryjoin="and_(Blog.id == foreign(Like.content_id), Like.content_type == 'blog')",
+        viewonly=True
+    )
+    tag_objects = relationship("Tag", secondary="blog_tags", back_populates="blogs")
+    drafts = relationship(
+        "Draft",
+        back_populates="blog",
+        primaryjoin="and_(Blog.id == foreign(Draft.content_id), Draft.content_type == 'blog')",
+        viewonly=True
+    )
+    __table_args__ = (
+        Index('idx_blog_username', 'username', 'content_type'),
+        Index('idx_blog_created', 'created_at'),
+        Index('idx_blog_author_created', 'user_id', 'created_at'),
+        Index('idx_blog_status_created', 'is_published', 'is_draft', 'created_at'),
+        Index('idx_blog_deleted', 'deleted_at'),
+    )
+
+
+class CaseStudy(Base):
+    """
+    CaseStudy model for case studies.
+    """
+    __tablename__ = 'case_studies'
+    id = Column(CompactUUID, primary_key=True)
+    user_id = Column(Integer, ForeignKey('users.id'), nullable=False)
+    username = Column(String(50), nullable=False)
+    title = Column(String(255), nullable=False)
+    problem = Column(CompressedText, nullable=False)
+    solution = Column(CompressedText, nullable=False)
+    results = Column(CompressedText, nullable=False)
+    tags = Column(JSON, default=[])
+    media = Column(JSON, default=[])
+    font = Column(String(50), default='Inter')
+    content_type = Column(String(20), default='case_study')
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+    views = Column(Integer, default=0)
+    public_link = Column(String(255))
+    is_published = Column(Boolean, default=True)
+    is_draft = Column(Boolean, default=False)
+    deleted_at = Column(DateTime)
+    content_html = Column(CompressedText)
+    excerpt = Column(Text)
+    render_version = Column(Integer)
+    user = relationship("User", back_populates="case_studies", overlaps="case_studies")
+    comments = relationship(
+        "Comment",
+        back_populates="case_study",
+        primaryjoin="and_(CaseStudy.id == foreign(Comment.content_id), Comment.content_type == 'case_study')",
+        viewonly=True
+    )
+    media_rel = relationship(
+        "Media",
+        back_populates="case_study",
+        primaryjoin="and_(CaseStudy.id == foreign(Media.content_id), Media.content_type == 'case_study')",
+        viewonly=True
+    )
+    likes = relationship(
+        "Like",
+        back_populates="case_study",
+        primaryjoin="and_(CaseStudy.id == foreign(Like.content_id), Like.content_type == 'case_study')",
+        viewonly=True
+    )
+    tag_objects = relationship("Tag", secondary="case_study_tags", back_populates="case_studies")
+    drafts = relationship(
+        "Draft",
+        back_populates="case_study",
+        primaryjoin="and_(CaseStudy.id == foreign(Draft.content_id), Draft.content_type == 'case_study')",
+        viewonly=True
+    )
+    __table_args__ = (
+        Index('idx_case_username', 'username', 'content_type'),
+        Index('idx_case_created', 'created_at'),
+        Index('idx_case_author_created', 'user_id', 'created_at'),
+        Index('idx_case_status_created', 'is_published', 'is_draft', 'created_at'),
+        Index('idx_case_deleted', 'deleted_at'),
+    )
+
+
+class Media(Base):
+    """
+    Media model for uploaded files.
+    """
+    __tablename__ = 'media'
+    id = Column(CompactUUID, primary_key=True)
+    user_id = Column(Integer, ForeignKey('users.id'), nullable=False)
+    username = Column(String(50), nullable=False)
+    content_type = Column(String(20))
+    content_id = Column(CompactUUID)
+    type = Column(String(20), nullable=False)
+    content = Column(Text, nullable=False)
+    filename = Column(String(255), nullable=False)
+    uploaded_at = Column(DateTime, default=datetime.utcnow)
+    size = Column(Integer)
+    checksum = Column(String(64))
+    user = relationship("User", back_populates="media", overlaps="media")
+    blog = relationship(
+        "Blog",
+        back_populates="media_rel",
+        primaryjoin="and_(Blog.id == foreign(Media.content_id), Media.content_type == 'blog')",
+        viewonly=True
+    )
+    case_study = relationship(
+        "CaseStudy",
+        back_populates="media_rel",
+        primaryjoin="and_(CaseStudy.id == foreign(Media.content_id), Media.content_type == 'case_study')",
+        viewonly=True
+    )
+    __table_args__ = (Index('idx_media_username', 'username'),)
+
+
+class Comment(Base):
+    """
+    Comment model for content comments.
+    """
+    __tablename__ = 'comments'
+    id = Column(CompactUUID, primary_key=True)
+    user_id = Column(Integer, ForeignKey('users.id'), nullable=False)
+    content_type = Column(String(20), nullable=False)
+    content_id = Column(CompactUUID, nullable=False)  # No ForeignKey due to polymorphism
+    username = Column(String(50), nullable=False)
+    comment = Column(Text, nullable=False)
+    comment_html = Column(Text)
+    render_version = Column(Integer)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    user = relationship("User", back_populates="comments")
+    blog = relationship(
+        "Blog",
+        back_populates="comments",
+        primaryjoin="and_(Blog.id == foreign(Comment.content_id), Comment.content_type == 'blog')",
+        viewonly=True
+    )
+    case_study = relationship(
+        "CaseStudy",
+        back_populates="comments",
+        primaryjoin="and_(CaseStudy.id == foreign(Comment.content_id), Comment.content_type == 'case_study')",
+        viewonly=True
+    )
+    __table_args__ = (Index('idx_comment_content_created', 'content_type', 'content_id', 'created_at'),)
+
+
+class Like(Base):
+    """
+    Like model for content likes.
+    """
+    __tablename__ = 'likes'
+    id = Column(CompactUUID, primary_key=True)
+    user_id = Column(Integer, ForeignKey('users.id'), nullable=False)
+    content_type = Column(String(20), nullable=False)
+    content_id = Column(CompactUUID, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    user = relationship("User", back_populates="likes")
+    blog = relationship(
+        "Blog",
+        back_populates="likes",
+        primaryjoin="and_(Blog.id == foreign(Like.content_id), Like.content_type == 'blog')",
+        viewonly=True
+    )
+    case_study = relationship(
+        "CaseStudy",
+        back_populates="likes",
+        primaryjoin="and_(CaseStudy.id == foreign(Like.content_id), Like.content_type == 'case_study')",
+        viewonly=True
+    )
+    __table_args__ = (
+        Index('idx_like_content', 'content_type', 'content_id'),
+        Index('idx_like_user_content', 'user_id', 'content_type', 'content_id'),
+        ForeignKeyConstraint(['user_id'], ['users.id'], name='fk_like_user_id'),
+    )
+
+
+class Notification(Base):
+    """
+    Notification model for user alerts.
+    """
+    __tablename__ = 'notifications'
+    id = Column(CompactUUID, primary_key=True)
+    user_id = Column(Integer, ForeignKey('users.id'), nullable=False)
+    message = Column(Text, nullable=False)
+    message_html = Column(Text)
+    render_version = Column(Integer)
+    is_read = Column(Boolean, default=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    content_type = Column(String(20))
+    content_id = Column(CompactUUID)
+    user = relationship("User", back_populates="notifications")
+    __table_args__ = (Index('idx_notification_user_created', 'user_id', 'created_at'),)
+
+
+class AnalyticsEvent(Base):
+    """
+    AnalyticsEvent model for tracking user interactions.
+    """
+    __tablename__ = 'analytics_events'
+    id = Column(CompactUUID, primary_key=True)
+    user_id = Column(Integer, ForeignKey('users.id'), nullable=True)
+    event_type = Column(String(50), nullable=False)
+    content_type = Column(String(20))
+    content_id = Column(CompactUUID)
+    timestamp = Column(DateTime, default=datetime.utcnow)
+    event_metadata = Column(CompressedJSON, default={})
+    user = relationship("User", back_populates="analytics_events")
+    __table_args__ = (Index('idx_analytics_event', 'event_type', 'timestamp'),)
+
+
+class Draft(Base):
+    """
+    Draft model for content versions.
+    """
+    __tablename__ = 'drafts'
+    id = Column(CompactUUID, primary_key=True)
+    user_id = Column(Integer, ForeignKey('users.id'), nullable=False)
+    content_type = Column(String(20), nullable=False)
+    content_id = Column(CompactUUID)
+    data = Column(CompressedJSON, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime)
+    content_hash = Column(String(64))
+    revision_count = Column(Integer, default=0)
+    user = relationship("User", back_populates="drafts")
+    blog = relationship(
+        "Blog",
+        back_populates="drafts",
+        primaryjoin="and_(Blog.id == foreign(Draft.content_id), Draft.content_type == 'blog')",
+        viewonly=True
+    )
+    case_study = relationship(
+        "CaseStudy",
+        back_populates="drafts",
+        primaryjoin="and_(CaseStudy.id == foreign(Draft.content_id), Draft.content_type == 'case_study')",
+        viewonly=True
+    )
+    __table_args__ = (Index('idx_draft_user', 'user_id', 'content_type'),)
+
+
+class DraftRevision(Base):
+    """
+    DraftRevision model for compressed draft history.
+    Each revision is a zlib-compressed snapshot or a delta against the previous revision.
+    """
+    __tablename__ = 'draft_revisions'
+    id = Column(CompactUUID, primary_key=True)
+    draft_id = Column(CompactUUID, ForeignKey('drafts.id'), nullable=False)
+    seq = Column(Integer, nullable=False)
+    content_hash = Column(String(64), nullable=False)
+    is_snapshot = Column(Boolean, default=False)
+    payload = Column(LargeBinary, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    __table_args__ = (Index('idx_draft_revision', 'draft_id', 'seq', unique=True),)
+
+
+class ContentRevision(Base):
+    """
+    ContentRevision model for the history of published blogs and case studies.
+    Each revision is a zlib-compressed keyframe or a delta against the previous revision.
+    """
+    __tablename__ = 'content_revisions'
+    id = Column(CompactUUID, primary_key=True)
+    content_type = Column(String(20), nullable=False)
+    content_id = Column(CompactUUID, nullable=False)
+    revision = Column(Integer, nullable=False)
+    user_id = Column(Integer, ForeignKey('users.id'))
+    content_hash = Column(String(64), nullable=False)
+    is_keyframe = Column(Boolean, default=False)
+    payload = Column(LargeBinary, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    __table_args__ = (
+        Index('idx_content_revision', 'content_type', 'content_id', 'revision', unique=True),
+        Index('idx_content_revision_time', 'content_type', 'content_id', 'created_at'),
+    )
+
+
+class ExternalId(Base):
+    """
+    ExternalId model mapping IDs that appear in public links but are not primary keys, such as
+    the original IDs of imported content, to the content they identify.
+    """
+    __tablename__ = 'external_ids'
+    content_type = Column(String(20), primary_key=True)
+    external_id = Column(String(255), primary_key=True)
+    content_id = Column(CompactUUID, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+
+class Job(Base):
+    """
+    Job model for the persistent queue of deferred work.
+    Workers claim the highest-priority due job; a claimed job is invisible to other workers
+    until locked_until passes, after which it is handed out again.
+    """
+    __tablename__ = 'jobs'
+    id = Column(CompactUUID, primary_key=True)
+    kind = Column(String(50), nullable=False)
+    payload = Column(JSON, default={})
+    priority = Column(Integer, default=JOB_PRIORITY_NORMAL)
+    status = Column(String(20), nullable=False, default='queued')
+    attempts = Column(Integer, default=0)
+    max_attempts = Column(Integer, default=JOB_MAX_ATTEMPTS)
+    idempotency_key = Column(String(255), unique=True)
+    run_at = Column(DateTime, default=datetime.utcnow)
+    locked_by = Column(String(100))
+    locked_until = Column(DateTime)
+    last_error = Column(Text)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    finished_at = Column(DateTime)
+    __table_args__ = (
+        Index('idx_job_claim', 'status', 'priority', 'run_at'),
+        Index('idx_job_finished', 'status', 'finished_at'),
+    )
+
+
+class TrendingScore(Base):
+    """
+    TrendingScore model holding the decayed activity score of a content item, relative to the
+    epoch in trending_epoch. Only items with recent activity have a row.
+    """
+    __tablename__ = 'trending_scores'
+    content_type = Column(String(20), primary_key=True)
+    content_id = Column(CompactUUID, primary_key=True)
+    score = Column(Float, nullable=False, default=0.0)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+    __table_args__ = (
+        Index('idx_trending_type_score', 'content_type', 'score'),
+    )
+
+
+class TrendingEpoch(Base):
+    """
+    TrendingEpoch model holding the single row with the time, in Unix seconds, that trending
+    scores are currently relative to.
+    """
+    __tablename__ = 'trending_epoch'
+    id = Column(Integer, primary_key=True)
+    epoch = Column(Float, nullable=False)
+
+
+class Follow(Base):
+    """
+    Follow model for the follower graph; users.follower_count mirrors the edges per followed user.
+    """
+    __tablename__ = 'follows'
+    follower_id = Column(Integer, ForeignKey('users.id'), primary_key=True)
+    followed_id = Column(Integer, ForeignKey('users.id'), primary_key=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    __table_args__ = (
+        Index('idx_follow_followed', 'followed_id', 'follower_id'),
+    )
+
+
+class TimelineEntry(Base):
+    """
+    TimelineEntry model for a post copied into a follower's home timeline when it was published.
+    created_at is the post's creation time, the order timelines are read in.
+    """
+    __tablename__ = 'timeline_entries'
+    user_id = Column(Integer, ForeignKey('users.id'), primary_key=True)
+    content_type = Column(String(20), primary_key=True)
+    content_id = Column(CompactUUID, primary_key=True)
+    author_id = Column(Integer, nullable=False)
+    created_at = Column(DateTime, nullable=False)
+    __table_args__ = (
+        Index('idx_timeline_user_created', 'user_id', 'created_at'),
+    )
+
+
+class RelatedContent(Base):
+    """
+    RelatedContent model holding the precomputed most similar posts of a published post,
+    ranked from 0.
+    """
+    __tablename__ = 'related_content'
+    content_type = Column(String(20), primary_key=True)
+    content_id = Column(CompactUUID, primary_key=True)
+    rank = Column(Integer, primary_key=True)
+    related_type = Column(String(20), nullable=False)
+    related_id = Column(CompactUUID, nullable=False)
+    score = Column(Float, nullable=False)
+
+
+class RelatedIndexState(Base):
+    """
+    RelatedIndexState model holding the single row of related content index state shared by all
+    processes: the compressed vocabulary, IDF weights and tag columns fixed at the last build, and
+    a generation token replaced by every build and sync.
+    """
+    __tablename__ = 'related_index_state'
+    id = Column(Integer, primary_key=True)
+    generation = Column(String(32), nullable=False)
+    changed_since_build = Column(Integer, nullable=False, default=0)
+    model = Column(LargeBinary, nullable=False)
+    built_at = Column(DateTime, default=datetime.utcnow)
+
+
+class RelatedIndexVersion(Base):
+    """
+    RelatedIndexVersion model recording the updated_at of each post as of its last indexing.
+    """
+    __tablename__ = 'related_index_versions'
+    content_type = Column(String(20), primary_key=True)
+    content_id = Column(CompactUUID, primary_key=True)
+    updated_at = Column(DateTime)
+
+
+# Association Tables
+blog_tags = Table(
+    'blog_tags', Base.metadata,
+    Column('blog_id', CompactUUID, ForeignKey('blogs.id'), primary_key=True),
+    Column('tag_id', CompactUUID, ForeignKey('tags.id'), primary_key=True)
+)
+
+case_study_tags = Table(
+    'case_study_tags', Base.metadata,
+    Column('case_study_id', CompactUUID, ForeignKey('case_studies.id'), primary_key=True),
+    Column('tag_id', CompactUUID, ForeignKey('tags.id'), primary_key=True)
+)
+
+# Models holding render artifacts, in the order the rerender job visits them.
+RENDER_TARGETS = {'blog': Blog, 'case_study': CaseStudy, 'comment': Comment, 'notification': Notification}
+
+
+def by_active_author(model):
+    """
+    Build a filter matching content whose author's account is active.
+    Deactivation leaves content untouched and readers apply this filter instead, so
+    reactivating an account shows its content again.
+    Args:
+        model: Content model (Blog or CaseStudy).
+    Returns:
+        Filter expression for the model's query.
+    """
+    return model.user_id.notin_(select(User.id).where(User.is_active == False))
+
+# Schema Migrations
+schema_migrations = Table(
+    'schema_migrations', Base.metadata,
+    Column('version', Integer, primary_key=True),
+    Column('name', String(100), nullable=False),
+    Column('applied_at', DateTime, default=datetime.utcnow),
+    Column('duration_ms', Integer)
+)
+
+# Migrations keyed by version, applied in ascending order. Each receives a MigrationContext;
+# every step must be safe to repeat, because a migration interrupted during a backfill or index
+# build is rerun from the start.
+MIGRATIONS: Dict[int, Dict[str, Any]] = {}
+
+
+def migration(version: int, name: str):
+    """
+    Register a schema migration.
+    Args:
+        version: Unique, increasing schema version the migration produces.
+        name: Short description.
+    Returns:
+        Callable: Decorator.
+    """
+    def register(func):
+        if version in MIGRATIONS:
+            raise ValueError(f"Duplicate migration version {version}")
+        MIGRATIONS[version] = {'name': name, 'func': func}
+        return func
+    return register
+
+
+class MigrationContext:
+    """
+    Steps of one migration.
+    Schema changes run in a single transaction; backfills then run in batches of their own
+    transactions and index builds one per transaction, so neither holds the write lock for long
+    and readers are never blocked under WAL. In dry-run mode steps are only estimated.
+    """
+
+    def __init__(self, engine, dry_run: bool = False, batch_size: int = MIGRATION_BATCH_SIZE):
+        self.engine = engine
+        self.dry_run = dry_run
+        self.batch_size = batch_size
+        self.steps: List[Dict[str, Any]] = []
+        self._schema: List[Any] = []
+        self._deferred: List[Any] = []
+
+    def execute(self, sql: str) -> None:
+        """
+        Run a schema statement in the migration's transaction.
+        Args:
+            sql: Idempotent SQL, e.g. DROP INDEX IF EXISTS.
+        """
+        self.steps.append({'step': sql, 'rows': 0, 'estimated_seconds': 0.0})
+        self._schema.append(lambda conn: conn.exec_driver_sql(sql))
+
+    def create_table(self, table: Table) -> None:
+        """
+        Create a table in the migration's transaction unless it already exists.
+        Args:
+            table: Table definition.
+        """
+        exists = table.name in sa_inspect(self.engine).get_table_names()
+        self.steps.append({'step': f"create table {table.name}" + (" (exists)" if exists else ""),
+                           'rows': 0, 'estimated_seconds': 0.0})
+        if not exists:
+            self._schema.append(lambda conn: table.create(conn, checkfirst=True))
+
+    def add_column(self, table: str, column: Column) -> None:
+        """
+        Add a nullable column unless it already exists; SQLite does this without rewriting the table.
+        Args:
+            table: Table name.
+            column: Column definition.
+        """
+        inspector = sa_inspect(self.engine)
+        exists = table in inspector.get_table_names() and column.name in {c['name'] for c in inspector.get_columns(table)}
+        self.steps.append({'step': f"add column {table}.{column.name}" + (" (exists)" if exists else ""),
+                           'rows': 0, 'estimated_seconds': 0.0})
+        if not exists:
+            column_type = column.type.compile(dialect=self.engine.dialect)
+            self._schema.append(lambda conn: conn.exec_driver_sql(
+                f"ALTER TABLE {table} ADD COLUMN {column.name} {column_type}"))
+
+    def create_index(self, name: str, table: str, columns: List[str], unique: bool = False) -> None:
+        """
+        Build an index after the schema transaction, in a transaction of its own.
+        Args:
+            name: Index name.
+            table: Table name.
+            columns: Indexed columns.
+            unique: Whether the index is unique.
+        """
+        inspector = sa_inspect(self.engine)
+        if table in inspector.get_table_names() and any(index['name'] == name for index in inspector.get_indexes(table)):
+            self.steps.append({'step': f"create index {name} (exists)", 'rows': 0, 'estimated_seconds': 0.0})
+            return
+        rows = self._count(table)
+        self.steps.append({'step': f"create index {name} on {table} ({', '.join(columns)})", 'rows': rows,
+                           'estimated_seconds': round(rows / MIGRATION_INDEX_ROWS_PER_SECOND, 2)})
+        self._deferred.append(lambda: self._run_in_transaction(
+            f"CREATE {'UNIQUE ' if unique else ''}INDEX IF NOT EXISTS {name} ON {table} ({', '.join(columns)})"))
+
+    def backfill(self, table: str, assignments: str, where: str) -> None:
+        """
+        Update matching rows in batches of consecutive rowids.
+        The condition must exclude rows already backfilled so an interrupted backfill can be
+        rerun without redoing them.
+        Args:
+            table: Table name.
+            assignments: SQL SET clause, e.g. "size = length(content) * 3 / 4".
+            where: SQL condition selecting rows still to update.
+        """
+        rows = self._count(table, where)
+        self.steps.append({'step': f"backfill {table}: {assignments} where {where}", 'rows': rows,
+                           'batches': -(-rows // self.batch_size),
+                           'estimated_seconds': round(rows / MIGRATION_BACKFILL_ROWS_PER_SECOND, 2)})
+        self._deferred.append(lambda: self._backfill(table, assignments, where))
+
+    def run(self, description: str, step: Any, rows: int = 0) -> None:
+        """
+        Run a Python step after the schema changes, in a transaction of its own.
+        Args:
+            description: Step description shown in dry runs.
+            step: Callable receiving the connection; must be safe to repeat.
+            rows: Estimated number of rows the step touches.
+        """
+        self.steps.append({'step': description, 'rows': rows,
+                           'estimated_seconds': round(rows / MIGRATION_BACKFILL_ROWS_PER_SECOND, 2)})
+        self._deferred.append(lambda: self._run_in_transaction(step))
+
+    def apply(self) -> None:
+        """
+        Run the recorded steps: schema changes atomically, then backfills and index builds.
+        """
+        with self.engine.begin() as conn:
+            for step in self._schema:
+                step(conn)
+        for step in self._deferred:
+            step()
+
+    def _count(self, table: str, where: Optional[str] = None) -> int:
+        if table not in sa_inspect(self.engine).get_table_names():
+            return 0
+        with self.engine.connect() as conn:
+            try:
+                return conn.exec_driver_sql(f"SELECT count(*) FROM {table}" + (f" WHERE {where}" if where else "")).scalar()
+            except SQLAlchemyError:
+                # In a dry run the condition may name a column an earlier pending migration adds;
+                # every row is then counted.
+                return conn.exec_driver_sql(f"SELECT count(*) FROM {table}").scalar()
+
+    def _run_in_transaction(self, step: Any) -> None:
+        with self.engine.begin() as conn:
+            if callable(step):
+                step(conn)
+            else:
+                conn.exec_driver_sql(step)
+
+    def _backfill(self, table: str, assignments: str, where: str) -> None:
+        # Walk the table in rowid windows so each row is read once, rather than rescanning
+        # past already-updated rows to find the next batch.
+        with self.engine.connect() as conn:
+            last = conn.exec_driver_sql(f"SELECT max(rowid) FROM {table}").scalar() or 0
+        total, start = 0, 0
+        while start < last:
+            with self.engine.begin() as conn:
+                total += conn.exec_driver_sql(
+                    f"UPDATE {table} SET {assignments} "
+                    f"WHERE rowid > {start} AND rowid <= {start + self.batch_size} AND ({where})"
+                ).rowcount
+            start += self.batch_size
+            if start < last:
+                time.sleep(MIGRATION_BATCH_PAUSE)
+        logger.info(f"Backfilled {total} rows of {table}")
+
+
+# The schema as it was when versioned migrations were introduced. It is frozen: later model
+# changes reach the database only through their own migrations, never through migration 1.
+BASELINE_METADATA = MetaData()
+Table(
+    'users', BASELINE_METADATA,
+    Column('id', Integer, primary_key=True),
+    Column('username', String(50), unique=True, nullable=False),
+    Column('password', String(255), nullable=False),
+    Column('email', String(100), unique=True, nullable=False),
+    Column('profile', JSON),
+    Column('created_at', DateTime),
+    Column('is_active', Boolean),
+    Column('is_admin', Boolean),
+    Column('last_login', DateTime),
+    Index('idx_user_active_created', 'is_active', 'created_at'),
+    Index('idx_user_created', 'created_at'),
+    Index('idx_user_username', 'username')
+)
+Table(
+    'tags', BASELINE_METADATA,
+    Column('id', String(36), primary_key=True),
+    Column('name', String(50), unique=True, nullable=False),
+    Column('created_at', DateTime),
+    Index('idx_tag_name', 'name')
+)
+Table(
+    'blogs', BASELINE_METADATA,
+    Column('id', String(36), primary_key=True),
+    Column('user_id', Integer, ForeignKey('users.id'), nullable=False),
+    Column('username', String(50), nullable=False),
+    Column('title', String(255), nullable=False),
+    Column('content', Text, nullable=False),
+    Column('tags', JSON),
+    Column('media', JSON),
+    Column('font', String(50)),
+    Column('content_type', String(20)),
+    Column('created_at', DateTime),
+    Column('updated_at', DateTime),
+    Column('views', Integer),
+    Column('public_link', String(255)),
+    Column('is_published', Boolean),
+    Column('is_draft', Boolean),
+    Column('deleted_at', DateTime),
+    Index('idx_blog_created', 'created_at'),
+    Index('idx_blog_deleted', 'deleted_at'),
+    Index('idx_blog_status_created', 'is_published', 'is_draft', 'created_at'),
+    Index('idx_blog_username', 'username', 'content_type')
+)
+Table(
+    'case_studies', BASELINE_METADATA,
+    Column('id', String(36), primary_key=True),
+    Column('user_id', Integer, ForeignKey('users.id'), nullable=False),
+    Column('username', String(50), nullable=False),
+    Column('title', String(255), nullable=False),
+    Column('problem', Text, nullable=False),
+    Column('solution', Text, nullable=False),
+    Column('results', Text, nullable=False),
+    Column('tags', JSON),
+    Column('media', JSON),
+    Column('font', String(50)),
+    Column('content_type', String(20)),
+    Column('created_at', DateTime),
+    Column('updated_at', DateTime),
+    Column('views', Integer),
+    Column('public_link', String(255)),
+    Column('is_published', Boolean),
+    Column('is_draft', Boolean),
+    Column('deleted_at', DateTime),
+    Index('idx_case_created', 'created_at'),
+    Index('idx_case_deleted', 'deleted_at'),
+    Index('idx_case_status_created', 'is_published', 'is_draft', 'created_at'),
+    Index('idx_case_username', 'username', 'content_type')
+)
+Table(
+    'blog_tags', BASELINE_METADATA,
+    Column('blog_id', String(36), ForeignKey('blogs.id'), primary_key=True),
+    Column('tag_id', String(36), ForeignKey('tags.id'), primary_key=True)
+)
+Table(
+    'case_study_tags', BASELINE_METADATA,
+    Column('case_study_id', String(36), ForeignKey('case_studies.id'), primary_key=True),
+    Column('tag_id', String(36), ForeignKey('tags.id'), primary_key=True)
+)
+Table(
+    'media', BASELINE_METADATA,
+    Column('id', String(36), primary_key=True),
+    Column('user_id', Integer, ForeignKey('users.id'), nullable=False),
+    Column('username', String(50), nullable=False),
+    Column('content_type', String(20)),
+    Column('content_id', String(36)),
+    Column('type', String(20), nullable=False),
+    Column('content', Text, nullable=False),
+    Column('filename', String(255), nullable=False),
+    Column('uploaded_at', DateTime),
+    Column('size', Integer),
+    Column('checksum', String(64)),
+    Index('idx_media_username', 'username')
+)
+Table(
+    'comments', BASELINE_METADATA,
+    Column('id', String(36), primary_key=True),
+    Column('user_id', Integer, ForeignKey('users.id'), nullable=False),
+    Column('content_type', String(20), nullable=False),
+    Column('content_id', String(36), nullable=False),
+    Column('username', String(50), nullable=False),
+    Column('comment', Text, nullable=False),
+    Column('created_at', DateTime),
+    Index('idx_comment_content', 'content_type', 'content_id')
+)
+Table(
+    'likes', BASELINE_METADATA,
+    Column('id', String(36), primary_key=True),
+    Column('user_id', Integer, ForeignKey('users.id'), nullable=False),
+    Column('content_type', String(20), nullable=False),
+    Column('content_id', String(36), nullable=False),
+    Column('created_at', DateTime),
+    Index('idx_like_content', 'content_type', 'content_id')
+)
+Table(
+    'notifications', BASELINE_METADATA,
+    Column('id', String(36), primary_key=True),
+    Column('user_id', Integer, ForeignKey('users.id'), nullable=False),
+    Column('message', Text, nullable=False),
+    Column('is_read', Boolean),
+    Column('created_at', DateTime),
+    Column('content_type', String(20)),
+    Column('content_id', String(36)),
+    Index('idx_notification_user', 'user_id')
+)
+Table(
+    'analytics_events', BASELINE_METADATA,
+    Column('id', String(36), primary_key=True),
+    Column('user_id', Integer, ForeignKey('users.id')),
+    Column('event_type', String(50), nullable=False),
+    Column('content_type', String(20)),
+    Column('content_id', String(36)),
+    Column('timestamp', DateTime),
+    Column('event_metadata', JSON),
+    Index('idx_analytics_event', 'event_type', 'timestamp')
+)
+Table(
+    'drafts', BASELINE_METADATA,
+    Column('id', String(36), primary_key=True),
+    Column('user_id', Integer, ForeignKey('users.id'), nullable=False),
+    Column('content_type', String(20), nullable=False),
+    Column('content_id', String(36)),
+    Column('data', JSON, nullable=False),
+    Column('created_at', DateTime),
+    Column('updated_at', DateTime),
+    Column('content_hash', String(64)),
+    Column('revision_count', Integer),
+    Index('idx_draft_user', 'user_id', 'content_type')
+)
+Table(
+    'draft_revisions', BASELINE_METADATA,
+    Column('id', String(36), primary_key=True),
+    Column('draft_id', String(36), ForeignKey('drafts.id'), nullable=False),
+    Column('seq', Integer, nullable=False),
+    Column('content_hash', String(64), nullable=False),
+    Column('is_snapshot', Boolean),
+    Column('payload', LargeBinary, nullable=False),
+    Column('created_at', DateTime),
+    Index('idx_draft_revision', 'draft_id', 'seq', unique=True)
+)
+
+Table(
+    'content_revisions', BASELINE_METADATA,
+    Column('id', String(36), primary_key=True),
+    Column('content_type', String(20), nullable=False),
+    Column('content_id', String(36), nullable=False),
+    Column('revision', Integer, nullable=False),
+    Column('user_id', Integer, ForeignKey('users.id')),
+    Column('content_hash', String(64), nullable=False),
+    Column('is_keyframe', Boolean),
+    Column('payload', LargeBinary, nullable=False),
+    Column('created_at', DateTime),
+    Index('idx_content_revision', 'content_type', 'content_id', 'revision', unique=True),
+    Index('idx_content_revision_time', 'content_type', 'content_id', 'created_at')
+)
+Table(
+    'jobs', BASELINE_METADATA,
+    Column('id', String(36), primary_key=True),
+    Column('kind', String(50), nullable=False),
+    Column('payload', JSON),
+    Column('priority', Integer),
+    Column('status', String(20), nullable=False),
+    Column('attempts', Integer),
+    Column('max_attempts', Integer),
+    Column('idempotency_key', String(255), unique=True),
+    Column('run_at', DateTime),
+    Column('locked_by', String(100)),
+    Column('locked_until', DateTime),
+    Column('last_error', Text),
+    Column('created_at', DateTime),
+    Column('finished_at', DateTime),
+    Index('idx_job_claim', 'status', 'priority', 'run_at'),
+    Index('idx_job_finished', 'status', 'finished_at')
+)
+
+
+@migration(1, "baseline schema")
+def migrate_baseline(ctx: MigrationContext) -> None:
+    # New databases get the baseline tables; databases created before versioned migrations gain
+    # the baseline columns and indexes they are missing.
+    inspector = sa_inspect(ctx.engine)
+    tables = set(inspector.get_table_names())
+    for table in BASELINE_METADATA.sorted_tables:
+        if table.name not in tables:
+            ctx.create_table(table)
+            continue
+        columns = {column['name'] for column in inspector.get_columns(table.name)}
+        indexes = {index['name'] for index in inspector.get_indexes(table.name)}
+        for column in table.columns:
+            if column.name not in columns:
+                ctx.add_column(table.name, column)
+        for index in table.indexes:
+            if index.name not in indexes:
+                ctx.create_index(index.name, table.name, [column.name for column in index.columns], unique=index.unique)
+
+
+@migration(2, "indexes for comment, like and notification lookups; backfill media sizes")
+def migrate_lookup_indexes(ctx: MigrationContext) -> None:
+    ctx.create_index('idx_comment_content_created', 'comments', ['content_type', 'content_id', 'created_at'])
+    ctx.create_index('idx_like_user_content', 'likes', ['user_id', 'content_type', 'content_id'])
+    ctx.create_index('idx_notification_user_created', 'notifications', ['user_id', 'created_at'])
+    ctx.execute("DROP INDEX IF EXISTS idx_comment_content")
+    ctx.execute("DROP INDEX IF EXISTS idx_notification_user")
+    ctx.backfill('media', "size = length(content) * 3 / 4", "size IS NULL")
+
+
+# Tables holding content IDs: (table, content type column or None for a single type, ID column).
+CONTENT_ID_REFERENCES = [
+    ('media', 'content_type', 'content_id'),
+    ('comments', 'content_type', 'content_id'),
+    ('likes', 'content_type', 'content_id'),
+    ('notifications', 'content_type', 'content_id'),
+    ('analytics_events', 'content_type', 'content_id'),
+    ('drafts', 'content_type', 'content_id'),
+    ('content_revisions', 'content_type', 'content_id'),
+]
+
+# UUID columns converted from text to 16-byte keys, per table.
+COMPACT_ID_COLUMNS = {
+    'tags': ['id'],
+    'blogs': ['id'],
+    'case_studies': ['id'],
+    'media': ['id', 'content_id'],
+    'comments': ['id', 'content_id'],
+    'likes': ['id', 'content_id'],
+    'notifications': ['id', 'content_id'],
+    'analytics_events': ['id', 'content_id'],
+    'drafts': ['id', 'content_id'],
+    'draft_revisions': ['id', 'draft_id'],
+    'content_revisions': ['id', 'content_id'],
+    'jobs': ['id'],
+    'blog_tags': ['blog_id', 'tag_id'],
+    'case_study_tags': ['case_study_id', 'tag_id'],
+}
+
+
+def remap_external_content_ids(conn) -> None:
+    """
+    Give content whose ID is not a UUID (e.g. imported with the source system's ID) a
+    time-ordered key, record the old ID in external_ids and update every reference.
+    Args:
+        conn: Connection in the migration step's transaction.
+    """
+    for content_type, table, association, key in (('blog', 'blogs', 'blog_tags', 'blog_id'),
+                                                  ('case_study', 'case_studies', 'case_study_tags', 'case_study_id')):
+        rows = conn.exec_driver_sql(
+            f"SELECT id, created_at FROM {table} WHERE typeof(id) = 'text' AND uuid_blob(id) IS NULL").all()
+        for old_id, created_at in rows:
+            created_at = datetime.fromisoformat(created_at) if created_at else datetime.utcnow()
+            new_content_id = time_ordered_id(created_at, f"{content_type}:{old_id}")
+            conn.execute(sqlite_insert(ExternalId).values(
+                content_type=content_type, external_id=old_id, content_id=new_content_id,
+                created_at=datetime.utcnow()).on_conflict_do_nothing())
+            params = (uuid.UUID(new_content_id).bytes, old_id)
+            conn.exec_driver_sql(f"UPDATE {table} SET id = ? WHERE id = ?", params)
+            conn.exec_driver_sql(f"UPDATE {association} SET {key} = ? WHERE {key} = ?", params)
+            for reference, type_column, id_column in CONTENT_ID_REFERENCES:
+                conn.exec_driver_sql(f"UPDATE {reference} SET {id_column} = ? "
+                                     f"WHERE {type_column} = ? AND {id_column} = ?",
+                                     (params[0], content_type, old_id))
+        if rows:
+            logger.info(f"Remapped {len(rows)} {content_type} IDs to time-ordered keys")
+
+
+@migration(3, "compact time-ordered IDs")
+def migrate_compact_ids(ctx: MigrationContext) -> None:
+    # SQLite stores blobs in the existing text-affinity columns, so no table is rebuilt; UUID
+    # text is rewritten in place as the same 16 bytes, which keeps existing IDs and links valid.
+    ctx.create_table(ExternalId.__table__)
+    tables = set(sa_inspect(ctx.engine).get_table_names())
+    legacy = sum(ctx._count(table, "typeof(id) = 'text' AND uuid_blob(id) IS NULL")
+                 for table in ('blogs', 'case_studies') if table in tables)
+    ctx.run("remap non-UUID content IDs through external_ids", remap_external_content_ids, rows=legacy)
+    for table, columns in COMPACT_ID_COLUMNS.items():
+        for column in columns:
+            ctx.backfill(table, f"{column} = uuid_blob({column})",
+                         f"typeof({column}) = 'text' AND uuid_blob({column}) IS NOT NULL")
+
+
+# Columns stored with CompressedText or CompressedJSON, per table.
+COMPRESSED_COLUMNS = {
+    'blogs': ['content'],
+    'case_studies': ['problem', 'solution', 'results'],
+    'drafts': ['data'],
+    'analytics_events': ['event_metadata'],
+}
+
+
+def create_content_search(conn) -> None:
+    """
+    Create the full-text indexes and their triggers, then index the existing content.
+    Args:
+        conn: Connection in the migration step's transaction.
+    """
+    for table in CONTENT_SEARCH_COLUMNS:
+        for statement in content_search_ddl(table):
+            conn.exec_driver_sql(statement)
+    rebuild_content_search(conn)
+
+
+@migration(4, "compress large text and JSON columns; full-text search index")
+def migrate_compressed_columns(ctx: MigrationContext) -> None:
+    # Rows are compressed before the search triggers exist, so the backfill does not reindex
+    # them; the index is then built once from the plaintext.
+    for table, columns in COMPRESSED_COLUMNS.items():
+        for column in columns:
+            ctx.backfill(table, f"{column} = compress_text({column})",
+                         f"typeof({column}) = 'text' AND length(CAST({column} AS BLOB)) >= {COMPRESSION_THRESHOLD}")
+    tables = set(sa_inspect(ctx.engine).get_table_names())
+    ctx.run("create full-text indexes on blogs and case studies", create_content_search,
+            rows=sum(ctx._count(table) for table in CONTENT_SEARCH_COLUMNS if table in tables))
+
+
+@migration(5, "stored render artifacts for content, comments and notifications")
+def migrate_render_artifacts(ctx: MigrationContext) -> None:
+    # Existing rows are rendered by the rerender job, which the app queues at startup; until
+    # then readers render them on the fly.
+    for table, columns in (('blogs', ['content_html', 'excerpt', 'render_version']),
+                           ('case_studies', ['content_html', 'excerpt', 'render_version']),
+                           ('comments', ['comment_html', 'render_version']),
+                           ('notifications', ['message_html', 'render_version'])):
+        for column in columns:
+            ctx.add_column(table, Base.metadata.tables[table].c[column])
+
+
+def create_trending_scores(conn) -> None:
+    """
+    Score existing content from its likes, comments and views.
+    Args:
+        conn: Connection in the migration step's transaction.
+    """
+    rebuild_trending_scores(conn)
+
+
+@migration(6, "time-decayed trending scores")
+def migrate_trending_scores(ctx: MigrationContext) -> None:
+    ctx.create_table(TrendingScore.__table__)
+    ctx.create_table(TrendingEpoch.__table__)
+    tables = set(sa_inspect(ctx.engine).get_table_names())
+    ctx.run("score content from likes, comments and views", create_trending_scores,
+            rows=sum(ctx._count(table) for table in ('likes', 'comments') if table in tables))
+
+
+def create_follow_graph(conn) -> None:
+    """
+    Copy the following lists kept in user profiles into the follows table, then build every
+    home timeline.
+    Args:
+        conn: Connection in the migration step's transaction.
+    """
+    users = dict(conn.execute(select(User.username, User.id)).all())
+    now = datetime.utcnow()
+    rows = [{'follower_id': user_id, 'followed_id': users[name], 'created_at': now}
+            for user_id, profile in conn.execute(select(User.id, User.profile))
+            for name in (profile or {}).get('following', [])
+            if name in users and users[name] != user_id]
+    if rows:
+        conn.execute(sqlite_insert(Follow).on_conflict_do_nothing(), rows)
+    rebuild_home_timelines(conn)
+
+
+@migration(7, "follow graph and home timelines")
+def migrate_home_timelines(ctx: MigrationContext) -> None:
+    ctx.add_column('users', User.__table__.c.follower_count)
+    ctx.create_table(Follow.__table__)
+    ctx.create_table(TimelineEntry.__table__)
+    ctx.create_index('idx_blog_author_created', 'blogs', ['user_id', 'created_at'])
+    ctx.create_index('idx_case_author_created', 'case_studies', ['user_id', 'created_at'])
+    ctx.run("copy follows from user profiles; build home timelines", create_follow_graph,
+            rows=ctx._count('users'))
+
+
+@migration(8, "precomputed related content")
+def migrate_related_content(ctx: MigrationContext) -> None:
+    # The related posts are computed by migration 10, once the index state can be stored.
+    ctx.create_table(RelatedContent.__table__)
+
+
+@migration(9, "full-text index maintained without SQL functions")
+def migrate_content_search_queue(ctx: MigrationContext) -> None:
+    # Replaces the external-content indexes, whose source view and triggers called the
+    # app-registered decompress_text(), so other SQLite clients could not write content rows.
+    tables = set(sa_inspect(ctx.engine).get_table_names())
+    legacy = [table for table in CONTENT_SEARCH_COLUMNS if table in tables and f"{table}_search_queue" not in tables]
+    for table in legacy:
+        for trigger in ('insert', 'delete', 'update'):
+            ctx.execute(f"DROP TRIGGER IF EXISTS {table}_search_{trigger}")
+        ctx.execute(f"DROP TABLE IF EXISTS {table}_search")
+        ctx.execute(f"DROP VIEW IF EXISTS {table}_search_source")
+    if legacy:
+        ctx.run("rebuild full-text indexes from decompressed content", create_content_search,
+                rows=sum(ctx._count(table) for table in legacy))
+
+
+@migration(10, "related content index state shared by all processes")
+def migrate_related_index_state(ctx: MigrationContext) -> None:
+    ctx.create_table(RelatedIndexState.__table__)
+    ctx.create_table(RelatedIndexVersion.__table__)
+    tables = set(sa_inspect(ctx.engine).get_table_names())
+    ctx.run("compute related posts of published content", rebuild_related_content,
+            rows=sum(ctx._count(table) for table in ('blogs', 'case_studies') if table in tables))
+
+
+SCHEMA_VERSION = max(MIGRATIONS)
+
+
+def get_applied_migrations(engine) -> Dict[int, Dict[str, Any]]:
+    """
+    Read the migrations recorded as applied.
+    Args:
+        engine: SQLAlchemy engine instance.
+    Returns:
+        Dict[int, Dict[str, Any]]: Applied migrations keyed by version.
+    """
+    if 'schema_migrations' not in sa_inspect(engine).get_table_names():
+        return {}
+    with engine.connect() as conn:
+        return {row.version: dict(row._mapping) for row in conn.execute(select(schema_migrations))}
+
+
+def run_migrations(engine, dry_run: bool = False, target: Optional[int] = None,
+                   batch_size: int = MIGRATION_BATCH_SIZE) -> List[Dict[str, Any]]:
+    """
+    Apply pending migrations in version order, or estimate them.
+    Args:
+        engine: SQLAlchemy engine instance.
+        dry_run: Only report the steps, affected rows and estimated duration.
+        target: Highest version to apply (default: latest).
+        batch_size: Rows per backfill transaction.
+    Returns:
+        List[Dict[str, Any]]: Per pending migration its version, name, steps and estimated or actual seconds.
+    """
+    target = SCHEMA_VERSION if target is None else target
+    applied = get_applied_migrations(engine)
+    if not dry_run:
+        schema_migrations.create(engine, checkfirst=True)
+    report = []
+    for version in sorted(MIGRATIONS):
+        if version in applied or version > target:
+            continue
+        spec = MIGRATIONS[version]
+        ctx = MigrationContext(engine, dry_run=dry_run, batch_size=batch_size)
+        started = time.perf_counter()
+        spec['func'](ctx)
+        entry = {'version': version, 'name': spec['name'], 'steps': ctx.steps,
+                 'estimated_seconds': round(sum(step['estimated_seconds'] for step in ctx.steps), 2)}
+        if not dry_run:
+            ctx.apply()
+            duration = time.perf_counter() - started
+            with engine.begin() as conn:
+                conn.execute(sqlite_insert(schema_migrations).values(
+                    version=version, name=spec['name'], applied_at=datetime.utcnow(), duration_ms=int(duration * 1000)
+                ).on_conflict_do_nothing())
+            entry['duration_seconds'] = round(duration, 2)
+            logger.info(f"Applied migration {version} ({spec['name']}) in {duration:.2f}s")
+        report.append(entry)
+    if not dry_run and set(MIGRATIONS) <= set(get_applied_migrations(engine)):
+        with engine.begin() as conn:
+            conn.exec_driver_sql(f"PRAGMA user_version = {SCHEMA_VERSION}")
+    return report
+
+
+def get_pending_migrations(engine) -> List[int]:
+    """
+    List the migrations not yet applied.
+    The applied version is also stamped in SQLite's user_version, so an up-to-date database costs
+    a single PRAGMA.
+    Args:
+        engine: SQLAlchemy engine instance.
+    Returns:
+        List[int]: Pending versions in ascending order.
+    """
+    with engine.connect() as conn:
+        if conn.exec_driver_sql("PRAGMA user_version").scalar() >= SCHEMA_VERSION:
+            return []
+    return sorted(set(MIGRATIONS) - set(get_applied_migrations(engine)))
+
+
+def bootstrap_schema(engine, auto_apply: str = MIGRATIONS_AUTO_APPLY) -> bool:
+    """
+    Bring the database to SCHEMA_VERSION if allowed, otherwise report pending migrations.
+    Migrating a new, empty database only creates tables, so it is cheap; migrating an existing
+    one may backfill and index every row, so it is left to `python manage.py migrate`.
+    Args:
+        engine: SQLAlchemy engine instance.
+        auto_apply: "1" to apply pending migrations, "new" to only set up an empty database, "0" to apply none.
+    Returns:
+        bool: True if migrations were applied, False otherwise.
+    """
+    pending = get_pending_migrations(engine)
+    if not pending:
+        return False
+    if auto_apply == "1" or (auto_apply == "new" and not sa_inspect(engine).get_table_names()):
+        run_migrations(engine)
+        return True
+    logger.warning(f"Schema migrations {pending} are pending; run `python manage.py migrate`")
+    return False
+
+
+@st.cache_resource
+def get_engine():
+    """
+    Return the process-wide engine, bootstrapping the schema on first use.
+    Cached so script reruns reuse one engine and connection pool.
+    Returns:
+        Engine: SQLAlchemy engine instance.
+    """
+    engine = get_db_engine()
+    bootstrap_schema(engine)
+    return engine
+
+
+engine = get_engine()
+Session = get_db_session(engine)
+
+# Data Manager
+
+
+class DataManager:
+    """
+    Manages database operations for the blog platform.
+    """
+
+    def __init__(self, session_factory):
+        self.session_factory = session_factory
+
+    def save_user(self, username: str, password: str, email: str, is_admin: bool = False) -> bool:
+        """
+        Save a new user with hashed password.
+        Args:
+            username: User's unique username.
+            password: User's password.
+            email: User's email address.
+            is_admin: Whether the user is an admin.
+        Returns:
+            bool: True if saved successfully, False otherwise.
+        """
+        try:
+            with self.session_factory() as session:
+                hashed_password = stauth.Hasher([password]).generate()[0]
+                user = User(
+                    username=bleach.clean(username),
+                    password=hashed_password,
+                    email=bleach.clean(email),
+                    is_admin=is_admin
+                )
+                session.add(user)
+                session.commit()
+                logger.info(f"User {username} registered successfully")
+                return True
+        except IntegrityError:
+            logger.error(f"User {username} or email {email} already exists")
+            return False
+        except SQLAlchemyError as e:
+            logger.error(f"Database error saving user: {str(e)}")
+            return False
+
+    def update_user_profile(self, username: str, profile: Dict[str, Any]) -> bool:
+        """
+        Update user profile information.
+        Args:
+            username: User's username.
+            profile: Dictionary of profile data.
+        Returns:
+            bool: True if updated successfully, False otherwise.
+        """
+        try:
+            with self.session_factory() as session:
+                user = session.query(User).filter_by(username=username).first()
+                if not user:
+                    logger.error(f"User {username} not found")
+                    return False
+                user.profile = {**user.profile, **profile}
+                session.commit()
+                logger.info(f"Profile updated for user {username}")
+                return True
+        except SQLAlchemyError as e:
+            logger.error(f"Error updating profile for {username}: {str(e)}")
+            return False
+
+    def update_password(self, username: str, new_password: str) -> bool:
+        """
+        Update user password.
+        Args:
+            username: User's username.
+            new_password: New password.
+        Returns:
+            bool: True if updated successfully, False otherwise.
+        """
+        try:
+            with self.session_factory() as session:
+                user = session.query(User).filter_by(username=username).first()
+                if not user:
+                    logger.error(f"User {username} not found")
+                    return False
+                user.password = stauth.Hasher([new_password]).generate()[0]
+                session.commit()
+                logger.info(f"Password updated for user {username}")
+                return True
+        except SQLAlchemyError as e:
+            logger.error(f"Error updating password for {username}: {str(e)}")
+            return False
+
+    def save_tag(self, name: str) -> str:
+        """
+        Save a new tag.
+        Args:
+            name: Tag name.
+        Returns:
+            str: Tag ID.
+        """
+        tag_id = new_id()
+        try:
+            with self.session_factory() as session:
+                tag = Tag(id=tag_id, name=bleach.clean(name))
+                session.add(tag)
+                session.commit()
+                logger.info(f"Tag {name} saved with ID {tag_id}")
+                return tag_id
+        except IntegrityError:
+            with self.session_factory() as session:
+                tag = session.query(Tag).filter_by(name=bleach.clean(name)).first()
+                if tag:
+                    return tag.id
+                logger.error(f"Error saving tag {name}")
+                raise
+        except SQLAlchemyError as e:
+            logger.error(f"Error saving tag {name}: {str(e)}")
+            raise
+
+    def _get_or_create_tags(self, session, names: List[str]) -> List[Tag]:
+        """
+        Resolve tag names to Tag rows inside the caller's transaction, creating missing ones.
+        Using the caller's session avoids opening a second writer while it holds SQLite's lock.
+        Args:
+            session: Active database session.
+            names: Cleaned tag names.
+        Returns:
+            List[Tag]: Tags in the order of names, without duplicates.
+        """
+        names = list(dict.fromkeys(names))
+        if not names:
+            return []
+        session.execute(sqlite_insert(Tag).values([
+            {'id': new_id(), 'name': name, 'created_at': datetime.utcnow()} for name in names
+        ]).on_conflict_do_nothing(index_elements=['name']))
+        tags = {tag.name: tag for tag in session.query(Tag).filter(Tag.name.in_(names))}
+        return [tags[name] for name in names]
+
+    def get_media_usage(self, username: str) -> int:
+        """
+        Compute the total decoded size of a user's stored media.
+        Args:
+            username: User's username.
+        Returns:
+            int: Bytes used.
+        """
+        with self.session_factory() as session:
+            return self._media_usage(session, username)
+
+    def _media_usage(self, session, username: str) -> int:
+        return int(session.query(
+            func.coalesce(func.sum(func.coalesce(Media.size, func.length(Media.content) * 3 / 4)), 0)
+        ).filter_by(username=username).scalar())
+
+    def save_media(self, username: str, file, content_type: Optional[str] = None, content_id: Optional[str] = None, progress_callback=None) -> str:
+        """
+        Save media file with base64 encoding.
+        The upload is read in fixed-size chunks that are validated, hashed and spooled, then
+        streamed into the row with SQLite incremental blob I/O so memory use stays constant.
+        Args:
+            username: Uploader's username.
+            file: Uploaded file object.
+            content_type: Associated content type (blog/case_study).
+            content_id: Associated content ID.
+            progress_callback: Called with the number of bytes read after each chunk.
+        Returns:
+            str: Media ID.
+        Raises:
+            ValueError: If the user is missing, the type is not recognised, or a size limit is exceeded.
+        """
+        filename = bleach.clean(file.name)
+        declared_size = getattr(file, 'size', None)
+        if declared_size is not None and declared_size > MEDIA_MAX_FILE_SIZE:
+            raise ValueError(f"{filename} exceeds the {MEDIA_MAX_FILE_SIZE // (1024 * 1024)} MB file size limit")
+        used = self.get_media_usage(username)
+        if hasattr(file, 'seek'):
+            file.seek(0)
+
+        file_type = None
+        size = 0
+        hasher = hashlib.sha256()
+        with tempfile.SpooledTemporaryFile(max_size=MEDIA_SPOOL_MAX_MEMORY) as staged:
+            for chunk in read_in_chunks(file, MEDIA_INGEST_CHUNK_SIZE):
+                if file_type is None:
+                    file_type = detect_media_type(chunk)
+                    if file_type is None:
+                        raise ValueError(f"{filename} is not a supported image or video file")
+                size += len(chunk)
+                if size > MEDIA_MAX_FILE_SIZE:
+                    raise ValueError(f"{filename} exceeds the {MEDIA_MAX_FILE_SIZE // (1024 * 1024)} MB file size limit")
+                if used + size > MEDIA_USER_QUOTA:
+                    raise ValueError(f"Uploading {filename} would exceed your media storage quota")
+                hasher.update(chunk)
+                staged.write(chunk)
+                if progress_callback:
+                    progress_callback(len(chunk))
+            if size == 0:
+                raise ValueError(f"{filename} is empty")
+
+            file_id = new_id()
+            try:
+                with _media_write_lock, self.session_factory() as session:
+                    user = session.query(User).filter_by(username=username).first()
+                    if not user:
+                        raise ValueError("User not found")
+                    media = Media(
+                        id=file_id,
+                        user_id=user.id,
+                        username=username,
+                        content_type=content_type,
+                        content_id=content_id,
+                        type=file_type,
+                        content=func.zeroblob((size + 2) // 3 * 4),
+                        filename=filename,
+                        size=size,
+                        checksum=hasher.hexdigest()
+                    )
+                    session.add(media)
+                    session.flush()
+                    # The early checks read usage before other uploads committed; recount it with
+                    # this row included while holding the write lock, so concurrent uploads cannot
+                    # together exceed the quota.
+                    if self._media_usage(session, username) > MEDIA_USER_QUOTA:
+                        raise ValueError(f"Uploading {filename} would exceed your media storage quota")
+                    rowid = session.scalar(select(literal_column('rowid')).where(Media.id == file_id))
+                    staged.seek(0)
+                    with session.connection().connection.driver_connection.blobopen('media', 'content', rowid) as blob:
+                        for chunk in read_in_chunks(staged, MEDIA_INGEST_CHUNK_SIZE):
+                            blob.write(base64.b64encode(chunk))
+                    session.commit()
+                    logger.info(f"Media {file_id} saved by {username} ({size} bytes)")
+                    return file_id
+            except SQLAlchemyError as e:
+                logger.error(f"Error saving media: {str(e)}")
+                raise
+
+    def save_media_batch(self, username: str, files: List[Any], content_type: Optional[str] = None, content_id: Optional[str] = None, progress_callback=None) -> List[str]:
+        """
+        Save several uploaded files concurrently on a bounded worker pool.
+        If any file is rejected, the files already saved by this batch are removed.
+        Args:
+            username: Uploader's username.
+            files: Uploaded file objects.
+            content_type: Associated content type (blog/case_study).
+            content_id: Associated content ID.
+            progress_callback: Called from the calling thread with (bytes_done, bytes_total).
+        Returns:
+            List[str]: Media IDs in upload order.
+        Raises:
+            ValueError: If any file fails to save, fails validation or the batch exceeds the user's quota.
+        """
+        files = list(files or [])
+        if not files:
+            return []
+        total = sum(getattr(file, 'size', 0) or 0 for file in files)
+        if self.get_media_usage(username) + total > MEDIA_USER_QUOTA:
+            raise ValueError("These uploads would exceed your media storage quota")
+
+        done = [0]
+        progress_lock = threading.Lock()
+
+        def add_progress(n: int) -> None:
+            with progress_lock:
+                done[0] += n
+
+        results, errors, futures = {}, [], {}
+        try:
+            with ThreadPoolExecutor(max_workers=min(MEDIA_INGEST_WORKERS, len(files)),
+                                    thread_name_prefix="media-ingest") as pool:
+                futures = {
+                    pool.submit(self.save_media, username, file, content_type, content_id, add_progress): idx
+                    for idx, file in enumerate(files)
+                }
+                pending = set(futures)
+                while pending:
+                    finished, pending = wait(pending, timeout=0.2)
+                    if progress_callback:
+                        with progress_lock:
+                            progress_callback(done[0], max(total, done[0]))
+                    for future in finished:
+                        idx = futures[future]
+                        try:
+                            results[idx] = future.result()
+                        except Exception as e:
+                            # Includes OSError from reading the upload or spooling it to disk.
+                            errors.append(f"{files[idx].name}: {str(e)}")
+            if errors:
+                raise ValueError("; ".join(errors))
+        except BaseException:
+            # The pool has finished every upload by now; remove whichever ones were saved.
+            self.delete_media([future.result() for future in futures
+                               if future.done() and not future.cancelled() and future.exception() is None])
+            raise
+        return [results[idx] for idx in range(len(files))]
+
+    def delete_media(self, media_ids: List[str]) -> int:
+        """
+        Delete media files by ID.
+        Args:
+            media_ids: Media IDs.
+        Returns:
+            int: Number of media rows deleted.
+        """
+        if not media_ids:
+            return 0
+        try:
+            with self.session_factory() as session:
+                deleted = session.query(Media).filter(Media.id.in_(media_ids)).delete(synchronize_session=False)
+                session.commit()
+                logger.info(f"Deleted {deleted} media files")
+                return deleted
+        except SQLAlchemyError as e:
+            logger.error(f"Error deleting media: {str(e)}")
+            return 0
+
+    def get_media_info(self, media_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Retrieve media metadata without loading the stored blob.
+        Args:
+            media_id: Media ID.
+        Returns:
+            Optional[Dict[str, Any]]: Media id, type, filename, uploaded_at, decoded size and ETag, or None.
+        """
+        try:
+            with self.session_factory() as session:
+                row = session.query(
+                    Media.id,
+                    Media.type,
+                    Media.filename,
+                    Media.uploaded_at,
+                    Media.size,
+                    func.length(Media.content),
+                    func.substr(Media.content, -2)
+                ).filter_by(id=media_id).first()
+                if not row:
+                    return None
+                size = row.size
+                if size is None:
+                    encoded_length, tail = row[5] or 0, row[6] or ''
+                    if isinstance(tail, bytes):
+                        tail = tail.decode('ascii', 'ignore')
+                    size = encoded_length // 4 * 3 - tail.count('=')
+                uploaded_at = row.uploaded_at or datetime(1970, 1, 1)
+                return {
+                    'id': row.id,
+                    'type': row.type,
+                    'filename': row.filename,
+                    'uploaded_at': uploaded_at,
+                    'size': size,
+                    'etag': f'"{row.id}-{int(uploaded_at.timestamp())}-{size}"'
+                }
+        except SQLAlchemyError as e:
+            logger.error(f"Error retrieving media info {media_id}: {str(e)}")
+            return None
+
+    def is_media_public(self, media_id: str) -> bool:
+        """
+        Check whether media may be served to anyone: it is the current profile picture of an
+        active user, or is attached to published, live content of its active uploader.
+        Args:
+            media_id: Media ID.
+        Returns:
+            bool: True if the media is public, False otherwise.
+        """
+        try:
+            with self.session_factory() as session:
+                owner = session.query(User.id, User.is_active, User.profile).join(Media, Media.user_id == User.id) \
+                    .filter(Media.id == media_id).first()
+                if not owner or not owner.is_active:
+                    return False
+                if (owner.profile or {}).get('profile_picture') == media_id:
+                    return True
+                for model in (Blog, CaseStudy):
+                    attached = func.json_each(model.media).table_valued('value')
+                    # Walks the uploader's posts through idx_*_author_created.
+                    if session.query(select(model.id).where(
+                            model.user_id == owner.id, model.is_published == True, model.deleted_at.is_(None),
+                            select(attached.c.value).where(attached.c.value == media_id).exists()).exists()).scalar():
+                        return True
+                return False
+        except SQLAlchemyError as e:
+            logger.error(f"Error checking access to media {media_id}: {str(e)}")
+            return False
+
+    def read_media_range(self, media_id: str, start: int, end: int) -> bytes:
+        """
+        Read a byte range of a media file, decoding only the base64 blocks that cover it.
+        Args:
+            media_id: Media ID.
+            start: First byte offset.
+            end: Last byte offset (inclusive).
+        Returns:
+            bytes: Decoded bytes for the range.
+        """
+        if end < start:
+            return b''
+        first_block, last_block = start // 3, end // 3
+        with self.session_factory() as session:
+            encoded = session.query(
+                func.substr(Media.content, first_block * 4 + 1, (last_block - first_block + 1) * 4)
+            ).filter_by(id=media_id).scalar()
+        if encoded is None:
+            raise ValueError("Media not found")
+        data = base64.b64decode(encoded)
+        offset = start - first_block * 3
+        return data[offset:offset + end - start + 1]
+
+    def iter_media_bytes(self, media_id: str, start: int, end: int, chunk_size: int = MEDIA_STREAM_CHUNK_SIZE):
+        """
+        Stream a byte range of a media file in bounded chunks.
+        Args:
+            media_id: Media ID.
+            start: First byte offset.
+            end: Last byte offset (inclusive).
+            chunk_size: Maximum bytes per chunk.
+        Yields:
+            bytes: Consecutive chunks of the range.
+        """
+        position = start
+        while position <= end:
+            chunk_end = min(position + chunk_size - 1, end)
+            yield self.read_media_range(media_id, position, chunk_end)
+            position = chunk_end + 1
+
+    def get_referenced_media_ids(self) -> set:
+        """
+        Collect every media ID referenced by content, drafts or profile pictures.
+        Returns:
+            set: Referenced media IDs.
+        """
+        referenced = set()
+        with self.session_factory() as session:
+            for (media_ids,) in session.query(Blog.media).yield_per(1000):
+                referenced.update(media_ids or [])
+            for (media_ids,) in session.query(CaseStudy.media).yield_per(1000):
+                referenced.update(media_ids or [])
+            for (data,) in session.query(Draft.data).yield_per(1000):
+                referenced.update((data or {}).get('media') or [])
+            for is_snapshot, payload in session.query(DraftRevision.is_snapshot, DraftRevision.payload).yield_per(1000):
+                revision = decompress_json(payload)
+                referenced.update((revision if is_snapshot else revision.get('set', {})).get('media') or [])
+            for (profile,) in session.query(User.profile).yield_per(1000):
+                if (profile or {}).get('profile_picture'):
+                    referenced.add(profile['profile_picture'])
+        return referenced
+
+    def collect_orphaned_media(self, grace_period: timedelta = MEDIA_GC_GRACE_PERIOD, batch_size: int = MEDIA_GC_BATCH_SIZE, dry_run: bool = False) -> Dict[str, Any]:
+        """
+        Delete media that nothing references (mark and sweep).
+        Only media older than the grace period is swept, so uploads whose content is still
+        being saved are left alone. Deletes run in batches, each in its own short transaction.
+        Args:
+            grace_period: Minimum age of media eligible for deletion.
+            batch_size: Number of media rows deleted per transaction.
+            dry_run: Report what would be deleted without deleting it.
+        Returns:
+            Dict[str, Any]: Scanned, orphaned and deleted counts and stored bytes reclaimed.
+        """
+        started = time.monotonic()
+        cutoff = datetime.utcnow() - grace_period
+        report = {'scanned': 0, 'orphaned': 0, 'deleted': 0, 'bytes_reclaimed': 0, 'dry_run': dry_run}
+        try:
+            referenced = self.get_referenced_media_ids()
+            orphans = []
+            with self.session_factory() as session:
+                candidates = session.query(Media.id, func.length(Media.content)).filter(
+                    Media.uploaded_at < cutoff
+                ).yield_per(1000)
+                for media_id, stored_size in candidates:
+                    report['scanned'] += 1
+                    if media_id not in referenced:
+                        orphans.append((media_id, stored_size or 0))
+            report['orphaned'] = len(orphans)
+            for start in range(0, len(orphans), batch_size):
+                batch = orphans[start:start + batch_size]
+                if dry_run:
+                    report['bytes_reclaimed'] += sum(size for _, size in batch)
+                    continue
+                with self.session_factory() as session:
+                    # Sizes of the rows actually removed, so rows already gone since the scan are not counted.
+                    sizes = session.execute(
+                        Media.__table__.delete().where(
+                            Media.id.in_([media_id for media_id, _ in batch]),
+                            Media.uploaded_at < cutoff
+                        ).returning(func.length(Media.content))
+                    ).scalars().all()
+                    session.commit()
+                report['deleted'] += len(sizes)
+                report['bytes_reclaimed'] += sum(size or 0 for size in sizes)
+        except SQLAlchemyError as e:
+            logger.error(f"Error collecting orphaned media: {str(e)}")
+            report['error'] = str(e)
+        report['duration_seconds'] = round(time.monotonic() - started, 3)
+        logger.info(f"Media garbage collection: {report}")
+        return report
+
+    def save_blog(self, username: str, title: str, content: str, tags: str = "", media: Optional[List[str]] = None, font: str = 'Inter', is_published: bool = True, is_draft: bool = False) -> str:
+        """
+        Save a new blog post.
+        Args:
+            username: Author's username.
+            title: Blog title.
+            content: Blog content.
+            tags: Comma-separated tags.
+            media: List of media IDs.
+            font: Font style.
+            is_published: Publish status.
+            is_draft: Draft status.
+        Returns:
+            str: Blog ID.
+        """
+        title = bleach.clean(title)
+        content = bleach.clean(content)
+        tag_list = [bleach.clean(tag.strip()) for tag in tags.split(',') if tag.strip()]
+        blog_id = new_id()
+        public_link = f"{APP_URL}/content/blog/{urllib.parse.quote(username)}/{blog_id}"
+        try:
+            with self.session_factory() as session:
+                user = session.query(User).filter_by(username=username).first()
+                if not user:
+                    raise ValueError("User not found")
+                blog = Blog(
+                    id=blog_id,
+                    user_id=user.id,
+                    username=username,
+                    title=title,
+                    content=content,
+                    tags=tag_list,
+                    media=media or [],
+                    font=font,
+                    public_link=public_link,
+                    is_published=is_published,
+                    is_draft=is_draft,
+                    **render_content('blog', {'content': content})
+                )
+                session.add(blog)
+                blog.tag_objects.extend(self._get_or_create_tags(session, tag_list))
+                self._record_revision(session, 'blog', blog, None)
+                session.commit()
+                if media:
+                    for media_id in media:
+                        media_record = session.query(Media).filter_by(id=media_id).first()
+                        if media_record:
+                            media_record.content_type = 'blog'
+                            media_record.content_id = blog_id
+                    session.commit()
+                logger.info(f"Blog {blog_id} saved by {username}")
+                self.enqueue_job('notify_followers', {
+                    'username': username, 'content_type': 'blog', 'content_id': blog_id, 'message': f"New blog: {title}"
+                }, idempotency_key=f"notify_followers:blog:{blog_id}")
+                if is_published:
+                    self.fan_out_timeline('blog', blog_id)
+                    self.schedule_related_refresh()
+                return blog_id
+        except SQLAlchemyError as e:
+            logger.error(f"Error saving blog: {str(e)}")
+            raise
+
+    def update_blog(self, blog_id: str, title: str, content: str, tags: str, media: List[str], font: str, is_published: bool, is_draft: bool) -> bool:
+        """
+        Update an existing blog post.
+        Args:
+            blog_id: Blog ID.
+            title: Updated title.
+            content: Updated content.
+            tags: Updated tags.
+            media: Updated media IDs.
+            font: Updated font.
+            is_published: Updated publish status.
+            is_draft: Updated draft status.
+        Returns:
+            bool: True if updated successfully, False otherwise.
+        """
+        try:
+            with self.session_factory() as session:
+                blog = session.query(Blog).filter_by(id=blog_id, deleted_at=None).first()
+                if not blog:
+                    logger.error(f"Blog {blog_id} not found")
+                    return False
+                previous = content_revision_data('blog', blog)
+                previous_at = blog.updated_at or blog.created_at
+                blog.title = bleach.clean(title)
+                blog.content = bleach.clean(content)
+                for key, value in render_content('blog', {'content': blog.content}).items():
+                    setattr(blog, key, value)
+                tag_list = [bleach.clean(tag.strip()) for tag in tags.split(',') if tag.strip()]
+                blog.tags = tag_list
+                blog.media = media
+                blog.font = font
+                blog.is_published = is_published
+                blog.is_draft = is_draft
+                blog.updated_at = datetime.utcnow()
+                blog.tag_objects.clear()
+                blog.tag_objects.extend(self._get_or_create_tags(session, tag_list))
+                if media:
+                    for media_id in media:
+                        media_record = session.query(Media).filter_by(id=media_id).first()
+                        if media_record:
+                            media_record.content_type = 'blog'
+                            media_record.content_id = blog_id
+                self._record_revision(session, 'blog', blog, previous, previous_at)
+                session.commit()
+                logger.info(f"Blog {blog_id} updated")
+                if is_published:
+                    self.fan_out_timeline('blog', blog_id)
+                self.schedule_related_refresh()
+                return True
+        except SQLAlchemyError as e:
+            logger.error(f"Error updating blog {blog_id}: {str(e)}")
+            return False
+
+    def save_case_study(self, username: str, title: str, problem: str, solution: str, results: str, tags: str = "", media: Optional[List[str]] = None, font: str = 'Inter', is_published: bool = True, is_draft: bool = False) -> str:
+        """
+        Save a new case study.
+        Args:
+            username: Author's username.
+            title: Case study title.
+            problem: Problem description.
+            solution: Solution description.
+            results: Results description.
+            tags: Comma-separated tags.
+            media: List of media IDs.
+            font: Font style.
+            is_published: Publish status.
+            is_draft: Draft status.
+        Returns:
+            str: Case study ID.
+        """
+        title = bleach.clean(title)
+        problem = bleach.clean(problem)
+        solution = bleach.clean(solution)
+        results = bleach.clean(results)
+        tag_list = [bleach.clean(tag.strip()) for tag in tags.split(',') if tag.strip()]
+        case_id = new_id()
+        public_link = f"{APP_URL}/content/case_study/{urllib.parse.quote(username)}/{case_id}"
+        try:
+            with self.session_factory() as session:
+                user = session.query(User).filter_by(username=username).first()
+                if not user:
+                    raise ValueError("User not found")
+                case_study = CaseStudy(
+                    id=case_id,
+                    user_id=user.id,
+                    username=username,
+                    title=title,
+                    problem=problem,
+                    solution=solution,
+                    results=results,
+                    tags=tag_list,
+                    media=media or [],
+                    font=font,
+                    public_link=public_link,
+                    is_published=is_published,
+                    is_draft=is_draft,
+                    **render_content('case_study', {'problem': problem, 'solution': solution, 'results': results})
+                )
+                session.add(case_study)
+                case_study.tag_objects.extend(self._get_or_create_tags(session, tag_list))
+                self._record_revision(session, 'case_study', case_study, None)
+                session.commit()
+                if media:
+                    for media_id in media:
+                        media_record = session.query(Media).filter_by(id=media_id).first()
+                        if media_record:
+                            media_record.content_type = 'case_study'
+                            media_record.content_id = case_id
+                    session.commit()
+                logger.info(f"Case study {case_id} saved by {username}")
+                self.enqueue_job('notify_followers', {
+                    'username': username, 'content_type': 'case_study', 'content_id': case_id, 'message': f"New case study: {title}"
+                }, idempotency_key=f"notify_followers:case_study:{case_id}")
+                if is_published:
+                    self.fan_out_timeline('case_study', case_id)
+                    self.schedule_related_refresh()
+                return case_id
+        except SQLAlchemyError as e:
+            logger.error(f"Error saving case study: {str(e)}")
+            raise
+
+    def update_case_study(self, case_id: str, title: str, problem: str, solution: str, results: str, tags: str, media: List[str], font: str, is_published: bool, is_draft: bool) -> bool:
+        """
+        Update an existing case study.
+        Args:
+            case_id: Case study ID.
+            title: Updated title.
+            problem: Updated problem.
+            solution: Updated solution.
+            results: Updated results.
+            tags: Updated tags.
+            media: Updated media IDs.
+            font: Updated font.
+            is_published: Updated publish status.
+            is_draft: Updated draft status.
+        Returns:
+            bool: True if updated successfully, False otherwise.
+        """
+        try:
+            with self.session_factory() as session:
+                case_study = session.query(CaseStudy).filter_by(id=case_id, deleted_at=None).first()
+                if not case_study:
+                    logger.error(f"Case study {case_id} not found")
+                    return False
+                previous = content_revision_data('case_study', case_study)
+                previous_at = case_study.updated_at or case_study.created_at
+                case_study.title = bleach.clean(title)
+                case_study.problem = bleach.clean(problem)
+                case_study.solution = bleach.clean(solution)
+                case_study.results = bleach.clean(results)
+                for key, value in render_content('case_study', {field: getattr(case_study, field)
+                                                                for field in RENDER_FIELDS['case_study']}).items():
+                    setattr(case_study, key, value)
+                tag_list = [bleach.clean(tag.strip()) for tag in tags.split(',') if tag.strip()]
+                case_study.tags = tag_list
+                case_study.media = media
+                case_study.font = font
+                case_study.is_published = is_published
+                case_study.is_draft = is_draft
+                case_study.updated_at = datetime.utcnow()
+                case_study.tag_objects.clear()
+                case_study.tag_objects.extend(self._get_or_create_tags(session, tag_list))
+                if media:
+                    for media_id in media:
+                        media_record = session.query(Media).filter_by(id=media_id).first()
+                        if media_record:
+                            media_record.content_type = 'case_study'
+                            media_record.content_id = case_id
+                self._record_revision(session, 'case_study', case_study, previous, previous_at)
+                session.commit()
+                logger.info(f"Case study {case_id} updated")
+                if is_published:
+                    self.fan_out_timeline('case_study', case_id)
+                self.schedule_related_refresh()
+                return True
+        except SQLAlchemyError as e:
+            logger.error(f"Error updating case study {case_id}: {str(e)}")
+            return False
+
+    def _record_revision(self, session, content_type: str, content: Any, previous: Optional[Dict[str, Any]],
+                         previous_at: Optional[datetime] = None) -> None:
+        """
+        Append the current state of a blog or case study to its revision log.
+        Content that predates the log gets its previous state recorded as a baseline keyframe first.
+        Args:
+            session: Active database session.
+            content_type: Content type (blog/case_study).
+            content: Blog or CaseStudy object, already modified.
+            previous: Field values before the modification, or None for new content.
+            previous_at: When the previous state was last saved, used to date the baseline keyframe.
+        """
+        data = content_revision_data(content_type, content)
+        data_hash = content_hash(data)
+        last = session.query(ContentRevision.revision, ContentRevision.content_hash).filter_by(
+            content_type=content_type, content_id=content.id
+        ).order_by(ContentRevision.revision.desc()).first()
+        if last and last.content_hash == data_hash:
+            return
+        revision, base = (last.revision if last else 0), previous
+        if previous is not None and (not last or last.content_hash != content_hash(previous)):
+            revision += 1
+            session.add(ContentRevision(
+                id=new_id(),
+                content_type=content_type,
+                content_id=content.id,
+                revision=revision,
+                user_id=content.user_id,
+                content_hash=content_hash(previous),
+                is_keyframe=True,
+                payload=compress_json(previous),
+                created_at=previous_at or content.created_at
+            ))
+            last_keyframe = revision
+        else:
+            last_keyframe = session.query(func.max(ContentRevision.revision)).filter_by(
+                content_type=content_type, content_id=content.id, is_keyframe=True
+            ).scalar()
+        revision += 1
+        is_keyframe = base is None or last_keyframe is None or revision - last_keyframe >= REVISION_KEYFRAME_INTERVAL
+        session.add(ContentRevision(
+            id=new_id(),
+            content_type=content_type,
+            content_id=content.id,
+            revision=revision,
+            user_id=content.user_id,
+            content_hash=data_hash,
+            is_keyframe=is_keyframe,
+            payload=compress_json(data if is_keyframe else make_delta(base, data))
+        ))
+
+    def get_content_history(self, content_type: str, content_id: str) -> List[Dict[str, Any]]:
+        """
+        List the revisions of a blog or case study.
+        Args:
+            content_type: Content type (blog/case_study).
+            content_id: Content ID.
+        Returns:
+            List[Dict[str, Any]]: Revision numbers and timestamps, newest first.
+        """
+        try:
+            with self.session_factory() as session:
+                revisions = session.query(ContentRevision.revision, ContentRevision.created_at).filter_by(
+                    content_type=content_type, content_id=content_id
+                ).order_by(ContentRevision.revision.desc()).all()
+                return [{'revision': r.revision, 'created_at': r.created_at} for r in revisions]
+        except SQLAlchemyError as e:
+            logger.error(f"Error retrieving history for {content_type}:{content_id}: {str(e)}")
+            return []
+
+    def get_content_revision(self, content_type: str, content_id: str, revision: Optional[int] = None, as_of: Optional[datetime] = None) -> Optional[Dict[str, Any]]:
+        """
+        Reconstruct a blog or case study as of a revision or a point in time.
+        Reconstruction replays at most REVISION_KEYFRAME_INTERVAL deltas from the nearest keyframe.
+        Args:
+            content_type: Content type (blog/case_study).
+            content_id: Content ID.
+            revision: Revision number; defaults to the latest.
+            as_of: Return the latest revision created at or before this time.
+        Returns:
+            Optional[Dict[str, Any]]: Field values at that revision, or None if there is none.
+        """
+        try:
+            with self.session_factory() as session:
+                target = session.query(func.max(ContentRevision.revision)).filter_by(
+                    content_type=content_type, content_id=content_id
+                )
+                if revision is not None:
+                    target = target.filter(ContentRevision.revision <= revision)
+                if as_of is not None:
+                    target = target.filter(ContentRevision.created_at <= as_of)
+                target = target.scalar()
+                if target is None:
+                    return None
+                keyframe = session.query(func.max(ContentRevision.revision)).filter(
+                    ContentRevision.content_type == content_type,
+                    ContentRevision.content_id == content_id,
+                    ContentRevision.is_keyframe == True,
+                    ContentRevision.revision <= target
+                ).scalar()
+                chain = session.query(ContentRevision.is_keyframe, ContentRevision.payload).filter(
+                    ContentRevision.content_type == content_type,
+                    ContentRevision.content_id == content_id,
+                    ContentRevision.revision >= keyframe,
+                    ContentRevision.revision <= target
+                ).order_by(ContentRevision.revision).all()
+                data = replay_revisions([(row.is_keyframe, row.payload) for row in chain])[-1]
+                return {**data, 'revision': target}
+        except SQLAlchemyError as e:
+            logger.error(f"Error reconstructing {content_type}:{content_id}: {str(e)}")
+            return None
+
+    def diff_content_revisions(self, content_type: str, content_id: str, from_revision: int, to_revision: int) -> str:
+        """
+        Produce a unified diff between two revisions of a blog or case study.
+        Args:
+            content_type: Content type (blog/case_study).
+            content_id: Content ID.
+            from_revision: Older revision number.
+            to_revision: Newer revision number.
+        Returns:
+            str: Unified diff, empty if the revisions are identical or missing.
+        """
+        old = self.get_content_revision(content_type, content_id, revision=from_revision)
+        new = self.get_content_revision(content_type, content_id, revision=to_revision)
+        if old is None or new is None:
+            return ''
+        lines = []
+        for field in [key for key in new if key != 'revision']:
+            old_value, new_value = old.get(field, ''), new.get(field, '')
+            if not isinstance(new_value, str):
+                old_value, new_value = json.dumps(old_value), json.dumps(new_value)
+            lines.extend(difflib.unified_diff(
+                old_value.splitlines(keepends=True),
+                new_value.splitlines(keepends=True),
+                fromfile=f"{field} (revision {from_revision})",
+                tofile=f"{field} (revision {to_revision})"
+            ))
+        return ''.join(line if line.endswith('\n') else line + '\n' for line in lines)
+
+    def save_comment(self, username: str, content_type: str, content_id: str, comment: str) -> str:
+        """
+        Save a new comment.
+        Args:
+            username: Commenter's username.
+            content_type: Content type (blog/case_study).
+            content_id: Content ID.
+            comment: Comment text.
+        Returns:
+            str: Comment ID.
+        """
+        comment = bleach.clean(comment)
+        comment_id = new_id()
+        created_at = datetime.utcnow()
+        try:
+            with self.session_factory() as session:
+                user = session.query(User).filter_by(username=username).first()
+                if not user:
+                    raise ValueError("User not found")
+                comment_obj = Comment(
+                    id=comment_id,
+                    user_id=user.id,
+                    username=username,
+                    content_type=content_type,
+                    content_id=content_id,
+                    comment=comment,
+                    comment_html=render_comment(username, comment, created_at),
+                    render_version=RENDER_VERSION,
+                    created_at=created_at
+                )
+                session.add(comment_obj)
+                self._add_trending_activity(session, [(content_type, content_id)], TRENDING_WEIGHTS['comment'])
+                session.commit()
+                logger.info(f"Comment {comment_id} saved by {username}")
+                self.enqueue_job('notify_content_owner', {
+                    'content_type': content_type, 'content_id': content_id, 'message': "New comment on {title}"
+                }, priority=JOB_PRIORITY_HIGH, idempotency_key=f"notify_comment:{comment_id}")
+                return comment_id
+        except SQLAlchemyError as e:
+            logger.error(f"Error saving comment: {str(e)}")
+            raise
+
+    def save_like(self, username: str, content_type: str, content_id: str) -> bool:
+        """
+        Save a like for content.
+        Args:
+            username: User's username.
+            content_type: Content type (blog/case_study).
+            content_id: Content ID.
+        Returns:
+            bool: True if saved successfully, False otherwise.
+        """
+        like_id = new_id()
+        try:
+            with self.session_factory() as session:
+                user = session.query(User).filter_by(username=username).first()
+                if not user:
+                    logger.error(f"User {username} not found")
+                    return False
+                existing_like = session.query(Like).filter_by(
+                    user_id=user.id, content_type=content_type, content_id=content_id
+                ).first()
+                if existing_like:
+                    logger.info(f"User {username} already liked {content_type}:{content_id}")
+                    return False
+                like = Like(
+                    id=like_id,
+                    user_id=user.id,
+                    content_type=content_type,
+                    content_id=content_id
+                )
+                session.add(like)
+                self._add_trending_activity(session, [(content_type, content_id)], TRENDING_WEIGHTS['like'])
+                session.commit()
+                logger.info(f"Like {like_id} saved by {username}")
+                self.enqueue_job('notify_content_owner', {
+                    'content_type': content_type, 'content_id': content_id, 'message': "New like on {title}"
+                }, priority=JOB_PRIORITY_HIGH, idempotency_key=f"notify_like:{like_id}")
+                return True
+        except SQLAlchemyError as e:
+            logger.error(f"Error saving like: {str(e)}")
+            return False
+
+    def remove_like(self, username: str, content_type: str, content_id: str) -> bool:
+        """
+        Remove a like from content.
+        Args:
+            username: User's username.
+            content_type: Content type (blog/case_study).
+            content_id: Content ID.
+        Returns:
+            bool: True if removed successfully, False otherwise.
+        """
+        try:
+            with self.session_factory() as session:
+                user = session.query(User).filter_by(username=username).first()
+                if not user:
+                    logger.error(f"User {username} not found")
+                    return False
+                like = session.query(Like).filter_by(
+                    user_id=user.id, content_type=content_type, content_id=content_id
+                ).first()
+                if not like:
+                    logger.info(f"No like found for {username} on {content_type}:{content_id}")
+                    return False
+                session.delete(like)
+                self._add_trending_activity(session, [(content_type, content_id)], -TRENDING_WEIGHTS['like'], like.created_at)
+                session.commit()
+                logger.info(f"Like removed by {username} for {content_type}:{content_id}")
+                return True
+        except SQLAlchemyError as e:
+            logger.error(f"Error removing like: {str(e)}")
+            return False
+
+    def save_draft(self, username: str, content_type: str, content_id: Optional[str], data: Dict[str, Any], draft_id: Optional[str] = None) -> str:
+        """
+        Save a draft version of content.
+        Updating an existing draft appends a compressed revision to its history instead of
+        inserting a new row; saving unchanged data is a no-op.
+        Args:
+            username: User's username.
+            content_type: Content type (blog/case_study).
+            content_id: Associated content ID.
+            data: Draft data.
+            draft_id: ID of the draft being updated, or None for a new draft.
+        Returns:
+            str: Draft ID.
+        """
+        data_hash = content_hash(data)
+        try:
+            with self.session_factory() as session:
+                user = session.query(User).filter_by(username=username).first()
+                if not user:
+                    raise ValueError("User not found")
+                draft = session.query(Draft).filter_by(id=draft_id, user_id=user.id).first() if draft_id else None
+                if draft and draft.content_hash == data_hash:
+                    logger.info(f"Draft {draft.id} unchanged, no revision saved")
+                    return draft.id
+                if not draft:
+                    draft = Draft(
+                        id=new_id(),
+                        user_id=user.id,
+                        content_type=content_type,
+                        content_id=content_id,
+                        data=data,
+                        revision_count=0
+                    )
+                    session.add(draft)
+                    previous_data = None
+                else:
+                    previous_data = draft.data
+                    if not draft.revision_count:
+                        self._append_draft_revision(session, draft, None, previous_data, draft.created_at)
+                    draft.data = data
+                    draft.content_id = content_id or draft.content_id
+                self._append_draft_revision(session, draft, previous_data, data)
+                draft.content_hash = data_hash
+                draft.updated_at = datetime.utcnow()
+                if draft.revision_count > DRAFT_KEEP_LAST:
+                    self._prune_draft_revisions(session, draft)
+                session.commit()
+                logger.info(f"Draft {draft.id} revision {draft.revision_count} saved by {username}")
+                return draft.id
+        except SQLAlchemyError as e:
+            logger.error(f"Error saving draft: {str(e)}")
+            raise
+
+    def _append_draft_revision(self, session, draft: Draft, previous_data: Optional[Dict[str, Any]], data: Dict[str, Any], created_at: Optional[datetime] = None) -> None:
+        """
+        Append a snapshot or delta revision to a draft's history.
+        Args:
+            session: Active database session.
+            draft: Draft being revised.
+            previous_data: Data of the previous revision, or None if this is the first.
+            data: Data of the new revision.
+            created_at: Revision timestamp, defaults to now.
+        """
+        last = session.query(DraftRevision.seq).filter_by(draft_id=draft.id).order_by(DraftRevision.seq.desc()).first()
+        last_snapshot = session.query(func.max(DraftRevision.seq)).filter_by(draft_id=draft.id, is_snapshot=True).scalar()
+        seq = last.seq + 1 if last else 1
+        is_snapshot = previous_data is None or last_snapshot is None or seq - last_snapshot >= DRAFT_SNAPSHOT_INTERVAL
+        session.add(DraftRevision(
+            id=new_id(),
+            draft_id=draft.id,
+            seq=seq,
+            content_hash=content_hash(data),
+            is_snapshot=is_snapshot,
+            payload=compress_json(data if is_snapshot else make_delta(previous_data, data)),
+            created_at=created_at or datetime.utcnow()
+        ))
+        draft.revision_count = (draft.revision_count or 0) + 1
+
+    def _prune_draft_revisions(self, session, draft: Draft) -> None:
+        """
+        Apply the retention policy to a draft's history.
+        Keeps the last DRAFT_KEEP_LAST revisions plus the last revision of each of the past
+        DRAFT_CHECKPOINT_DAYS days. Kept revisions whose predecessor was pruned are re-encoded.
+        Args:
+            session: Active database session.
+            draft: Draft whose history is pruned.
+        """
+        session.flush()
+        revisions = session.query(DraftRevision).filter_by(draft_id=draft.id).order_by(DraftRevision.seq).all()
+        states = replay_revisions([(revision.is_snapshot, revision.payload) for revision in revisions])
+
+        keep = set(range(max(0, len(revisions) - DRAFT_KEEP_LAST), len(revisions)))
+        checkpoint_cutoff = datetime.utcnow() - timedelta(days=DRAFT_CHECKPOINT_DAYS)
+        daily = {}
+        for idx, revision in enumerate(revisions):
+            if revision.created_at >= checkpoint_cutoff:
+                daily[revision.created_at.date()] = idx
+        keep.update(daily.values())
+
+        previous_kept, since_snapshot = None, 0
+        for idx, revision in enumerate(revisions):
+            if idx not in keep:
+                session.delete(revision)
+                continue
+            chain_broken = previous_kept != idx - 1
+            if previous_kept is None or (not revision.is_snapshot and since_snapshot + 1 >= DRAFT_SNAPSHOT_INTERVAL):
+                revision.is_snapshot, revision.payload = True, compress_json(states[idx])
+            elif chain_broken and not revision.is_snapshot:
+                revision.payload = compress_json(make_delta(states[previous_kept], states[idx]))
+            since_snapshot = 0 if revision.is_snapshot else since_snapshot + 1
+            previous_kept = idx
+        draft.revision_count = len(keep)
+
+    def get_draft_history(self, draft_id: str) -> List[Dict[str, Any]]:
+        """
+        List the retained revisions of a draft.
+        Args:
+            draft_id: Draft ID.
+        Returns:
+            List[Dict[str, Any]]: Revision numbers and timestamps, newest first.
+        """
+        try:
+            with self.session_factory() as session:
+                revisions = session.query(DraftRevision.seq, DraftRevision.created_at).filter_by(
+                    draft_id=draft_id
+                ).order_by(DraftRevision.seq.desc()).all()
+                return [{'seq': r.seq, 'created_at': r.created_at} for r in revisions]
+        except SQLAlchemyError as e:
+            logger.error(f"Error retrieving history for draft {draft_id}: {str(e)}")
+            return []
+
+    def get_draft_revision(self, draft_id: str, seq: int) -> Optional[Dict[str, Any]]:
+        """
+        Reconstruct the data of a draft revision from its nearest snapshot.
+        Args:
+            draft_id: Draft ID.
+            seq: Revision number.
+        Returns:
+            Optional[Dict[str, Any]]: Draft data at that revision, or None if not retained.
+        """
+        try:
+            with self.session_factory() as session:
+                snapshot_seq = session.query(func.max(DraftRevision.seq)).filter(
+                    DraftRevision.draft_id == draft_id,
+                    DraftRevision.is_snapshot == True,
+                    DraftRevision.seq <= seq
+                ).scalar()
+                if snapshot_seq is None:
+                    return None
+                revisions = session.query(DraftRevision).filter(
+                    DraftRevision.draft_id == draft_id,
+                    DraftRevision.seq >= snapshot_seq,
+                    DraftRevision.seq <= seq
+                ).order_by(DraftRevision.seq).all()
+                if not revisions or revisions[-1].seq != seq:
+                    return None
+                return replay_revisions([(revision.is_snapshot, revision.payload) for revision in revisions])[-1]
+        except SQLAlchemyError as e:
+            logger.error(f"Error reconstructing draft {draft_id} revision {seq}: {str(e)}")
+            return None
+
+    def get_drafts(self, username: str, content_type: str) -> List[Draft]:
+        """
+        Retrieve drafts for a user, one head per document.
+        Older rows that share a content ID with a newer draft are superseded and not returned.
+        Args:
+            username: User's username.
+            content_type: Content type (blog/case_study).
+        Returns:
+            List[Draft]: List of drafts.
+        """
+        try:
+            with self.session_factory() as session:
+                user = session.query(User).filter_by(username=username).first()
+                if not user:
+                    return []
+                last_modified = func.coalesce(Draft.updated_at, Draft.created_at)
+                ranked = session.query(
+                    Draft.id,
+                    func.row_number().over(
+                        partition_by=func.coalesce(Draft.content_id, Draft.id),
+                        order_by=last_modified.desc()
+                    ).label('rank')
+                ).filter_by(user_id=user.id, content_type=content_type).subquery()
+                return session.query(Draft).join(ranked, ranked.c.id == Draft.id).filter(
+                    ranked.c.rank == 1
+                ).order_by(last_modified.desc()).all()
+        except SQLAlchemyError as e:
+            logger.error(f"Error retrieving drafts for {username}: {str(e)}")
+            return []
+
+    def notify_user(self, username: str, message: str, content_type: Optional[str] = None, content_id: Optional[str] = None) -> bool:
+        """
+        Send a notification to a user.
+        Args:
+            username: Recipient's username.
+            message: Notification message.
+            content_type: Associated content type.
+            content_id: Associated content ID.
+        Returns:
+            bool: True if sent successfully, False otherwise.
+        """
+        notification_id = new_id()
+        try:
+            with self.session_factory() as session:
+                user = session.query(User).filter_by(username=username).first()
+                if not user:
+                    logger.error(f"User {username} not found")
+                    return False
+                message = bleach.clean(message)
+                created_at = datetime.utcnow()
+                notification = Notification(
+                    id=notification_id,
+                    user_id=user.id,
+                    message=message,
+                    message_html=render_notification(message, created_at),
+                    render_version=RENDER_VERSION,
+                    content_type=content_type,
+                    content_id=content_id,
+                    created_at=created_at
+                )
+                session.add(notification)
+                session.commit()
+                logger.info(f"Notification {notification_id} sent to {username}")
+                return True
+        except SQLAlchemyError as e:
+            logger.error(f"Error sending notification to {username}: {str(e)}")
+            return False
+
+    def notify_followers(self, username: str, content_type: str, content_id: str, message: str) -> bool:
+        """
+        Notify followers of new content.
+        All notifications are inserted in one transaction. Followers who already have a
+        notification for this content are skipped, so a retried job does not notify twice.
+        Args:
+            username: Content creator's username.
+            content_type: Content type.
+            content_id: Content ID.
+            message: Notification message.
+        Returns:
+            bool: True if the followers were notified, False on error.
+        """
+        message = bleach.clean(message)
+        created_at = datetime.utcnow()
+        message_html = render_notification(message, created_at)
+        try:
+            with self.session_factory() as session:
+                author = aliased(User)
+                notified = select(Notification.id).where(
+                    Notification.user_id == Follow.follower_id, Notification.content_type == content_type,
+                    Notification.content_id == content_id).exists()
+                follower_ids = session.scalars(select(Follow.follower_id).join(author, author.id == Follow.followed_id)
+                                               .where(author.username == username, ~notified)).all()
+                if follower_ids:
+                    session.execute(Notification.__table__.insert(), [{
+                        'id': new_id(), 'user_id': follower_id, 'message': message, 'message_html': message_html,
+                        'render_version': RENDER_VERSION, 'content_type': content_type, 'content_id': content_id,
+                        'is_read': False, 'created_at': created_at
+                    } for follower_id in follower_ids])
+                    session.commit()
+                logger.info(f"Notified {len(follower_ids)} followers of {username}")
+                return True
+        except SQLAlchemyError as e:
+            logger.error(f"Error notifying followers for {username}: {str(e)}")
+            return False
+
+    def get_notifications(self, username: str, unread_only: bool = False) -> List[Notification]:
+        """
+        Retrieve user notifications.
+        Args:
+            username: User's username.
+            unread_only: Filter for unread notifications.
+        Returns:
+            List[Notification]: List of notifications.
+        """
+        try:
+            with self.session_factory() as session:
+                user = session.query(User).filter_by(username=username).first()
+                if not user:
+                    return []
+                query = session.query(Notification).filter_by(user_id=user.id)
+                if unread_only:
+                    query = query.filter_by(is_read=False)
+                return query.order_by(Notification.created_at.desc()).all()
+        except SQLAlchemyError as e:
+            logger.error(f"Error retrieving notifications for {username}: {str(e)}")
+            return []
+
+    def mark_notification_read(self, notification_id: str) -> bool:
+        """
+        Mark a notification as read.
+        Args:
+            notification_id: Notification ID.
+        Returns:
+            bool: True if marked successfully, False otherwise.
+        """
+        try:
+            with self.session_factory() as session:
+                notification = session.query(Notification).filter_by(id=notification_id).first()
+                if not notification:
+                    logger.error(f"Notification {notification_id} not found")
+                    return False
+                notification.is_read = True
+                session.commit()
+                logger.info(f"Notification {notification_id} marked as read")
+                return True
+        except SQLAlchemyError as e:
+            logger.error(f"Error marking notification {notification_id} as read: {str(e)}")
+            return False
+
+    def follow_user(self, username: str, followed: str) -> bool:
+        """
+        Follow an author and queue copying their latest posts into the follower's timeline.
+        Args:
+            username: Follower's username.
+            followed: Username of the author to follow.
+        Returns:
+            bool: True if the follow was added, False if it already existed or on error.
+        """
+        try:
+            with self.session_factory() as session:
+                users = {user.username: user for user in session.query(User).filter(User.username.in_([username, followed]))}
+                follower, author = users.get(username), users.get(followed)
+                if not follower or not author or follower.id == author.id:
+                    logger.error(f"{username} cannot follow {followed}")
+                    return False
+                added = session.execute(sqlite_insert(Follow).values(
+                    follower_id=follower.id, followed_id=author.id, created_at=datetime.utcnow()
+                ).on_conflict_do_nothing()).rowcount
+                if not added:
+                    return False
+                session.execute(update(User).where(User.id == author.id).values(
+                    follower_count=func.coalesce(User.follower_count, 0) + 1))
+                # Profiles keep a copy of the list for display and account exports.
+                following = list((follower.profile or {}).get('following', []))
+                if followed not in following:
+                    follower.profile = {**(follower.profile or {}), 'following': following + [followed]}
+                follower_id, author_id = follower.id, author.id
+                session.commit()
+        except SQLAlchemyError as e:
+            logger.error(f"Error following {followed} for {username}: {str(e)}")
+            return False
+        logger.info(f"{username} followed {followed}")
+        self.enqueue_job('backfill_timeline', {'user_id': follower_id, 'author_id': author_id},
+                         priority=JOB_PRIORITY_HIGH)
+        return True
+
+    def unfollow_user(self, username: str, followed: str) -> bool:
+        """
+        Stop following an author and remove their posts from the follower's timeline.
+        Args:
+            username: Follower's username.
+            followed: Username of the author to unfollow.
+        Returns:
+            bool: True if the follow was removed, False if there was none or on error.
+        """
+        try:
+            with self.session_factory() as session:
+                users = {user.username: user for user in session.query(User).filter(User.username.in_([username, followed]))}
+                follower, author = users.get(username), users.get(followed)
+                if not follower or not author:
+                    logger.error(f"{username} cannot unfollow {followed}")
+                    return False
+                removed = session.execute(Follow.__table__.delete().where(
+                    Follow.follower_id == follower.id, Follow.followed_id == author.id)).rowcount
+                if not removed:
+                    return False
+                session.execute(update(User).where(User.id == author.id).values(
+                    follower_count=func.max(func.coalesce(User.follower_count, 0) - 1, 0)))
+                session.execute(TimelineEntry.__table__.delete().where(
+                    TimelineEntry.user_id == follower.id, TimelineEntry.author_id == author.id))
+                following = [name for name in (follower.profile or {}).get('following', []) if name != followed]
+                follower.profile = {**(follower.profile or {}), 'following': following}
+                session.commit()
+                logger.info(f"{username} unfollowed {followed}")
+                return True
+        except SQLAlchemyError as e:
+            logger.error(f"Error unfollowing {followed} for {username}: {str(e)}")
+            return False
 
+    def is_following(self, username: str, followed: str) -> bool:
+        """
+        Check whether a user follows an author.
+        Args:
+            username: Follower's username.
+            followed: Author's username.
+        Returns:
+            bool: True if username follows followed.
+        """
+        author = aliased(User)
+        with self.session_factory() as session:
+            return session.query(Follow).join(User, User.id == Follow.follower_id) \
+                .join(author, author.id == Follow.followed_id) \
+                .filter(User.username == username, author.username == followed).first() is not None
 
-class DataManager:
-    """
-    Manages database operations for the blog platform.
-    """
+    def get_follower_count(self, username: str) -> int:
+        """
+        Get the number of followers of an author.
+        Args:
+            username: Author's username.
+        Returns:
+            int: Follower count, or 0 on error.
+        """
+        try:
+            with self.session_factory() as session:
+                return session.scalar(select(User.follower_count).where(User.username == username)) or 0
+        except SQLAlchemyError as e:
+            logger.error(f"Error counting followers of {username}: {str(e)}")
+            return 0
 
-    def __init__(self, session_factory):
-        self.session_factory = session_factory
+    def fan_out_timeline(self, content_type: str, content_id: str) -> Optional[str]:
+        """
+        Queue copying a published post into its author's followers' timelines.
+        Queued once per post, so republishing an edited post does not fan it out again.
+        Args:
+            content_type: Content type (blog/case_study).
+            content_id: Content ID.
+        Returns:
+            Optional[str]: Job ID, or None on error.
+        """
+        return self.enqueue_job('fan_out_timeline', {'content_type': content_type, 'content_id': content_id},
+                                idempotency_key=f"fan_out_timeline:{content_type}:{content_id}")
 
-    def save_user(self, username: str, password: str, email: str, is_admin: bool = False) -> bool:
+    def fan_out_to_timelines(self, content_type: str, content_id: str, batch_size: int = TIMELINE_FANOUT_BATCH_SIZE) -> int:
         """
-        Save a new user with hashed password.
+        Copy a newly published post into its author's followers' timelines.
+        Posts of authors at or above TIMELINE_FANOUT_THRESHOLD followers are skipped; readers
+        merge them in instead. Followers are visited in batches of their own transactions.
         Args:
-            username: User's unique username.
-            password: User's password.
-            email: User's email address.
-            is_admin: Whether the user is an admin.
+            content_type: Content type (blog/case_study).
+            content_id: Content ID.
+            batch_size: Followers per transaction.
         Returns:
-            bool: True if saved successfully, False otherwise.
+            int: Number of timeline entries added.
+        """
+        model = Blog if content_type == 'blog' else CaseStudy
+        with self.session_factory() as session:
+            content = session.query(model.user_id, model.created_at).filter(
+                model.id == content_id, model.is_published == True, model.deleted_at.is_(None)).first()
+            if not content:
+                return 0
+            follower_count = session.scalar(select(User.follower_count).where(User.id == content.user_id)) or 0
+        if follower_count >= TIMELINE_FANOUT_THRESHOLD:
+            return 0
+        added, after = 0, 0
+        while True:
+            with self.session_factory() as session:
+                followers = session.scalars(select(Follow.follower_id).where(
+                    Follow.followed_id == content.user_id, Follow.follower_id > after
+                ).order_by(Follow.follower_id).limit(batch_size)).all()
+                if not followers:
+                    break
+                added += session.execute(sqlite_insert(TimelineEntry).values([{
+                    'user_id': follower_id, 'content_type': content_type, 'content_id': content_id,
+                    'author_id': content.user_id, 'created_at': content.created_at
+                } for follower_id in followers]).on_conflict_do_nothing()).rowcount
+                self._trim_timelines(session, followers)
+                session.commit()
+            after = followers[-1]
+        return added
+
+    def backfill_timeline(self, user_id: int, author_id: int, limit: int = TIMELINE_BACKFILL_ENTRIES) -> int:
+        """
+        Copy an author's latest posts into a new follower's timeline.
+        Args:
+            user_id: Follower's user ID.
+            author_id: Followed author's user ID.
+            limit: Number of posts copied.
+        Returns:
+            int: Number of timeline entries added.
+        """
+        with self.session_factory() as session:
+            follows = session.query(Follow).filter_by(follower_id=user_id, followed_id=author_id).first()
+            follower_count = session.scalar(select(User.follower_count).where(User.id == author_id)) or 0
+            if not follows or follower_count >= TIMELINE_FANOUT_THRESHOLD:
+                return 0
+            added = session.execute(text(
+                "INSERT OR IGNORE INTO timeline_entries (user_id, content_type, content_id, author_id, created_at) "
+                f"SELECT :user_id, content_type, id, user_id, created_at FROM ({PUBLISHED_CONTENT_SQL}) "
+                "WHERE user_id = :author_id ORDER BY created_at DESC LIMIT :limit"
+            ), {'user_id': user_id, 'author_id': author_id, 'limit': limit}).rowcount
+            self._trim_timelines(session, [user_id])
+            session.commit()
+            return added
+
+    def _trim_timelines(self, session, user_ids: List[int]) -> None:
+        """
+        Drop entries beyond the newest TIMELINE_MAX_ENTRIES of each listed timeline.
+        Args:
+            session: Active database session.
+            user_ids: Owners of the timelines.
+        """
+        ranked = select(literal_column('rowid').label('entry'), func.row_number().over(
+            partition_by=TimelineEntry.user_id, order_by=TimelineEntry.created_at.desc()
+        ).label('position')).select_from(TimelineEntry).where(TimelineEntry.user_id.in_(user_ids)).subquery()
+        session.execute(TimelineEntry.__table__.delete().where(literal_column('rowid').in_(
+            select(ranked.c.entry).where(ranked.c.position > TIMELINE_MAX_ENTRIES))))
+
+    def get_timeline(self, username: str, limit: int = TIMELINE_PAGE_SIZE, before: Optional[datetime] = None) -> List[Any]:
+        """
+        Retrieve a page of a user's home timeline, newest first.
+        Merges the materialized timeline with the latest posts of followed authors whose posts
+        are not fanned out.
+        Args:
+            username: Timeline owner's username.
+            limit: Maximum number of posts.
+            before: Only posts created before this time, for the next page.
+        Returns:
+            List[Any]: Published content objects.
         """
         try:
             with self.session_factory() as session:
-                hashed_password = stauth.Hasher([password]).generate()[0]
-                user = User(
-                    username=bleach.clean(username),
-                    password=hashed_password,
-                    email=bleach.clean(email),
-                    is_admin=is_admin
+                user_id = session.scalar(select(User.id).where(User.username == username))
+                if user_id is None:
+                    return []
+                entries = select(TimelineEntry.content_type, TimelineEntry.content_id, TimelineEntry.created_at) \
+                    .where(TimelineEntry.user_id == user_id)
+                if before:
+                    entries = entries.where(TimelineEntry.created_at < before)
+                candidates = list(session.execute(entries.order_by(TimelineEntry.created_at.desc()).limit(limit)))
+                pulled = select(Follow.followed_id).join(User, User.id == Follow.followed_id).where(
+                    Follow.follower_id == user_id, User.follower_count >= TIMELINE_FANOUT_THRESHOLD)
+                models = {'blog': Blog, 'case_study': CaseStudy}
+                for key, model in models.items():
+                    posts = select(model.id, model.created_at).where(
+                        model.user_id.in_(pulled), model.is_published == True, model.deleted_at.is_(None), by_active_author(model))
+                    if before:
+                        posts = posts.where(model.created_at < before)
+                    candidates += [(key, content_id, created_at) for content_id, created_at in
+                                   session.execute(posts.order_by(model.created_at.desc()).limit(limit))]
+                page = list(dict.fromkeys((key, content_id) for key, content_id, _ in
+                                          sorted(candidates, key=lambda candidate: candidate[2], reverse=True)))[:limit]
+                loaded = {}
+                for key, model in models.items():
+                    ids = [content_id for item_type, content_id in page if item_type == key]
+                    if ids:
+                        loaded.update(((key, content.id), content) for content in session.query(model).filter(
+                            model.id.in_(ids), model.is_published == True, model.deleted_at.is_(None), by_active_author(model)))
+                return [loaded[item] for item in page if item in loaded]
+        except SQLAlchemyError as e:
+            logger.error(f"Error loading timeline for {username}: {str(e)}")
+            return []
+
+    def schedule_related_refresh(self) -> Optional[str]:
+        """
+        Queue a related content refresh RELATED_REFRESH_DELAY seconds from now.
+        Saves within the same window share one job, which folds in every change made so far.
+        Returns:
+            Optional[str]: Job ID, or None on error.
+        """
+        window = int(time.time() // RELATED_REFRESH_DELAY)
+        return self.enqueue_job('refresh_related', {}, priority=JOB_PRIORITY_LOW,
+                                idempotency_key=f"refresh_related:{window}", delay=timedelta(seconds=RELATED_REFRESH_DELAY))
+
+    def refresh_related_content(self) -> Dict[str, Any]:
+        """
+        Recompute the related posts of content changed since the last refresh.
+        Returns:
+            Dict[str, Any]: Refresh report.
+        """
+        with self.session_factory() as session:
+            report = get_related_index().sync(session)
+            session.commit()
+        return report
+
+    def get_related_content(self, items: List[Tuple[str, str]], limit: int = RELATED_TOP_K) -> Dict[Tuple[str, str], List[Any]]:
+        """
+        Retrieve the stored related posts of several content items.
+        Args:
+            items: (content_type, content_id) pairs.
+            limit: Maximum related posts per item.
+        Returns:
+            Dict[Tuple[str, str], List[Any]]: Published related content objects per item, most similar first.
+        """
+        related = {}
+        try:
+            with self.session_factory() as session:
+                links = []
+                for content_type in ('blog', 'case_study'):
+                    ids = [content_id for item_type, content_id in items if item_type == content_type]
+                    if ids:
+                        links += session.execute(select(
+                            RelatedContent.content_type, RelatedContent.content_id, RelatedContent.related_type, RelatedContent.related_id
+                        ).where(RelatedContent.content_type == content_type, RelatedContent.content_id.in_(ids),
+                                RelatedContent.rank < limit).order_by(RelatedContent.content_id, RelatedContent.rank)).all()
+                loaded = {}
+                for key, model in (('blog', Blog), ('case_study', CaseStudy)):
+                    ids = {link.related_id for link in links if link.related_type == key}
+                    if ids:
+                        loaded.update(((key, content.id), content) for content in session.query(model).filter(
+                            model.id.in_(ids), model.is_published == True, model.deleted_at.is_(None), by_active_author(model)))
+                for link in links:
+                    content = loaded.get((link.related_type, link.related_id))
+                    if content:
+                        related.setdefault((link.content_type, link.content_id), []).append(content)
+        except SQLAlchemyError as e:
+            logger.error(f"Error loading related content: {str(e)}")
+        return related
+
+    def log_analytics_event(self, username: Optional[str], event_type: str, content_type: Optional[str] = None, content_id: Optional[str] = None, event_metadata: Dict[str, Any] = None) -> bool:
+        """
+        Queue an analytics event for recording by a job worker.
+        Args:
+            username: User's username, if authenticated.
+            event_type: Type of event (e.g., view, click).
+            content_type: Associated content type.
+            content_id: Associated content ID.
+            event_metadata: Additional event data.
+        Returns:
+            bool: True if queued successfully, False otherwise.
+        """
+        return self.enqueue_job('record_analytics_event', {
+            'username': username,
+            'event_type': event_type,
+            'content_type': content_type,
+            'content_id': content_id,
+            'event_metadata': event_metadata or {},
+            'timestamp': datetime.utcnow().isoformat()
+        }, priority=JOB_PRIORITY_LOW) is not None
+
+    def record_analytics_event(self, username: Optional[str], event_type: str, content_type: Optional[str] = None, content_id: Optional[str] = None, event_metadata: Dict[str, Any] = None, timestamp: Optional[datetime] = None) -> bool:
+        """
+        Write an analytics event.
+        Args:
+            username: User's username, if authenticated.
+            event_type: Type of event (e.g., view, click).
+            content_type: Associated content type.
+            content_id: Associated content ID.
+            event_metadata: Additional event data.
+            timestamp: When the event happened (defaults to now).
+        Returns:
+            bool: True if logged successfully, False otherwise.
+        """
+        event_id = new_id()
+        try:
+            with self.session_factory() as session:
+                user = session.query(User).filter_by(username=username).first() if username else None
+                event = AnalyticsEvent(
+                    id=event_id,
+                    user_id=user.id if user else None,
+                    event_type=event_type,
+                    content_type=content_type,
+                    content_id=content_id,
+                    timestamp=timestamp or datetime.utcnow(),
+                    event_metadata=event_metadata or {}
                 )
-                session.add(user)
+                session.add(event)
                 session.commit()
-                logger.info(f"User {username} registered successfully")
+                logger.info(f"Analytics event {event_id} logged")
                 return True
-        except IntegrityError:
-            logger.error(f"User {username} or email {email} already exists")
+        except SQLAlchemyError as e:
+            logger.error(f"Error logging analytics event: {str(e)}")
             return False
+
+    def record_views(self, items: List[Tuple[str, str]]) -> bool:
+        """
+        Queue view count increments for displayed content.
+        Args:
+            items: (content_type, content_id) pairs that were viewed.
+        Returns:
+            bool: True if queued successfully, False otherwise.
+        """
+        if not items:
+            return True
+        return self.enqueue_job('increment_views', {'items': [list(item) for item in items]},
+                                priority=JOB_PRIORITY_LOW) is not None
+
+    def increment_views(self, items: List[Tuple[str, str]]) -> int:
+        """
+        Add one view to each listed content item.
+        Args:
+            items: (content_type, content_id) pairs.
+        Returns:
+            int: Number of rows updated.
+        """
+        updated = 0
+        with self.session_factory() as session:
+            for content_type, model in (('blog', Blog), ('case_study', CaseStudy)):
+                ids = [content_id for item_type, content_id in items if item_type == content_type]
+                if ids:
+                    updated += session.query(model).filter(model.id.in_(ids)).update(
+                        {model.views: model.views + 1}, synchronize_session=False)
+            self._add_trending_activity(session, items, TRENDING_WEIGHTS['view'])
+            session.commit()
+        return updated
+
+    def _add_trending_activity(self, session, items: List[Tuple[str, str]], weight: float,
+                               occurred_at: Optional[datetime] = None) -> None:
+        """
+        Add activity to the trending scores of content items, in the caller's transaction.
+        The epoch is read by the same statement, so a concurrent renormalization cannot leave
+        the increment scaled against a stale epoch.
+        Args:
+            session: Active database session.
+            items: (content_type, content_id) pairs.
+            weight: Weight of the activity; negative to withdraw earlier activity, e.g. a like.
+            occurred_at: UTC time of the activity (default: now). Withdrawn activity must pass the
+                time it was added at, so the same boost is subtracted.
+        """
+        if not items:
+            return
+        now = time.time()
+        at = occurred_at.replace(tzinfo=timezone.utc).timestamp() if occurred_at else now
+        epoch = select(TrendingEpoch.epoch).where(TrendingEpoch.id == 1).scalar_subquery()
+        increment = weight * func.trending_boost(at - func.coalesce(epoch, now))
+        statement = sqlite_insert(TrendingScore.__table__).values(
+            content_type=bindparam('content_type'), content_id=bindparam('content_id'),
+            score=func.max(increment, 0.0), updated_at=datetime.utcnow()
+        )
+        statement = statement.on_conflict_do_update(index_elements=['content_type', 'content_id'], set_={
+            'score': func.max(TrendingScore.__table__.c.score + increment, 0.0),
+            'updated_at': statement.excluded.updated_at
+        })
+        session.execute(statement, [{'content_type': content_type, 'content_id': content_id}
+                                    for content_type, content_id in items])
+
+    def renormalize_trending(self, min_score: float = TRENDING_MIN_SCORE) -> Dict[str, Any]:
+        """
+        Move the trending epoch to now, scaling every score by its decay since the previous
+        epoch, and drop items whose decayed score fell below min_score.
+        Ordering is unchanged; this only keeps scores in float range and the table small.
+        Args:
+            min_score: Smallest decayed score kept.
+        Returns:
+            Dict[str, Any]: Report with the rows rescaled and dropped.
+        """
+        now = time.time()
+        factor = func.trending_boost(func.coalesce(
+            select(TrendingEpoch.epoch).where(TrendingEpoch.id == 1).scalar_subquery(), now) - now)
+        report = {'rescaled': 0, 'dropped': 0}
+        try:
+            with self.session_factory() as session:
+                # Every statement computes the factor from the stored epoch, and all of them run in
+                # one write transaction, so concurrent increments are scaled exactly once.
+                report['dropped'] = session.execute(TrendingScore.__table__.delete().where(
+                    TrendingScore.score * factor < min_score)).rowcount
+                report['rescaled'] = session.execute(TrendingScore.__table__.update().values(
+                    score=TrendingScore.score * factor)).rowcount
+                session.execute(sqlite_insert(TrendingEpoch).values(id=1, epoch=now).on_conflict_do_update(
+                    index_elements=['id'], set_={'epoch': now}))
+                session.commit()
         except SQLAlchemyError as e:
-            logger.error(f"Database error saving user: {str(e)}")
+            logger.error(f"Error renormalizing trending scores: {str(e)}")
+            report['error'] = str(e)
+        return report
+
+    def enqueue_job(self, kind: str, payload: Dict[str, Any], priority: int = JOB_PRIORITY_NORMAL,
+                    idempotency_key: Optional[str] = None, delay: Optional[timedelta] = None,
+                    max_attempts: int = JOB_MAX_ATTEMPTS) -> Optional[str]:
+        """
+        Add a job to the persistent queue.
+        Args:
+            kind: Handler name registered with job_handler.
+            payload: JSON-serialisable handler arguments.
+            priority: Higher priorities run first.
+            idempotency_key: Jobs sharing a key are enqueued only once.
+            delay: Earliest time to run, relative to now.
+            max_attempts: Attempts before the job is marked failed.
+        Returns:
+            Optional[str]: Job ID (the existing one for a duplicate key), or None on error.
+        """
+        job_id = new_id()
+        now = datetime.utcnow()
+        try:
+            with self.session_factory() as session:
+                session.execute(sqlite_insert(Job).values(
+                    id=job_id, kind=kind, payload=payload, priority=priority, status='queued', attempts=0,
+                    max_attempts=max_attempts, idempotency_key=idempotency_key,
+                    run_at=now + (delay or timedelta(0)), created_at=now
+                ).on_conflict_do_nothing(index_elements=['idempotency_key']))
+                if idempotency_key:
+                    job_id = session.scalar(select(Job.id).where(Job.idempotency_key == idempotency_key))
+                session.commit()
+                return job_id
+        except SQLAlchemyError as e:
+            logger.error(f"Error enqueueing {kind} job: {str(e)}")
+            return None
+
+    def claim_job(self, worker_id: str, visibility_timeout: int = JOB_VISIBILITY_TIMEOUT) -> Optional[Dict[str, Any]]:
+        """
+        Atomically claim the highest-priority job that is due, or whose previous claim expired.
+        Args:
+            worker_id: Identifier of the claiming worker.
+            visibility_timeout: Seconds the job stays hidden from other workers.
+        Returns:
+            Optional[Dict[str, Any]]: Claimed job's id, kind, payload, attempts and max_attempts, or None.
+        """
+        now = datetime.utcnow()
+        candidate = select(Job.id).where(or_(
+            and_(Job.status == 'queued', Job.run_at <= now),
+            and_(Job.status == 'running', Job.locked_until < now)
+        )).order_by(Job.priority.desc(), Job.run_at).limit(1).scalar_subquery()
+        try:
+            with self.session_factory() as session:
+                row = session.execute(
+                    update(Job).where(Job.id == candidate).values(
+                        status='running', attempts=Job.attempts + 1, locked_by=worker_id,
+                        locked_until=now + timedelta(seconds=visibility_timeout)
+                    ).returning(Job.id, Job.kind, Job.payload, Job.attempts, Job.max_attempts)
+                ).mappings().first()
+                session.commit()
+                return dict(row) if row else None
+        except SQLAlchemyError as e:
+            logger.error(f"Error claiming job: {str(e)}")
+            return None
+
+    def complete_job(self, job_id: str, worker_id: str) -> bool:
+        """
+        Mark a claimed job as done.
+        Args:
+            job_id: Job ID.
+            worker_id: Worker holding the claim.
+        Returns:
+            bool: True if the claim was still held, False otherwise.
+        """
+        return self._finish_job(job_id, worker_id, status='done', finished_at=datetime.utcnow(),
+                                locked_by=None, locked_until=None)
+
+    def fail_job(self, job_id: str, worker_id: str, attempts: int, max_attempts: int, error: str) -> bool:
+        """
+        Record a failed attempt, scheduling a retry with exponential backoff and jitter
+        or marking the job failed once its attempts are used up.
+        Args:
+            job_id: Job ID.
+            worker_id: Worker holding the claim.
+            attempts: Attempts made so far, including this one.
+            max_attempts: Attempts allowed.
+            error: Error description.
+        Returns:
+            bool: True if the claim was still held, False otherwise.
+        """
+        if attempts >= max_attempts:
+            return self._finish_job(job_id, worker_id, status='failed', last_error=error,
+                                    finished_at=datetime.utcnow(), locked_by=None, locked_until=None)
+        delay = min(JOB_RETRY_MAX_DELAY, JOB_RETRY_BASE_DELAY * 2 ** (attempts - 1)) * random.uniform(0.5, 1.0)
+        return self._finish_job(job_id, worker_id, status='queued', last_error=error,
+                                run_at=datetime.utcnow() + timedelta(seconds=delay), locked_by=None, locked_until=None)
+
+    def _finish_job(self, job_id: str, worker_id: str, **values) -> bool:
+        try:
+            with self.session_factory() as session:
+                updated = session.execute(update(Job).where(
+                    Job.id == job_id, Job.status == 'running', Job.locked_by == worker_id).values(**values)).rowcount
+                session.commit()
+                return updated == 1
+        except SQLAlchemyError as e:
+            logger.error(f"Error updating job {job_id}: {str(e)}")
             return False
 
-    def update_user_profile(self, username: str, profile: Dict[str, Any]) -> bool:
+    def get_job_stats(self) -> Dict[str, int]:
+        """
+        Count jobs by status.
+        Returns:
+            Dict[str, int]: Job counts keyed by status.
+        """
+        try:
+            with self.session_factory() as session:
+                return dict(session.query(Job.status, func.count(Job.id)).group_by(Job.status).all())
+        except SQLAlchemyError as e:
+            logger.error(f"Error counting jobs: {str(e)}")
+            return {}
+
+    def retry_failed_jobs(self) -> int:
+        """
+        Requeue every failed job with a fresh set of attempts.
+        Returns:
+            int: Number of jobs requeued.
+        """
+        try:
+            with self.session_factory() as session:
+                updated = session.query(Job).filter(Job.status == 'failed').update(
+                    {Job.status: 'queued', Job.attempts: 0, Job.run_at: datetime.utcnow(), Job.finished_at: None},
+                    synchronize_session=False)
+                session.commit()
+                return updated
+        except SQLAlchemyError as e:
+            logger.error(f"Error requeueing failed jobs: {str(e)}")
+            return 0
+
+    def prune_jobs(self, older_than: timedelta = JOB_RETENTION) -> int:
         """
-        Update user profile information.
+        Delete finished jobs older than the retention period.
         Args:
-            username: User's username.
-            profile: Dictionary of profile data.
+            older_than: Retention period for done jobs.
         Returns:
-            bool: True if updated successfully, False otherwise.
+            int: Number of jobs deleted.
         """
         try:
             with self.session_factory() as session:
-                user = session.query(User).filter_by(username=username).first()
-                if not user:
-                    logger.error(f"User {username} not found")
-                    return False
-                user.profile = {**user.profile, **profile}
+                deleted = session.query(Job).filter(
+                    Job.status == 'done', Job.finished_at < datetime.utcnow() - older_than
+                ).delete(synchronize_session=False)
                 session.commit()
-                logger.info(f"Profile updated for user {username}")
-                return True
+                return deleted
         except SQLAlchemyError as e:
-            logger.error(f"Error updating profile for {username}: {str(e)}")
-            return False
+            logger.error(f"Error pruning jobs: {str(e)}")
+            return 0
 
-    def update_password(self, username: str, new_password: str) -> bool:
+    def rerender_stale(self, target: str, after: int = 0, batch_size: int = RERENDER_BATCH_SIZE) -> Tuple[int, Optional[int]]:
         """
-        Update user password.
+        Re-render one batch of stored artifacts stamped with an older RENDER_VERSION, or none.
+        Rows are visited in rowid order, so a caller passing back the returned cursor walks
+        the table once.
         Args:
-            username: User's username.
-            new_password: New password.
+            target: Key of RENDER_TARGETS.
+            after: Rowid to continue after.
+            batch_size: Rows per transaction.
         Returns:
-            bool: True if updated successfully, False otherwise.
+            Tuple[int, Optional[int]]: Rows re-rendered, and the cursor for the next batch or None when done.
         """
+        model = RENDER_TARGETS[target]
+        rowid = literal_column(f"{model.__tablename__}.rowid")
         try:
             with self.session_factory() as session:
-                user = session.query(User).filter_by(username=username).first()
-                if not user:
-                    logger.error(f"User {username} not found")
-                    return False
-                user.password = stauth.Hasher([new_password]).generate()[0]
+                rows = session.query(model, rowid).filter(
+                    rowid > after, or_(model.render_version.is_(None), model.render_version < RENDER_VERSION)
+                ).order_by(rowid).limit(batch_size).all()
+                for obj, _ in rows:
+                    if target == 'comment':
+                        obj.comment_html = render_comment(obj.username, obj.comment, obj.created_at)
+                        obj.render_version = RENDER_VERSION
+                    elif target == 'notification':
+                        obj.message_html = render_notification(obj.message, obj.created_at)
+                        obj.render_version = RENDER_VERSION
+                    else:
+                        for key, value in render_content(target, {field: getattr(obj, field)
+                                                                  for field in RENDER_FIELDS[target]}).items():
+                            setattr(obj, key, value)
                 session.commit()
-                logger.info(f"Password updated for user {username}")
-                return True
+                return len(rows), (rows[-1][1] if len(rows) == batch_size else None)
         except SQLAlchemyError as e:
-            logger.error(f"Error updating password for {username}: {str(e)}")
-            return False
+            logger.error(f"Error re-rendering {target} after rowid {after}: {str(e)}")
+            raise
 
-    def save_tag(self, name: str) -> str:
+    def schedule_rerender(self) -> Optional[str]:
         """
-        Save a new tag.
+        Queue the rerender job for the current RENDER_VERSION; repeated calls queue it once.
+        Returns:
+            Optional[str]: Job ID, or None on error.
+        """
+        return self.enqueue_job('rerender', {'target': next(iter(RENDER_TARGETS)), 'after': 0},
+                                priority=JOB_PRIORITY_LOW, idempotency_key=f"rerender:v{RENDER_VERSION}")
+
+    def resolve_content_id(self, content_type: str, public_id: str) -> Optional[str]:
+        """
+        Resolve an ID from a public link to the content's primary key.
+        UUIDs are primary keys already; anything else is looked up in the external ID mapping.
         Args:
-            name: Tag name.
+            content_type: Content type (blog/case_study).
+            public_id: ID as it appears in the link.
         Returns:
-            str: Tag ID.
+            Optional[str]: Content ID or None if unknown.
         """
-        tag_id = str(uuid.uuid4())
+        if parse_uuid(public_id):
+            return str(public_id)
         try:
             with self.session_factory() as session:
-                tag = Tag(id=tag_id, name=bleach.clean(name))
-                session.add(tag)
-                session.commit()
-                logger.info(f"Tag {name} saved with ID {tag_id}")
-                return tag_id
-        except IntegrityError:
-            with self.session_factory() as session:
-                tag = session.query(Tag).filter_by(name=bleach.clean(name)).first()
-                if tag:
-                    return tag.id
-                logger.error(f"Error saving tag {name}")
-                raise
+                return session.scalar(select(ExternalId.content_id).where(
+                    ExternalId.content_type == content_type, ExternalId.external_id == str(public_id)))
         except SQLAlchemyError as e:
-            logger.error(f"Error saving tag {name}: {str(e)}")
-            raise
+            logger.error(f"Error resolving external ID {content_type}:{public_id}: {str(e)}")
+            return None
 
-    def save_media(self, username: str, file, content_type: Optional[str] = None, content_id: Optional[str] = None) -> str:
+    def get_content_by_id(self, content_type: str, content_id: str) -> Optional[Any]:
         """
-        Save media file with base64 encoding.
+        Retrieve content by type and ID.
         Args:
-            username: Uploader's username.
-            file: Uploaded file object.
-            content_type: Associated content type (blog/case_study).
-            content_id: Associated content ID.
+            content_type: Content type (blog/case_study).
+            content_id: Content ID, or an external ID from a public link.
         Returns:
-            str: Media ID.
+            Optional[Any]: Content object or None.
         """
-        file_type = 'image' if file.type.startswith('image') else 'video' if file.type.startswith('video') else 'gif'
-        file_content = base64.b64encode(file.read()).decode('utf-8')
-        file_id = str(uuid.uuid4())
+        if not parse_uuid(content_id):
+            content_id = self.resolve_content_id(content_type, content_id)
+            if content_id is None:
+                return None
         try:
             with self.session_factory() as session:
-                user = session.query(User).filter_by(username=username).first()
-                if not user:
-                    raise ValueError("User not found")
-                media = Media(
-                    id=file_id,
-                    user_id=user.id,
-                    username=username,
-                    content_type=content_type,
-                    content_id=content_id,
-                    type=file_type,
-                    content=file_content,
-                    filename=bleach.clean(file.name)
-                )
-                session.add(media)
-                session.commit()
-                logger.info(f"Media {file_id} saved by {username}")
-                return file_id
+                if content_type == 'blog':
+                    return session.query(Blog).filter_by(id=content_id, deleted_at=None).first()
+                elif content_type == 'case_study':
+                    return session.query(CaseStudy).filter_by(id=content_id, deleted_at=None).first()
+                logger.error(f"Invalid content type: {content_type}")
+                return None
         except SQLAlchemyError as e:
-            logger.error(f"Error saving media: {str(e)}")
-            raise
+            logger.error(f"Error retrieving content {content_type}:{content_id}: {str(e)}")
+            return None
 
-    def save_blog(self, username: str, title: str, content: str, tags: str = "", media: Optional[List[str]] = None, font: str = 'Inter', is_published: bool = True, is_draft: bool = False) -> str:
+    def get_user_content(self, username: str, content_type: Optional[str] = None) -> List[Any]:
         """
-        Save a new blog post.
+        Retrieve all content by user and type.
         Args:
-            username: Author's username.
-            title: Blog title.
-            content: Blog content.
-            tags: Comma-separated tags.
-            media: List of media IDs.
-            font: Font style.
-            is_published: Publish status.
-            is_draft: Draft status.
+            username: User's username.
+            content_type: Content type (blog/case_study, or None for all).
         Returns:
-            str: Blog ID.
+            List[Any]: List of content objects.
         """
-        title = bleach.clean(title)
-        content = bleach.clean(content)
-        tag_list = [bleach.clean(tag.strip()) for tag in tags.split(',') if tag.strip()]
-        blog_id = str(uuid.uuid4())
-        public_link = f"{APP_URL}/content/blog/{urllib.parse.quote(username)}/{blog_id}"
         try:
             with self.session_factory() as session:
-                user = session.query(User).filter_by(username=username).first()
-                if not user:
-                    raise ValueError("User not found")
-                blog = Blog(
-                    id=blog_id,
-                    user_id=user.id,
-                    username=username,
-                    title=title,
-                    content=content,
-                    tags=tag_list,
-                    media=media or [],
-                    font=font,
-                    public_link=public_link,
-                    is_published=is_published,
-                    is_draft=is_draft
-                )
-                session.add(blog)
-                for tag_name in tag_list:
-                    tag_id = self.save_tag(tag_name)
-                    tag = session.query(Tag).filter_by(id=tag_id).first()
-                    blog.tag_objects.append(tag)
-                session.commit()
-                if media:
-                    for media_id in media:
-                        media_record = session.query(Media).filter_by(id=media_id).first()
-                        if media_record:
-                            media_record.content_type = 'blog'
-                            media_record.content_id = blog_id
-                    session.commit()
-                logger.info(f"Blog {blog_id} saved by {username}")
-                self.notify_followers(username, 'blog', blog_id, f"New blog: {title}")
-                return blog_id
+                if content_type == 'blog':
+                    return session.query(Blog).filter_by(username=username, deleted_at=None).all()
+                elif content_type == 'case_study':
+                    return session.query(CaseStudy).filter_by(username=username, deleted_at=None).all()
+                elif content_type is None or content_type == 'all':
+                    blogs = session.query(Blog).filter_by(username=username, deleted_at=None).all()
+                    case_studies = session.query(CaseStudy).filter_by(username=username, deleted_at=None).all()
+                    return blogs + case_studies
+                return []
         except SQLAlchemyError as e:
-            logger.error(f"Error saving blog: {str(e)}")
-            raise
+            logger.error(f"Error retrieving content for {username}: {str(e)}")
+            return []
 
-    def update_blog(self, blog_id: str, title: str, content: str, tags: str, media: List[str], font: str, is_published: bool, is_draft: bool) -> bool:
+    def query_users(self, search: Optional[str] = None, status: Optional[str] = None, role: Optional[str] = None,
+                    sort: str = 'created_at', descending: bool = True, page: int = 1,
+                    page_size: int = ADMIN_PAGE_SIZE) -> Tuple[List[Dict[str, Any]], int]:
         """
-        Update an existing blog post.
+        Retrieve one page of users for administration.
         Args:
-            blog_id: Blog ID.
-            title: Updated title.
-            content: Updated content.
-            tags: Updated tags.
-            media: Updated media IDs.
-            font: Updated font.
-            is_published: Updated publish status.
-            is_draft: Updated draft status.
+            search: Text matched against username and email.
+            status: 'active' or 'inactive' to filter by account status.
+            role: 'admin' or 'member' to filter by role.
+            sort: Sort key from ADMIN_USER_SORTS.
+            descending: Sort direction.
+            page: 1-based page number.
+            page_size: Rows per page.
         Returns:
-            bool: True if updated successfully, False otherwise.
+            Tuple[List[Dict[str, Any]], int]: Page of user rows and the total matching count.
         """
+        filters = []
+        if search:
+            pattern = f"%{search}%"
+            filters.append(or_(User.username.ilike(pattern), User.email.ilike(pattern)))
+        if status:
+            filters.append(User.is_active == (status == 'active'))
+        if role:
+            filters.append(User.is_admin == (role == 'admin'))
+        order = getattr(User, ADMIN_USER_SORTS[sort])
         try:
             with self.session_factory() as session:
-                blog = session.query(Blog).filter_by(id=blog_id).first()
-                if not blog:
-                    logger.error(f"Blog {blog_id} not found")
-                    return False
-                blog.title = bleach.clean(title)
-                blog.content = bleach.clean(content)
-                tag_list = [bleach.clean(tag.strip()) for tag in tags.split(',') if tag.strip()]
-                blog.tags = tag_list
-                blog.media = media
-                blog.font = font
-                blog.is_published = is_published
-                blog.is_draft = is_draft
-                blog.updated_at = datetime.utcnow()
-                blog.tag_objects.clear()
-                for tag_name in tag_list:
-                    tag_id = self.save_tag(tag_name)
-                    tag = session.query(Tag).filter_by(id=tag_id).first()
-                    blog.tag_objects.append(tag)
-                if media:
-                    for media_id in media:
-                        media_record = session.query(Media).filter_by(id=media_id).first()
-                        if media_record:
-                            media_record.content_type = 'blog'
-                            media_record.content_id = blog_id
-                session.commit()
-                logger.info(f"Blog {blog_id} updated")
-                return True
+                total = session.scalar(select(func.count()).select_from(User).where(*filters))
+                rows = session.execute(
+                    select(User.id, User.username, User.email, User.is_active, User.is_admin,
+                           User.created_at, User.last_login)
+                    .where(*filters)
+                    .order_by(order.desc() if descending else order.asc(), User.id)
+                    .limit(page_size).offset((page - 1) * page_size)
+                ).mappings().all()
+                return [dict(row) for row in rows], total
         except SQLAlchemyError as e:
-            logger.error(f"Error updating blog {blog_id}: {str(e)}")
-            return False
+            logger.error(f"Error querying users: {str(e)}")
+            return [], 0
 
-    def save_case_study(self, username: str, title: str, problem: str, solution: str, results: str, tags: str = "", media: Optional[List[str]] = None, font: str = 'Inter', is_published: bool = True, is_draft: bool = False) -> str:
+    def query_content(self, content_type: str, search: Optional[str] = None, author: Optional[str] = None,
+                      status: Optional[str] = None, start_date: Optional[datetime] = None,
+                      end_date: Optional[datetime] = None, sort: str = 'created_at', descending: bool = True,
+                      page: int = 1, page_size: int = ADMIN_PAGE_SIZE) -> Tuple[List[Dict[str, Any]], int]:
         """
-        Save a new case study.
+        Retrieve one page of content summaries for administration, without loading bodies.
         Args:
-            username: Author's username.
-            title: Case study title.
-            problem: Problem description.
-            solution: Solution description.
-            results: Results description.
-            tags: Comma-separated tags.
-            media: List of media IDs.
-            font: Font style.
-            is_published: Publish status.
-            is_draft: Draft status.
+            content_type: Content type (blog/case_study).
+            search: Text matched against the title.
+            author: Exact author username.
+            status: 'published', 'unpublished' or 'draft'.
+            start_date: Earliest creation time.
+            end_date: Latest creation time.
+            sort: Sort key from ADMIN_CONTENT_SORTS.
+            descending: Sort direction.
+            page: 1-based page number.
+            page_size: Rows per page.
         Returns:
-            str: Case study ID.
+            Tuple[List[Dict[str, Any]], int]: Page of content rows and the total matching count.
         """
-        title = bleach.clean(title)
-        problem = bleach.clean(problem)
-        solution = bleach.clean(solution)
-        results = bleach.clean(results)
-        tag_list = [bleach.clean(tag.strip()) for tag in tags.split(',') if tag.strip()]
-        case_id = str(uuid.uuid4())
-        public_link = f"{APP_URL}/content/case_study/{urllib.parse.quote(username)}/{case_id}"
+        model = Blog if content_type == 'blog' else CaseStudy
+        filters = [model.deleted_at.is_(None)]
+        if search:
+            filters.append(model.title.ilike(f"%{search}%"))
+        if author:
+            filters.append(model.username == author)
+        if status == 'published':
+            filters.extend([model.is_published == True, model.is_draft == False])
+        elif status == 'unpublished':
+            filters.extend([model.is_published == False, model.is_draft == False])
+        elif status == 'draft':
+            filters.append(model.is_draft == True)
+        if start_date:
+            filters.append(model.created_at >= start_date)
+        if end_date:
+            filters.append(model.created_at < end_date)
+        order = getattr(model, ADMIN_CONTENT_SORTS[sort])
         try:
             with self.session_factory() as session:
-                user = session.query(User).filter_by(username=username).first()
-                if not user:
-                    raise ValueError("User not found")
-                case_study = CaseStudy(
-                    id=case_id,
-                    user_id=user.id,
-                    username=username,
-                    title=title,
-                    problem=problem,
-                    solution=solution,
-                    results=results,
-                    tags=tag_list,
-                    media=media or [],
-                    font=font,
-                    public_link=public_link,
-                    is_published=is_published,
-                    is_draft=is_draft
-                )
-                session.add(case_study)
-                for tag_name in tag_list:
-                    tag_id = self.save_tag(tag_name)
-                    tag = session.query(Tag).filter_by(id=tag_id).first()
-                    case_study.tag_objects.append(tag)
-                session.commit()
-                if media:
-                    for media_id in media:
-                        media_record = session.query(Media).filter_by(id=media_id).first()
-                        if media_record:
-                            media_record.content_type = 'case_study'
-                            media_record.content_id = case_id
-                    session.commit()
-                logger.info(f"Case study {case_id} saved by {username}")
-                self.notify_followers(username, 'case_study', case_id, f"New case study: {title}")
-                return case_id
+                total = session.scalar(select(func.count()).select_from(model).where(*filters))
+                rows = session.execute(
+                    select(model.id, model.title, model.username, model.is_published, model.is_draft,
+                           model.views, model.created_at, model.updated_at)
+                    .where(*filters)
+                    .order_by(order.desc() if descending else order.asc(), model.id)
+                    .limit(page_size).offset((page - 1) * page_size)
+                ).mappings().all()
+                return [dict(row) for row in rows], total
         except SQLAlchemyError as e:
-            logger.error(f"Error saving case study: {str(e)}")
-            raise
+            logger.error(f"Error querying {content_type} content: {str(e)}")
+            return [], 0
 
-    def update_case_study(self, case_id: str, title: str, problem: str, solution: str, results: str, tags: str, media: List[str], font: str, is_published: bool, is_draft: bool) -> bool:
+    def set_users_active(self, usernames: List[str], active: bool) -> int:
         """
-        Update an existing case study.
+        Activate or deactivate several users in one statement.
+        Deactivated users' content is kept and hidden from readers until reactivation.
         Args:
-            case_id: Case study ID.
-            title: Updated title.
-            problem: Updated problem.
-            solution: Updated solution.
-            results: Updated results.
-            tags: Updated tags.
-            media: Updated media IDs.
-            font: Updated font.
-            is_published: Updated publish status.
-            is_draft: Updated draft status.
+            usernames: Usernames to update.
+            active: New account status.
         Returns:
-            bool: True if updated successfully, False otherwise.
+            int: Number of users updated.
         """
+        if not usernames:
+            return 0
         try:
             with self.session_factory() as session:
-                case_study = session.query(CaseStudy).filter_by(id=case_id).first()
-                if not case_study:
-                    logger.error(f"Case study {case_id} not found")
-                    return False
-                case_study.title = bleach.clean(title)
-                case_study.problem = bleach.clean(problem)
-                case_study.solution = bleach.clean(solution)
-                case_study.results = bleach.clean(results)
-                tag_list = [bleach.clean(tag.strip()) for tag in tags.split(',') if tag.strip()]
-                case_study.tags = tag_list
-                case_study.media = media
-                case_study.font = font
-                case_study.is_published = is_published
-                case_study.is_draft = is_draft
-                case_study.updated_at = datetime.utcnow()
-                case_study.tag_objects.clear()
-                for tag_name in tag_list:
-                    tag_id = self.save_tag(tag_name)
-                    tag = session.query(Tag).filter_by(id=tag_id).first()
-                    case_study.tag_objects.append(tag)
-                if media:
-                    for media_id in media:
-                        media_record = session.query(Media).filter_by(id=media_id).first()
-                        if media_record:
-                            media_record.content_type = 'case_study'
-                            media_record.content_id = case_id
-                session.commit()
-                logger.info(f"Case study {case_id} updated")
-                return True
+                updated = session.query(User).filter(User.username.in_(usernames)).update(
+                    {User.is_active: active}, synchronize_session=False)
+                session.commit()
+                logger.info(f"Set is_active={active} for {updated} users")
+                return updated
         except SQLAlchemyError as e:
-            logger.error(f"Error updating case study {case_id}: {str(e)}")
-            return False
+            logger.error(f"Error updating user status: {str(e)}")
+            return 0
 
-    def save_comment(self, username: str, content_type: str, content_id: str, comment: str) -> str:
+    def sync_content_search(self) -> int:
         """
-        Save a new comment.
-        Args:
-            username: Commenter's username.
-            content_type: Content type (blog/case_study).
-            content_id: Content ID.
-            comment: Comment text.
+        Index content written since the last sync, if any, in a transaction of its own.
         Returns:
-            str: Comment ID.
+            int: Number of rows indexed.
         """
-        comment = bleach.clean(comment)
-        comment_id = str(uuid.uuid4())
+        pending = " OR ".join(f"EXISTS (SELECT 1 FROM {table}_search_queue)" for table in CONTENT_SEARCH_COLUMNS)
         try:
             with self.session_factory() as session:
-                user = session.query(User).filter_by(username=username).first()
-                if not user:
-                    raise ValueError("User not found")
-                comment_obj = Comment(
-                    id=comment_id,
-                    user_id=user.id,
-                    username=username,
-                    content_type=content_type,
-                    content_id=content_id,
-                    comment=comment
-                )
-                session.add(comment_obj)
+                if not session.scalar(text(f"SELECT {pending}")):
+                    return 0
+                indexed = sync_content_search(session)
                 session.commit()
-                logger.info(f"Comment {comment_id} saved by {username}")
-                content = self.get_content_by_id(content_type, content_id)
-                if content:
-                    self.notify_user(content.username, f"New comment on {content.title}", content_type, content_id)
-                return comment_id
+                return indexed
         except SQLAlchemyError as e:
-            logger.error(f"Error saving comment: {str(e)}")
-            raise
+            logger.error(f"Error updating the full-text index: {str(e)}")
+            return 0
 
-    def save_like(self, username: str, content_type: str, content_id: str) -> bool:
+    def search_content(self, query: str, tags: Optional[List[str]] = None, content_type: Optional[str] = None,
+                       trending: bool = False, limit: Optional[int] = None) -> List[Any]:
         """
-        Save a like for content.
+        Search content by query and tags.
+        Words of the query are matched as prefixes against the full-text index, best matches
+        first; a query without words matches all published content. Trending searches return
+        only content with recent activity, highest trending score first.
         Args:
-            username: User's username.
-            content_type: Content type (blog/case_study).
-            content_id: Content ID.
+            query: Search query.
+            tags: List of tags to filter by.
+            content_type: Content type (blog/case_study, or None for all).
+            trending: Order by trending score instead of match quality.
+            limit: Maximum number of results per content type, and overall when trending.
         Returns:
-            bool: True if saved successfully, False otherwise.
+            List[Any]: List of matching content objects.
         """
-        like_id = str(uuid.uuid4())
+        match = search_match_expression(query)
+        if match:
+            self.sync_content_search()
         try:
             with self.session_factory() as session:
-                user = session.query(User).filter_by(username=username).first()
-                if not user:
-                    logger.error(f"User {username} not found")
-                    return False
-                existing_like = session.query(Like).filter_by(
-                    user_id=user.id, content_type=content_type, content_id=content_id
-                ).first()
-                if existing_like:
-                    logger.info(f"User {username} already liked {content_type}:{content_id}")
-                    return False
-                like = Like(
-                    id=like_id,
-                    user_id=user.id,
-                    content_type=content_type,
-                    content_id=content_id
-                )
-                session.add(like)
-                session.commit()
-                logger.info(f"Like {like_id} saved by {username}")
-                content = self.get_content_by_id(content_type, content_id)
-                if content:
-                    self.notify_user(content.username, f"New like on {content.title}", content_type, content_id)
-                return True
+                results = {}
+                for key, model in (('blog', Blog), ('case_study', CaseStudy)):
+                    if content_type and content_type != key:
+                        continue
+                    q = session.query(model).filter(model.is_published == True, model.deleted_at.is_(None), by_active_author(model))
+                    if trending:
+                        # Walks idx_trending_type_score from the top, so the first `limit` hits end the scan.
+                        q = q.join(TrendingScore, and_(TrendingScore.content_type == key, TrendingScore.content_id == model.id)) \
+                            .add_columns(TrendingScore.score).order_by(TrendingScore.score.desc())
+                    if match:
+                        index = f"{model.__tablename__}_search"
+                        hits = select(literal_column('rowid').label('rowid'), literal_column('rank').label('rank')) \
+                            .select_from(text(index)).where(literal_column(index).op('MATCH')(match)).subquery()
+                        q = q.join(hits, hits.c.rowid == literal_column(f"{model.__tablename__}.rowid"))
+                        if not trending:
+                            q = q.order_by(hits.c.rank)
+                    if tags:
+                        q = q.filter(model.tags.contains(tags))
+                    if limit:
+                        q = q.limit(limit)
+                    results[key] = q.all()
+                if trending:
+                    ranked = sorted(results.get('blog', []) + results.get('case_study', []), key=lambda row: row.score, reverse=True)
+                    return [row[0] for row in ranked[:limit]]
+                return results.get('blog', []) + results.get('case_study', [])
         except SQLAlchemyError as e:
-            logger.error(f"Error saving like: {str(e)}")
-            return False
+            logger.error(f"Error searching content: {str(e)}")
+            return []
 
-    def remove_like(self, username: str, content_type: str, content_id: str) -> bool:
+    def get_analytics(self, username: str, start_date: Optional[datetime] = None, end_date: Optional[datetime] = None) -> Dict[str, Any]:
         """
-        Remove a like from content.
+        Retrieve analytics for user content.
         Args:
             username: User's username.
-            content_type: Content type (blog/case_study).
-            content_id: Content ID.
+            start_date: Start date filter.
+            end_date: End date filter.
         Returns:
-            bool: True if removed successfully, False otherwise.
+            Dict[str, Any]: Analytics data.
         """
         try:
             with self.session_factory() as session:
                 user = session.query(User).filter_by(username=username).first()
                 if not user:
-                    logger.error(f"User {username} not found")
-                    return False
-                like = session.query(Like).filter_by(
-                    user_id=user.id, content_type=content_type, content_id=content_id
-                ).first()
-                if not like:
-                    logger.info(f"No like found for {username} on {content_type}:{content_id}")
-                    return False
-                session.delete(like)
-                session.commit()
-                logger.info(f"Like removed by {username} for {content_type}:{content_id}")
-                return True
+                    return {}
+                blog_views = session.query(func.sum(Blog.views)).filter_by(username=username, deleted_at=None).scalar() or 0
+                case_study_views = session.query(func.sum(CaseStudy.views)).filter_by(username=username, deleted_at=None).scalar() or 0
+                blog_likes = session.query(func.count(Like.id)).filter(
+                    Like.content_type == 'blog',
+                    Like.content_id.in_(session.query(Blog.id).filter_by(username=username, deleted_at=None))
+                ).scalar() or 0
+                case_study_likes = session.query(func.count(Like.id)).filter(
+                    Like.content_type == 'case_study',
+                    Like.content_id.in_(session.query(CaseStudy.id).filter_by(username=username, deleted_at=None))
+                ).scalar() or 0
+                events_query = session.query(AnalyticsEvent).filter_by(user_id=user.id)
+                if start_date:
+                    events_query = events_query.filter(AnalyticsEvent.timestamp >= start_date)
+                if end_date:
+                    events_query = events_query.filter(AnalyticsEvent.timestamp <= end_date)
+                event_counts = events_query.group_by(AnalyticsEvent.event_type).count()
+                return {
+                    'total_views': blog_views + case_study_views,
+                    'total_likes': blog_likes + case_study_likes,
+                    'blog_count': session.query(Blog).filter_by(username=username, deleted_at=None).count(),
+                    'case_study_count': session.query(CaseStudy).filter_by(username=username, deleted_at=None).count(),
+                    'event_counts': event_counts
+                }
         except SQLAlchemyError as e:
-            logger.error(f"Error removing like: {str(e)}")
-            return False
+            logger.error(f"Error retrieving analytics for {username}: {str(e)}")
+            return {}
 
-    def save_draft(self, username: str, content_type: str, content_id: Optional[str], data: Dict[str, Any]) -> str:
+    def delete_content(self, content_type: str, content_id: str) -> bool:
         """
-        Save a draft version of content.
+        Delete content by type and ID.
         Args:
-            username: User's username.
             content_type: Content type (blog/case_study).
-            content_id: Associated content ID.
-            data: Draft data.
+            content_id: Content ID.
         Returns:
-            str: Draft ID.
+            bool: True if deleted successfully, False otherwise.
+        """
+        deleted = self.delete_contents(content_type, [content_id])
+        if not deleted:
+            logger.error(f"Content {content_type}:{content_id} not deleted")
+        return deleted == 1
+
+    def delete_contents(self, content_type: str, content_ids: List[str]) -> int:
+        """
+        Delete several content items in one statement.
+        Items are hidden from every read immediately; their rows and dependent data are
+        removed later by purge_deleted_content.
+        Args:
+            content_type: Content type (blog/case_study).
+            content_ids: Content IDs.
+        Returns:
+            int: Number of content items deleted.
         """
-        draft_id = str(uuid.uuid4())
+        model = {'blog': Blog, 'case_study': CaseStudy}.get(content_type)
+        if model is None:
+            logger.error(f"Invalid content type: {content_type}")
+            return 0
+        if not content_ids:
+            return 0
         try:
             with self.session_factory() as session:
-                user = session.query(User).filter_by(username=username).first()
-                if not user:
-                    raise ValueError("User not found")
-                draft = Draft(
-                    id=draft_id,
-                    user_id=user.id,
-                    content_type=content_type,
-                    content_id=content_id,
-                    data=data
-                )
-                session.add(draft)
+                deleted = session.query(model).filter(model.id.in_(content_ids), model.deleted_at.is_(None)).update(
+                    {model.deleted_at: datetime.utcnow()}, synchronize_session=False)
                 session.commit()
-                logger.info(f"Draft {draft_id} saved by {username}")
-                return draft_id
+                logger.info(f"Deleted {deleted} {content_type} items")
+            if deleted:
+                self.schedule_related_refresh()
+            return deleted
         except SQLAlchemyError as e:
-            logger.error(f"Error saving draft: {str(e)}")
-            raise
+            logger.error(f"Error deleting {content_type} items: {str(e)}")
+            return 0
 
-    def get_drafts(self, username: str, content_type: str) -> List[Draft]:
+    def count_pending_purge(self) -> int:
         """
-        Retrieve drafts for a user.
-        Args:
-            username: User's username.
-            content_type: Content type (blog/case_study).
+        Count deleted content items that have not been purged yet.
         Returns:
-            List[Draft]: List of drafts.
+            int: Number of items awaiting purge.
         """
         try:
             with self.session_factory() as session:
-                user = session.query(User).filter_by(username=username).first()
-                if not user:
-                    return []
-                return session.query(Draft).filter_by(
-                    user_id=user.id, content_type=content_type
-                ).order_by(Draft.created_at.desc()).all()
+                return sum(session.query(func.count(model.id)).filter(model.deleted_at.isnot(None)).scalar() or 0
+                           for model in (Blog, CaseStudy))
         except SQLAlchemyError as e:
-            logger.error(f"Error retrieving drafts for {username}: {str(e)}")
-            return []
+            logger.error(f"Error counting deleted content: {str(e)}")
+            return 0
 
-    def notify_user(self, username: str, message: str, content_type: Optional[str] = None, content_id: Optional[str] = None) -> bool:
+    def purge_deleted_content(self, grace_period: timedelta = CONTENT_PURGE_GRACE_PERIOD,
+                              batch_size: int = CONTENT_PURGE_BATCH_SIZE, max_batches: Optional[int] = None) -> Dict[str, Any]:
         """
-        Send a notification to a user.
+        Permanently remove content deleted longer ago than the grace period.
+        Each batch removes up to batch_size items together with their tag associations, media,
+        comments, likes, drafts, notifications, analytics events, history, trending scores,
+        timeline entries and related posts in its own short transaction, pausing between batches
+        so interactive writers are not starved.
         Args:
-            username: Recipient's username.
-            message: Notification message.
-            content_type: Associated content type.
-            content_id: Associated content ID.
+            grace_period: Minimum time since deletion.
+            batch_size: Content items per transaction.
+            max_batches: Stop after this many batches (None for no limit).
         Returns:
-            bool: True if sent successfully, False otherwise.
+            Dict[str, Any]: Purge report with counts of purged items and rows removed per table.
         """
-        notification_id = str(uuid.uuid4())
+        started = time.monotonic()
+        cutoff = datetime.utcnow() - grace_period
+        report = {'purged': 0, 'batches': 0, 'rows': {}}
+        targets = [(Blog, 'blog', blog_tags, blog_tags.c.blog_id),
+                   (CaseStudy, 'case_study', case_study_tags, case_study_tags.c.case_study_id)]
         try:
-            with self.session_factory() as session:
-                user = session.query(User).filter_by(username=username).first()
-                if not user:
-                    logger.error(f"User {username} not found")
-                    return False
-                notification = Notification(
-                    id=notification_id,
-                    user_id=user.id,
-                    message=bleach.clean(message),
-                    content_type=content_type,
-                    content_id=content_id
-                )
-                session.add(notification)
-                session.commit()
-                logger.info(f"Notification {notification_id} sent to {username}")
-                return True
+            for model, content_type, association, key in targets:
+                while max_batches is None or report['batches'] < max_batches:
+                    with self.session_factory() as session:
+                        ids = session.scalars(select(model.id).where(model.deleted_at < cutoff).limit(batch_size)).all()
+                        if not ids:
+                            break
+                        draft_ids = select(Draft.id).where(Draft.content_type == content_type, Draft.content_id.in_(ids))
+                        statements = [
+                            ('draft_revisions', DraftRevision.__table__.delete().where(DraftRevision.draft_id.in_(draft_ids))),
+                            ('tag_links', association.delete().where(key.in_(ids)))
+                        ] + [
+                            (dependent.__tablename__, dependent.__table__.delete().where(
+                                dependent.content_type == content_type, dependent.content_id.in_(ids)))
+                            for dependent in (Draft, Comment, Like, Media, Notification, AnalyticsEvent, ContentRevision,
+                                              TrendingScore, TimelineEntry, RelatedContent)
+                        ] + [(model.__tablename__, model.__table__.delete().where(model.id.in_(ids)))]
+                        for name, statement in statements:
+                            removed = session.execute(statement).rowcount
+                            report['rows'][name] = report['rows'].get(name, 0) + removed
+                        session.commit()
+                    report['purged'] += len(ids)
+                    report['batches'] += 1
+                    time.sleep(CONTENT_PURGE_PAUSE)
         except SQLAlchemyError as e:
-            logger.error(f"Error sending notification to {username}: {str(e)}")
-            return False
+            logger.error(f"Error purging deleted content: {str(e)}")
+            report['error'] = str(e)
+        report['duration_seconds'] = round(time.monotonic() - started, 3)
+        if report['purged']:
+            logger.info(f"Purged {report['purged']} deleted content items in {report['batches']} batches")
+        return report
+
+
+def get_data_manager():
+    """
+    Instantiate DataManager with session factory.
+    Returns:
+        DataManager: Data manager instance.
+    """
+    return DataManager(Session)
+
+# Media Server
+
+
+def read_in_chunks(file, chunk_size: int):
+    """
+    Read a file-like object in fixed-size chunks.
+    Every chunk except the last is exactly chunk_size bytes, even if the reader returns short reads.
+    Args:
+        file: File-like object opened for binary reading.
+        chunk_size: Chunk size in bytes.
+    Yields:
+        bytes: File contents chunk by chunk.
+    """
+    buffer = b''
+    while True:
+        data = file.read(chunk_size - len(buffer))
+        if not data:
+            break
+        buffer += data
+        if len(buffer) == chunk_size:
+            yield buffer
+            buffer = b''
+    if buffer:
+        yield buffer
+
+
+def detect_media_type(header: bytes) -> Optional[str]:
+    """
+    Identify an upload as image or video from its leading magic bytes.
+    Args:
+        header: First bytes of the file.
+    Returns:
+        Optional[str]: 'image', 'video', or None if the format is not supported.
+    """
+    if header.startswith((b'\x89PNG\r\n\x1a\n', b'\xff\xd8\xff', b'GIF87a', b'GIF89a')):
+        return 'image'
+    if header[:4] == b'RIFF' and header[8:12] == b'WEBP':
+        return 'image'
+    if header[4:8] == b'ftyp' or header.startswith((b'\x1a\x45\xdf\xa3', b'OggS')):
+        return 'video'
+    return None
+
+
+def media_url(media_id: str, width: Optional[int] = None) -> str:
+    """
+    Build the URL the browser uses to fetch a media file.
+    Args:
+        media_id: Media ID.
+        width: Display width for images; the server returns a resized copy when set.
+    Returns:
+        str: Media URL.
+    """
+    url = f"{MEDIA_BASE_URL}/media/{urllib.parse.quote(media_id)}"
+    return f"{url}?w={width}" if width else url
+
+
+def render_display_image(data: bytes, width: int) -> Tuple[bytes, str]:
+    """
+    Decode an image and re-encode it at a display width.
+    Images are only ever scaled down; animated GIFs are returned unchanged.
+    Args:
+        data: Original image bytes.
+        width: Target width in pixels.
+    Returns:
+        Tuple[bytes, str]: Encoded image bytes and MIME type.
+    """
+    from PIL import Image
+
+    img = Image.open(io.BytesIO(data))
+    if img.format == 'GIF' and getattr(img, 'is_animated', False):
+        return data, 'image/gif'
+    if img.width > width:
+        height = max(1, round(img.height * width / img.width))
+        img.draft('RGB', (width, height))
+        img = img.resize((width, height), Image.LANCZOS)
+    output = io.BytesIO()
+    if img.mode in ('RGBA', 'LA', 'P'):
+        img.save(output, format='PNG', optimize=True)
+        return output.getvalue(), 'image/png'
+    img.convert('RGB').save(output, format='JPEG', quality=85, optimize=True)
+    return output.getvalue(), 'image/jpeg'
+
+
+class ImageCache:
+    """
+    Process-wide, memory-bounded LRU cache of display-ready image bytes keyed by media ID and width.
+    """
+
+    def __init__(self, max_bytes: int = IMAGE_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, media_id: str, width: int) -> Optional[Tuple[bytes, str]]:
+        """
+        Look up a cached image and mark it as recently used.
+        Args:
+            media_id: Media ID.
+            width: Display width.
+        Returns:
+            Optional[Tuple[bytes, str]]: Image bytes and MIME type, or None on a miss.
+        """
+        with self._lock:
+            entry = self._entries.get((media_id, width))
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end((media_id, width))
+            self.hits += 1
+            return entry
+
+    def put(self, media_id: str, width: int, data: bytes, mime_type: str) -> None:
+        """
+        Store an image, evicting least recently used entries to stay within the memory bound.
+        Args:
+            media_id: Media ID.
+            width: Display width.
+            data: Image bytes.
+            mime_type: Image MIME type.
+        """
+        if len(data) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop((media_id, width), None)
+            if previous:
+                self.current_bytes -= len(previous[0])
+            self._entries[(media_id, width)] = (data, mime_type)
+            self.current_bytes += len(data)
+            while self.current_bytes > self.max_bytes:
+                _, (evicted, _) = self._entries.popitem(last=False)
+                self.current_bytes -= len(evicted)
+                self.evictions += 1
+
+    def get_or_render(self, dm: 'DataManager', media_id: str, width: int) -> Optional[Tuple[bytes, str]]:
+        """
+        Return a display-ready image, decoding and resizing it on a cache miss.
+        Args:
+            dm: Data manager used to read the original image.
+            media_id: Media ID.
+            width: Display width.
+        Returns:
+            Optional[Tuple[bytes, str]]: Image bytes and MIME type, or None if the media is not an image.
+        """
+        width = max(1, min(width, IMAGE_MAX_DISPLAY_WIDTH))
+        entry = self.get(media_id, width)
+        if entry is not None:
+            return entry
+        info = dm.get_media_info(media_id)
+        if not info or info['type'] != 'image':
+            return None
+        entry = render_display_image(dm.read_media_range(media_id, 0, info['size'] - 1), width)
+        self.put(media_id, width, *entry)
+        return entry
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Report cache counters.
+        Returns:
+            Dict[str, int]: Hits, misses, evictions, entry count and bytes used.
+        """
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'entries': len(self._entries),
+                'bytes': self.current_bytes,
+                'max_bytes': self.max_bytes
+            }
+
+
+@st.cache_resource
+def get_image_cache() -> ImageCache:
+    """
+    Return the process-wide image cache.
+    Returns:
+        ImageCache: Shared image cache instance.
+    """
+    return ImageCache()
+
+
+def parse_byte_range(range_header: str, size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single-range HTTP Range header.
+    Args:
+        range_header: Value of the Range header, e.g. "bytes=0-1023".
+        size: Total size of the resource in bytes.
+    Returns:
+        Optional[Tuple[int, int]]: Inclusive (start, end) offsets, or None if unsatisfiable.
+    Raises:
+        ValueError: If the header is not a single byte range and should be ignored.
+    """
+    match = re.fullmatch(r"\s*bytes\s*=\s*(\d*)\s*-\s*(\d*)\s*", range_header)
+    if not match or match.group(1) == match.group(2) == '':
+        raise ValueError(f"Unsupported range: {range_header}")
+    first, last = match.groups()
+    if first == '':
+        suffix = int(last)
+        if suffix == 0 or size == 0:
+            return None
+        return max(size - suffix, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        return None
+    return start, end
+
+
+class MediaRequestHandler(BaseHTTPRequestHandler):
+    """
+    Serves public media blobs by ID with HTTP Range, ETag/Last-Modified and long-lived cache headers.
+    Media that is not public answers 404, like an unknown ID.
+    """
+    protocol_version = "HTTP/1.1"
+
+    def do_HEAD(self):
+        self._serve_media(head_only=True)
+
+    def do_GET(self):
+        self._serve_media()
+
+    def log_message(self, format, *args):
+        logger.debug(f"Media server {self.address_string()}: {format % args}")
+
+    def _send_empty(self, status: int, headers: Dict[str, str]) -> None:
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def _serve_media(self, head_only: bool = False) -> None:
+        parsed = urllib.parse.urlparse(self.path)
+        match = re.fullmatch(r"/media/([A-Za-z0-9\-]{1,64})", parsed.path)
+        if not match:
+            self._send_empty(404, {})
+            return
+        media_id = match.group(1)
+        dm = self.server.data_manager
+        info = dm.get_media_info(media_id)
+        if not info or not dm.is_media_public(media_id):
+            self._send_empty(404, {})
+            return
+
+        body = None
+        content_type = mimetypes.guess_type(info['filename'])[0] or (
+            "video/mp4" if info['type'] == 'video' else "application/octet-stream")
+        width = urllib.parse.parse_qs(parsed.query).get('w', [''])[0]
+        if width.isdigit() and int(width) > 0 and info['type'] == 'image':
+            try:
+                rendered = self.server.image_cache.get_or_render(dm, media_id, int(width))
+            except (OSError, ValueError) as e:
+                logger.error(f"Error resizing media {media_id}: {str(e)}")
+                rendered = None
+            if rendered:
+                body, content_type = rendered
+                info = {**info, 'size': len(body), 'etag': f'{info["etag"][:-1]}-w{width}"'}
+
+        cache_headers = {
+            "ETag": info['etag'],
+            "Last-Modified": formatdate(info['uploaded_at'].timestamp(), usegmt=True),
+            "Cache-Control": f"public, max-age={MEDIA_CACHE_MAX_AGE}, immutable",
+        }
+        if_none_match = self.headers.get("If-None-Match")
+        if_modified_since = self.headers.get("If-Modified-Since")
+        not_modified = False
+        if if_none_match:
+            not_modified = if_none_match.strip() == "*" or info['etag'] in [
+                tag.strip() for tag in if_none_match.split(",")]
+        elif if_modified_since:
+            try:
+                since = parsedate_to_datetime(if_modified_since).replace(tzinfo=None)
+                not_modified = info['uploaded_at'].replace(microsecond=0) <= since
+            except (TypeError, ValueError):
+                not_modified = False
+        if not_modified:
+            self._send_empty(304, cache_headers)
+            return
+
+        size = info['size']
+        start, end, status = 0, size - 1, 200
+        range_header = self.headers.get("Range")
+        if_range = self.headers.get("If-Range")
+        if range_header and (not if_range or if_range.strip() == info['etag']):
+            try:
+                byte_range = parse_byte_range(range_header, size)
+                if byte_range is None:
+                    self._send_empty(416, {**cache_headers, "Content-Range": f"bytes */{size}"})
+                    return
+                start, end = byte_range
+                status = 206
+            except ValueError:
+                pass
+
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(end - start + 1))
+        self.send_header("Accept-Ranges", "bytes")
+        for name, value in cache_headers.items():
+            self.send_header(name, value)
+        if status == 206:
+            self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+        self.end_headers()
+        if head_only:
+            return
+        try:
+            if body is not None:
+                self.wfile.write(body[start:end + 1])
+                return
+            for chunk in dm.iter_media_bytes(media_id, start, end):
+                self.wfile.write(chunk)
+        except (BrokenPipeError, ConnectionResetError):
+            logger.debug(f"Client closed connection while streaming media {media_id}")
+        except (SQLAlchemyError, ValueError) as e:
+            logger.error(f"Error streaming media {media_id}: {str(e)}")
+            self.close_connection = True
+
+
+@st.cache_resource
+def start_media_server() -> Optional[ThreadingHTTPServer]:
+    """
+    Start the media server in a background thread, once per process.
+    Returns:
+        Optional[ThreadingHTTPServer]: Running server, or None if the port could not be bound.
+    """
+    try:
+        server = ThreadingHTTPServer((MEDIA_SERVER_HOST, MEDIA_SERVER_PORT), MediaRequestHandler)
+    except OSError as e:
+        logger.error(f"Could not start media server on {MEDIA_SERVER_HOST}:{MEDIA_SERVER_PORT}: {str(e)}")
+        return None
+    server.daemon_threads = True
+    server.data_manager = get_data_manager()
+    server.image_cache = get_image_cache()
+    threading.Thread(target=server.serve_forever, name="media-server", daemon=True).start()
+    logger.info(f"Media server listening on {MEDIA_SERVER_HOST}:{MEDIA_SERVER_PORT}")
+    return server
+
+
+class PeriodicTask:
+    """
+    Runs a maintenance task periodically in a background thread and keeps its last report.
+    """
 
-    def notify_followers(self, username: str, content_type: str, content_id: str, message: str) -> None:
+    def __init__(self, name: str, task, interval: int):
+        self.name = name
+        self.task = task
+        self.interval = interval
+        self.last_report: Optional[Dict[str, Any]] = None
+        self.last_run: Optional[datetime] = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def run_once(self, **kwargs) -> Dict[str, Any]:
         """
-        Notify followers of new content.
+        Run the task once, skipping it if a run is already in progress.
         Args:
-            username: Content creator's username.
-            content_type: Content type.
-            content_id: Content ID.
-            message: Notification message.
+            **kwargs: Passed to the task.
+        Returns:
+            Dict[str, Any]: Task report.
         """
+        if not self._lock.acquire(blocking=False):
+            return {'skipped': f'{self.name} already running'}
         try:
-            with self.session_factory() as session:
-                followers = session.query(User).filter(
-                    User.profile.contains({'following': [username]})
-                ).all()
-                for follower in followers:
-                    self.notify_user(follower.username, message, content_type, content_id)
-        except SQLAlchemyError as e:
-            logger.error(f"Error notifying followers for {username}: {str(e)}")
+            report = self.task(**kwargs)
+            self.last_report, self.last_run = report, datetime.utcnow()
+            return report
+        finally:
+            self._lock.release()
 
-    def get_notifications(self, username: str, unread_only: bool = False) -> List[Notification]:
+    def start(self) -> None:
         """
-        Retrieve user notifications.
-        Args:
-            username: User's username.
-            unread_only: Filter for unread notifications.
-        Returns:
-            List[Notification]: List of notifications.
+        Start the background loop.
         """
-        try:
-            with self.session_factory() as session:
-                user = session.query(User).filter_by(username=username).first()
-                if not user:
-                    return []
-                query = session.query(Notification).filter_by(user_id=user.id)
-                if unread_only:
-                    query = query.filter_by(is_read=False)
-                return query.order_by(Notification.created_at.desc()).all()
-        except SQLAlchemyError as e:
-            logger.error(f"Error retrieving notifications for {username}: {str(e)}")
-            return []
+        threading.Thread(target=self._run, name=self.name, daemon=True).start()
 
-    def mark_notification_read(self, notification_id: str) -> bool:
+    def stop(self) -> None:
         """
-        Mark a notification as read.
-        Args:
-            notification_id: Notification ID.
-        Returns:
-            bool: True if marked successfully, False otherwise.
+        Stop the background loop.
         """
+        self._stop.set()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.run_once()
+
+
+@st.cache_resource
+def start_media_collector() -> PeriodicTask:
+    """
+    Start the orphaned media collector in a background thread, once per process.
+    Returns:
+        PeriodicTask: Running collector.
+    """
+    collector = PeriodicTask("media-gc", get_data_manager().collect_orphaned_media, MEDIA_GC_INTERVAL)
+    collector.start()
+    logger.info(f"Media garbage collector running every {MEDIA_GC_INTERVAL}s")
+    return collector
+
+
+@st.cache_resource
+def start_content_purger() -> PeriodicTask:
+    """
+    Start the deleted content purger in a background thread, once per process.
+    Returns:
+        PeriodicTask: Running purger.
+    """
+    purger = PeriodicTask("content-purge", get_data_manager().purge_deleted_content, CONTENT_PURGE_INTERVAL)
+    purger.start()
+    logger.info(f"Content purger running every {CONTENT_PURGE_INTERVAL}s")
+    return purger
+
+
+@st.cache_resource
+def start_trending_renormalizer() -> PeriodicTask:
+    """
+    Start the trending score renormalizer in a background thread, once per process.
+    Returns:
+        PeriodicTask: Running renormalizer.
+    """
+    renormalizer = PeriodicTask("trending-renormalize", get_data_manager().renormalize_trending, TRENDING_RENORMALIZE_INTERVAL)
+    renormalizer.start()
+    logger.info(f"Trending renormalizer running every {TRENDING_RENORMALIZE_INTERVAL}s")
+    return renormalizer
+
+
+def process_pool_target(name: str):
+    """
+    Resolve a module-level function so it can be sent to a worker process.
+    Under `streamlit run` this file executes as __main__, whose functions cannot be pickled
+    by reference, so workers are handed the function from the importable module instead.
+    Args:
+        name: Function name.
+    Returns:
+        Callable: The function as defined in the blog_platform module.
+    """
+    return getattr(importlib.import_module('blog_platform'), name)
+
+
+def create_process_pool(workers: int) -> ProcessPoolExecutor:
+    """
+    Create a worker process pool.
+    Workers are spawned rather than forked because the app process runs server threads.
+    Args:
+        workers: Number of worker processes.
+    Returns:
+        ProcessPoolExecutor: New pool.
+    """
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+
+
+def render_content_pdf(content_type: str, content_id: str, template: str, output_path: str) -> str:
+    """
+    Render a blog or case study to a PDF file.
+    Runs inside a PDF export worker process; images are read from the media store and
+    downscaled to print resolution. The file is written atomically.
+    Args:
+        content_type: Content type (blog/case_study).
+        content_id: Content ID.
+        template: Key of PDF_TEMPLATES.
+        output_path: Destination file path.
+    Returns:
+        str: Path of the rendered PDF.
+    """
+    from PIL import Image
+    from reportlab.lib import pagesizes
+    from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+    from reportlab.platypus import Image as PdfImage, Paragraph, SimpleDocTemplate, Spacer
+
+    settings = PDF_TEMPLATES[template]
+    dm = get_data_manager()
+    content = dm.get_content_by_id(content_type, content_id)
+    if not content:
+        raise ValueError(f"Content {content_type}:{content_id} not found")
+
+    styles = getSampleStyleSheet()
+    font = PDF_FONTS.get(content.font, 'Helvetica')
+    body_style = ParagraphStyle('Body', parent=styles['BodyText'], fontName=font,
+                                fontSize=settings['font_size'], leading=settings['font_size'] * 1.4)
+    meta_style = ParagraphStyle('Meta', parent=body_style, textColor='#666666')
+    pagesize = getattr(pagesizes, settings['pagesize'])
+    frame_width = pagesize[0] - 2 * settings['margin']
+
+    def paragraphs(text: str) -> List[Any]:
+        markup = bleach.clean(text or '', tags={'b', 'i', 'u', 'a'}, attributes={'a': ['href']}, strip=True)
+        return [Paragraph(block.strip().replace('\n', '<br/>'), body_style)
+                for block in re.split(r'\n\s*\n', markup) if block.strip()]
+
+    story = [
+        Paragraph(content.title, styles['Title']),
+        Paragraph(f"By {content.username} | {content.created_at.strftime('%Y-%m-%d')}", meta_style),
+        Spacer(1, 12)
+    ]
+    if content_type == 'blog':
+        story.extend(paragraphs(content.content))
+    else:
+        for heading, text_value in [('Problem', content.problem), ('Solution', content.solution), ('Results', content.results)]:
+            story.append(Paragraph(heading, styles['Heading2']))
+            story.extend(paragraphs(text_value))
+
+    image_width = frame_width * settings['image_scale']
+    for media_id in content.media or []:
+        info = dm.get_media_info(media_id)
+        if not info or info['type'] != 'image':
+            continue
         try:
-            with self.session_factory() as session:
-                notification = session.query(Notification).filter_by(id=notification_id).first()
-                if not notification:
-                    logger.error(f"Notification {notification_id} not found")
-                    return False
-                notification.is_read = True
-                session.commit()
-                logger.info(f"Notification {notification_id} marked as read")
-                return True
-        except SQLAlchemyError as e:
-            logger.error(f"Error marking notification {notification_id} as read: {str(e)}")
-            return False
+            data, _ = render_display_image(dm.read_media_range(media_id, 0, info['size'] - 1),
+                                           int(image_width / 72 * PDF_IMAGE_DPI))
+            pixel_width, pixel_height = Image.open(io.BytesIO(data)).size
+            story.append(Spacer(1, 12))
+            story.append(PdfImage(io.BytesIO(data), width=image_width,
+                                  height=image_width * pixel_height / pixel_width))
+        except (OSError, ValueError) as e:
+            logger.error(f"Skipping image {media_id} in PDF for {content_type}:{content_id}: {str(e)}")
+
+    if content.tags:
+        story.append(Spacer(1, 12))
+        story.append(Paragraph("Tags: " + ", ".join(content.tags), meta_style))
+
+    tmp_path = f"{output_path}.{os.getpid()}.tmp"
+    SimpleDocTemplate(tmp_path, pagesize=pagesize, title=content.title, author=content.username,
+                      leftMargin=settings['margin'], rightMargin=settings['margin'],
+                      topMargin=settings['margin'], bottomMargin=settings['margin']).build(story)
+    os.replace(tmp_path, output_path)
+    return output_path
+
+
+class PdfExporter:
+    """
+    Renders PDFs on a worker process pool and caches finished files.
+    Files are keyed by (content ID, updated_at, template), so edits produce a new file
+    and repeat downloads of an unchanged item are served straight from disk.
+    """
 
-    def log_analytics_event(self, username: Optional[str], event_type: str, content_type: Optional[str] = None, content_id: Optional[str] = None, metadataa: Dict[str, Any] = None) -> bool:
+    def __init__(self, cache_dir: Path = PDF_CACHE_DIR, workers: int = PDF_EXPORT_WORKERS):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.workers = workers
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pending: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def cache_path(self, content_type: str, content_id: str, updated_at: Optional[datetime], template: str) -> Path:
         """
-        Log an analytics event.
+        Compute the cache file for a content version and template.
         Args:
-            username: User's username, if authenticated.
-            event_type: Type of event (e.g., view, click).
-            content_type: Associated content type.
-            content_id: Associated content ID.
-            metadataa: Additional event data.
+            content_type: Content type (blog/case_study).
+            content_id: Content ID.
+            updated_at: Content last-modified time.
+            template: Key of PDF_TEMPLATES.
         Returns:
-            bool: True if logged successfully, False otherwise.
+            Path: Cache file path.
         """
-        event_id = str(uuid.uuid4())
-        try:
-            with self.session_factory() as session:
-                user = session.query(User).filter_by(username=username).first() if username else None
-                event = AnalyticsEvent(
-                    id=event_id,
-                    user_id=user.id if user else None,
-                    event_type=event_type,
-                    content_type=content_type,
-                    content_id=content_id,
-                    metadataa=metadataa or {}
-                )
-                session.add(event)
-                session.commit()
-                logger.info(f"Analytics event {event_id} logged")
-                return True
-        except SQLAlchemyError as e:
-            logger.error(f"Error logging analytics event: {str(e)}")
-            return False
+        version = updated_at.isoformat() if updated_at else ''
+        key = hashlib.sha256(f"{content_type}:{content_id}:{version}:{template}".encode('utf-8')).hexdigest()
+        return self.cache_dir / f"{key}.pdf"
 
-    def get_content_by_id(self, content_type: str, content_id: str) -> Optional[Any]:
+    def export(self, content_type: str, content_id: str, template: str = 'standard') -> Dict[str, Any]:
         """
-        Retrieve content by type and ID.
+        Return a cached PDF or schedule its rendering.
         Args:
             content_type: Content type (blog/case_study).
             content_id: Content ID.
+            template: Key of PDF_TEMPLATES.
         Returns:
-            Optional[Any]: Content object or None.
+            Dict[str, Any]: 'status' of ready/pending/failed, with 'path' when ready or 'error' when failed.
         """
+        if template not in PDF_TEMPLATES:
+            return {'status': 'failed', 'error': f"Unknown template: {template}"}
+        content = get_data_manager().get_content_by_id(content_type, content_id)
+        if not content:
+            return {'status': 'failed', 'error': "Content not found"}
+        path = self.cache_path(content_type, content_id, content.updated_at, template)
+        if path.exists():
+            path.touch()
+            return {'status': 'ready', 'path': path}
+
+        with self._lock:
+            future = self._pending.get(path.name)
+            if future is None:
+                future = self._submit(content_type, content_id, template, str(path))
+                self._pending[path.name] = future
+        if not future.done():
+            return {'status': 'pending'}
+        with self._lock:
+            self._pending.pop(path.name, None)
         try:
-            with self.session_factory() as session:
-                if content_type == 'blog':
-                    return session.query(Blog).filter_by(id=content_id).first()
-                elif content_type == 'case_study':
-                    return session.query(CaseStudy).filter_by(id=content_id).first()
-                logger.error(f"Invalid content type: {content_type}")
-                return None
-        except SQLAlchemyError as e:
-            logger.error(f"Error retrieving content {content_type}:{content_id}: {str(e)}")
-            return None
+            future.result()
+        except Exception as e:
+            logger.error(f"PDF export failed for {content_type}:{content_id}: {str(e)}")
+            return {'status': 'failed', 'error': str(e)}
+        self.prune_cache()
+        return {'status': 'ready', 'path': path}
 
-    def get_user_content(self, username: str, content_type: Optional[str] = None) -> List[Any]:
+    def prune_cache(self, max_bytes: int = PDF_CACHE_MAX_BYTES) -> None:
         """
-        Retrieve all content by user and type.
+        Delete least recently used cached PDFs until the cache fits its size limit.
         Args:
-            username: User's username.
-            content_type: Content type (blog/case_study, or None for all).
+            max_bytes: Cache size limit.
+        """
+        files = sorted(self.cache_dir.glob("*.pdf"), key=lambda f: f.stat().st_mtime)
+        total = sum(f.stat().st_size for f in files)
+        for cached in files:
+            if total <= max_bytes:
+                break
+            total -= cached.stat().st_size
+            cached.unlink(missing_ok=True)
+
+    def _submit(self, *args) -> Future:
+        worker = process_pool_target('render_content_pdf')
+        try:
+            return self._get_pool().submit(worker, *args)
+        except BrokenProcessPool:
+            self._pool = None
+            return self._get_pool().submit(worker, *args)
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = create_process_pool(self.workers)
+        return self._pool
+
+
+@st.cache_resource
+def get_pdf_exporter() -> PdfExporter:
+    """
+    Return the process-wide PDF exporter.
+    Returns:
+        PdfExporter: Shared exporter instance.
+    """
+    return PdfExporter()
+
+# Account Export
+
+
+def export_json_default(value: Any) -> Any:
+    """
+    Serialise values the json module does not handle natively.
+    Args:
+        value: Value to serialise.
+    Returns:
+        Any: JSON-compatible representation.
+    """
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, bytes):
+        return base64.b64encode(value).decode('ascii')
+    raise TypeError(f"Cannot serialise {type(value).__name__}")
+
+
+class AccountExporter:
+    """
+    Streams everything a user owns into a ZIP archive of JSONL files plus raw media.
+    Rows are read in keyset-ordered parts through server-side cursors (yield_per), and
+    media is copied in chunks, so memory use does not grow with the account. After each
+    part the archive is closed and a checkpoint recording its central directory is saved
+    next to it; an interrupted export puts that directory back, dropping whatever the
+    interrupted part wrote over it, and resumes from the last completed part. Reopening the archive for each part reads and
+    rewrites its central directory, a cost proportional to the entries written so far, so
+    larger parts trade resume granularity for fewer rewrites.
+    """
+
+    def __init__(self, dm: 'DataManager', username: str, output_path: Path,
+                 batch_size: int = EXPORT_BATCH_SIZE, part_rows: int = EXPORT_PART_ROWS,
+                 media_per_part: int = EXPORT_MEDIA_PER_PART):
+        self.dm = dm
+        self.username = username
+        self.output_path = Path(output_path)
+        self.checkpoint_path = self.output_path.with_name(self.output_path.name + '.checkpoint.json')
+        self.batch_size = batch_size
+        self.part_rows = part_rows
+        self.media_per_part = media_per_part
+
+    def run(self, resume: bool = True, progress_callback=None) -> Dict[str, Any]:
+        """
+        Write the archive, resuming from a checkpoint when one exists.
+        Args:
+            resume: Continue an interrupted export instead of starting over.
+            progress_callback: Optional callable receiving (section, rows_or_files_so_far).
         Returns:
-            List[Any]: List of content objects.
+            Dict[str, Any]: Export manifest with per-section counts.
+        Raises:
+            ValueError: If the user does not exist.
+            zipfile.BadZipFile: If the finished archive lacks a part the checkpoint recorded; the
+                checkpoint is removed so the next run starts over.
         """
+        with self.dm.session_factory() as session:
+            user = session.query(User).filter_by(username=self.username).first()
+            if not user:
+                raise ValueError(f"User {self.username} not found")
+            user_id = user.id
+            profile = {
+                'id': user.id, 'username': user.username, 'email': user.email, 'profile': user.profile or {},
+                'created_at': user.created_at, 'is_active': user.is_active, 'last_login': user.last_login
+            }
+
+        state = self._load_checkpoint() if resume else None
+        if state:
+            # A part interrupted mid-write has overwritten the central directory; restore it.
+            with open(self.output_path, 'r+b') as f:
+                f.seek(state['start_dir'])
+                f.write(base64.b64decode(state['central_directory']))
+                f.truncate()
+            logger.info(f"Resuming export of {self.username} from {self.checkpoint_path}")
+        else:
+            self.output_path.parent.mkdir(parents=True, exist_ok=True)
+            self.output_path.unlink(missing_ok=True)
+            state = {'username': self.username, 'started_at': datetime.utcnow().isoformat(), 'sections': {}}
+            with zipfile.ZipFile(self.output_path, 'w', compression=zipfile.ZIP_DEFLATED) as zf:
+                zf.writestr('profile.json', json.dumps(profile, default=export_json_default, indent=2))
+            self._save_checkpoint(state)
+
+        for name, model, criterion in self._sections(user_id):
+            section = state['sections'].setdefault(name, {'last_key': None, 'parts': 0, 'rows': 0, 'done': False})
+            while not section['done']:
+                self._write_part(name, model, criterion, section)
+                self._save_checkpoint(state)
+                if progress_callback:
+                    progress_callback(name, section['rows'])
+
+        files = state['sections'].setdefault('media_files', {'last_key': None, 'files': 0, 'bytes': 0, 'done': False})
+        while not files['done']:
+            self._write_media_part(user_id, files)
+            self._save_checkpoint(state)
+            if progress_callback:
+                progress_callback('media_files', files['files'])
+
+        manifest = {
+            'username': self.username,
+            'started_at': state['started_at'],
+            'completed_at': datetime.utcnow().isoformat(),
+            'sections': {name: {k: v for k, v in section.items() if k not in ('last_key', 'done')}
+                         for name, section in state['sections'].items()}
+        }
+        self._verify(state)
+        with zipfile.ZipFile(self.output_path, 'a', compression=zipfile.ZIP_DEFLATED) as zf:
+            zf.writestr('manifest.json', json.dumps(manifest, indent=2))
+        self.checkpoint_path.unlink(missing_ok=True)
+        logger.info(f"Exported account {self.username} to {self.output_path}")
+        return manifest
+
+    def _sections(self, user_id: int) -> List[Tuple[str, Any, Any]]:
+        return [
+            ('blogs', Blog, and_(Blog.user_id == user_id, Blog.deleted_at.is_(None))),
+            ('case_studies', CaseStudy, and_(CaseStudy.user_id == user_id, CaseStudy.deleted_at.is_(None))),
+            ('drafts', Draft, Draft.user_id == user_id),
+            ('comments', Comment, Comment.user_id == user_id),
+            ('likes', Like, Like.user_id == user_id),
+            ('media', Media, Media.user_id == user_id),
+            ('analytics_events', AnalyticsEvent, AnalyticsEvent.user_id == user_id),
+        ]
+
+    def _write_part(self, name: str, model: Any, criterion: Any, section: Dict[str, Any]) -> None:
+        # Media rows are exported as metadata; the raw files go under media/ separately.
+        columns = [c for c in model.__table__.columns if not (model is Media and c.name == 'content')]
+        stmt = select(*columns).where(criterion).order_by(model.id).limit(self.part_rows)
+        if section['last_key'] is not None:
+            stmt = stmt.where(model.id > section['last_key'])
+
+        with self.dm.session_factory() as session:
+            rows = iter(session.execute(stmt.execution_options(yield_per=self.batch_size)).mappings())
+            first = next(rows, None)
+            if first is None:
+                section['done'] = True
+                return
+            count = 0
+            with zipfile.ZipFile(self.output_path, 'a', compression=zipfile.ZIP_DEFLATED) as zf:
+                with zf.open(f"{name}/part-{section['parts'] + 1:05d}.jsonl", 'w', force_zip64=True) as entry:
+                    row = first
+                    while row is not None:
+                        entry.write((json.dumps(dict(row), default=export_json_default) + '\n').encode('utf-8'))
+                        count += 1
+                        section['last_key'] = row['id']
+                        row = next(rows, None)
+        section['parts'] += 1
+        section['rows'] += count
+        section['done'] = count < self.part_rows
+
+    def _write_media_part(self, user_id: int, files: Dict[str, Any]) -> None:
+        with self.dm.session_factory() as session:
+            query = session.query(Media.id, Media.filename).filter(Media.user_id == user_id)
+            if files['last_key'] is not None:
+                query = query.filter(Media.id > files['last_key'])
+            batch = query.order_by(Media.id).limit(self.media_per_part).all()
+        if not batch:
+            files['done'] = True
+            return
+
+        with zipfile.ZipFile(self.output_path, 'a') as zf:
+            for media_id, filename in batch:
+                info = self.dm.get_media_info(media_id)
+                if info and info['size']:
+                    # Images and video are already compressed, so store them as-is.
+                    entry = zipfile.ZipInfo(f"media/{media_id}/{Path(filename).name or 'file'}",
+                                            date_time=max(info['uploaded_at'], datetime(1980, 1, 1)).timetuple()[:6])
+                    entry.compress_type = zipfile.ZIP_STORED
+                    with zf.open(entry, 'w', force_zip64=True) as f:
+                        for chunk in self.dm.iter_media_bytes(media_id, 0, info['size'] - 1):
+                            f.write(chunk)
+                    files['files'] += 1
+                    files['bytes'] += info['size']
+                files['last_key'] = media_id
+        files['done'] = len(batch) < self.media_per_part
+
+    def _verify(self, state: Dict[str, Any]) -> None:
+        # Every part and media file the checkpoint counted must be in the archive.
+        with zipfile.ZipFile(self.output_path) as zf:
+            names = set(zf.namelist())
+        expected = {'profile.json'} | {f"{name}/part-{part:05d}.jsonl" for name, section in state['sections'].items()
+                                       for part in range(1, section.get('parts', 0) + 1)}
+        missing = sorted(expected - names)
+        media_files = sum(1 for name in names if name.startswith('media/'))
+        if missing or media_files != state['sections'].get('media_files', {}).get('files', 0):
+            self.checkpoint_path.unlink(missing_ok=True)
+            raise zipfile.BadZipFile(f"Export archive {self.output_path} is incomplete: missing {missing}, "
+                                     f"{media_files} media files")
+
+    def _load_checkpoint(self) -> Optional[Dict[str, Any]]:
+        if not (self.checkpoint_path.exists() and self.output_path.exists()):
+            return None
+        with open(self.checkpoint_path) as f:
+            state = json.load(f)
+        # Checkpoints without a saved central directory cannot be resumed safely.
+        return state if state.get('username') == self.username and 'central_directory' in state else None
+
+    def _save_checkpoint(self, state: Dict[str, Any]) -> None:
+        with zipfile.ZipFile(self.output_path) as zf:
+            state['start_dir'] = zf.start_dir
+        with open(self.output_path, 'rb') as f:
+            f.seek(state['start_dir'])
+            state['central_directory'] = base64.b64encode(f.read()).decode('ascii')
+        tmp_path = self.checkpoint_path.with_name(self.checkpoint_path.name + '.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(state, f)
+        os.replace(tmp_path, self.checkpoint_path)
+
+# Bulk Import
+
+
+def iter_batches(iterable, size: int):
+    """
+    Group an iterable into lists of at most size items.
+    Args:
+        iterable: Items to group.
+        size: Maximum batch size.
+    Yields:
+        list: Consecutive batches.
+    """
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def parse_markdown_document(document: str, default_title: str) -> Dict[str, Any]:
+    """
+    Turn a Markdown document into an import record.
+    Optional front matter between leading '---' lines supplies `key: value` fields
+    (title, author, tags, date, type, font, published); without a title, the first
+    '# ' heading is used.
+    Args:
+        document: Markdown source.
+        default_title: Title used when the document has none.
+    Returns:
+        Dict[str, Any]: Import record.
+    """
+    fields = {}
+    body = document
+    if document.startswith('---'):
+        header, separator, rest = document[3:].partition('\n---')
+        if separator:
+            for line in header.splitlines():
+                key, colon, value = line.partition(':')
+                if colon:
+                    fields[key.strip().lower()] = value.strip().strip('"\'')
+            body = rest.split('\n', 1)[1] if '\n' in rest else ''
+    if 'title' not in fields:
+        heading = re.match(r'\s*#\s+(.+)\n', body)
+        if heading:
+            fields['title'] = heading.group(1).strip()
+            body = body[heading.end():]
+    record = {
+        'type': fields.get('type', 'blog'),
+        'title': fields.get('title', default_title),
+        'content': body.strip(),
+        'tags': fields.get('tags', '').strip('[]'),
+        'username': fields.get('author') or fields.get('username'),
+        'created_at': fields.get('date'),
+        'font': fields.get('font')
+    }
+    if 'published' in fields:
+        record['is_published'] = fields['published'].lower() not in ('false', 'no', '0')
+    return record
+
+
+def iter_import_records(paths: List[str], default_username: Optional[str] = None):
+    """
+    Stream import records from JSONL files and Markdown files or directories.
+    Args:
+        paths: Files or directories to read; directories are searched recursively.
+        default_username: Author for records that do not name one.
+    Yields:
+        Tuple[str, Dict[str, Any]]: Record source (file and line) and raw record.
+    """
+    for path in map(Path, paths):
+        files = sorted(f for f in path.rglob('*') if f.suffix in ('.jsonl', '.md', '.markdown')) if path.is_dir() else [path]
+        for file in files:
+            if file.suffix == '.jsonl':
+                with open(file, encoding='utf-8') as f:
+                    for line_number, line in enumerate(f, 1):
+                        if not line.strip():
+                            continue
+                        source = f"{file}:{line_number}"
+                        try:
+                            record = json.loads(line)
+                        except json.JSONDecodeError as e:
+                            yield source, {'_error': f"Invalid JSON: {e.msg}"}
+                            continue
+                        if not isinstance(record, dict):
+                            yield source, {'_error': "Record is not an object"}
+                            continue
+                        record.setdefault('username', default_username)
+                        yield source, record
+            else:
+                record = parse_markdown_document(file.read_text(encoding='utf-8'), file.stem)
+                record['username'] = record['username'] or default_username
+                yield str(file), record
+
+
+def prepare_import_records(items: List[Tuple[str, Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """
+    Validate and sanitise raw import records. Runs in bulk import worker processes.
+    Args:
+        items: (source, raw record) pairs.
+    Returns:
+        List[Dict[str, Any]]: Per record, either an 'error' or the content 'type', author
+            'username', cleaned 'tags' and table 'row' (without user_id).
+    """
+    prepared = []
+    for source, record in items:
         try:
-            with self.session_factory() as session:
-                if content_type == 'blog':
-                    return session.query(Blog).filter_by(username=username).all()
-                elif content_type == 'case_study':
-                    return session.query(CaseStudy).filter_by(username=username).all()
-                elif content_type or content_type == 'all':
-                    blogs = session.query(Blog).filter_by(username=username).all()
-                    case_studies = session.query(CaseStudy).filter_by(username=username).all()
-                    return blogs + case_studies
-                return []
-        except SQLAlchemyError as e:
-            logger.error(f"Error retrieving content for {username}: {str(e)}")
-            return []
+            if '_error' in record:
+                raise ValueError(record['_error'])
+            content_type = record.get('type') or 'blog'
+            if content_type not in ('blog', 'case_study'):
+                raise ValueError(f"Unknown content type: {content_type}")
+            username = record.get('username')
+            if not username:
+                raise ValueError("Missing username")
+            title = bleach.clean(str(record.get('title') or '').strip())
+            if not title or len(title) > 255:
+                raise ValueError("Title must be 1-255 characters")
+            fields = ['content'] if content_type == 'blog' else ['problem', 'solution', 'results']
+            body = {field: bleach.clean(str(record.get(field) or '')) for field in fields}
+            missing = [field for field, value in body.items() if not value.strip()]
+            if missing:
+                raise ValueError(f"Missing {', '.join(missing)}")
+            tags = record.get('tags') or []
+            if isinstance(tags, str):
+                tags = tags.split(',')
+            tag_list = list(dict.fromkeys(bleach.clean(str(tag).strip()) for tag in tags if str(tag).strip()))
+            if any(len(tag) > 50 for tag in tag_list):
+                raise ValueError("Tags must be at most 50 characters")
+            created_at = record.get('created_at')
+            created_at = datetime.fromisoformat(created_at) if created_at else datetime.utcnow()
+            # IDs are derived from the record, so re-imports are skipped. UUIDs are kept; other
+            # IDs get a time-ordered key and stay reachable from their public link via external_ids.
+            external_id = str(record['id']) if record.get('id') else None
+            if external_id and parse_uuid(external_id):
+                content_id, external_id = str(parse_uuid(external_id)), None
+            elif external_id:
+                if len(external_id) > 255:
+                    raise ValueError("ID must be at most 255 characters")
+                content_id = time_ordered_id(created_at, f"{content_type}:{external_id}")
+            elif record.get('created_at'):
+                content_id = time_ordered_id(created_at, json.dumps(record, sort_keys=True, default=str))
+            else:
+                content_id = str(uuid.uuid5(uuid.NAMESPACE_URL, json.dumps(record, sort_keys=True, default=str)))
+            prepared.append({
+                'source': source,
+                'type': content_type,
+                'username': username,
+                'tags': tag_list,
+                'external_id': external_id,
+                'row': {
+                    'id': content_id,
+                    'username': username,
+                    'title': title,
+                    **body,
+                    'tags': tag_list,
+                    'media': [],
+                    'font': record.get('font') or 'Inter',
+                    'content_type': content_type,
+                    'created_at': created_at,
+                    'updated_at': created_at,
+                    'views': 0,
+                    **render_content(content_type, body),
+                    'public_link': f"{APP_URL}/content/{content_type}/{urllib.parse.quote(username)}/"
+                                   f"{urllib.parse.quote(external_id or content_id, safe='')}",
+                    'is_published': bool(record.get('is_published', True)),
+                    'is_draft': False
+                }
+            })
+        except (ValueError, TypeError) as e:
+            prepared.append({'source': source, 'error': str(e)})
+    return prepared
+
+
+class BulkImporter:
+    """
+    Imports blogs and case studies from JSONL files and Markdown directories.
+    Records are validated and sanitised on a worker process pool, authors and tags are
+    resolved in bulk, and rows are inserted with executemany in one transaction per batch.
+    Follower notifications and per-row index maintenance are skipped; derived indexes are
+    rebuilt once when the import finishes. Records whose ID already exists are skipped, so
+    an import can be re-run safely.
+    """
+
+    TABLES = {
+        'blog': (Blog.__table__, blog_tags, 'blog_id'),
+        'case_study': (CaseStudy.__table__, case_study_tags, 'case_study_id')
+    }
 
-    def search_content(self, query: str, tags: Optional[List[str]] = None, content_type: Optional[str] = None) -> List[Any]:
+    def __init__(self, dm: 'DataManager', default_username: Optional[str] = None,
+                 batch_size: int = IMPORT_BATCH_SIZE, workers: int = IMPORT_WORKERS):
+        self.dm = dm
+        self.default_username = default_username
+        self.batch_size = batch_size
+        self.workers = workers
+        self._user_ids: Dict[str, int] = {}
+        self._tag_ids: Dict[str, str] = {}
+
+    def run(self, paths: List[str], progress_callback=None) -> Dict[str, Any]:
         """
-        Search content by query and tags.
+        Import every record found under the given paths.
         Args:
-            query: Search query.
-            tags: List of tags to filter by.
-            content_type: Content type (blog/case_study, or None for all).
+            paths: JSONL files, Markdown files or directories.
+            progress_callback: Optional callable receiving the running report after each batch.
         Returns:
-            List[Any]: List of matching content objects.
+            Dict[str, Any]: Counts of records read, imported, skipped and failed, tags created,
+                the first errors, derived index rebuild timings and duration.
         """
+        started = time.perf_counter()
+        report = {'read': 0, 'imported': {'blog': 0, 'case_study': 0}, 'skipped': 0, 'failed': 0,
+                  'tags_created': 0, 'errors': []}
+        prepare = process_pool_target('prepare_import_records')
+        pending = deque()
+        buffer = []
+        with create_process_pool(self.workers) as pool:
+            records = iter_import_records(paths, self.default_username)
+            for chunk in iter_batches(records, IMPORT_CHUNK_SIZE):
+                report['read'] += len(chunk)
+                pending.append(pool.submit(prepare, chunk))
+                # Keep a bounded number of chunks in flight so memory stays flat.
+                if len(pending) >= 2 * self.workers:
+                    buffer.extend(pending.popleft().result())
+                while len(buffer) >= self.batch_size:
+                    self._insert_batch(buffer[:self.batch_size], report)
+                    buffer = buffer[self.batch_size:]
+                    if progress_callback:
+                        progress_callback(report)
+            while pending:
+                buffer.extend(pending.popleft().result())
+            for batch in iter_batches(buffer, self.batch_size):
+                self._insert_batch(batch, report)
+                if progress_callback:
+                    progress_callback(report)
+
+        report['derived_indexes'] = rebuild_derived_indexes(self.dm.session_factory)
+        report['duration_seconds'] = round(time.perf_counter() - started, 3)
+        logger.info(f"Bulk import finished: {report['imported']} imported, {report['skipped']} skipped, "
+                    f"{report['failed']} failed in {report['duration_seconds']}s")
+        return report
+
+    def _insert_batch(self, batch: List[Dict[str, Any]], report: Dict[str, Any]) -> None:
+        valid = []
+        for item in batch:
+            if 'error' in item:
+                self._record_error(report, item['source'], item['error'])
+            else:
+                valid.append(item)
+        if not valid:
+            return
+
         try:
-            with self.session_factory() as session:
-                blogs = session.query(Blog).filter(
-                    and_(
-                        Blog.is_published == True,
-                        or_(
-                            Blog.title.ilike(f"%{query}%"),
-                            Blog.content.ilike(f"%{query}%")
-                        )
-                    )
-                )
-                case_studies = session.query(CaseStudy).filter(
-                    and_(
-                        CaseStudy.is_published == True,
-                        or_(
-                            CaseStudy.title.ilike(f"%{query}%"),
-                            CaseStudy.problem.ilike(f"%{query}%"),
-                            CaseStudy.solution.ilike(f"%{query}%"),
-                            CaseStudy.results.ilike(f"%{query}%")
-                        )
-                    )
-                )
-                if tags:
-                    blogs = blogs.filter(Blog.tags.contains(tags))
-                    case_studies = case_studies.filter(CaseStudy.tags.contains(tags))
-                if content_type == 'blog':
-                    return blogs.all()
-                elif content_type == 'case_study':
-                    return case_studies.all()
-                return blogs.all() + case_studies.all()
+            with self.dm.session_factory() as session:
+                self._resolve_users(session, {item['username'] for item in valid})
+                self._resolve_tags(session, {tag for item in valid for tag in item['tags']}, report)
+                self._resolve_external_ids(session, valid)
+                seen = {content_type: set(session.scalars(select(table.c.id).where(
+                            table.c.id.in_([item['row']['id'] for item in valid if item['type'] == content_type]))))
+                        for content_type, (table, _, _) in self.TABLES.items()}
+                rows = {content_type: [] for content_type in self.TABLES}
+                links = {content_type: [] for content_type in self.TABLES}
+                external_ids = []
+                for item in valid:
+                    user_id = self._user_ids.get(item['username'])
+                    if user_id is None:
+                        self._record_error(report, item['source'], f"Unknown user: {item['username']}")
+                        continue
+                    if item['row']['id'] in seen[item['type']]:
+                        report['skipped'] += 1
+                        continue
+                    seen[item['type']].add(item['row']['id'])
+                    rows[item['type']].append(dict(item['row'], user_id=user_id))
+                    key = self.TABLES[item['type']][2]
+                    links[item['type']].extend({key: item['row']['id'], 'tag_id': self._tag_ids[tag]} for tag in item['tags'])
+                    if item['external_id']:
+                        external_ids.append({'content_type': item['type'], 'external_id': item['external_id'],
+                                             'content_id': item['row']['id'], 'created_at': datetime.utcnow()})
+                for content_type, (table, association, _) in self.TABLES.items():
+                    if rows[content_type]:
+                        session.execute(table.insert(), rows[content_type])
+                    if links[content_type]:
+                        session.execute(association.insert(), links[content_type])
+                if external_ids:
+                    session.execute(sqlite_insert(ExternalId).on_conflict_do_nothing(), external_ids)
+                session.commit()
         except SQLAlchemyError as e:
-            logger.error(f"Error searching content: {str(e)}")
-            return []
+            logger.error(f"Bulk import batch failed: {str(e)}")
+            self._tag_ids.clear()
+            for item in valid:
+                self._record_error(report, item['source'], "Batch insert failed")
+            return
+        for content_type in self.TABLES:
+            report['imported'][content_type] += len(rows[content_type])
+
+    def _resolve_users(self, session, usernames: set) -> None:
+        missing = [name for name in usernames if name not in self._user_ids]
+        if missing:
+            self._user_ids.update(session.execute(
+                select(User.username, User.id).where(User.username.in_(missing))).all())
+
+    def _resolve_external_ids(self, session, items: List[Dict[str, Any]]) -> None:
+        # Records imported before keep the key they were given, wherever it was derived from.
+        wanted = {item['external_id'] for item in items if item['external_id']}
+        if not wanted:
+            return
+        mapped = {(content_type, external_id): content_id for content_type, external_id, content_id in session.execute(
+            select(ExternalId.content_type, ExternalId.external_id, ExternalId.content_id)
+            .where(ExternalId.external_id.in_(wanted)))}
+        for item in items:
+            content_id = mapped.get((item['type'], item['external_id']))
+            if content_id:
+                item['row']['id'] = content_id
+
+    def _resolve_tags(self, session, names: set, report: Dict[str, Any]) -> None:
+        missing = [name for name in names if name not in self._tag_ids]
+        if not missing:
+            return
+        self._tag_ids.update(session.execute(select(Tag.name, Tag.id).where(Tag.name.in_(missing))).all())
+        new_tags = [{'id': new_id(), 'name': name, 'created_at': datetime.utcnow()}
+                    for name in missing if name not in self._tag_ids]
+        if new_tags:
+            session.execute(Tag.__table__.insert(), new_tags)
+            self._tag_ids.update((tag['name'], tag['id']) for tag in new_tags)
+            report['tags_created'] += len(new_tags)
+
+    def _record_error(self, report: Dict[str, Any], source: str, error: str) -> None:
+        report['failed'] += 1
+        if len(report['errors']) < IMPORT_MAX_REPORTED_ERRORS:
+            report['errors'].append(f"{source}: {error}")
+
+# Job Queue
+
+# Handlers for deferred work, keyed by job kind; each receives a DataManager and the payload
+# and raises to have the job retried.
+JOB_HANDLERS: Dict[str, Any] = {}
+
+
+def job_handler(kind: str):
+    """
+    Register a function that runs jobs of the given kind.
+    Args:
+        kind: Job kind.
+    Returns:
+        Callable: Decorator that registers the handler.
+    """
+    def register(handler):
+        JOB_HANDLERS[kind] = handler
+        return handler
+    return register
+
+
+@job_handler('notify_user')
+def handle_notify_user(dm: DataManager, payload: Dict[str, Any]) -> None:
+    if not dm.notify_user(payload['username'], payload['message'], payload.get('content_type'), payload.get('content_id')):
+        raise RuntimeError(f"Could not notify {payload['username']}")
+
+
+@job_handler('notify_followers')
+def handle_notify_followers(dm: DataManager, payload: Dict[str, Any]) -> None:
+    if not dm.notify_followers(payload['username'], payload['content_type'], payload['content_id'], payload['message']):
+        raise RuntimeError(f"Could not notify followers of {payload['username']}")
+
+
+@job_handler('fan_out_timeline')
+def handle_fan_out_timeline(dm: DataManager, payload: Dict[str, Any]) -> None:
+    dm.fan_out_to_timelines(payload['content_type'], payload['content_id'])
+
+
+@job_handler('backfill_timeline')
+def handle_backfill_timeline(dm: DataManager, payload: Dict[str, Any]) -> None:
+    dm.backfill_timeline(payload['user_id'], payload['author_id'])
+
+
+@job_handler('refresh_related')
+def handle_refresh_related(dm: DataManager, payload: Dict[str, Any]) -> None:
+    report = dm.refresh_related_content()
+    logger.info(f"Refreshed related content: {report}")
+
+
+@job_handler('notify_content_owner')
+def handle_notify_content_owner(dm: DataManager, payload: Dict[str, Any]) -> None:
+    content = dm.get_content_by_id(payload['content_type'], payload['content_id'])
+    if content and not dm.notify_user(content.username, payload['message'].format(title=content.title),
+                                      payload['content_type'], payload['content_id']):
+        raise RuntimeError(f"Could not notify {content.username}")
+
+
+@job_handler('record_analytics_event')
+def handle_record_analytics_event(dm: DataManager, payload: Dict[str, Any]) -> None:
+    timestamp = datetime.fromisoformat(payload['timestamp']) if payload.get('timestamp') else None
+    if not dm.record_analytics_event(payload.get('username'), payload['event_type'], payload.get('content_type'),
+                                     payload.get('content_id'), payload.get('event_metadata'), timestamp):
+        raise RuntimeError(f"Could not record {payload['event_type']} event")
+
+
+@job_handler('increment_views')
+def handle_increment_views(dm: DataManager, payload: Dict[str, Any]) -> None:
+    dm.increment_views([tuple(item) for item in payload['items']])
+
 
-    def get_analytics(self, username: str, start_date: Optional[datetime] = None, end_date: Optional[datetime] = None) -> Dict[str, Any]:
+@job_handler('rerender')
+def handle_rerender(dm: DataManager, payload: Dict[str, Any]) -> None:
+    # One batch per job; the next batch, or the next target once this one is done, is a new job.
+    target, after = payload['target'], payload.get('after', 0)
+    count, cursor = dm.rerender_stale(target, after)
+    targets = list(RENDER_TARGETS)
+    if cursor is None:
+        logger.info(f"Re-rendered {target} artifacts up to render version {RENDER_VERSION}")
+        if targets.index(target) + 1 == len(targets):
+            return
+        target, cursor = targets[targets.index(target) + 1], 0
+    dm.enqueue_job('rerender', {'target': target, 'after': cursor}, priority=JOB_PRIORITY_LOW,
+                   idempotency_key=f"rerender:v{RENDER_VERSION}:{target}:{cursor}")
+
+
+class JobWorker:
+    """
+    Claims and runs queued jobs until stopped.
+    Failed jobs are retried with backoff by the queue; finished jobs are pruned hourly.
+    """
+
+    def __init__(self, dm: DataManager, worker_id: Optional[str] = None, poll_interval: float = JOB_POLL_INTERVAL):
+        self.dm = dm
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}:{threading.get_ident()}"
+        self.poll_interval = poll_interval
+        self._stop = threading.Event()
+
+    def run_once(self) -> bool:
         """
-        Retrieve analytics for user content.
-        Args:
-            username: User's username.
-            start_date: Start date filter.
-            end_date: End date filter.
+        Claim and run a single job.
         Returns:
-            Dict[str, Any]: Analytics data.
+            bool: True if a job was claimed, False if the queue had nothing due.
         """
+        job = self.dm.claim_job(self.worker_id)
+        if not job:
+            return False
+        if job['attempts'] > job['max_attempts']:
+            # A worker holding this job died repeatedly before finishing it.
+            self.dm.fail_job(job['id'], self.worker_id, job['attempts'], job['max_attempts'], "Visibility timeout expired")
+            return True
+        handler = JOB_HANDLERS.get(job['kind'])
         try:
-            with self.session_factory() as session:
-                user = session.query(User).filter_by(username=username).first()
-                if not user:
-                    return {}
-                blog_views = session.query(func.sum(Blog.views)).filter_by(username=username).scalar() or 0
-                case_study_views = session.query(func.sum(CaseStudy.views)).filter_by(username=username).scalar() or 0
-                blog_likes = session.query(func.count(Like.id)).filter(
-                    Like.content_type == 'blog',
-                    Like.content_id.in_(session.query(Blog.id).filter_by(username=username))
-                ).scalar() or 0
-                case_study_likes = session.query(func.count(Like.id)).filter(
-                    Like.content_type == 'case_study',
-                    Like.content_id.in_(session.query(CaseStudy.id).filter_by(username=username))
-                ).scalar() or 0
-                events_query = session.query(AnalyticsEvent).filter_by(user_id=user.id)
-                if start_date:
-                    events_query = events_query.filter(AnalyticsEvent.timestamp >= start_date)
-                if end_date:
-                    events_query = events_query.filter(AnalyticsEvent.timestamp <= end_date)
-                event_counts = events_query.group_by(AnalyticsEvent.event_type).count()
-                return {
-                    'total_views': blog_views + case_study_views,
-                    'total_likes': blog_likes + case_study_likes,
-                    'blog_count': session.query(Blog).filter_by(username=username).count(),
-                    'case_study_count': session.query(CaseStudy).filter_by(username=username).count(),
-                    'event_counts': event_counts
-                }
-        except SQLAlchemyError as e:
-            logger.error(f"Error retrieving analytics for {username}: {str(e)}")
-            return {}
+            if handler is None:
+                raise ValueError(f"No handler for job kind {job['kind']}")
+            handler(self.dm, job['payload'] or {})
+        except Exception as e:
+            logger.error(f"Job {job['id']} ({job['kind']}) attempt {job['attempts']} failed: {str(e)}")
+            self.dm.fail_job(job['id'], self.worker_id, job['attempts'], job['max_attempts'], f"{type(e).__name__}: {e}")
+        else:
+            self.dm.complete_job(job['id'], self.worker_id)
+        return True
 
-    def delete_content(self, content_type: str, content_id: str) -> bool:
+    def run(self) -> None:
         """
-        Delete content by type and ID.
-        Args:
-            content_type: Content type (blog/case_study).
-            content_id: Content ID.
-        Returns:
-            bool: True if deleted successfully, False otherwise.
+        Process jobs until stop() is called, sleeping while the queue is empty.
         """
-        try:
-            with self.session_factory() as session:
-                if content_type == 'blog':
-                    content = session.query(Blog).filter_by(id=content_id).first()
-                elif content_type == 'case_study':
-                    content = session.query(CaseStudy).filter_by(id=content_id).first()
-                else:
-                    logger.error(f"Invalid content type: {content_type}")
-                    return False
-                if not content:
-                    logger.error(f"Content {content_type}:{content_id} not found")
-                    return False
-                session.query(Comment).filter_by(content_type=content_type, content_id=content_id).delete()
-                session.query(Like).filter_by(content_type=content_type, content_id=content_id).delete()
-                session.query(Media).filter_by(content_type=content_type, content_id=content_id).delete()
-                session.query(Draft).filter_by(content_type=content_type, content_id=content_id).delete()
-                session.query(Notification).filter_by(content_type=content_type, content_id=content_id).delete()
-                session.delete(content)
-                session.commit()
-                logger.info(f"Deleted {content_type}:{content_id}")
-                return True
-        except SQLAlchemyError as e:
-            logger.error(f"Error deleting {content_type}:{content_id}: {str(e)}")
-            return False
+        last_prune = time.monotonic()
+        while not self._stop.is_set():
+            if not self.run_once():
+                self._stop.wait(self.poll_interval)
+            if time.monotonic() - last_prune > 3600:
+                self.dm.prune_jobs()
+                last_prune = time.monotonic()
+
+    def start(self) -> None:
+        """
+        Run the worker in a background thread.
+        """
+        threading.Thread(target=self.run, name="job-worker", daemon=True).start()
 
+    def stop(self) -> None:
+        """
+        Stop the worker after its current job.
+        """
+        self._stop.set()
 
-def get_data_manager():
+
+def run_job_worker(poll_interval: float = JOB_POLL_INTERVAL) -> None:
     """
-    Instantiate DataManager with session factory.
+    Entry point for a job worker process.
+    Args:
+        poll_interval: Seconds to wait when the queue is empty.
+    """
+    worker = JobWorker(get_data_manager(), worker_id=f"{socket.gethostname()}:{os.getpid()}", poll_interval=poll_interval)
+    logger.info(f"Job worker {worker.worker_id} started")
+    try:
+        worker.run()
+    except KeyboardInterrupt:
+        logger.info(f"Job worker {worker.worker_id} stopped")
+
+
+@st.cache_resource
+def start_job_worker_thread() -> JobWorker:
+    """
+    Start a job worker thread inside the app process, once per process.
     Returns:
-        DataManager: Data manager instance.
+        JobWorker: Running worker.
     """
-    return DataManager(Session)
+    worker = JobWorker(get_data_manager())
+    worker.start()
+    logger.info("In-process job worker started")
+    return worker
+
+
+@st.cache_resource
+def schedule_rerender_job() -> Optional[str]:
+    """
+    Queue the rerender job once per process, so artifacts from older render versions are refreshed.
+    Returns:
+        Optional[str]: Job ID, or None on error.
+    """
+    return get_data_manager().schedule_rerender()
 
 # Streamlit UI Components
 
@@ -1437,17 +6757,13 @@ def create_content_page():
                 st.error("Title and content are required")
                 logger.error(f"Blog creation failed for {username}: missing title/content")
                 return
-            media_ids = []
-            if media_files:
-                for file in media_files:
-                    try:
-                        media_id = dm.save_media(username, file)
-                        media_ids.append(media_id)
-                        logger.info(f"Media uploaded for blog by {username}: {media_id}")
-                    except ValueError as e:
-                        st.error(str(e))
-                        logger.error(f"Media upload failed for {username}: {str(e)}")
-                        return
+            try:
+                media_ids = save_uploaded_media(dm, username, media_files)
+                logger.info(f"Media uploaded for blog by {username}: {media_ids}")
+            except ValueError as e:
+                st.error(str(e))
+                logger.error(f"Media upload failed for {username}: {str(e)}")
+                return
             try:
                 blog_data = {
                     'title': title,
@@ -1492,17 +6808,13 @@ def create_content_page():
                 st.error("Title, problem, solution, and results are required")
                 logger.error(f"Case study creation failed for {username}: missing required fields")
                 return
-            media_ids = []
-            if media_files:
-                for file in media_files:
-                    try:
-                        media_id = dm.save_media(username, file)
-                        media_ids.append(media_id)
-                        logger.info(f"Media uploaded for case study by {username}: {media_id}")
-                    except ValueError as e:
-                        st.error(str(e))
-                        logger.error(f"Media upload failed for {username}: {str(e)}")
-                        return
+            try:
+                media_ids = save_uploaded_media(dm, username, media_files)
+                logger.info(f"Media uploaded for case study by {username}: {media_ids}")
+            except ValueError as e:
+                st.error(str(e))
+                logger.error(f"Media upload failed for {username}: {str(e)}")
+                return
             try:
                 case_data = {
                     'title': title,
@@ -1599,16 +6911,14 @@ def edit_content_page():
             content_text = st.text_area("Content", value=content_data.get('content', ''), height=300)
             if st.form_submit_button("Update Blog"):
                 media_ids = content_data.get('media', [])
-                if media_files:
-                    for file in media_files:
-                        try:
-                            media_id = dm.save_media(username, file)
-                            media_ids.append(media_id)
-                            logger.info(f"Media {media_id} uploaded for blog edit by {username}")
-                        except ValueError as e:
-                            st.error(str(e))
-                            logger.error(f"Media upload failed for blog edit by {username}: {str(e)}")
-                            return
+                try:
+                    new_media_ids = save_uploaded_media(dm, username, media_files)
+                    media_ids.extend(new_media_ids)
+                    logger.info(f"Media {new_media_ids} uploaded for blog edit by {username}")
+                except ValueError as e:
+                    st.error(str(e))
+                    logger.error(f"Media upload failed for blog edit by {username}: {str(e)}")
+                    return
                 try:
                     if is_draft:
                         draft_data = {
@@ -1620,8 +6930,7 @@ def edit_content_page():
                             'is_published': is_published,
                             'is_draft': is_draft_save
                         }
-                        new_draft_id = dm.save_draft(username, 'blog', content_id if content_data.get(
-                            'content_id') else None, draft_data)
+                        new_draft_id = dm.save_draft(username, 'blog', content.content_id, draft_data, draft_id=content_id)
                         st.success(f"Draft updated! Draft ID: {new_draft_id}")
                         logger.info(f"Blog draft {new_draft_id} updated by {username}")
                     else:
@@ -1641,16 +6950,14 @@ def edit_content_page():
             results = st.text_area("Results", value=content_data.get('results', ''), height=200)
             if st.form_submit_button("Update Case Study"):
                 media_ids = content_data.get('media', [])
-                if media_files:
-                    for file in media_files:
-                        try:
-                            media_id = dm.save_media(username, file)
-                            media_ids.append(media_id)
-                            logger.info(f"Media {media_id} uploaded for case study edit by {username}")
-                        except ValueError as e:
-                            st.error(str(e))
-                            logger.error(f"Media upload failed for case study edit by {username}: {str(e)}")
-                            return
+                try:
+                    new_media_ids = save_uploaded_media(dm, username, media_files)
+                    media_ids.extend(new_media_ids)
+                    logger.info(f"Media {new_media_ids} uploaded for case study edit by {username}")
+                except ValueError as e:
+                    st.error(str(e))
+                    logger.error(f"Media upload failed for case study edit by {username}: {str(e)}")
+                    return
                 try:
                     if is_draft:
                         draft_data = {
@@ -1664,8 +6971,8 @@ def edit_content_page():
                             'is_published': is_published,
                             'is_draft': is_draft_save
                         }
-                        new_draft_id = dm.save_draft(username, 'case_study',
-                                                     content_id if content_data.get('content_id') else None, draft_data)
+                        new_draft_id = dm.save_draft(username, 'case_study', content.content_id, draft_data,
+                                                     draft_id=content_id)
                         st.success(f"Draft updated! Draft ID: {new_draft_id}")
                         logger.info(f"Case study draft {new_draft_id} updated by {username}")
                     else:
@@ -1680,6 +6987,139 @@ def edit_content_page():
                     st.error(f"Error updating case study: {str(e)}")
                     logger.error(f"Case study update error for {username}: {str(e)}")
 
+    if not is_draft:
+        history = dm.get_content_history(content_type.lower().replace(' ', '_'), content_id)
+        if len(history) > 1:
+            with st.expander("Revision History"):
+                revision_labels = {
+                    f"Revision {h['revision']} ({h['created_at'].strftime('%Y-%m-%d %H:%M')})": h['revision']
+                    for h in history
+                }
+                labels = list(revision_labels.keys())
+                col1, col2 = st.columns(2)
+                with col1:
+                    from_label = st.selectbox("Compare", labels, index=1, key="revision_from")
+                with col2:
+                    to_label = st.selectbox("With", labels, index=0, key="revision_to")
+                diff = dm.diff_content_revisions(content_type.lower().replace(' ', '_'), content_id,
+                                                 revision_labels[from_label], revision_labels[to_label])
+                if diff:
+                    st.code(diff, language="diff")
+                else:
+                    st.info("No differences between these revisions")
+
+
+@st.fragment
+def content_interactions_fragment(content_type: str, content_id: str, public_link: str) -> None:
+    """
+    Render like count and Like/Unlike/Share buttons for a single content card.
+    Runs as a fragment so an interaction only reruns this card, not the whole feed.
+    Args:
+        content_type: Content type (blog/case_study).
+        content_id: Content ID.
+        public_link: Public link of the content.
+    """
+    dm = get_data_manager()
+    with Session() as session:
+        like_count = session.query(Like).filter_by(
+            content_type=content_type, content_id=content_id
+        ).count()
+        has_liked = None
+        if st.session_state.authenticated:
+            user = session.query(User).filter_by(username=st.session_state.username).first()
+            has_liked = session.query(Like).filter_by(
+                user_id=user.id,
+                content_type=content_type,
+                content_id=content_id
+            ).first()
+    st.write(f"Likes: {like_count}")
+    if not st.session_state.authenticated:
+        return
+    col1, col2 = st.columns(2)
+    with col1:
+        if not has_liked:
+            if st.button(f"Like", key=f"like_{content_id}"):
+                dm.save_like(st.session_state.username, content_type, content_id)
+                dm.log_analytics_event(st.session_state.username, 'like', content_type, content_id)
+                st.rerun(scope="fragment")
+        else:
+            if st.button(f"Unlike", key=f"unlike_{content_id}"):
+                dm.remove_like(st.session_state.username, content_type, content_id)
+                dm.log_analytics_event(st.session_state.username, 'unlike', content_type, content_id)
+                st.rerun(scope="fragment")
+    with col2:
+        if st.button(f"Share", key=f"share_{content_id}"):
+            st.write(f"Share this {content_type}: {public_link}")
+            dm.log_analytics_event(st.session_state.username, 'share', content_type, content_id)
+    pdf_key = f"pdf_export_{content_id}"
+    export = st.session_state.get(pdf_key)
+    if export and export['status'] == 'pending':
+        pdf_export_fragment(content_type, content_id)
+    elif export and export['status'] == 'ready':
+        # The file is only read when the button is clicked.
+        st.download_button("Download PDF", data=export['path'].read_bytes, file_name=f"{content_type}-{content_id}.pdf",
+                           mime="application/pdf", key=f"download_pdf_{content_id}")
+    else:
+        if export:
+            st.error(f"PDF export failed: {export['error']}")
+        if st.button("Export PDF", key=f"export_pdf_{content_id}"):
+            st.session_state[pdf_key] = {'status': 'pending'}
+            dm.log_analytics_event(st.session_state.username, 'export_pdf', content_type, content_id)
+            st.rerun(scope="fragment")
+
+
+@st.fragment(run_every=2)
+def pdf_export_fragment(content_type: str, content_id: str) -> None:
+    """
+    Poll a pending background PDF export.
+    Once it is ready or has failed, the result is kept in session state and the page reruns
+    without this fragment, so polling stops.
+    Args:
+        content_type: Content type (blog/case_study).
+        content_id: Content ID.
+    """
+    result = get_pdf_exporter().export(content_type, content_id)
+    if result['status'] == 'pending':
+        st.caption("Preparing PDF...")
+        return
+    st.session_state[f"pdf_export_{content_id}"] = result
+    st.rerun()
+
+
+@st.fragment
+def comments_fragment(content_type: str, content_id: str, title: str) -> None:
+    """
+    Render the latest comments and the comment form for a single content card.
+    Runs as a fragment so posting a comment only reruns this card.
+    Args:
+        content_type: Content type (blog/case_study).
+        content_id: Content ID.
+        title: Content title, used for the comment box label.
+    """
+    dm = get_data_manager()
+    st.subheader("Comments")
+    with Session() as session:
+        comments = session.query(Comment).filter_by(
+            content_type=content_type, content_id=content_id
+        ).order_by(Comment.created_at.desc()).limit(5).all()
+    for comment in comments:
+        html_value = comment.comment_html if comment.render_version else \
+            render_comment(comment.username, comment.comment, comment.created_at)
+        st.markdown(f"<div class='comment'>{html_value}</div>", unsafe_allow_html=True)
+
+    if st.session_state.authenticated:
+        comment_text = st.text_area(f"Comment on {title}", key=f"comment_{content_id}", height=100)
+        if st.button("Post Comment", key=f"post_{content_id}"):
+            try:
+                comment_id = dm.save_comment(st.session_state.username, content_type, content_id, comment_text)
+                st.success("Comment posted!")
+                logger.info(f"Comment {comment_id} posted by {st.session_state.username}")
+                dm.log_analytics_event(st.session_state.username, 'comment', content_type, content_id)
+                st.rerun(scope="fragment")
+            except ValueError as e:
+                st.error(str(e))
+                logger.error(f"Comment posting failed for {st.session_state.username}: {str(e)}")
+
 
 def view_content_page():
     """
@@ -1692,95 +7132,46 @@ def view_content_page():
     tag_options = [tag.name for tag in Session().query(Tag).all()]
     selected_tags = st.multiselect("Filter by Tags", tag_options, help="Select tags to filter content")
     content_type = st.selectbox("Content Type", ["All", "Blog", "Case Study"], help="Filter by content type")
+    order = st.radio("Order", ["Relevance", "Trending"], horizontal=True,
+                     help="Trending ranks content by recent views, likes and comments")
 
-    content_type_filter = None if content_type == "All" else content_type.lower()
-    contents = dm.search_content(search_query, selected_tags, content_type_filter)
+    content_type_filter = None if content_type == "All" else content_type.lower().replace(' ', '_')
+    if order == "Trending":
+        contents = dm.search_content(search_query, selected_tags, content_type_filter, trending=True, limit=TRENDING_PAGE_SIZE)
+    else:
+        contents = dm.search_content(search_query, selected_tags, content_type_filter)
+    dm.record_views([(content.content_type, content.id) for content in contents])
+    related = dm.get_related_content([(content.content_type, content.id) for content in contents])
 
     with Session() as session:
         for content in contents:
             with st.container():
                 st.markdown("<div class='content-card'>", unsafe_allow_html=True)
                 st.subheader(content.title)
-                if content.content_type == 'blog':
-                    st.write(content.content[:300] + "..." if len(content.content) > 300 else content.content)
-                    content.views += 1
-                else:
-                    st.write(f"Problem: {content.problem[:200]}...")
-                    st.write(f"Solution: {content.solution[:200]}...")
-                    st.write(f"Results: {content.results[:200]}...")
-                    content.views += 1
+                artifacts = content_artifacts(content)
+                for line in artifacts['excerpt'].splitlines():
+                    st.write(line)
+                with st.expander(f"Read {content.content_type.replace('_', ' ')}"):
+                    st.markdown(artifacts['content_html'], unsafe_allow_html=True)
+                    if related.get((content.content_type, content.id)):
+                        st.markdown("**Related:** " + " · ".join(
+                            f"[{item.title}]({item.public_link})" for item in related[(content.content_type, content.id)]))
                 st.write(f"By {content.username} | {content.created_at.strftime('%Y-%m-%d')} | Views: {content.views}")
                 st.markdown(
                     "**Tags:** " + ", ".join([f"<span class='tag'>{tag}</span>" for tag in content.tags]), unsafe_allow_html=True)
 
                 if content.media:
                     cols = st.columns(min(len(content.media), 3))
-                    for idx, media_id in enumerate(content.media):
-                        media = session.query(Media).filter_by(id=media_id).first()
-                        if media and media.type == 'image':
-                            try:
-                                img_data = base64.b64decode(media.content)
-                                img = Image.open(io.BytesIO(img_data))
-                                with cols[idx % 3]:
-                                    st.image(img, caption=media.filename, width=200)
-                            except Exception as e:
-                                logger.error(f"Error rendering media {media_id}: {str(e)}")
-                                st.warning(f"Could not display media: {media.filename}")
-
-                like_count = session.query(Like).filter_by(
-                    content_type=content.content_type, content_id=content.id
-                ).count()
-                st.write(f"Likes: {like_count}")
-                if st.session_state.authenticated:
-                    user = session.query(User).filter_by(username=st.session_state.username).first()
-                    has_liked = session.query(Like).filter_by(
-                        user_id=user.id,
-                        content_type=content.content_type,
-                        content_id=content.id
-                    ).first()
-                    col1, col2 = st.columns(2)
-                    with col1:
-                        if not has_liked:
-                            if st.button(f"Like", key=f"like_{content.id}"):
-                                dm.save_like(st.session_state.username, content.content_type, content.id)
-                                dm.log_analytics_event(st.session_state.username, 'like',
-                                                       content.content_type, content.id)
-                                st.rerun()
-                        else:
-                            if st.button(f"Unlike", key=f"unlike_{content.id}"):
-                                dm.remove_like(st.session_state.username, content.content_type, content.id)
-                                dm.log_analytics_event(st.session_state.username, 'unlike',
-                                                       content.content_type, content.id)
-                                st.rerun()
-                    with col2:
-                        if st.button(f"Share", key=f"share_{content.id}"):
-                            st.write(f"Share this {content.content_type}: {content.public_link}")
-                            dm.log_analytics_event(st.session_state.username, 'share', content.content_type, content.id)
-
-                st.subheader("Comments")
-                comments = session.query(Comment).filter_by(
-                    content_type=content.content_type, content_id=content.id
-                ).order_by(Comment.created_at.desc()).limit(5).all()
-                for comment in comments:
-                    st.markdown(
-                        f"<div class='comment'>{comment.username}: {comment.comment} ({comment.created_at.strftime('%Y-%m-%d %H:%M')})</div>",
-                        unsafe_allow_html=True
-                    )
+                    position = {media_id: index for index, media_id in enumerate(content.media)}
+                    media_items = sorted(session.query(Media.id, Media.type, Media.filename).filter(
+                        Media.id.in_(content.media)
+                    ), key=lambda media: position.get(media.id, len(position)))
+                    for idx, media in enumerate(m for m in media_items if m.type == 'image'):
+                        with cols[idx % 3]:
+                            render_media(media, width=200)
 
-                if st.session_state.authenticated:
-                    comment_text = st.text_area(f"Comment on {content.title}", key=f"comment_{content.id}", height=100)
-                    if st.button("Post Comment", key=f"post_{content.id}"):
-                        try:
-                            comment_id = dm.save_comment(st.session_state.username,
-                                                         content.content_type, content.id, comment_text)
-                            st.success("Comment posted!")
-                            logger.info(f"Comment {comment_id} posted by {st.session_state.username}")
-                            dm.log_analytics_event(st.session_state.username, 'comment',
-                                                   content.content_type, content.id)
-                            st.rerun()
-                        except ValueError as e:
-                            st.error(str(e))
-                            logger.error(f"Comment posting failed for {st.session_state.username}: {str(e)}")
+                content_interactions_fragment(content.content_type, content.id, content.public_link)
+                comments_fragment(content.content_type, content.id, content.title)
 
                 st.markdown(f"[View Full {content.content_type.capitalize()}]({content.public_link})")
                 st.markdown("</div>", unsafe_allow_html=True)
@@ -1791,11 +7182,47 @@ def view_content_page():
             st.error("Error updating view counts")
 
 
+def timeline_page():
+    """
+    Render the home timeline.
+    Shows the latest posts of followed authors, newest first, a page at a time.
+    """
+    st.title("Home")
+    dm = get_data_manager()
+    username = st.session_state.username
+    before = st.session_state.get('timeline_before')
+    contents = dm.get_timeline(username, before=before)
+    if not contents:
+        st.info("Follow authors from their public profile to see their posts here" if before is None
+                else "No older posts")
+    for content in contents:
+        with st.container():
+            st.markdown("<div class='content-card'>", unsafe_allow_html=True)
+            st.subheader(content.title)
+            st.write(f"By {content.username} | {content.created_at.strftime('%Y-%m-%d')}")
+            for line in content_artifacts(content)['excerpt'].splitlines():
+                st.write(line)
+            st.markdown(f"[View Full {content.content_type.capitalize()}]({content.public_link})")
+            st.markdown("</div>", unsafe_allow_html=True)
+    col1, col2 = st.columns(2)
+    with col1:
+        if before is not None and st.button("Newest posts"):
+            st.session_state.timeline_before = None
+            st.rerun()
+    with col2:
+        if len(contents) == TIMELINE_PAGE_SIZE and st.button("Older posts"):
+            st.session_state.timeline_before = contents[-1].created_at
+            st.rerun()
+    dm.log_analytics_event(username, 'view_timeline')
+
+
 def analytics_page():
     """
     Render user analytics dashboard.
     Displays content performance metrics and event logs.
     """
+    import pandas as pd
+
     st.title("Analytics Dashboard")
     dm = get_data_manager()
     username = st.session_state.username
@@ -1820,9 +7247,10 @@ def analytics_page():
             st.metric("Case Studies", analytics.get('case_study_count', 0))
 
         with Session() as session:
-            blogs = session.query(Blog.id, Blog.title, Blog.views, Blog.created_at).filter_by(username=username).all()
+            blogs = session.query(Blog.id, Blog.title, Blog.views, Blog.created_at).filter_by(
+                username=username, deleted_at=None).all()
             case_studies = session.query(CaseStudy.id, CaseStudy.title, CaseStudy.views,
-                                         CaseStudy.created_at).filter_by(username=username).all()
+                                         CaseStudy.created_at).filter_by(username=username, deleted_at=None).all()
 
             if blogs or case_studies:
                 df = pd.DataFrame([
@@ -1843,7 +7271,7 @@ def analytics_page():
             User).filter_by(username=username).first().id).limit(20).all()
         event_data = [
             {'Event Type': e.event_type, 'Content Type': e.content_type or 'N/A',
-                'Content ID': e.content_id or 'N/A', 'Timestamp': e.timestamp, 'Metadata': json.dumps(e.metadataa)}
+                'Content ID': e.content_id or 'N/A', 'Timestamp': e.timestamp, 'Metadata': json.dumps(e.event_metadata)}
             for e in events
         ]
         st.dataframe(event_data)
@@ -1855,11 +7283,160 @@ def analytics_page():
         st.error("An unexpected error occurred")
 
 
+def admin_page_selector(key: str) -> int:
+    """
+    Render a page number input for an admin table.
+    Args:
+        key: Widget key.
+    Returns:
+        int: Selected 1-based page.
+    """
+    return int(st.number_input("Page", min_value=1, value=1, step=1, key=key))
+
+
+def fragment_flash(key: str) -> None:
+    """
+    Show and clear a success message left by the previous fragment run.
+    Args:
+        key: Session state key holding the message.
+    """
+    message = st.session_state.pop(key, None)
+    if message:
+        st.success(message)
+
+
+@st.fragment
+def admin_users_fragment() -> None:
+    """
+    Render the paginated, filterable user table with bulk status actions.
+    Runs as a fragment so filtering, paging and bulk actions only rerun this section.
+    """
+    import pandas as pd
+
+    dm = get_data_manager()
+    fragment_flash("admin_user_flash")
+    col1, col2, col3, col4, col5 = st.columns([3, 1, 1, 2, 1])
+    with col1:
+        search = st.text_input("Search", placeholder="Username or email", key="admin_user_search")
+    with col2:
+        status = st.selectbox("Status", ["All", "Active", "Inactive"], key="admin_user_status")
+    with col3:
+        role = st.selectbox("Role", ["All", "Admin", "Member"], key="admin_user_role")
+    with col4:
+        sort = st.selectbox("Sort By", list(ADMIN_USER_SORTS), key="admin_user_sort",
+                            format_func=lambda key: key.replace('_', ' ').title())
+    with col5:
+        page = admin_page_selector("admin_user_page")
+    descending = st.checkbox("Descending", value=True, key="admin_user_desc")
+
+    users, total = dm.query_users(search.strip() or None, None if status == "All" else status.lower(),
+                                  None if role == "All" else role.lower(), sort, descending, page)
+    pages = max(1, -(-total // ADMIN_PAGE_SIZE))
+    st.caption(f"{total} users, page {page} of {pages}")
+    selection = st.dataframe(
+        pd.DataFrame([
+            {
+                'Username': u['username'],
+                'Email': u['email'],
+                'Active': u['is_active'],
+                'Admin': u['is_admin'],
+                'Joined': u['created_at'].strftime('%Y-%m-%d') if u['created_at'] else '',
+                'Last Login': u['last_login'].strftime('%Y-%m-%d %H:%M') if u['last_login'] else 'Never'
+            }
+            for u in users
+        ]),
+        hide_index=True, on_select="rerun", selection_mode="multi-row", key="admin_user_table"
+    )
+    selected = [users[i]['username'] for i in selection.selection.rows if i < len(users)]
+
+    col1, col2 = st.columns(2)
+    for column, label, active in [(col1, "Activate Selected", True), (col2, "Deactivate Selected", False)]:
+        with column:
+            if st.button(label, disabled=not selected, key=f"admin_users_{active}"):
+                updated = dm.set_users_active(selected, active)
+                logger.info(f"Admin {st.session_state.username} set is_active={active} for {selected}")
+                dm.log_analytics_event(st.session_state.username, 'admin_update_user',
+                                       event_metadata={'users': selected, 'active': active})
+                st.session_state["admin_user_flash"] = f"{updated} users {'activated' if active else 'deactivated'}"
+                st.rerun(scope="fragment")
+
+    if len(selected) == 1:
+        st.write(f"Export data for {selected[0]}")
+        export_account_section(dm, selected[0])
+
+
+@st.fragment
+def admin_content_fragment() -> None:
+    """
+    Render the paginated, filterable content table with bulk delete.
+    Runs as a fragment so filtering, paging and deletes only rerun this section.
+    """
+    import pandas as pd
+
+    dm = get_data_manager()
+    fragment_flash("admin_content_flash")
+    col1, col2, col3, col4 = st.columns([1, 2, 1, 1])
+    with col1:
+        content_type = {"Blog": "blog", "Case Study": "case_study"}[
+            st.selectbox("Content Type", ["Blog", "Case Study"], key="admin_content_type")]
+    with col2:
+        search = st.text_input("Search", placeholder="Title", key="admin_content_search")
+    with col3:
+        author = st.text_input("Author", key="admin_content_author")
+    with col4:
+        status = st.selectbox("Status", ["All", "Published", "Unpublished", "Draft"], key="admin_content_status")
+    col1, col2, col3 = st.columns([2, 2, 1])
+    with col1:
+        dates = st.date_input("Created Between", value=[], key="admin_content_dates")
+    with col2:
+        sort = st.selectbox("Sort By", list(ADMIN_CONTENT_SORTS), key="admin_content_sort",
+                            format_func=lambda key: key.replace('_', ' ').title())
+    with col3:
+        page = admin_page_selector("admin_content_page")
+    descending = st.checkbox("Descending", value=True, key="admin_content_desc")
+
+    start_date = datetime(dates[0].year, dates[0].month, dates[0].day) if len(dates) > 0 else None
+    end_date = datetime(dates[1].year, dates[1].month, dates[1].day) + timedelta(days=1) if len(dates) > 1 else None
+    contents, total = dm.query_content(content_type, search.strip() or None, author.strip() or None,
+                                       None if status == "All" else status.lower(), start_date, end_date,
+                                       sort, descending, page)
+    pages = max(1, -(-total // ADMIN_PAGE_SIZE))
+    st.caption(f"{total} items, page {page} of {pages}")
+    selection = st.dataframe(
+        pd.DataFrame([
+            {
+                'Title': c['title'],
+                'Author': c['username'],
+                'Published': c['is_published'],
+                'Draft': c['is_draft'],
+                'Views': c['views'],
+                'Created': c['created_at'].strftime('%Y-%m-%d %H:%M') if c['created_at'] else '',
+                'Updated': c['updated_at'].strftime('%Y-%m-%d %H:%M') if c['updated_at'] else ''
+            }
+            for c in contents
+        ]),
+        hide_index=True, on_select="rerun", selection_mode="multi-row", key="admin_content_table"
+    )
+    selected = [contents[i]['id'] for i in selection.selection.rows if i < len(contents)]
+
+    confirm = st.checkbox(f"Confirm deleting {len(selected)} selected items", key="admin_content_confirm",
+                          disabled=not selected)
+    if st.button("Delete Selected", disabled=not (selected and confirm), key="admin_content_delete"):
+        deleted = dm.delete_contents(content_type, selected)
+        logger.info(f"Admin {st.session_state.username} deleted {deleted} {content_type} items")
+        dm.log_analytics_event(st.session_state.username, 'admin_delete_content', content_type,
+                               event_metadata={'ids': selected})
+        st.session_state["admin_content_flash"] = f"{deleted} items deleted"
+        st.rerun(scope="fragment")
+
+
 def admin_dashboard():
     """
     Render admin dashboard for content and user management.
     Restricted to admin users.
     """
+    import pandas as pd
+
     if not st.session_state.get('is_admin', False):
         st.error("Access restricted to administrators")
         logger.warning(f"Non-admin {st.session_state.username} attempted to access admin dashboard")
@@ -1869,58 +7446,110 @@ def admin_dashboard():
     dm = get_data_manager()
 
     st.subheader("Manage Users")
-    try:
-        with Session() as session:
-            users = session.query(User).all()
-            user_data = [
-                {
-                    'ID': u.id,
-                    'Username': u.username,
-                    'Email': u.email,
-                    'Active': u.is_active,
-                    'Admin': u.is_admin,
-                    'Last Login': u.last_login.strftime('%Y-%m-%d %H:%M') if u.last_login else 'Never'
-                }
-                for u in users
-            ]
-            st.dataframe(user_data)
-
-            st.subheader("Toggle User Status")
-            user_to_toggle = st.selectbox("Select User", [u.username for u in users], key="toggle_user")
-            new_status = st.selectbox("Set Status", ["Active", "Inactive"], key="user_status")
-            if st.button("Update User Status"):
-                user = session.query(User).filter_by(username=user_to_toggle).first()
-                user.is_active = (new_status == "Active")
-                session.commit()
-                st.success(f"User {user_to_toggle} status updated to {new_status}")
-                logger.info(f"Admin {st.session_state.username} updated {user_to_toggle} status to {new_status}")
-                dm.log_analytics_event(st.session_state.username, 'admin_update_user',
-                                       metadataa={'user': user_to_toggle})
-    except SQLAlchemyError as e:
-        logger.error(f"Error managing users in admin dashboard: {str(e)}")
-        st.error("Error managing users")
+    admin_users_fragment()
 
     st.subheader("Manage Content")
-    content_type = st.selectbox("Content Type", ["Blog", "Case Study"], key="admin_content_type")
-    try:
-        contents = dm.get_user_content("all", content_type.lower())
-        for content in contents:
-            with st.expander(f"{content.title} by {content.username}"):
-                st.write(f"Published: {content.is_published}, Draft: {content.is_draft}")
-                st.write(f"Created: {content.created_at}, Updated: {content.updated_at}")
-                if st.button(f"Delete {content.title}", key=f"delete_{content.id}"):
-                    if dm.delete_content(content_type.lower(), content.id):
-                        st.success(f"{content.title} deleted")
-                        logger.info(f"Admin {st.session_state.username} deleted {content_type}:{content.id}")
-                        dm.log_analytics_event(st.session_state.username,
-                                               'admin_delete_content', content_type, content.id)
-                        st.rerun()
-                    else:
-                        st.error("Failed to delete content")
-                        logger.error(f"Failed to delete {content_type}:{content.id}")
-    except SQLAlchemyError as e:
-        logger.error(f"Error managing content in admin dashboard: {str(e)}")
-        st.error("Error managing content")
+    admin_content_fragment()
+
+    st.subheader("Media Storage")
+    collector = start_media_collector()
+    col1, col2 = st.columns(2)
+    with col1:
+        if st.button("Preview Orphaned Media"):
+            collector.run_once(dry_run=True)
+    with col2:
+        if st.button("Delete Orphaned Media"):
+            collector.run_once()
+            dm.log_analytics_event(st.session_state.username, 'admin_media_gc')
+    if collector.last_report:
+        report = collector.last_report
+        verb = "Would reclaim" if report.get('dry_run') else "Reclaimed"
+        st.write(f"Last run {collector.last_run.strftime('%Y-%m-%d %H:%M')} UTC: scanned {report['scanned']}, "
+                 f"orphaned {report['orphaned']}, deleted {report['deleted']}. "
+                 f"{verb} {report['bytes_reclaimed'] / (1024 * 1024):.1f} MB.")
+
+    st.subheader("Deleted Content")
+    purger = start_content_purger()
+    st.write(f"{dm.count_pending_purge()} deleted items awaiting purge "
+             f"(purged {CONTENT_PURGE_GRACE_PERIOD.total_seconds() / 3600:.0f}h after deletion)")
+    if st.button("Purge Now"):
+        purger.run_once()
+        dm.log_analytics_event(st.session_state.username, 'admin_content_purge')
+    if purger.last_report:
+        report = purger.last_report
+        st.write(f"Last run {purger.last_run.strftime('%Y-%m-%d %H:%M')} UTC: purged {report.get('purged', 0)} items "
+                 f"in {report.get('batches', 0)} batches, {sum(report.get('rows', {}).values())} rows removed.")
+
+    st.subheader("Slow Queries")
+    st.caption(f"Statements slower than {SLOW_QUERY_THRESHOLD_MS:.0f} ms in this process, by total time")
+    offenders = get_slow_query_log().top_offenders()
+    if offenders:
+        report = pd.DataFrame([{
+            'SQL': o['sql'][:120], 'Count': o['count'], 'Total ms': o['total_ms'], 'Avg ms': o['avg_ms'],
+            'Max ms': o['max_ms'], 'Call Sites': ", ".join(o['call_sites']), 'Full Scans': ", ".join(o['full_scans'])
+        } for o in offenders])
+        st.dataframe(report.style.apply(
+            lambda row: ['background-color: #5c1f2a' if row['Full Scans'] else ''] * len(row), axis=1
+        ), hide_index=True)
+        for offender in offenders:
+            if offender['full_scans']:
+                with st.expander(f"Full scan of {', '.join(offender['full_scans'])}: {offender['sql'][:60]}"):
+                    st.code(offender['sql'], language="sql")
+                    st.code("\n".join(offender['plan'] or []))
+                    st.write(f"Parameters: {offender['parameters']}")
+    else:
+        st.write("No slow queries recorded")
+
+    st.subheader("Job Queue")
+    job_stats = dm.get_job_stats()
+    col1, col2, col3, col4 = st.columns(4)
+    for column, status in zip((col1, col2, col3, col4), ('queued', 'running', 'failed', 'done')):
+        with column:
+            st.metric(status.title(), job_stats.get(status, 0))
+    if job_stats.get('failed') and st.button("Retry Failed Jobs"):
+        st.success(f"{dm.retry_failed_jobs()} jobs requeued")
+
+    st.subheader("Image Cache")
+    cache_stats = get_image_cache().stats()
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Hits", cache_stats['hits'])
+    with col2:
+        st.metric("Misses", cache_stats['misses'])
+    with col3:
+        st.metric("Evictions", cache_stats['evictions'])
+    with col4:
+        st.metric("Memory", f"{cache_stats['bytes'] / (1024 * 1024):.1f} / {cache_stats['max_bytes'] / (1024 * 1024):.0f} MB")
+
+
+@st.fragment
+def follow_fragment(username: str) -> None:
+    """
+    Render a public profile's follower count and, for other signed-in users, the Follow/Unfollow button.
+    Runs as a fragment so following only reruns the count and button, not the profile page.
+    Args:
+        username: Username of the profile being viewed.
+    """
+    dm = get_data_manager()
+    fragment_flash("follow_flash")
+    st.write(f"**Followers**: {dm.get_follower_count(username)}")
+    if not st.session_state.authenticated or st.session_state.username == username:
+        return
+    if not dm.is_following(st.session_state.username, username):
+        if st.button(f"Follow {username}"):
+            dm.follow_user(st.session_state.username, username)
+            dm.log_analytics_event(st.session_state.username, 'follow',
+                                   event_metadata={'followed_user': username})
+            st.session_state["follow_flash"] = f"You are now following {username}"
+            st.rerun(scope="fragment")
+    else:
+        st.caption(f"You are following {username}")
+        if st.button(f"Unfollow {username}"):
+            dm.unfollow_user(st.session_state.username, username)
+            dm.log_analytics_event(st.session_state.username, 'unfollow',
+                                   event_metadata={'unfollowed_user': username})
+            st.session_state["follow_flash"] = f"You have unfollowed {username}"
+            st.rerun(scope="fragment")
 
 
 def public_profile_page():
@@ -1941,6 +7570,9 @@ def public_profile_page():
                 st.error("User not found")
                 logger.error(f"Public profile not found for {username}")
                 return
+            if not user.is_active:
+                st.info("This account has been deactivated")
+                return
             profile = user.profile or {}
             st.subheader(f"{username}'s Profile")
             st.write(f"**Bio**: {profile.get('bio', 'No bio available')}")
@@ -1953,51 +7585,50 @@ def public_profile_page():
 
             profile_picture = profile.get('profile_picture')
             if profile_picture:
-                media = session.query(Media).filter_by(id=profile_picture).first()
+                media = session.query(Media.id, Media.type, Media.filename).filter_by(id=profile_picture).first()
                 if media and media.type == 'image':
-                    try:
-                        img_data = base64.b64decode(media.content)
-                        img = Image.open(io.BytesIO(img_data))
-                        st.image(img, caption="Profile Picture", width=150)
-                    except Exception as e:
-                        logger.error(f"Error rendering profile picture for {username}: {str(e)}")
-
-            if st.session_state.authenticated and st.session_state.username != username:
-                user_obj = session.query(User).filter_by(username=st.session_state.username).first()
-                following = user_obj.profile.get('following', [])
-                if username not in following:
-                    if st.button(f"Follow {username}"):
-                        following.append(username)
-                        dm.update_user_profile(st.session_state.username, {'following': following})
-                        st.success(f"You are now following {username}")
-                        logger.info(f"{st.session_state.username} followed {username}")
-                        dm.log_analytics_event(st.session_state.username, 'follow',
-                                               metadataa={'followed_user': username})
-                        st.rerun()
-                else:
-                    if st.button(f"Unfollow {username}"):
-                        following.remove(username)
-                        dm.update_user_profile(st.session_state.username, {'following': following})
-                        st.success(f"You have unfollowed {username}")
-                        logger.info(f"{st.session_state.username} unfollowed {username}")
-                        dm.log_analytics_event(st.session_state.username, 'unfollow',
-                                               metadataa={'unfollowed_user': username})
-                        st.rerun()
+                    render_media(media, width=150, caption="Profile Picture")
+
+            follow_fragment(username)
 
             st.subheader("Public Content")
-            blogs = session.query(Blog).filter_by(username=username, is_published=True).all()
-            case_studies = session.query(CaseStudy).filter_by(username=username, is_published=True).all()
+            blogs = session.query(Blog).filter_by(username=username, is_published=True, deleted_at=None).all()
+            case_studies = session.query(CaseStudy).filter_by(username=username, is_published=True, deleted_at=None).all()
             if not (blogs or case_studies):
                 st.info("No public content available")
             for content in blogs + case_studies:
                 st.markdown(f"- [{content.title}]({content.public_link}) ({content.content_type.capitalize()})")
             dm.log_analytics_event(st.session_state.username if st.session_state.authenticated else None,
-                                   'view_profile', metadataa={'profile_user': username})
+                                   'view_profile', event_metadata={'profile_user': username})
     except SQLAlchemyError as e:
         logger.error(f"Error loading public profile for {username}: {str(e)}")
         st.error("Error loading profile")
 
 
+@st.fragment
+def notification_fragment(notification: Notification) -> None:
+    """
+    Render a single notification with its Mark as Read action.
+    Runs as a fragment so marking one notification read only reruns that notification.
+    Args:
+        notification: Notification object.
+    """
+    dm = get_data_manager()
+    html_value = notification.message_html if notification.render_version else \
+        render_notification(notification.message, notification.created_at)
+    st.markdown(f"<div class='notification'>{'📬 ' if not notification.is_read else ''}{html_value}</div>",
+                unsafe_allow_html=True)
+    if notification.content_type and notification.content_id:
+        content = dm.get_content_by_id(notification.content_type, notification.content_id)
+        if content:
+            st.markdown(f"[View {notification.content_type.capitalize()}]({content.public_link})")
+    if not notification.is_read:
+        if st.button("Mark as Read", key=f"read_{notification.id}"):
+            if dm.mark_notification_read(notification.id):
+                notification.is_read = True
+            st.rerun(scope="fragment")
+
+
 def notifications_page():
     """
     Render notifications page.
@@ -2020,19 +7651,7 @@ def notifications_page():
 
         for notification in notifications:
             with st.container():
-                st.markdown(
-                    f"<div class='notification'>{'📬 ' if not notification.is_read else ''}{notification.message} "
-                    f"({notification.created_at.strftime('%Y-%m-%d %H:%M')})</div>",
-                    unsafe_allow_html=True
-                )
-                if notification.content_type and notification.content_id:
-                    content = dm.get_content_by_id(notification.content_type, notification.content_id)
-                    if content:
-                        st.markdown(f"[View {notification.content_type.capitalize()}]({content.public_link})")
-                if not notification.is_read:
-                    if st.button("Mark as Read", key=f"read_{notification.id}"):
-                        dm.mark_notification_read(notification.id)
-                        st.rerun()
+                notification_fragment(notification)
         dm.log_analytics_event(username, 'view_notifications')
     except SQLAlchemyError as e:
         logger.error(f"Error loading notifications for {username}: {str(e)}")
@@ -2057,9 +7676,10 @@ def tag_explorer_page():
                 tag = session.query(Tag).filter_by(name=selected_tag).first()
                 blogs = tag.blogs
                 case_studies = tag.case_studies
+                inactive = set(session.scalars(select(User.id).where(User.is_active == False)))
                 st.subheader(f"Content tagged with '{selected_tag}'")
                 for content in blogs + case_studies:
-                    if content.is_published:
+                    if content.is_published and content.deleted_at is None and content.user_id not in inactive:
                         with st.container():
                             st.markdown("<div class='content-card'>", unsafe_allow_html=True)
                             st.write(f"**{content.title}** ({content.content_type.capitalize()})")
@@ -2069,7 +7689,7 @@ def tag_explorer_page():
                 dm.log_analytics_event(
                     st.session_state.username if st.session_state.authenticated else None,
                     'explore_tag',
-                    metadataa={'tag': selected_tag}
+                    event_metadata={'tag': selected_tag}
                 )
     except SQLAlchemyError as e:
         logger.error(f"Error exploring tags: {str(e)}")
@@ -2100,6 +7720,20 @@ def draft_management_page():
             for draft in drafts:
                 with st.expander(f"{draft.data.get('title', 'Untitled')} (Created: {draft.created_at.strftime('%Y-%m-%d')})"):
                     st.write(f"Content Type: {draft.content_type.capitalize()}")
+                    history = dm.get_draft_history(draft.id)
+                    if len(history) > 1:
+                        version_labels = {
+                            f"Version {h['seq']} ({h['created_at'].strftime('%Y-%m-%d %H:%M')})": h['seq']
+                            for h in history[1:]
+                        }
+                        version = st.selectbox("Earlier Versions", list(version_labels.keys()),
+                                               key=f"draft_version_{draft.id}")
+                        if st.button("Restore Version", key=f"restore_draft_{draft.id}"):
+                            restored = dm.get_draft_revision(draft.id, version_labels[version])
+                            if restored is not None:
+                                dm.save_draft(username, draft.content_type, draft.content_id, restored, draft_id=draft.id)
+                                logger.info(f"Draft {draft.id} restored to version {version_labels[version]} by {username}")
+                                st.rerun()
                     if st.button("Edit Draft", key=f"edit_draft_{draft.id}"):
                         st.session_state.edit_draft_id = draft.id
                         st.session_state.edit_draft_type = content_type.lower()
@@ -2167,10 +7801,12 @@ def draft_management_page():
                     content = st.text_area("Content", value=data.get('content', ''), height=300)
                     if st.form_submit_button("Update Draft"):
                         media_ids = data.get('media', [])
-                        if media_files:
-                            for file in media_files:
-                                media_id = dm.save_media(username, file)
-                                media_ids.append(media_id)
+                        try:
+                            media_ids.extend(save_uploaded_media(dm, username, media_files))
+                        except ValueError as e:
+                            st.error(str(e))
+                            logger.error(f"Media upload failed for draft {draft_id}: {str(e)}")
+                            return
                         new_data = {
                             'title': title,
                             'content': content,
@@ -2181,9 +7817,9 @@ def draft_management_page():
                             'is_draft': True
                         }
                         try:
-                            new_draft_id = dm.save_draft(username, 'blog', draft.content_id, new_data)
-                            st.success(f"Draft updated! New Draft ID: {new_draft_id}")
-                            logger.info(f"Draft {draft_id} updated to {new_draft_id} by {username}")
+                            dm.save_draft(username, 'blog', draft.content_id, new_data, draft_id=draft.id)
+                            st.success("Draft updated!")
+                            logger.info(f"Draft {draft_id} updated by {username}")
                             del st.session_state.edit_draft_id
                             st.rerun()
                         except ValueError as e:
@@ -2195,10 +7831,12 @@ def draft_management_page():
                     results = st.text_area("Results", value=data.get('results', ''), height=200)
                     if st.form_submit_button("Update Draft"):
                         media_ids = data.get('media', [])
-                        if media_files:
-                            for file in media_files:
-                                media_id = dm.save_media(username, file)
-                                media_ids.append(media_id)
+                        try:
+                            media_ids.extend(save_uploaded_media(dm, username, media_files))
+                        except ValueError as e:
+                            st.error(str(e))
+                            logger.error(f"Media upload failed for draft {draft_id}: {str(e)}")
+                            return
                         new_data = {
                             'title': title,
                             'problem': problem,
@@ -2211,9 +7849,9 @@ def draft_management_page():
                             'is_draft': True
                         }
                         try:
-                            new_draft_id = dm.save_draft(username, 'case_study', draft.content_id, new_data)
-                            st.success(f"Draft updated! New Draft ID: {new_draft_id}")
-                            logger.info(f"Draft {draft_id} updated to {new_draft_id} by {username}")
+                            dm.save_draft(username, 'case_study', draft.content_id, new_data, draft_id=draft.id)
+                            st.success("Draft updated!")
+                            logger.info(f"Draft {draft_id} updated by {username}")
                             del st.session_state.edit_draft_id
                             st.rerun()
                         except ValueError as e:
@@ -2254,11 +7892,14 @@ def user_settings_page():
                     logger.info(f"Notification preferences updated for {username}")
                     dm.log_analytics_event(username, 'update_settings')
 
+            st.subheader("Export Your Data")
+            st.caption("Download your content, drafts, comments, media and analytics as a ZIP archive.")
+            export_account_section(dm, username)
+
             st.subheader("Account Management")
             if st.button("Deactivate Account"):
                 if st.checkbox("Confirm Deactivation"):
-                    user.is_active = False
-                    session.commit()
+                    dm.set_users_active([username], False)
                     st.session_state.authenticated = False
                     st.session_state.username = None
                     st.success("Account deactivated")
@@ -2276,6 +7917,19 @@ def enhanced_main():
     Orchestrates navigation and page rendering.
     """
     custom_css()
+    pending = get_pending_migrations(engine)
+    if pending:
+        st.error(f"The database schema is out of date (pending migrations: {', '.join(map(str, pending))}). "
+                 "Run `python manage.py migrate`, then reload this page.")
+        st.stop()
+    if MEDIA_SERVER_ENABLED:
+        start_media_server()
+    start_media_collector()
+    start_content_purger()
+    start_trending_renormalizer()
+    schedule_rerender_job()
+    if JOB_INLINE_WORKER:
+        start_job_worker_thread()
     if "authenticated" not in st.session_state:
         st.session_state.authenticated = False
         st.session_state.username = None
@@ -2291,6 +7945,7 @@ def enhanced_main():
 
     st.sidebar.title(f"Welcome, {st.session_state.username}")
     pages = [
+        "Home",
         "View Content",
         "Create Content",
         "Edit Content",
@@ -2308,8 +7963,22 @@ def enhanced_main():
 
     page = st.sidebar.selectbox("Navigate", pages, help="Select a page to view")
 
+    with profile_queries(page) as profile:
+        render_page(page)
+    if profile and st.session_state.is_admin:
+        query_debug_panel(profile)
+
+
+def render_page(page: str) -> None:
+    """
+    Render the selected navigation page.
+    Args:
+        page: Page name from the sidebar.
+    """
     try:
-        if page == "View Content":
+        if page == "Home":
+            timeline_page()
+        elif page == "View Content":
             view_content_page()
         elif page == "Create Content":
             create_content_page()
@@ -2344,6 +8013,36 @@ def enhanced_main():
         logger.error(f"Unexpected error in main: {str(e)}")
         st.error("An unexpected error occurred. Please try again.")
 
+
+def query_debug_panel(profile: QueryProfile) -> None:
+    """
+    Render the admin-only performance panel in the sidebar.
+    Shows this rerun's render time, query statistics and N+1 suspects, plus per-page averages
+    over recent reruns in this process.
+    Args:
+        profile: Profile of the page just rendered.
+    """
+    import pandas as pd
+
+    summary = profile.to_dict()
+    with st.sidebar.expander("Performance"):
+        st.write(f"**{summary['page']}**: {summary['render_ms']:.0f} ms render, "
+                 f"{summary['query_count']} queries, {summary['db_ms']:.0f} ms in the database")
+        for repeated in summary['n_plus_one']:
+            st.warning(f"Possible N+1: executed {repeated['count']} times")
+            st.code(repeated['sql'], language="sql")
+        if summary['slowest']:
+            st.caption("Slowest statements")
+            st.dataframe(pd.DataFrame(summary['slowest']), hide_index=True)
+        recent = pd.DataFrame(list(get_query_metrics()))
+        if not recent.empty:
+            st.caption("Recent reruns by page")
+            st.dataframe(recent.groupby('page').agg(
+                reruns=('page', 'size'), avg_render_ms=('render_ms', 'mean'),
+                avg_queries=('query_count', 'mean'), avg_db_ms=('db_ms', 'mean')
+            ).round(1))
+
+
 # Helper Functions
 
 
@@ -2364,20 +8063,81 @@ def validate_input(text: str, max_length: int = 1000) -> bool:
     return True
 
 
-def render_media(media: Media, width: int = 300) -> None:
+def save_uploaded_media(dm: DataManager, username: str, files: List[Any]) -> List[str]:
+    """
+    Save uploaded files concurrently while showing upload progress.
+    Args:
+        dm: Data manager instance.
+        username: Uploader's username.
+        files: Uploaded file objects.
+    Returns:
+        List[str]: Media IDs in upload order.
+    Raises:
+        ValueError: If any file is rejected.
+    """
+    if not files:
+        return []
+    progress = st.progress(0.0, text="Uploading media...")
+
+    def update(done: int, total: int) -> None:
+        progress.progress(min(done / total, 1.0) if total else 1.0,
+                          text=f"Uploading media... {done // 1024:,} / {total // 1024:,} KB")
+
+    try:
+        return dm.save_media_batch(username, files, progress_callback=update)
+    finally:
+        progress.empty()
+
+
+def export_account_section(dm: DataManager, username: str) -> None:
+    """
+    Build (or resume) an account export archive and offer it for download.
+    Args:
+        dm: Data manager instance.
+        username: Account to export.
+    """
+    output_path = EXPORT_DIR / f"{username}.zip"
+    if st.button("Prepare Export", key=f"prepare_export_{username}"):
+        with st.status("Exporting...") as status:
+            try:
+                AccountExporter(dm, username, output_path).run(
+                    progress_callback=lambda section, count: status.update(
+                        label=f"Exported {count} {section.replace('_', ' ')}"))
+                status.update(label="Export ready", state="complete")
+                dm.log_analytics_event(st.session_state.username, 'export_account', event_metadata={'user': username})
+            except (ValueError, OSError, zipfile.BadZipFile, SQLAlchemyError) as e:
+                logger.error(f"Account export failed for {username}: {str(e)}")
+                status.update(label="Export failed; preparing it again resumes where it stopped", state="error")
+    if output_path.exists() and not AccountExporter(dm, username, output_path).checkpoint_path.exists():
+        # Reruns only render the button; the archive is read when it is clicked.
+        st.download_button("Download Export", data=output_path.read_bytes, file_name=output_path.name,
+                           mime="application/zip", key=f"download_export_{username}")
+
+
+def render_media(media: Any, width: int = 300, caption: Optional[str] = None) -> None:
     """
     Render media content in Streamlit.
+    Images and videos are referenced by media server URL so the browser streams and caches them;
+    bytes are only inlined when the media server is disabled.
     Args:
-        media: Media object.
+        media: Media object or row with id, type and filename.
         width: Image width in pixels.
+        caption: Image caption, defaults to the filename.
     """
     try:
+        dm = get_data_manager()
         if media.type == 'image':
-            img_data = base64.b64decode(media.content)
-            img = Image.open(io.BytesIO(img_data))
-            st.image(img, caption=media.filename, width=width)
+            if MEDIA_SERVER_ENABLED:
+                st.image(media_url(media.id, width), caption=caption or media.filename, width=width)
+            else:
+                image = get_image_cache().get_or_render(dm, media.id, width)
+                st.image(image[0], caption=caption or media.filename, width=width)
         elif media.type == 'video':
-            st.video(base64.b64decode(media.content))
+            if MEDIA_SERVER_ENABLED:
+                st.video(media_url(media.id))
+            else:
+                info = dm.get_media_info(media.id)
+                st.video(dm.read_media_range(media.id, 0, info['size'] - 1))
         else:
             st.warning(f"Unsupported media type: {media.type}")
     except Exception as e:
@@ -2395,9 +8155,9 @@ def get_popular_tags(limit: int = 10) -> List[str]:
     """
     try:
         with Session() as session:
-            tags = session.query(Tag).join(blog_tags).group_by(Tag.id).order_by(
+            tags = session.query(Tag).join(blog_tags).join(Blog).filter(Blog.deleted_at.is_(None)).group_by(Tag.id).order_by(
                 func.count(blog_tags.c.blog_id).desc()).limit(limit).all()
-            tags += session.query(Tag).join(case_study_tags).group_by(Tag.id).order_by(
+            tags += session.query(Tag).join(case_study_tags).join(CaseStudy).filter(CaseStudy.deleted_at.is_(None)).group_by(Tag.id).order_by(
                 func.count(case_study_tags.c.case_study_id).desc()).limit(limit).all()
             return list(set(tag.name for tag in tags))[:limit]
     except SQLAlchemyError as e:
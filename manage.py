@@ -0,0 +1,429 @@
+"""
+GalaxyWrite management commands.
+Run maintenance tasks outside the Streamlit app, e.g.:
+    python manage.py export-account alice --output exports/alice.zip
+    python manage.py import-content posts/ archive.jsonl --username alice
+    python manage.py worker --processes 4
+    python manage.py slow-queries --limit 10
+    python manage.py generate-data --scale 10k
+    python manage.py benchmark --scale 10k --save-baseline
+    python manage.py load-test --scale 10k --sessions 1 4 16 32
+    python manage.py import-time --budget 1000
+    python manage.py migrate --dry-run
+    python manage.py rerender
+    python manage.py related
+"""
+
+import argparse
+import logging
+import multiprocessing
+import os
+import sys
+import zipfile
+from pathlib import Path
+
+# Importing the app bootstraps the database schema; here it must only be inspected, so that
+# `migrate` (including --dry-run) sees every pending migration.
+os.environ["GALAXYWRITE_AUTO_MIGRATE"] = "0"
+
+from benchmarks import (
+    BENCHMARK_ITERATIONS,
+    BENCHMARK_REGRESSION_TOLERANCE,
+    BENCHMARK_SCALES,
+    BENCHMARK_SEED,
+    BENCHMARKS,
+    IMPORT_TIME_BUDGET_MS,
+    IMPORT_TIME_RUNS,
+    LOAD_TEST_DURATION,
+    LOAD_TEST_SESSIONS,
+    LoadTest,
+    SyntheticDataGenerator,
+    baseline_path,
+    compare_to_baseline,
+    database_path,
+    load_results,
+    measure_import_time,
+    open_data_manager,
+    run_benchmarks,
+    save_results,
+)
+from blog_platform import (
+    EXPORT_BATCH_SIZE,
+    EXPORT_DIR,
+    IMPORT_BATCH_SIZE,
+    IMPORT_WORKERS,
+    JOB_POLL_INTERVAL,
+    MIGRATION_BATCH_SIZE,
+    MIGRATIONS,
+    RENDER_TARGETS,
+    RELATED_TOP_K,
+    RENDER_VERSION,
+    RERENDER_BATCH_SIZE,
+    SLOW_QUERY_LOG_FILE,
+    AccountExporter,
+    BulkImporter,
+    RelatedContentIndex,
+    SlowQueryLog,
+    engine,
+    get_applied_migrations,
+    get_data_manager,
+    run_job_worker,
+    run_migrations,
+)
+
+
+def export_account(args: argparse.Namespace) -> int:
+    """
+    Export a user's account to a ZIP archive, resuming an interrupted export by default.
+    Args:
+        args: Parsed command-line arguments.
+    Returns:
+        int: Process exit code.
+    """
+    output = args.output or EXPORT_DIR / f"{args.username}.zip"
+    exporter = AccountExporter(get_data_manager(), args.username, output, batch_size=args.batch_size)
+    try:
+        manifest = exporter.run(
+            resume=not args.restart,
+            progress_callback=lambda section, count: print(f"{section}: {count}", file=sys.stderr)
+        )
+    except (ValueError, zipfile.BadZipFile) as e:
+        print(str(e), file=sys.stderr)
+        return 1
+    for section, counts in manifest['sections'].items():
+        print(f"{section}: " + ", ".join(f"{k}={v}" for k, v in counts.items()))
+    print(f"Wrote {output}")
+    return 0
+
+
+def import_content(args: argparse.Namespace) -> int:
+    """
+    Bulk import blogs and case studies from JSONL files and Markdown directories.
+    Args:
+        args: Parsed command-line arguments.
+    Returns:
+        int: Process exit code; 1 if any record failed.
+    """
+    importer = BulkImporter(get_data_manager(), default_username=args.username,
+                            batch_size=args.batch_size, workers=args.workers)
+    report = importer.run(
+        args.paths,
+        progress_callback=lambda r: print(f"read {r['read']}, imported {sum(r['imported'].values())}", file=sys.stderr)
+    )
+    for error in report['errors']:
+        print(error, file=sys.stderr)
+    print(f"Read {report['read']} records in {report['duration_seconds']}s: "
+          f"{report['imported']['blog']} blogs and {report['imported']['case_study']} case studies imported, "
+          f"{report['skipped']} already present, {report['failed']} failed, {report['tags_created']} new tags")
+    return 1 if report['failed'] else 0
+
+
+def worker(args: argparse.Namespace) -> int:
+    """
+    Run job worker processes until interrupted.
+    Args:
+        args: Parsed command-line arguments.
+    Returns:
+        int: Process exit code.
+    """
+    if args.processes == 1:
+        run_job_worker(args.poll_interval)
+        return 0
+    context = multiprocessing.get_context('spawn')
+    processes = [context.Process(target=run_job_worker, args=(args.poll_interval,), name=f"job-worker-{n}")
+                 for n in range(args.processes)]
+    for process in processes:
+        process.start()
+    try:
+        for process in processes:
+            process.join()
+    except KeyboardInterrupt:
+        for process in processes:
+            process.join()
+    return 0
+
+
+def slow_queries(args: argparse.Namespace) -> int:
+    """
+    Print the top slow-query offenders from the slow query log files.
+    Args:
+        args: Parsed command-line arguments.
+    Returns:
+        int: Process exit code.
+    """
+    for rank, offender in enumerate(SlowQueryLog.from_file(args.log).top_offenders(args.limit), 1):
+        scans = f"  FULL SCAN: {', '.join(offender['full_scans'])}" if offender['full_scans'] else ""
+        print(f"{rank}. {offender['count']}x, total {offender['total_ms']} ms, avg {offender['avg_ms']} ms, "
+              f"max {offender['max_ms']} ms{scans}")
+        print(f"   {offender['sql']}")
+        print(f"   called from: {', '.join(offender['call_sites']) or 'unknown'}")
+        for step in offender['plan'] or []:
+            print(f"   plan: {step}")
+    return 0
+
+
+def generate_data(args: argparse.Namespace) -> int:
+    """
+    Fill an empty benchmark database with a deterministic synthetic dataset.
+    Args:
+        args: Parsed command-line arguments.
+    Returns:
+        int: Process exit code.
+    """
+    path = args.database or database_path(args.scale)
+    generator = SyntheticDataGenerator(open_data_manager(path), scale=args.scale, seed=args.seed)
+    try:
+        counts = generator.run(
+            progress_callback=lambda table, done, total: print(f"{table}: {done}/{total}", file=sys.stderr)
+        )
+    except ValueError as e:
+        print(f"Generation failed: {e}", file=sys.stderr)
+        return 1
+    print(f"Generated {args.scale} dataset in {path}: " + ", ".join(f"{count} {kind}" for kind, count in counts.items()))
+    return 0
+
+
+def benchmark(args: argparse.Namespace) -> int:
+    """
+    Run the benchmark suite and compare it with the stored baseline.
+    Args:
+        args: Parsed command-line arguments.
+    Returns:
+        int: Process exit code; 1 if any benchmark regressed.
+    """
+    logging.getLogger("blog_platform").setLevel(logging.WARNING)
+    path = args.database or database_path(args.scale)
+    if not path.exists():
+        print(f"No benchmark database at {path}; run generate-data --scale {args.scale} first", file=sys.stderr)
+        return 1
+    print(f"{'benchmark':32} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'queries':>8} {'peak KB':>9}")
+    try:
+        results = run_benchmarks(
+            open_data_manager(path), names=args.only, iterations=args.iterations, seed=args.seed,
+            progress_callback=lambda name, r: print(f"{name:32} {r['p50_ms']:>9} {r['p95_ms']:>9} {r['p99_ms']:>9} "
+                                                    f"{r['queries']:>8} {r['peak_kb']:>9}")
+        )
+    except ValueError as e:
+        print(f"Benchmark failed: {e}", file=sys.stderr)
+        return 1
+    results['scale'] = args.scale
+    baseline = args.baseline or baseline_path(args.scale)
+    if args.output:
+        save_results(results, args.output)
+    if args.save_baseline:
+        save_results(results, baseline)
+        print(f"Saved baseline to {baseline}")
+        return 0
+    if not baseline.exists():
+        print(f"No baseline at {baseline}; rerun with --save-baseline to create one")
+        return 0
+    regressions = compare_to_baseline(results, load_results(baseline), tolerance=args.tolerance)
+    for regression in regressions:
+        print(f"REGRESSION {regression['name']} {regression['metric']}: "
+              f"{regression['baseline']} -> {regression['current']}")
+    if not regressions:
+        print(f"No regressions against {baseline}")
+    return 1 if regressions else 0
+
+
+def load_test(args: argparse.Namespace) -> int:
+    """
+    Drive the data layer from increasing numbers of concurrent sessions.
+    Args:
+        args: Parsed command-line arguments.
+    Returns:
+        int: Process exit code.
+    """
+    logging.getLogger("blog_platform").setLevel(logging.CRITICAL)
+    path = args.database or database_path(args.scale)
+    if not path.exists():
+        print(f"No benchmark database at {path}; run generate-data --scale {args.scale} first", file=sys.stderr)
+        return 1
+    mix = None
+    if args.mix:
+        try:
+            mix = {name: int(weight) for name, weight in (item.split("=", 1) for item in args.mix)}
+        except ValueError:
+            print("--mix entries must look like name=weight", file=sys.stderr)
+            return 1
+    print(f"{'sessions':>8} {'ops/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>9} {'lock wait ms':>12} {'errors':>7}")
+    try:
+        test = LoadTest(open_data_manager(path), mix=mix, duration=args.duration, think_time=args.think_time,
+                        seed=args.seed, with_worker=not args.no_worker)
+        results = test.run(
+            args.sessions,
+            progress_callback=lambda r: print(
+                f"{r['sessions']:>8} {r['throughput_ops']:>8} {r['p50_ms']:>8} {r['p95_ms']:>8} {r['p99_ms']:>9} "
+                f"{r['lock_wait_ms']:>12} {r['error_rate']:>7.2%}" + (f"  {r['db_errors']}" if r['db_errors'] else "")
+            )
+        )
+    except ValueError as e:
+        print(f"Load test failed: {e}", file=sys.stderr)
+        return 1
+    if args.output:
+        save_results({'scale': args.scale, 'mix': test.mix, 'levels': results}, args.output)
+    return 0
+
+
+def import_time(args: argparse.Namespace) -> int:
+    """
+    Check the app module's import time against the budget.
+    Args:
+        args: Parsed command-line arguments.
+    Returns:
+        int: Process exit code; 1 if over budget or a deferred dependency is imported eagerly.
+    """
+    result = measure_import_time(runs=args.runs, budget_ms=args.budget)
+    print(f"import {result['module']}: median {result['median_ms']} ms, best {result['best_ms']} ms "
+          f"(budget {result['budget_ms']} ms)")
+    for name, ms in result['slowest_imports']:
+        print(f"   {name:32} {ms:>8} ms")
+    if result['deferred_loaded']:
+        print(f"Deferred modules imported at startup: {', '.join(result['deferred_loaded'])}")
+    return 0 if result['within_budget'] else 1
+
+
+def migrate(args: argparse.Namespace) -> int:
+    """
+    Apply pending schema migrations, estimate them, or list migration status.
+    Args:
+        args: Parsed command-line arguments.
+    Returns:
+        int: Process exit code.
+    """
+    if args.status:
+        applied = get_applied_migrations(engine)
+        for version in sorted(MIGRATIONS):
+            state = f"applied {applied[version]['applied_at']}" if version in applied else "pending"
+            print(f"{version:>4}  {state:32} {MIGRATIONS[version]['name']}")
+        return 0
+    report = run_migrations(engine, dry_run=args.dry_run, target=args.target, batch_size=args.batch_size)
+    if not report:
+        print("No pending migrations")
+    for entry in report:
+        timing = f"estimated {entry['estimated_seconds']}s" if args.dry_run else f"took {entry['duration_seconds']}s"
+        print(f"{entry['version']:>4}  {entry['name']} ({timing})")
+        for step in entry['steps']:
+            rows = f" [{step['rows']} rows, ~{step['estimated_seconds']}s]" if step['rows'] else ""
+            print(f"        {step['step']}{rows}")
+    return 0
+
+
+def rerender(args: argparse.Namespace) -> int:
+    """
+    Re-render stored HTML and excerpts older than the current render version, in batches.
+    Args:
+        args: Parsed command-line arguments.
+    Returns:
+        int: Process exit code.
+    """
+    dm = get_data_manager()
+    for target in RENDER_TARGETS:
+        total, cursor = 0, 0
+        while cursor is not None:
+            count, cursor = dm.rerender_stale(target, cursor, args.batch_size)
+            total += count
+        print(f"{target}: re-rendered {total} rows to render version {RENDER_VERSION}")
+    return 0
+
+
+def related(args: argparse.Namespace) -> int:
+    """
+    Rebuild the related posts of all published content from scratch.
+    Args:
+        args: Parsed command-line arguments.
+    Returns:
+        int: Process exit code.
+    """
+    with get_data_manager().session_factory() as session:
+        report = RelatedContentIndex().build(session)
+        session.commit()
+    print(f"Stored up to {RELATED_TOP_K} related posts for {report['posts']} posts over {report['terms']} terms")
+    return 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="GalaxyWrite management commands")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    export_parser = subparsers.add_parser("export-account", help="Export everything a user owns to a ZIP archive")
+    export_parser.add_argument("username")
+    export_parser.add_argument("--output", help="Archive path (default: exports/<username>.zip)")
+    export_parser.add_argument("--batch-size", type=int, default=EXPORT_BATCH_SIZE, help="Rows fetched per database round trip")
+    export_parser.add_argument("--restart", action="store_true", help="Ignore any checkpoint and start over")
+    export_parser.set_defaults(func=export_account)
+
+    import_parser = subparsers.add_parser("import-content", help="Bulk import JSONL files and Markdown directories")
+    import_parser.add_argument("paths", nargs="+")
+    import_parser.add_argument("--username", help="Author for records that do not name one")
+    import_parser.add_argument("--batch-size", type=int, default=IMPORT_BATCH_SIZE, help="Rows inserted per transaction")
+    import_parser.add_argument("--workers", type=int, default=IMPORT_WORKERS, help="Validation worker processes")
+    import_parser.set_defaults(func=import_content)
+
+    worker_parser = subparsers.add_parser("worker", help="Run job queue worker processes")
+    worker_parser.add_argument("--processes", type=int, default=1, help="Number of worker processes")
+    worker_parser.add_argument("--poll-interval", type=float, default=JOB_POLL_INTERVAL,
+                               help="Seconds to wait when the queue is empty")
+    worker_parser.set_defaults(func=worker)
+
+    slow_parser = subparsers.add_parser("slow-queries", help="Report the slowest query shapes from the slow query log")
+    slow_parser.add_argument("--log", type=Path, default=SLOW_QUERY_LOG_FILE, help="Slow query log file")
+    slow_parser.add_argument("--limit", type=int, default=10, help="Number of offenders to show")
+    slow_parser.set_defaults(func=slow_queries)
+
+    generate_parser = subparsers.add_parser("generate-data", help="Generate a synthetic benchmark dataset")
+    generate_parser.add_argument("--scale", choices=list(BENCHMARK_SCALES), default="10k", help="Dataset size by user count")
+    generate_parser.add_argument("--database", type=Path, help="SQLite file (default: benchmark_data/galaxywrite-<scale>.db)")
+    generate_parser.add_argument("--seed", type=int, default=BENCHMARK_SEED, help="Random seed")
+    generate_parser.set_defaults(func=generate_data)
+
+    benchmark_parser = subparsers.add_parser("benchmark", help="Benchmark DataManager methods and page data paths")
+    benchmark_parser.add_argument("--scale", choices=list(BENCHMARK_SCALES), default="10k", help="Dataset to run against")
+    benchmark_parser.add_argument("--database", type=Path, help="SQLite file (default: benchmark_data/galaxywrite-<scale>.db)")
+    benchmark_parser.add_argument("--only", nargs="+", choices=list(BENCHMARKS), help="Benchmarks to run")
+    benchmark_parser.add_argument("--iterations", type=int, default=BENCHMARK_ITERATIONS, help="Timed iterations per benchmark")
+    benchmark_parser.add_argument("--seed", type=int, default=BENCHMARK_SEED, help="Seed for argument sampling")
+    benchmark_parser.add_argument("--baseline", type=Path, help="Baseline file (default: benchmark_data/baseline-<scale>.json)")
+    benchmark_parser.add_argument("--save-baseline", action="store_true", help="Store this run as the baseline")
+    benchmark_parser.add_argument("--tolerance", type=float, default=BENCHMARK_REGRESSION_TOLERANCE,
+                                  help="Allowed relative growth of p95 latency and peak memory")
+    benchmark_parser.add_argument("--output", type=Path, help="Also write the results to this JSON file")
+    benchmark_parser.set_defaults(func=benchmark)
+
+    load_parser = subparsers.add_parser("load-test", help="Simulate concurrent sessions against the data layer")
+    load_parser.add_argument("--scale", choices=list(BENCHMARK_SCALES), default="10k", help="Dataset to run against")
+    load_parser.add_argument("--database", type=Path, help="SQLite file (default: benchmark_data/galaxywrite-<scale>.db)")
+    load_parser.add_argument("--sessions", type=int, nargs="+", default=LOAD_TEST_SESSIONS, help="Concurrency levels")
+    load_parser.add_argument("--duration", type=float, default=LOAD_TEST_DURATION, help="Seconds per concurrency level")
+    load_parser.add_argument("--think-time", type=float, default=0.0, help="Mean pause between a session's operations")
+    load_parser.add_argument("--mix", nargs="+", metavar="NAME=WEIGHT", help="Operation mix (default: LOAD_TEST_MIX)")
+    load_parser.add_argument("--seed", type=int, default=BENCHMARK_SEED, help="Seed for argument sampling")
+    load_parser.add_argument("--no-worker", action="store_true", help="Do not run a job worker during the test")
+    load_parser.add_argument("--output", type=Path, help="Write the results to this JSON file")
+    load_parser.set_defaults(func=load_test)
+
+    import_time_parser = subparsers.add_parser("import-time", help="Check the app's import time against its budget")
+    import_time_parser.add_argument("--runs", type=int, default=IMPORT_TIME_RUNS, help="Timed imports")
+    import_time_parser.add_argument("--budget", type=float, default=IMPORT_TIME_BUDGET_MS, help="Median budget in ms")
+    import_time_parser.set_defaults(func=import_time)
+
+    migrate_parser = subparsers.add_parser("migrate", help="Apply pending schema migrations")
+    migrate_parser.add_argument("--dry-run", action="store_true", help="Report steps and estimated cost without applying")
+    migrate_parser.add_argument("--status", action="store_true", help="List applied and pending migrations")
+    migrate_parser.add_argument("--target", type=int, help="Highest version to apply")
+    migrate_parser.add_argument("--batch-size", type=int, default=MIGRATION_BATCH_SIZE, help="Rows per backfill transaction")
+    migrate_parser.set_defaults(func=migrate)
+
+    rerender_parser = subparsers.add_parser("rerender", help="Refresh stored HTML and excerpts after render rule changes")
+    rerender_parser.add_argument("--batch-size", type=int, default=RERENDER_BATCH_SIZE, help="Rows per transaction")
+    rerender_parser.set_defaults(func=rerender)
+
+    related_parser = subparsers.add_parser("related", help="Rebuild precomputed related posts")
+    related_parser.set_defaults(func=related)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())